@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+# Micro-benchmark of Stock.company_data access and of the bulk
+# CompanyDataTable.
+#
+# Stock.company_data used to return copy.deepcopy of a plain CompanyData
+# object; it now returns the frozen object itself. The Stock is built from
+# a canned quote (no network access). Run from the repository root:
+#
+#     PYTHONPATH=src python benchmarks/bench_company_data.py
+
+import copy
+import sys
+import timeit
+import yfinance as yf
+from yayFinPy.stock import CompanyData, CompanyDataTable, Stock
+
+
+class _LegacyCompanyData:
+    # CompanyData as it was: a plain object with a __dict__
+
+    def __init__(self, name, address, business_summary, logo_url, industry_sector, profits, country, website):
+        self.__name = name
+        self.__address = address
+        self.__business_summary = business_summary
+        self.__logo_url = logo_url
+        self.__industry_sector = industry_sector
+        self.__profits = profits
+        self.__country = country
+        self.__website = website
+
+
+class _CannedTicker:
+    # stands in for yf.Ticker so that a Stock can be built offline
+
+    def __init__(self, ticker_symbol):
+        name, address, summary, logo, sector, profits, country, website = _fields(0)
+        self.info = {"quoteType": "EQUITY", "symbol": ticker_symbol, "regularMarketPrice": 150.0,
+                     "regularMarketVolume": 1e7, "regularMarketOpen": 149.0, "regularMarketPreviousClose": 148.0,
+                     "regularMarketDayHigh": 151.0, "regularMarketDayLow": 147.0, "exchange": "NMS",
+                     "longName": name, "address1": address, "longBusinessSummary": summary, "logo_url": logo,
+                     "sector": sector, "profitMargins": profits, "country": country, "website": website,
+                     "pegRatio": 1.5, "marketCap": 2e12, "ask": 150.1, "askSize": 100, "bid": 149.9,
+                     "bidSize": 100, "trailingPE": 25.0, "shortName": name}
+
+
+def _offline_stock(ticker_symbol):
+    ticker = yf.Ticker
+    yf.Ticker = _CannedTicker
+    try:
+        return Stock(ticker_symbol)
+    finally:
+        yf.Ticker = ticker
+
+
+def _fields(i):
+    return ("Company %d" % i, "%d Main Street" % i, "A company which does things. " * 20,
+            "https://logo.example.com/%d.png" % i, ["Technology", "Energy", "Healthcare"][i % 3], 0.1 + i / 1e5,
+            ["United States", "Canada"][i % 2], "https://www.example%d.com" % i)
+
+
+def _deep_size(obj):
+    attrs = getattr(obj, "__dict__", None)
+    values = attrs.values() if attrs is not None else \
+        [object.__getattribute__(obj, s) for s in ("_CompanyData" + n for n in CompanyData.__slots__)]
+    return sys.getsizeof(obj) + (sys.getsizeof(attrs) if attrs is not None else 0) + \
+        sum(sys.getsizeof(v) for v in values)
+
+
+def main(number=100000, companies=10000):
+    legacy = _LegacyCompanyData(*_fields(0))
+    stock = _offline_stock("AAPL")
+
+    deepcopy_time = timeit.timeit(lambda: copy.deepcopy(legacy), number=number)
+    shared_time = timeit.timeit(lambda: stock.company_data, number=number)
+    print("company_data access, %d calls" % number)
+    print("  deepcopy (before): %8.1f ns/call" % (deepcopy_time / number * 1e9))
+    print("  shared (after):    %8.1f ns/call" % (shared_time / number * 1e9))
+
+    objects = {"S%d" % i: CompanyData(*_fields(i)) for i in range(companies)}
+    legacy_bytes = sum(_deep_size(_LegacyCompanyData(*_fields(i))) for i in range(companies))
+    frozen_bytes = sum(_deep_size(o) for o in objects.values())
+    table = CompanyDataTable(objects)
+    frame = table.to_dataframe()
+    table_bytes = int(frame.memory_usage(index=False, deep=True).sum())
+    print("company data of %d stocks" % companies)
+    print("  plain objects:    %8.1f MB" % (legacy_bytes / 1e6))
+    print("  slotted objects:  %8.1f MB" % (frozen_bytes / 1e6))
+    print("  CompanyDataTable: %8.1f MB" % (table_bytes / 1e6))
+
+
+if __name__ == '__main__':
+    main()
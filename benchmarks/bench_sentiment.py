@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+# Benchmark of sentiment scoring of 100k texts: one text after the other
+# (as Stock.sentiment used to do), with the SentimentPipeline in one process,
+# on a process pool, and again with a warm cache. Uses sentifish when it is
+# installed, and a small word list scorer otherwise. Run from the
+# repository root:
+#
+#     PYTHONPATH=src python benchmarks/bench_sentiment.py
+
+import random
+import time
+from yayFinPy.sentiment import SentimentPipeline, sentifish_score
+
+_POSITIVE = {"up", "beat", "strong", "buy", "bullish", "record", "growth"}
+_NEGATIVE = {"down", "miss", "weak", "sell", "bearish", "loss", "lawsuit"}
+_WORDS = sorted(_POSITIVE | _NEGATIVE) + ["the", "stock", "today", "earnings", "guidance", "$TSLA", "$AAPL"]
+
+
+def word_list_score(text):
+    words = text.lower().split()
+    pos = sum(w in _POSITIVE for w in words)
+    neg = sum(w in _NEGATIVE for w in words)
+    return 0.5 if pos == neg else pos / (pos + neg)
+
+
+def _corpus(n, unique, seed=0):
+    rnd = random.Random(seed)
+    texts = [" ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(8, 30))) for _ in range(unique)]
+    # retweets and tweets mentioning several tickers repeat
+    return [texts[rnd.randrange(unique)] for _ in range(n)]
+
+
+def _timed(label, n, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print("  %-28s %8.2f s %10.0f texts/s" % (label, elapsed, n / elapsed))
+    return result
+
+
+def main(n=100000, unique=60000):
+    try:
+        sentifish_score("warm up")
+        scorer, name = sentifish_score, "sentifish"
+    except ImportError:
+        scorer, name = word_list_score, "word list"
+    texts = _corpus(n, unique)
+    print("scoring %d texts (%d distinct) with the %s scorer" % (n, unique, name))
+
+    expected = _timed("one by one (before)", n, lambda: [scorer(t) for t in texts])
+    local = SentimentPipeline(scorer, cache_size=n, processes=0)
+    _timed("pipeline, one process", n, lambda: local.score(texts))
+    pool = SentimentPipeline(scorer, cache_size=n, processes=None)
+    scores = _timed("pipeline, process pool", n, lambda: pool.score(texts))
+    _timed("pipeline, warm cache", n, lambda: pool.score(texts))
+    assert list(scores) == expected
+
+
+if __name__ == '__main__':
+    main()
@@ -10,7 +10,8 @@ setup(
    author_email='csachdev@andrew.cmu.edu, shubhamg@andrew.cmu.edu, tzhan@andrew.cmu.edu, vasudevl@andrew.cmu.edu, vsitpal@andrew.cmu.edu',
    url="",
    packages=['yayFinPy'],  #same as name
-   install_requires=['pandas', 'numpy', 'yfinance', 'ta-lib','tweepy','sentifish','google','beautifulsoup4'], #external packages as dependencies
+   python_requires='>=3.9',
+   install_requires=['pandas>=1.5', 'numpy', 'yfinance', 'ta-lib','tweepy','sentifish','google','beautifulsoup4'], #external packages as dependencies
    entry_points={
         'console_scripts': [
             'sample=sample:main',
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+import pandas as pd
+from .columns import _ColumnStore
+from .exceptions import *
+
+
+NUMERIC_FIELDS = ("price", "closing_price", "volume", "market_cap", "pe_ratio")
+GROUPINGS = ("industry_sector", "country")
+
+# running sums kept per group, one row each
+_COUNT, _MARKET_CAP, _VOLUME, _RETURN_VOLUME, _WEIGHTED_RETURN, _PE, _PE_COUNT = range(7)
+_STATS = 7
+
+
+class UniverseAggregator():
+    """
+    Rolls up the fields of a universe of securities by industry sector and
+    by country: number of securities, total market cap and volume, volume
+    weighted daily return (price against the previous close) and mean PE.
+
+    Fields are gathered once into columnar arrays, one row per ticker, and
+    every grouping keeps the running sums behind its statistics, computed
+    with a vectorized group-by (bincount). When securities are refreshed,
+    only their rows are updated: their old contributions are subtracted
+    from their old groups and the new ones added, so a refresh costs the
+    number of securities refreshed, not the size of the universe. The sums
+    are recomputed from the columns once the number of incremental updates
+    reaches the size of the universe, so rounding errors don't accumulate.
+
+    Methods
+    -------
+    update(self, ticker_symbol, **fields)
+        Adds a ticker or updates some of its fields.
+
+    update_securities(self, securities)
+        Adds or updates tickers from security objects or snapshots.
+
+    remove(self, ticker_symbol)
+        Removes a ticker.
+
+    aggregate(self, by)
+        Returns the statistics of every group.
+
+    rebuild(self)
+        Recomputes all running sums from the columns.
+
+    Example usage:
+
+        aggregator = UniverseAggregator()
+        aggregator.update_securities(stocks)
+        print(aggregator.aggregate("industry_sector"))
+        aggregator.update("AAPL", price=182.5, volume=5.1e7)
+        print(aggregator.aggregate("country"))
+    """
+
+    def __init__(self, securities=()):
+        """
+        Parameters
+        ----------
+        securities : iterable, optional
+            Security objects (Stock, ...) or snapshots to start with
+        """
+        columns = {f: (np.float64, np.nan) for f in NUMERIC_FIELDS}
+        columns.update({g: (np.int64, -1) for g in GROUPINGS})
+        self.__store = _ColumnStore(columns)
+        self.__groups = {g: [] for g in GROUPINGS}
+        self.__group_ids = {g: dict() for g in GROUPINGS}
+        self.__sums = {g: np.zeros((0, _STATS), dtype=np.float64) for g in GROUPINGS}
+        self.__updates = 0
+        self.update_securities(securities)
+
+    def __len__(self):
+        return len(self.__store)
+
+    def __contains__(self, ticker_symbol):
+        return ticker_symbol in self.__store
+
+    def __code(self, grouping, value):
+        if value is None:
+            return -1
+        ids = self.__group_ids[grouping]
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(self.__groups[grouping])
+            self.__groups[grouping].append(value)
+        return code
+
+    def __contributions(self, rows):
+        """
+        Returns the (rows, stats) contributions of rows to the sums of their group.
+        """
+        n = self.__store.column
+        price, close, volume = n("price")[rows], n("closing_price")[rows], n("volume")[rows]
+        market_cap, pe = n("market_cap")[rows], n("pe_ratio")[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            daily_return = price / close - 1
+        has_return = np.isfinite(daily_return) & np.isfinite(volume)
+        has_pe = np.isfinite(pe)
+
+        out = np.zeros((len(rows), _STATS), dtype=np.float64)
+        out[:, _COUNT] = self.__store.alive[rows]
+        out[:, _MARKET_CAP] = np.where(np.isfinite(market_cap), market_cap, 0)
+        out[:, _VOLUME] = np.where(np.isfinite(volume), volume, 0)
+        out[:, _RETURN_VOLUME] = np.where(has_return, volume, 0)
+        out[:, _WEIGHTED_RETURN] = np.where(has_return, volume * daily_return, 0)
+        out[:, _PE] = np.where(has_pe, pe, 0)
+        out[:, _PE_COUNT] = has_pe
+        return out
+
+    def __accumulate(self, grouping, codes, contributions):
+        sums = self.__sums[grouping]
+        size = len(self.__groups[grouping])
+        if len(sums) < size:
+            sums = self.__sums[grouping] = np.concatenate([sums, np.zeros((size - len(sums), _STATS))])
+        grouped = codes >= 0
+        np.add.at(sums, codes[grouped], contributions[grouped])
+
+    def __apply(self, rows, numeric, groups, alive):
+        """
+        Writes the new values of rows and moves their contributions.
+        """
+        old = self.__contributions(rows)
+        old_codes = {g: self.__store.column(g)[rows].copy() for g in GROUPINGS}
+        for f, values in numeric.items():
+            self.__store.column(f)[rows] = values
+        for g, codes in groups.items():
+            self.__store.column(g)[rows] = codes
+        self.__store.alive[rows] = alive
+
+        self.__updates += len(rows)
+        if self.__updates >= max(64, len(self.__store)):
+            self.rebuild()
+            return
+        new = self.__contributions(rows)
+        for g in GROUPINGS:
+            self.__accumulate(g, old_codes[g], -old)
+            self.__accumulate(g, self.__store.column(g)[rows], new)
+
+    def update(self, ticker_symbol: str, **fields):
+        """
+        Adds a ticker or updates some of its fields.
+
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol
+        **fields
+            The new values of fields (price, closing_price, volume,
+            market_cap, pe_ratio, industry_sector, country); None marks a
+            value as missing
+
+        Raises
+        ------
+        InputError
+            If a field is not aggregated.
+        """
+        for name in fields:
+            if name not in NUMERIC_FIELDS and name not in GROUPINGS:
+                raise InputError("Invalid field", "Needs to be one of " + ", ".join(NUMERIC_FIELDS + GROUPINGS))
+        rows = np.array([self.__store.row(ticker_symbol)])
+        numeric = {f: np.nan if v is None else float(v) for f, v in fields.items() if f in NUMERIC_FIELDS}
+        groups = {g: self.__code(g, v) for g, v in fields.items() if g in GROUPINGS}
+        self.__apply(rows, numeric, groups, True)
+
+    def update_securities(self, securities):
+        """
+        Adds or updates tickers from security objects (Stock, ...) or
+        snapshots, reading the fields they have, in one vectorized update.
+
+        Parameters
+        ----------
+        securities : iterable
+            The security objects
+        """
+        latest = {s.ticker_symbol: s for s in securities}
+        if not latest:
+            return
+        rows = np.array([self.__store.row(t) for t in latest], dtype=np.int64)
+        numeric = dict()
+        for f in NUMERIC_FIELDS:
+            values = [getattr(s, f, None) for s in latest.values()]
+            numeric[f] = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+        groups = dict()
+        for g in GROUPINGS:
+            company_data = [getattr(s, "company_data", None) for s in latest.values()]
+            groups[g] = np.array([self.__code(g, getattr(c, g, None) if c is not None else None)
+                                  for c in company_data], dtype=np.int64)
+        self.__apply(rows, numeric, groups, True)
+
+    def remove(self, ticker_symbol: str):
+        """
+        Removes a ticker.
+
+        Raises
+        ------
+        InputError
+            If the ticker is not aggregated.
+        """
+        row = self.__store.get(ticker_symbol)
+        if row is None:
+            raise InputError("Ticker Symbol not in UniverseAggregator", "Input Ticker " + str(ticker_symbol))
+        self.__apply(np.array([row]), {f: np.nan for f in NUMERIC_FIELDS}, {g: -1 for g in GROUPINGS}, False)
+        self.__store.remove(ticker_symbol)
+
+    def rebuild(self):
+        """
+        Recomputes the running sums of every grouping from the columns.
+        """
+        rows = np.arange(self.__store.size)
+        contributions = self.__contributions(rows)
+        for g in GROUPINGS:
+            codes = self.__store.column(g)
+            grouped = codes >= 0
+            size = len(self.__groups[g])
+            self.__sums[g] = np.stack([np.bincount(codes[grouped], weights=contributions[grouped, s], minlength=size)
+                                       for s in range(_STATS)], axis=1) if size else np.zeros((0, _STATS))
+        self.__updates = 0
+
+    def aggregate(self, by: str = "industry_sector") -> pd.DataFrame:
+        """
+        Returns the statistics of every group with at least one security.
+
+        Parameters
+        ----------
+        by : str, optional
+            "industry_sector" or "country" (default is "industry_sector")
+
+        Returns
+        -------
+        pandas.DataFrame
+            indexed by group, with columns Count, Market Cap, Volume,
+            Volume Weighted Return and Mean PE (NaN when no security of the
+            group has the fields needed)
+
+        Raises
+        ------
+        InputError
+            If the grouping is not supported.
+        """
+        if by not in GROUPINGS:
+            raise InputError("Invalid grouping", "Needs to be one of " + ", ".join(GROUPINGS))
+        sums = self.__sums[by]
+        count = np.rint(sums[:, _COUNT]).astype(np.int64)
+        present = count > 0
+        sums = sums[present]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weighted_return = np.where(sums[:, _RETURN_VOLUME] > 0,
+                                       sums[:, _WEIGHTED_RETURN] / sums[:, _RETURN_VOLUME], np.nan)
+            mean_pe = np.where(sums[:, _PE_COUNT] > 0.5, sums[:, _PE] / sums[:, _PE_COUNT], np.nan)
+        index = pd.Index([g for g, p in zip(self.__groups[by], present) if p], name=by)
+        return pd.DataFrame({"Count": count[present], "Market Cap": sums[:, _MARKET_CAP],
+                             "Volume": sums[:, _VOLUME], "Volume Weighted Return": weighted_return,
+                             "Mean PE": mean_pe}, index=index)
@@ -0,0 +1,453 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import re
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple, deque
+import yfinance as yf
+from .enumerations import *
+from .exceptions import *
+
+
+# number of callback errors an AlertEngine keeps
+_MAX_ERRORS = 1000
+
+Alert = namedtuple('Alert', ['alert_id', 'ticker_symbol', 'indicator', 'operator', 'threshold'])
+Alert.__doc__ = """
+Named Tuple Alert
+alert_id -> identifier returned by AlertEngine.add_alert
+ticker_symbol -> ticker symbol of the security watched
+indicator -> "price", "RSI(n)" or "SMA(n)"
+operator -> one of "<", "<=", ">", ">="
+threshold -> value the indicator is compared to
+"""
+
+AlertEvent = namedtuple('AlertEvent', ['alert', 'value', 'timestamp'])
+AlertEvent.__doc__ = """
+Named Tuple AlertEvent
+alert -> the Alert which triggered
+value -> value of the indicator which triggered it
+timestamp -> time of the update in epoch seconds
+"""
+
+_CONDITION = re.compile(r"^\s*(?:(price|rsi|sma)\s*(?:\(\s*(\d+)\s*\))?\s*)?(<=|>=|<|>)\s*"
+                        r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$", re.IGNORECASE)
+
+
+class _ThresholdIndex():
+    # Sorted thresholds of one (ticker, indicator) and operator. The alerts
+    # triggered by a value are a contiguous run at one end of the list, found
+    # with one binary search.
+
+    def __init__(self):
+        self.thresholds = {op: [] for op in ("<", "<=", ">", ">=")}
+        self.ids = {op: [] for op in ("<", "<=", ">", ">=")}
+
+    def __len__(self):
+        return sum(len(v) for v in self.ids.values())
+
+    def add(self, operator, threshold, alert_id):
+        thresholds, ids = self.thresholds[operator], self.ids[operator]
+        i = bisect_right(thresholds, threshold)
+        thresholds.insert(i, threshold)
+        ids.insert(i, alert_id)
+
+    def remove(self, operator, threshold, alert_id):
+        thresholds, ids = self.thresholds[operator], self.ids[operator]
+        lo, hi = bisect_left(thresholds, threshold), bisect_right(thresholds, threshold)
+        i = ids.index(alert_id, lo, hi)
+        del thresholds[i]
+        del ids[i]
+
+    def trigger(self, value):
+        fired = []
+        for op, ids in self.ids.items():
+            if not ids:
+                continue
+            thresholds = self.thresholds[op]
+            if op == "<" or op == "<=":
+                # value < threshold: the thresholds above the value
+                i = (bisect_right if op == "<" else bisect_left)(thresholds, value)
+                fired.extend(ids[i:])
+                del thresholds[i:], ids[i:]
+            else:
+                # value > threshold: the thresholds below the value
+                i = (bisect_left if op == ">" else bisect_right)(thresholds, value)
+                fired.extend(ids[:i])
+                del thresholds[:i], ids[:i]
+        return fired
+
+
+class _SMA():
+    # simple moving average of the committed closes and the current price
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+
+    def commit(self, close):
+        self.window.append(close)
+        self.total += close
+        if len(self.window) > self.period - 1:
+            self.total -= self.window.popleft()
+
+    def value(self, price):
+        if len(self.window) < self.period - 1:
+            return None
+        return (self.total + price) / self.period
+
+
+class _RSI():
+    # Wilder's relative strength index of the committed closes and the current price
+
+    def __init__(self, period):
+        self.period = period
+        self.last = None
+        self.changes = 0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def __step(self, price):
+        change = price - self.last
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self.changes + 1 < self.period:
+            return self.gain + gain, self.loss + loss
+        if self.changes + 1 == self.period:
+            return (self.gain + gain) / self.period, (self.loss + loss) / self.period
+        return ((self.gain * (self.period - 1) + gain) / self.period,
+                (self.loss * (self.period - 1) + loss) / self.period)
+
+    def commit(self, close):
+        if self.last is not None:
+            self.gain, self.loss = self.__step(close)
+            self.changes += 1
+        self.last = close
+
+    def value(self, price):
+        if self.last is None or self.changes + 1 < self.period:
+            return None
+        gain, loss = self.__step(price)
+        if loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+_INDICATORS = {"RSI": _RSI, "SMA": _SMA}
+
+
+class _SymbolState():
+
+    def __init__(self):
+        self.closes = None
+        self.bar = None
+        self.pending = None
+        self.indicators = dict()
+        self.index = dict()
+
+
+class AlertEngine():
+    """
+    Matches price updates against many threshold alerts.
+
+    Alerts are conditions such as "< 150" on the price of a security, or
+    "RSI(14) < 30" and "SMA(50) > 200" on an indicator of its closing
+    prices. The thresholds of every ticker and indicator are kept sorted, so
+    an update finds the alerts it triggers with a binary search instead of
+    checking every alert. An alert triggers once and is then removed.
+
+    Indicators are seeded once per ticker from cached daily history and then
+    updated incrementally: the price of an update stands for the close of the
+    current day, and is committed as a close when the first update of a
+    later day arrives.
+
+    Updates can come from security objects (``update_securities``, e.g. the
+    objects of a refreshed Portfolio), from a QuoteStream (``on_quote`` as
+    its callback) or from a PollingScheduler (``on_poll`` as its listener).
+
+    A callback which raises does not stop the callbacks of the other
+    triggered alerts; its error is kept in ``errors``.
+
+    Methods
+    -------
+    add_alert(self, ticker_symbol, condition, callback)
+        Adds an alert and returns its id.
+
+    remove_alert(self, alert_id)
+        Removes an alert.
+
+    alerts(self, ticker_symbol)
+        Returns the pending alerts.
+
+    errors(self)
+        Returns the latest errors raised by callbacks.
+
+    watch(self, security)
+        Uses a security object for the history of its ticker.
+
+    update(self, ticker_symbol, price, timestamp)
+        Matches a price update and returns the triggered alerts.
+
+    update_securities(self, securities)
+        Matches the current price of security objects.
+
+    on_quote(self, update)
+        Matches a QuoteUpdate.
+
+    on_poll(self, ticker_symbol, changed)
+        Matches a PollingScheduler update.
+
+    Example usage:
+
+        engine = AlertEngine()
+        engine.add_alert("AAPL", "< 150", callback=print)
+        engine.add_alert("AAPL", "RSI(14) < 30", callback=print)
+        stream.subscribe(["AAPL"], callback=engine.on_quote)
+    """
+
+    def __init__(self, history_loader=None, history_duration: Duration = Duration.YEAR_1,
+                 bar_seconds: float = 86400):
+        """
+        Parameters
+        ----------
+        history_loader : callable, optional
+            Function taking a ticker symbol and returning its closing prices
+            as a pandas Series indexed by time, oldest first (default uses
+            the watched security object, or downloads from Yahoo Finance)
+        history_duration : Duration, optional
+            Duration of history used to seed the indicators (default is 1 year)
+        bar_seconds : float, optional
+            Length of the bars of the indicators in seconds (default is 1 day)
+        """
+        self.__loader = history_loader
+        self.__duration = history_duration
+        self.__bar_seconds = float(bar_seconds)
+        self.__alerts = dict()
+        self.__callbacks = dict()
+        self.__symbols = dict()
+        self.__securities = dict()
+        self.__errors = deque(maxlen=_MAX_ERRORS)
+        self.__next_id = 0
+
+    def __len__(self):
+        return len(self.__alerts)
+
+    @property
+    def errors(self):
+        """
+        Returns
+        -------
+        list
+            (AlertEvent, exception) of the last 1000 callbacks which
+            raised, oldest first.
+        """
+        return list(self.__errors)
+
+    def add_alert(self, ticker_symbol: str, condition: str, callback=None) -> int:
+        """
+        Adds an alert.
+
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol of the security
+        condition : str
+            The condition triggering the alert: an optional indicator
+            ("price", "RSI(n)" or "SMA(n)", default is price), an operator
+            ("<", "<=", ">" or ">=") and a number, e.g. "RSI(14) < 30"
+        callback : callable, optional
+            Function called with the AlertEvent when the alert triggers
+
+        Returns
+        -------
+        int
+            the id of the alert.
+
+        Raises
+        ------
+        ParsingError
+            If the condition can't be parsed.
+        """
+        if not isinstance(ticker_symbol, str):
+            raise ParsingError("Invalid ticker_symbol type", "expected type 'str'")
+        match = _CONDITION.match(condition) if isinstance(condition, str) else None
+        if match is None:
+            raise ParsingError("Invalid condition", "expected e.g. '< 150' or 'RSI(14) < 30', got " + str(condition))
+        name, period, operator, threshold = match.groups()
+        name = (name or "price").upper()
+        if name == "PRICE":
+            if period is not None:
+                raise ParsingError("Invalid condition", "price takes no period")
+            indicator = "price"
+        else:
+            period = 14 if period is None else int(period)
+            if period < 1:
+                raise ParsingError("Invalid condition", "period needs to be >= 1")
+            indicator = "%s(%d)" % (name, period)
+
+        state = self.__symbols.get(ticker_symbol)
+        if state is None:
+            state = self.__symbols[ticker_symbol] = _SymbolState()
+        if indicator != "price" and indicator not in state.indicators:
+            state.indicators[indicator] = self.__seed(ticker_symbol, state, _INDICATORS[name](period))
+
+        alert_id = self.__next_id
+        self.__next_id += 1
+        alert = Alert(alert_id, ticker_symbol, indicator, operator, float(threshold))
+        state.index.setdefault(indicator, _ThresholdIndex()).add(operator, alert.threshold, alert_id)
+        self.__alerts[alert_id] = alert
+        if callback is not None:
+            self.__callbacks[alert_id] = callback
+        return alert_id
+
+    def remove_alert(self, alert_id: int):
+        """
+        Removes a pending alert.
+
+        Raises
+        ------
+        InputError
+            If there is no pending alert with this id.
+        """
+        alert = self.__alerts.pop(alert_id, None)
+        if alert is None:
+            raise InputError("Invalid alert_id", "No pending alert " + str(alert_id))
+        self.__callbacks.pop(alert_id, None)
+        self.__symbols[alert.ticker_symbol].index[alert.indicator].remove(alert.operator, alert.threshold, alert_id)
+
+    def alerts(self, ticker_symbol: str = None) -> list:
+        """
+        Returns
+        -------
+        list[Alert]
+            the pending alerts, of one ticker or of all.
+        """
+        return [a for a in self.__alerts.values() if ticker_symbol is None or a.ticker_symbol == ticker_symbol]
+
+    def watch(self, security):
+        """
+        Uses a security object (Stock, Currency, ...) for the history of its
+        ticker, so the indicators are seeded from its cached history.
+        """
+        self.__securities[security.ticker_symbol] = security
+
+    def __load(self, ticker_symbol):
+        if self.__loader is not None:
+            return self.__loader(ticker_symbol)
+        security = self.__securities.get(ticker_symbol)
+        if security is not None and hasattr(security, "historical_data"):
+            return security.historical_data(self.__duration)["Close"]
+        return yf.Ticker(ticker_symbol).history(period=self.__duration.value)["Close"]
+
+    def __seed(self, ticker_symbol, state, indicator):
+        if state.closes is None:
+            closes = self.__load(ticker_symbol).dropna()
+            state.closes = [float(c) for c in closes.values]
+            if len(closes):
+                # the last close may be of the current bar: keep it pending
+                state.pending = state.closes.pop()
+                state.bar = int(closes.index[-1].timestamp() // self.__bar_seconds)
+        for close in state.closes:
+            indicator.commit(close)
+        return indicator
+
+    def update(self, ticker_symbol: str, price: float, timestamp: float = None) -> list:
+        """
+        Matches a price update against the alerts of its ticker.
+
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol of the security
+        price : float
+            The current price
+        timestamp : float, optional
+            The time of the price in epoch seconds (default is now)
+
+        Returns
+        -------
+        list[AlertEvent]
+            the alerts triggered by the update, which are removed.
+        """
+        state = self.__symbols.get(ticker_symbol)
+        if state is None:
+            return []
+        price = float(price)
+        timestamp = time.time() if timestamp is None else float(timestamp)
+
+        bar = int(timestamp // self.__bar_seconds)
+        if state.bar is None or bar >= state.bar:
+            if state.bar is not None and bar > state.bar and state.pending is not None:
+                if state.closes is not None:
+                    state.closes.append(state.pending)
+                for indicator in state.indicators.values():
+                    indicator.commit(state.pending)
+            state.bar = bar
+            state.pending = price
+
+        events = []
+        for name, index in state.index.items():
+            if not len(index):
+                continue
+            value = price if name == "price" else state.indicators[name].value(price)
+            if value is None:
+                continue
+            for alert_id in index.trigger(value):
+                events.append(AlertEvent(self.__alerts.pop(alert_id), value, timestamp))
+
+        for event in events:
+            callback = self.__callbacks.pop(event.alert.alert_id, None)
+            if callback is not None:
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.__errors.append((event, e))
+        return events
+
+    def update_securities(self, securities) -> list:
+        """
+        Matches the current price of security objects, e.g. the values of
+        Portfolio.get_portfolio_objects() after a refresh. The objects are
+        watched for history as well.
+
+        Returns
+        -------
+        list[AlertEvent]
+            the alerts triggered.
+        """
+        events = []
+        now = time.time()
+        for security in securities:
+            self.watch(security)
+            events.extend(self.update(security.ticker_symbol, security.price, now))
+        return events
+
+    def on_quote(self, update) -> list:
+        """
+        Matches a QuoteUpdate; can be given as a QuoteStream callback.
+        """
+        return self.update(update.ticker_symbol, update.price, update.timestamp)
+
+    def on_poll(self, ticker_symbol: str, changed: dict) -> list:
+        """
+        Matches a PollingScheduler update; can be given as its listener.
+        """
+        if "price" not in changed:
+            return []
+        return self.update(ticker_symbol, changed["price"])
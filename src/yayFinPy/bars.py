@@ -0,0 +1,438 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+import pandas as pd
+from .enumerations import *
+from .exceptions import *
+
+
+_BAR_SECONDS = {
+    Interval.MINUTE_1: 60,
+    Interval.MINUTE_5: 300,
+    Interval.MINUTE_15: 900,
+    Interval.MINUTE_30: 1800,
+    Interval.HOUR_1: 3600,
+}
+
+class BarAggregator():
+    """
+    Builds OHLCV bars of a fixed Interval from trade or quote ticks in real
+    time.
+
+    The bar being built of every symbol is kept in flat numpy arrays indexed
+    by symbol (open, high, low, close, volume, price x volume for the VWAP,
+    trade count), and batches of ticks are folded into them with grouped
+    numpy reductions, so throughput does not depend on Python loops over
+    ticks. A bar is closed when a tick of a later bar arrives, for its
+    symbol or (as time moves on) for any symbol; closed bars are returned by
+    ``add_ticks`` and kept for ``bars``. Ticks older than the bar being built
+    of their symbol are dropped.
+
+    Live feeds delivering one tick at a time use ``add_tick``, which updates
+    the arrays in place for its symbol only and scans the other symbols
+    only when a tick starts a later bar than any seen before.
+
+    Bars are indexed like ``historical_data`` (columns Open, High, Low,
+    Close, Volume), so they can be passed to the indicator methods of the
+    securities as their ``history``.
+
+    Methods
+    -------
+    add_ticks(self, symbols, prices, volumes, timestamps)
+        Folds a batch of ticks in and returns the bars closed by it.
+
+    add_tick(self, symbol, price, volume, timestamp)
+        Folds a single tick in and returns the bars closed by it, as dicts.
+
+    close_bars(self, timestamp)
+        Closes the bars which ended before a time and returns them.
+
+    bars(self, symbol)
+        Returns the closed bars of a symbol.
+
+    current_bar(self, symbol)
+        Returns the bar being built of a symbol.
+
+    Example usage:
+
+        aggregator = BarAggregator(Interval.MINUTE_5)
+        closed = aggregator.add_ticks(symbols, prices, volumes, timestamps)
+        rsi = Stock("AAPL").relative_strength_index(history=aggregator.bars("AAPL"))
+    """
+
+    def __init__(self, interval: Interval = Interval.MINUTE_1, max_bars: int = 10000):
+        """
+        Parameters
+        ----------
+        interval : Interval, optional
+            The interval of the bars, from 1 minute to 1 hour (default is 1 minute)
+        max_bars : int, optional
+            Number of closed bars kept per symbol for ``bars`` (default is 10000)
+
+        Raises
+        ------
+        InputError
+            If the interval is not supported.
+        """
+        if interval not in _BAR_SECONDS:
+            raise InputError("Invalid interval", "Needs to be between 1 minute and 1 hour")
+        self.__interval = interval
+        self.__width = _BAR_SECONDS[interval]
+        self.__max_bars = max_bars
+        self.__slots = dict()
+        self.__symbols = []
+        # the symbols again, as the object array the closed bars are labelled from
+        self.__names = np.empty(0, dtype=object)
+        self.__bucket = np.empty(0, dtype=np.int64)
+        self.__open = np.empty(0, dtype=np.float64)
+        self.__high = np.empty(0, dtype=np.float64)
+        self.__low = np.empty(0, dtype=np.float64)
+        self.__close = np.empty(0, dtype=np.float64)
+        self.__volume = np.empty(0, dtype=np.float64)
+        self.__pv = np.empty(0, dtype=np.float64)
+        self.__trades = np.empty(0, dtype=np.int64)
+        self.__closed = None
+        self.__stored = 0
+        self.__dropped = 0
+        # latest bar reached by any tick: every bar before it is closed
+        self.__latest = np.iinfo(np.int64).min
+
+    @property
+    def interval(self):
+        """
+        Returns
+        -------
+        Interval
+            the interval of the bars.
+        """
+        return self.__interval
+
+    @property
+    def dropped(self):
+        """
+        Returns
+        -------
+        int
+            the number of ticks dropped for arriving after their bar closed.
+        """
+        return self.__dropped
+
+    def __slot_ids(self, symbols):
+        codes, uniques = pd.factorize(np.asarray(symbols, dtype=object))
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        for i, s in enumerate(uniques):
+            slot = self.__slots.get(s)
+            if slot is None:
+                slot = self.__new_slot(s)
+            lookup[i] = slot
+        return lookup[codes]
+
+    def __new_slot(self, symbol):
+        slot = len(self.__symbols)
+        if slot == len(self.__bucket):
+            grow = max(16, slot)
+            self.__bucket = np.concatenate([self.__bucket, np.full(grow, -1, dtype=np.int64)])
+            for name in ("open", "high", "low", "close", "volume", "pv"):
+                attr = "_BarAggregator__" + name
+                setattr(self, attr, np.concatenate([getattr(self, attr), np.zeros(grow)]))
+            self.__trades = np.concatenate([self.__trades, np.zeros(grow, dtype=np.int64)])
+            self.__names = np.concatenate([self.__names, np.full(grow, None, dtype=object)])
+        self.__slots[symbol] = slot
+        self.__symbols.append(symbol)
+        self.__names[slot] = symbol
+        return slot
+
+    def add_tick(self, symbol: str, price: float, volume: float, timestamp: float) -> list:
+        """
+        Folds a single tick in, updating only the bar of its symbol. See
+        ``add_ticks`` for batches of ticks.
+
+        Parameters
+        ----------
+        symbol : str
+            The ticker symbol of the tick
+        price : float
+            The traded (or quoted) price
+        volume : float
+            The traded volume (0 for quotes)
+        timestamp : float
+            The time of the tick in epoch seconds
+
+        Returns
+        -------
+        list[dict]
+            the bars closed by the tick, usually none, in time order; each
+            has the keys Ticker Symbol, Datetime, Open, High, Low, Close,
+            Volume, VWAP and Trades.
+        """
+        slot = self.__slots.get(symbol)
+        if slot is None:
+            slot = self.__new_slot(symbol)
+        price = float(price)
+        volume = float(volume)
+        bucket = int(float(timestamp) // self.__width)
+        current = int(self.__bucket[slot])
+        if bucket < current:
+            self.__dropped += 1
+            return []
+        closed = []
+        if self.__trades[slot] > 0 and bucket == current:
+            if price > self.__high[slot]:
+                self.__high[slot] = price
+            elif price < self.__low[slot]:
+                self.__low[slot] = price
+            self.__close[slot] = price
+            self.__volume[slot] += volume
+            self.__pv[slot] += price * volume
+            self.__trades[slot] += 1
+        else:
+            if self.__trades[slot] > 0:
+                closed.append(self.__snapshot(np.array([slot])))
+            self.__bucket[slot] = bucket
+            self.__open[slot] = self.__high[slot] = self.__low[slot] = self.__close[slot] = price
+            self.__volume[slot] = volume
+            self.__pv[slot] = price * volume
+            self.__trades[slot] = 1
+        if bucket > self.__latest:
+            closed.append(self.__close_ended(timestamp))
+        if not closed:
+            return []
+        slots, bucket, open, high, low, close, volume, pv, trades = self.__collect(closed)
+        return [{"Ticker Symbol": self.__names[s],
+                 "Datetime": pd.Timestamp(int(b) * self.__width, unit="s", tz="UTC"),
+                 "Open": o, "High": h, "Low": l, "Close": c, "Volume": v,
+                 "VWAP": p / v if v > 0 else c, "Trades": int(n)}
+                for s, b, o, h, l, c, v, p, n in zip(slots, bucket, open, high, low, close, volume, pv, trades)]
+
+    def add_ticks(self, symbols, prices, volumes, timestamps) -> pd.DataFrame:
+        """
+        Folds a batch of ticks into the bars.
+
+        Parameters
+        ----------
+        symbols : array-like of str
+            The ticker symbol of each tick
+        prices : array-like of float
+            The traded (or quoted) price of each tick
+        volumes : array-like of float
+            The traded volume of each tick (0 for quotes)
+        timestamps : array-like of float
+            The time of each tick in epoch seconds
+
+        Returns
+        -------
+        pandas.DataFrame
+            the bars closed by the batch, one row per bar, with columns
+            Datetime, Ticker Symbol, Open, High, Low, Close, Volume, VWAP
+            and Trades.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(prices) == len(volumes) == len(timestamps) == len(symbols):
+            raise InputError("Invalid ticks", "Needs as many symbols, prices, volumes and timestamps")
+        if len(prices) == 0:
+            return self.__frame([])
+
+        slots = self.__slot_ids(symbols)
+        buckets = np.floor_divide(timestamps, self.__width).astype(np.int64)
+
+        # ticks of a bar which was already closed are dropped
+        late = buckets < self.__bucket[slots]
+        if late.any():
+            self.__dropped += int(late.sum())
+            keep = ~late
+            slots, buckets, prices, volumes, timestamps = \
+                slots[keep], buckets[keep], prices[keep], volumes[keep], timestamps[keep]
+
+        closed = []
+        if len(prices):
+            # group the ticks by (symbol, bar), keeping arrival order within a bar
+            order = np.lexsort((np.arange(len(slots)), buckets, slots))
+            slots, buckets, prices, volumes = slots[order], buckets[order], prices[order], volumes[order]
+            starts = np.flatnonzero(np.r_[True, (slots[1:] != slots[:-1]) | (buckets[1:] != buckets[:-1])])
+            ends = np.r_[starts[1:], len(slots)] - 1
+            g_slot = slots[starts]
+            g_bucket = buckets[starts]
+            g_open = prices[starts]
+            g_close = prices[ends]
+            g_high = np.maximum.reduceat(prices, starts)
+            g_low = np.minimum.reduceat(prices, starts)
+            g_volume = np.add.reduceat(volumes, starts)
+            g_pv = np.add.reduceat(prices * volumes, starts)
+            g_trades = np.diff(np.r_[starts, len(slots)])
+
+            first = np.r_[True, g_slot[1:] != g_slot[:-1]]
+            last = np.r_[g_slot[1:] != g_slot[:-1], True]
+
+            # first group of a symbol continuing the bar being built: merge it in
+            cur = self.__bucket[g_slot]
+            merge = first & (g_bucket == cur) & (self.__trades[g_slot] > 0)
+            m = g_slot[merge]
+            self.__high[m] = np.maximum(self.__high[m], g_high[merge])
+            self.__low[m] = np.minimum(self.__low[m], g_low[merge])
+            self.__close[m] = g_close[merge]
+            self.__volume[m] += g_volume[merge]
+            self.__pv[m] += g_pv[merge]
+            self.__trades[m] += g_trades[merge]
+
+            # the bar being built closes when a later bar of its symbol starts
+            closed.append(self.__snapshot(g_slot[first & ~(merge & last)]))
+
+            # groups followed by a later group of the same symbol are closed bars
+            done = ~last & ~merge
+            closed.append((g_slot[done], g_bucket[done], g_open[done], g_high[done], g_low[done],
+                           g_close[done], g_volume[done], g_pv[done], g_trades[done]))
+
+            # the last group of a symbol is its new bar being built
+            new = last & ~merge
+            n = g_slot[new]
+            self.__bucket[n] = g_bucket[new]
+            self.__open[n] = g_open[new]
+            self.__high[n] = g_high[new]
+            self.__low[n] = g_low[new]
+            self.__close[n] = g_close[new]
+            self.__volume[n] = g_volume[new]
+            self.__pv[n] = g_pv[new]
+            self.__trades[n] = g_trades[new]
+
+        if len(timestamps):
+            # time moved on for the symbols without ticks as well
+            closed.append(self.__close_ended(timestamps.max()))
+        return self.__frame(closed)
+
+    def close_bars(self, timestamp: float) -> pd.DataFrame:
+        """
+        Closes the bars of all symbols which ended at or before a time, e.g.
+        the clock of the tick stream, and returns them.
+
+        Parameters
+        ----------
+        timestamp : float
+            The time in epoch seconds
+
+        Returns
+        -------
+        pandas.DataFrame
+            the bars closed, as returned by ``add_ticks``.
+        """
+        return self.__frame([self.__close_ended(timestamp)])
+
+    def __close_ended(self, timestamp):
+        current = int(np.floor_divide(float(timestamp), self.__width))
+        self.__latest = max(self.__latest, current)
+        n = len(self.__symbols)
+        ended = np.flatnonzero((self.__bucket[:n] < current) & (self.__trades[:n] > 0))
+        closed = self.__snapshot(ended)
+        # ticks of the closed bars now count as late; a new bar starts with the next tick
+        self.__bucket[ended] = current
+        self.__trades[ended] = 0
+        return closed
+
+    def __snapshot(self, slots):
+        slots = slots[self.__trades[slots] > 0]
+        return (slots, self.__bucket[slots], self.__open[slots], self.__high[slots], self.__low[slots],
+                self.__close[slots], self.__volume[slots], self.__pv[slots], self.__trades[slots])
+
+    def __collect(self, parts):
+        """
+        Concatenates closed bars in time order and stores them for ``bars``.
+        """
+        parts = [p for p in parts if len(p[0])]
+        if not parts:
+            return [np.empty(0, dtype=np.int64)] * 2 + [np.empty(0)] * 6 + [np.empty(0, dtype=np.int64)]
+        columns = [np.concatenate(c) for c in zip(*parts)]
+        order = np.lexsort((columns[0], columns[1]))
+        columns = [c[order] for c in columns]
+        self.__store(columns)
+        return columns
+
+    def __frame(self, parts) -> pd.DataFrame:
+        columns = self.__collect(parts)
+        frame = self.__to_frame(columns)
+        frame.insert(0, "Ticker Symbol", self.__names[columns[0]])
+        return frame.reset_index()
+
+    def __to_frame(self, columns) -> pd.DataFrame:
+        slots, bucket, open, high, low, close, volume, pv, trades = columns
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(volume > 0, pv / volume, close)
+        index = pd.DatetimeIndex(pd.to_datetime(bucket * self.__width, unit="s", utc=True), name="Datetime")
+        return pd.DataFrame({"Open": open, "High": high, "Low": low, "Close": close, "Volume": volume,
+                             "VWAP": vwap, "Trades": trades}, index=index)
+
+    def __store(self, columns):
+        size = self.__stored + len(columns[0])
+        if self.__closed is None or size > len(self.__closed[0]):
+            capacity = max(1024, 2 * size)
+            grown = [np.empty(capacity, dtype=c.dtype) for c in columns]
+            if self.__closed is not None:
+                for g, c in zip(grown, self.__closed):
+                    g[:self.__stored] = c[:self.__stored]
+            self.__closed = grown
+        for stored, c in zip(self.__closed, columns):
+            stored[self.__stored:size] = c
+        self.__stored = size
+        if size > 2 * self.__max_bars * max(1, len(self.__symbols)):
+            self.__trim()
+
+    def __trim(self):
+        # keep the last max_bars closed bars of every symbol
+        slots = self.__closed[0][:self.__stored]
+        order = np.argsort(slots, kind="stable")
+        sorted_slots = slots[order]
+        starts = np.searchsorted(sorted_slots, sorted_slots, side="right")
+        keep = np.zeros(self.__stored, dtype=bool)
+        keep[order[starts - np.arange(self.__stored) <= self.__max_bars]] = True
+        n = int(keep.sum())
+        for c in self.__closed:
+            c[:n] = c[:self.__stored][keep]
+        self.__stored = n
+
+    def bars(self, symbol: str) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the closed bars of the symbol, oldest first, indexed by Datetime
+            with columns Open, High, Low, Close, Volume, VWAP and Trades.
+        """
+        slot = self.__slots.get(symbol)
+        if self.__closed is None or slot is None:
+            return self.__to_frame([np.empty(0, dtype=np.int64)] * 2 + [np.empty(0)] * 6 +
+                                   [np.empty(0, dtype=np.int64)])
+        mask = self.__closed[0][:self.__stored] == slot
+        return self.__to_frame([c[:self.__stored][mask][-self.__max_bars:] for c in self.__closed])
+
+    def current_bar(self, symbol: str) -> dict:
+        """
+        Returns
+        -------
+        dict
+            the bar being built of the symbol, None if there is none.
+        """
+        slot = self.__slots.get(symbol)
+        if slot is None or self.__trades[slot] == 0:
+            return None
+        volume = self.__volume[slot]
+        return {"Datetime": pd.Timestamp(int(self.__bucket[slot]) * self.__width, unit="s", tz="UTC"),
+                "Open": self.__open[slot], "High": self.__high[slot], "Low": self.__low[slot],
+                "Close": self.__close[slot], "Volume": volume,
+                "VWAP": self.__pv[slot] / volume if volume > 0 else self.__close[slot],
+                "Trades": int(self.__trades[slot])}
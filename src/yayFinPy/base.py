@@ -22,13 +22,45 @@
 # - Tianyang Zhan
 
 from decimal import Decimal
+import time
 import yfinance as yf
+import pandas as pd
 import talib
 from datetime import date
+from .history import MAX_WINDOW, date_windows, iter_history
 from .enumerations import *
 from .exceptions import *
 
 
+# Seconds downloaded history is reused by historical_data and the indicators.
+_HISTORY_TTL = 300
+
+
+class _ReadOnlySeries():
+    """
+    A pandas Series fetched on first use and cached. Every access returns a
+    new Series over a non-writeable view of the cached values: nothing is
+    copied, and as the cached array itself is private and non-writeable,
+    callers can't make the view writeable again to change it.
+    """
+
+    def __init__(self, fetch):
+        self.__fetch = fetch
+        self.__values = None
+
+    def get(self):
+        if self.__values is None:
+            series = self.__fetch()
+            values = series.to_numpy(copy=True)
+            values.flags.writeable = False
+            self.__values = values
+            self.__index = series.index
+            self.__name = series.name
+        view = self.__values.view()
+        view.flags.writeable = False
+        return pd.Series(view, index=self.__index, name=self.__name, copy=False)
+
+
 class _BaseSecurity():
     """
     A class used to represent Base Securities. It contains attributes and methods common to all security types.
@@ -73,6 +105,10 @@ class _BaseSecurity():
                  threads: bool = True)
         downloads price, volume data for a security.
 
+    download_chunks(start: date, end: date = None, interval: Interval = Interval.MINUTE_1,
+                    max_workers: int = 4)
+        downloads price, volume data for a long date range as a generator of DataFrame chunks.
+
     historical_data(duration: Duration = Duration.MONTH_1, interval: Interval = Interval.DAY_1)
         returns price, volume data for a security.
 
@@ -134,6 +170,7 @@ class _BaseSecurity():
             If data of API can't be parsed
         """
         self.__security = yf.Ticker(ticker)
+        self.__history_cache = dict()
 
         # ticker validation
         if 'quoteType' in self.__security.info:
@@ -281,15 +318,57 @@ class _BaseSecurity():
             start = str(start)
         if end is not None:
             end = str(end)
+        if start is not None and interval in MAX_WINDOW and pd.Timestamp(end or date.today()) > pd.Timestamp(start) \
+                and len(date_windows(start, end or date.today(), interval)) > 1:
+            # longer than Yahoo serves in one request: fetch it window by window
+            chunks = list(iter_history(self.__ticker_symbol, start, end, interval,
+                                       max_workers=4 if threads else 1, fetcher=self.__download_window))
+            return pd.concat(chunks) if chunks else pd.DataFrame()
         return yf.download(self.__ticker_symbol, period=duration.value, interval=interval.value, start=start, end=end,
                            threads=threads)
 
+    @staticmethod
+    def __download_window(ticker_symbol, start, end, interval):
+        return yf.download(ticker_symbol, start=start, end=end, interval=interval.value, threads=False,
+                           progress=False)
+
+    def download_chunks(self, start: date, end: date = None, interval: Interval = Interval.MINUTE_1,
+                        max_workers: int = 4):
+        """
+        downloads price, volume data for a long date range, one request window
+        at a time. Yahoo Finance limits how far back a single intraday request
+        goes (e.g. 7 days of 1 minute bars); the range is split into such
+        windows, fetched concurrently and yielded in order without duplicates.
+
+        Parameters
+        ----------
+        start: date
+            The date from which the data is required
+        end: date, optional
+            The date up to which the data is required (default is now)
+        interval: Interval, optional
+            In what intervals should the data be reported (default is 1 minute)
+        max_workers: int, optional
+            Number of windows downloaded at once (default is 4)
+
+        Returns
+        -------
+        generator of Pandas.Dataframe
+            price, volume data of each window, in chronological order.
+        """
+        return iter_history(self.__ticker_symbol, start, end, interval, max_workers=max_workers,
+                            fetcher=lambda t, s, e, i: self.__security.history(start=s, end=e, interval=i.value))
+
     def historical_data(self, duration: Duration = Duration.MONTH_1, interval: Interval = Interval.DAY_1):
         """
         Returns
         -------
         Pandas.Dataframe
-            returns price, volume data for a security.
+            returns price, volume data for a security. The data of a duration
+            and interval is downloaded at most once every 5 minutes: calls
+            within that time, including those of the indicator methods, reuse
+            it and do not see newer bars. The returned frame is a copy, so
+            changing it does not change the cached data.
 
         Parameters
         ----------
@@ -298,9 +377,23 @@ class _BaseSecurity():
         interval: Interval, optional
             In what intervals should the data be reported (default is 1 day)
         """
-        return self.__security.history(period=duration.value, interval=interval.value)
+        return self.__cached_history(duration, interval).copy()
+
+    def __cached_history(self, duration, interval=Interval.DAY_1):
+        key = (duration, interval)
+        cached = self.__history_cache.get(key)
+        now = time.monotonic()
+        if cached is None or now - cached[0] > _HISTORY_TTL:
+            cached = (now, self.__security.history(period=duration.value, interval=interval.value))
+            self.__history_cache[key] = cached
+        return cached[1]
+
+    def __price_history(self, duration, history):
+        if history is not None:
+            return history
+        return self.__cached_history(duration)
 
-    def moving_average(self, duration: Duration = Duration.MONTH_1, timeperiod=7):
+    def moving_average(self, duration: Duration = Duration.MONTH_1, timeperiod=7, history: pd.DataFrame = None):
         """
         returns moving average price for a security averaged on timeperiod for given duration.
 
@@ -310,16 +403,20 @@ class _BaseSecurity():
             The duration for which the data is required (default is 1 month)
         timeperiod: int, optional
             Time period for which the data is averaged (default is 7 days)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.SMA(close, timeperiod=timeperiod)
 
     def bollinger_bands(self, duration: Duration = Duration.MONTH_1, timeperiod=7, dev_up=Multiplier.TWICE,
-                        dev_down=Multiplier.TWICE):
+                        dev_down=Multiplier.TWICE, history: pd.DataFrame = None):
         """
         returns upperband, middleband, lowerband for price of a security averaged on timeperiod for given duration.
             and deviation multiples.
@@ -334,15 +431,19 @@ class _BaseSecurity():
             Deviation multiplier for upper band (default is 2x)
         dev_down: Multiplier, optional
             Deviation multiplier for lower band (default is 2x)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.BBANDS(close, timeperiod=timeperiod, nbdevup=dev_up.value, nbdevdn=dev_down.value, matype=0)
 
-    def rate_of_change_ratio(self, duration: Duration = Duration.MONTH_1, timeperiod=7):
+    def rate_of_change_ratio(self, duration: Duration = Duration.MONTH_1, timeperiod=7, history: pd.DataFrame = None):
         """
         returns rate of change of ratio (price/previous price) averaged on timeperiod for a given duration.
 
@@ -352,15 +453,19 @@ class _BaseSecurity():
             The duration for which the data is required (default is 1 month)
         timeperiod: int, optional
             Time period for which the data is averaged (default is 7 days)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.ROCR(close, timeperiod=timeperiod)
 
-    def relative_strength_index(self, duration: Duration = Duration.MONTH_1, timeperiod=7):
+    def relative_strength_index(self, duration: Duration = Duration.MONTH_1, timeperiod=7, history: pd.DataFrame = None):
         """
         returns relative strength index averaged on timeperiod for a given duration. It measures the magnitude of recent
         price changes to evaluate overbought or oversold conditions in the price of a security.
@@ -372,15 +477,19 @@ class _BaseSecurity():
             The duration for which the data is required (default is 1 month)
         timeperiod: int, optional
             Time period for which the data is averaged (default is 7 days)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.RSI(close, timeperiod=timeperiod)
 
-    def balance_of_power(self, duration: Duration = Duration.MONTH_1):
+    def balance_of_power(self, duration: Duration = Duration.MONTH_1, history: pd.DataFrame = None):
         """
         returns Balance Of Power (BOP) data for a given duration for a security. This indicator uses price to
         measure buying and selling pressure. It determines the strength of the buyers and sellers by looking at
@@ -391,14 +500,18 @@ class _BaseSecurity():
         ----------
         duration: Duration, optional
             The duration for which the data is required (default is 1 month)
-        """
-        close = self.__security.history(period=duration.value)['Close']
-        open = self.__security.history(period=duration.value)['Open']
-        high = self.__security.history(period=duration.value)['High']
-        low = self.__security.history(period=duration.value)['Low']
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
+        """
+        data = self.__price_history(duration, history)
+        close = data['Close']
+        open = data['Open']
+        high = data['High']
+        low = data['Low']
         return talib.BOP(open, high, low, close)
 
-    def commodity_channel_index(self, duration: Duration = Duration.MONTH_1, timeperiod=7):
+    def commodity_channel_index(self, duration: Duration = Duration.MONTH_1, timeperiod=7, history: pd.DataFrame = None):
         """
         returns the CCI market indicator used to track market movements that may indicate buying or selling.
         CCI is calculated with the following formula: (Typical Price - Simple Moving Average) / (0.015 x Mean Deviation)
@@ -410,17 +523,21 @@ class _BaseSecurity():
             The duration for which the data is required (default is 1 month)
         timeperiod: int, optional
             Time period for which the data is averaged (default is 7 days)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
-        high = self.__security.history(period=duration.value)['High']
-        low = self.__security.history(period=duration.value)['Low']
+        data = self.__price_history(duration, history)
+        close = data['Close']
+        high = data['High']
+        low = data['Low']
         return talib.CCI(high, low, close, timeperiod=timeperiod)
 
-    def accumulation_distribution(self, duration: Duration = Duration.MONTH_1):
+    def accumulation_distribution(self, duration: Duration = Duration.MONTH_1, history: pd.DataFrame = None):
         """
         returns the accumulation/distribution indicator (AD) indicator that uses volume and price to assess whether
         a stock is being accumulated or distributed.
@@ -433,15 +550,18 @@ class _BaseSecurity():
         ----------
         duration: Duration, optional
             The duration for which the data is required (default is 1 month)
-
-        """
-        close = self.__security.history(period=duration.value)['Close']
-        high = self.__security.history(period=duration.value)['High']
-        low = self.__security.history(period=duration.value)['Low']
-        vol = self.__security.history(period=duration.value)['Volume']
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
+        """
+        data = self.__price_history(duration, history)
+        close = data['Close']
+        high = data['High']
+        low = data['Low']
+        vol = data['Volume']
         return talib.AD(high, low, close, vol)
 
-    def linear_regression(self, duration: Duration = Duration.MONTH_1, timeperiod=7):
+    def linear_regression(self, duration: Duration = Duration.MONTH_1, timeperiod=7, history: pd.DataFrame = None):
         """
         returns Linear Regression Indicator used for trend identification and trend following in a similar to moving averages.
         It has advantage of having less lag than the moving average, responding quicker to changes in direction.
@@ -453,15 +573,19 @@ class _BaseSecurity():
             The duration for which the data is required (default is 1 month)
         timeperiod: int, optional
             Time period for which the data is averaged (default is 7 days)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.LINEARREG(close, timeperiod=timeperiod)
 
-    def standard_deviation(self, duration: Duration = Duration.MONTH_1, timeperiod=7, dev=Multiplier.ONCE):
+    def standard_deviation(self, duration: Duration = Duration.MONTH_1, timeperiod=7, dev=Multiplier.ONCE, history: pd.DataFrame = None):
         """
         returns the Standard deviation indicator which is the statistical measure of market volatility,
         measuring how widely prices are dispersed from the average price.
@@ -474,15 +598,19 @@ class _BaseSecurity():
             Time period for which the data is averaged (default is 7 days)
         dev: Multiplier, optional
             Deviation multiplier of data from normal (default is 1x)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.STDDEV(close, timeperiod=timeperiod, nbdev=dev.value)
 
-    def variance(self, duration: Duration = Duration.MONTH_1, timeperiod=7, dev=Multiplier.ONCE):
+    def variance(self, duration: Duration = Duration.MONTH_1, timeperiod=7, dev=Multiplier.ONCE, history: pd.DataFrame = None):
         """
         returns Variance indicator which is the statistical measure of market volatility, obtained by squaring the
         standard deviation
@@ -495,15 +623,19 @@ class _BaseSecurity():
             Time period for which the data is averaged (default is 7 days)
         dev: Multiplier, optional
             Deviation multiplier of data from normal (default is 1x)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.VAR(close, timeperiod=timeperiod, nbdev=dev.value)
 
-    def time_series_forecast(self, duration: Duration = Duration.MONTH_1, timeperiod=7):
+    def time_series_forecast(self, duration: Duration = Duration.MONTH_1, timeperiod=7, history: pd.DataFrame = None):
         """
         returns Time Series Forecast (TSF) indicator, which is based on a linear regression technique that uses the
         least squares method to fit a straight line to data points.
@@ -514,10 +646,14 @@ class _BaseSecurity():
             The duration for which the data is required (default is 1 month)
         timeperiod: int, optional
             Time period for which the data is averaged (default is 7 days)
+        history: Pandas.Dataframe, optional
+            Price, volume data to compute the indicator on instead of downloading it, e.g. the bars
+            of a BarAggregator (default is None)
         """
         if timeperiod < 2:
             timeperiod = 2
         if timeperiod > 1000:
             timeperiod = 1000
-        close = self.__security.history(period=duration.value)['Close']
+        data = self.__price_history(duration, history)
+        close = data['Close']
         return talib.TSF(close, timeperiod=timeperiod)
\ No newline at end of file
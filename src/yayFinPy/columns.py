@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+
+
+class _ColumnStore():
+    """
+    Named numpy columns with one row per key, as used by Screener and
+    UniverseAggregator.
+
+    A key keeps its row until it is removed; the rows of removed keys are
+    reset to the missing value of every column and reused by the next keys
+    added. The columns grow by doubling, and new rows hold the missing
+    values, so the arrays returned by ``column`` and ``alive`` are only
+    valid until the next key is added.
+    """
+
+    def __init__(self, columns: dict):
+        """
+        Parameters
+        ----------
+        columns : dict
+            key: column name, value: (dtype, missing value) of the column
+        """
+        self.__rows = dict()
+        self.__keys = []
+        self.__free = []
+        self.__missing = {name: (np.dtype(dtype), missing) for name, (dtype, missing) in columns.items()}
+        self.__columns = {name: np.full(0, missing, dtype=dtype) for name, (dtype, missing) in self.__missing.items()}
+        self.__alive = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def __contains__(self, key):
+        return key in self.__rows
+
+    @property
+    def size(self) -> int:
+        """
+        Returns
+        -------
+        int
+            the number of rows allocated, live or not.
+        """
+        return len(self.__alive)
+
+    @property
+    def alive(self) -> np.ndarray:
+        """
+        Returns
+        -------
+        numpy.ndarray
+            the boolean column marking the rows which hold a key.
+        """
+        return self.__alive
+
+    def column(self, name) -> np.ndarray:
+        """
+        Returns
+        -------
+        numpy.ndarray
+            the column, indexed by row; writes go to the store.
+        """
+        return self.__columns[name]
+
+    def get(self, key):
+        """
+        Returns
+        -------
+        int
+            the row of a key, None if it has none.
+        """
+        return self.__rows.get(key)
+
+    def key(self, row: int):
+        """
+        Returns
+        -------
+        object
+            the key of a row, None for a free row.
+        """
+        return self.__keys[row]
+
+    def row(self, key) -> int:
+        """
+        Returns the row of a key, giving it a free or new row first if it
+        has none.
+        """
+        row = self.__rows.get(key)
+        if row is not None:
+            return row
+        if self.__free:
+            row = self.__free.pop()
+            self.__keys[row] = key
+        else:
+            row = len(self.__keys)
+            self.__keys.append(key)
+            if row == len(self.__alive):
+                self.__grow(max(64, 2 * row))
+        self.__rows[key] = row
+        self.__alive[row] = True
+        return row
+
+    def remove(self, key) -> int:
+        """
+        Frees the row of a key and resets it to the missing values.
+
+        Returns
+        -------
+        int
+            the freed row, None if the key has none.
+        """
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return None
+        for name, (_, missing) in self.__missing.items():
+            self.__columns[name][row] = missing
+        self.__alive[row] = False
+        self.__keys[row] = None
+        self.__free.append(row)
+        return row
+
+    def __grow(self, size):
+        used = len(self.__alive)
+        alive = np.zeros(size, dtype=bool)
+        alive[:used] = self.__alive
+        self.__alive = alive
+        for name, (dtype, missing) in self.__missing.items():
+            column = np.full(size, missing, dtype=dtype)
+            column[:used] = self.__columns[name]
+            self.__columns[name] = column
@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+import pandas as pd
+from .history import aligned_closes
+from .enumerations import *
+from .exceptions import *
+
+
+_FILE_VERSION = 1
+
+# rows moved through the rolling sums before they are summed again from
+# scratch, so rounding errors don't build up over long histories
+_RESYNC_ROWS = 256
+
+
+class _PairwiseMoments():
+    """
+    Sums over a set of rows of returns from which the covariance of every
+    pair of columns is computed, counting for each pair only the rows where
+    both are present. Rows are added and removed one at a time.
+
+    When no return is missing, the sums of a column are the same for all
+    pairs, and only the cross products need a matrix.
+    """
+
+    def __init__(self, n, dense):
+        self.dense = dense
+        self.cross = np.zeros((n, n))
+        if dense:
+            self.count = 0.0
+            self.sum = np.zeros(n)
+        else:
+            self.count = np.zeros((n, n))
+            self.sum = np.zeros((n, n))
+            self.square = np.zeros((n, n))
+
+    def update(self, added, removed=None):
+        """
+        Adds rows and removes rows, given as (rows, n) arrays.
+        """
+        if self.dense:
+            if removed is None or len(removed) == 0:
+                self.cross += added.T @ added
+                self.sum += added.sum(axis=0)
+                self.count += len(added)
+            else:
+                # one rank-k update instead of two
+                self.cross += np.vstack([added, removed]).T @ np.vstack([added, -removed])
+                self.sum += added.sum(axis=0) - removed.sum(axis=0)
+                self.count += len(added) - len(removed)
+            return
+        for rows, sign in ((added, 1.0), (removed, -1.0)):
+            if rows is None or len(rows) == 0:
+                continue
+            if not np.isnan(rows).any():
+                # every pair is present in all the rows
+                self.count += sign * len(rows)
+                self.sum += sign * rows.sum(axis=0)[:, None]
+                self.square += sign * (rows * rows).sum(axis=0)[:, None]
+                self.cross += sign * (rows.T @ rows)
+                continue
+            present = np.isfinite(rows)
+            values = np.where(present, rows, 0.0)
+            mask = present.astype(np.float64)
+            self.count += sign * (mask.T @ mask)
+            self.sum += sign * (values.T @ mask)
+            self.square += sign * ((values * values).T @ mask)
+            self.cross += sign * (values.T @ values)
+
+    def covariance(self, min_periods):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.dense:
+                if self.count < max(min_periods, 2):
+                    return np.full(self.cross.shape, np.nan)
+                cov = np.outer(self.sum, self.sum)
+                cov *= -1.0 / self.count
+                cov += self.cross
+                cov *= 1.0 / (self.count - 1)
+                return cov
+            cov = (self.cross - self.sum * self.sum.T / self.count) / (self.count - 1)
+            return np.where(self.count >= max(min_periods, 2), cov, np.nan)
+
+    def correlation(self, min_periods):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.dense:
+                if self.count < max(min_periods, 2):
+                    return np.full(self.cross.shape, np.nan)
+                # scaled in place: the matrices are large
+                corr = np.outer(self.sum, self.sum)
+                corr *= -1.0 / self.count
+                corr += self.cross
+                scale = 1.0 / np.sqrt(np.diag(corr).copy())
+                corr *= scale[:, None]
+                corr *= scale[None, :]
+                return np.clip(corr, -1.0, 1.0, out=corr)
+            centered = self.cross - self.sum * self.sum.T / self.count
+            # variance of the column of each row, over the rows shared with the other column
+            var = self.square - self.sum * self.sum / self.count
+            corr = centered / np.sqrt(var * var.T)
+            corr = np.where(self.count >= max(min_periods, 2), corr, np.nan)
+            return np.clip(corr, -1.0, 1.0)
+
+
+class CorrelationEngine():
+    """
+    Correlations, covariances and betas of the returns of a universe of
+    securities, over the whole history and over rolling windows.
+
+    Closing prices are aligned into one matrix of log returns (one column
+    per ticker). Full matrices are computed with a few matrix products,
+    counting for each pair only the dates where both have a return.
+    Rolling matrices keep running sums over the window and update them as
+    the window moves, adding the return entering and removing the one
+    leaving (a rank-2 update) instead of recomputing each window. Rolling
+    betas and correlations to a benchmark are computed for all tickers and
+    dates at once from cumulative sums. Returns are centered on their mean
+    first, so the running sums stay small.
+
+    Rolling matrices can be exported compactly: only the upper triangle of
+    each, in single precision, in a compressed numpy file.
+
+    Methods
+    -------
+    from_securities(securities, duration, interval, fill_limit)
+        Creates an engine from the cached histories of securities.
+
+    covariance(self), correlation(self)
+        Returns the matrix over the whole history.
+
+    beta(self, benchmark)
+        Returns the betas of all tickers to a benchmark.
+
+    rolling_beta(self, benchmark, window), rolling_correlation_to(self, benchmark, window)
+        Returns the rolling betas or correlations to a benchmark.
+
+    iter_rolling(self, window, step, kind)
+        Yields the rolling correlation or covariance matrices.
+
+    export_rolling(self, path, window, step, kind)
+        Saves the rolling matrices to a compressed numpy file.
+
+    Example usage:
+
+        engine = CorrelationEngine.from_securities(stocks + [Stock("^GSPC")], duration=Duration.YEAR_2)
+        betas = engine.rolling_beta("^GSPC", window=60)
+        engine.export_rolling("correlations.npz", window=60, step=5)
+    """
+
+    def __init__(self, closes: pd.DataFrame):
+        """
+        Parameters
+        ----------
+        closes : pandas.DataFrame
+            Aligned closing prices, one column per ticker symbol (see
+            ``history.aligned_closes``)
+
+        Raises
+        ------
+        InputError
+            If there are less than 2 dates of prices.
+        """
+        if len(closes) < 2:
+            raise InputError("Invalid closes", "Needs prices for at least 2 dates")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(closes.to_numpy(dtype=np.float64)), axis=0)
+        returns[~np.isfinite(returns)] = np.nan
+        with np.errstate(invalid="ignore"):
+            # covariances don't change with a shift, and centered sums lose less precision
+            mean = np.nanmean(returns, axis=0) if returns.size else np.zeros(returns.shape[1])
+        self.__returns = returns - np.nan_to_num(mean)
+        self.__dense = not np.isnan(self.__returns).any()
+        self.__tickers = [str(t) for t in closes.columns]
+        self.__columns = {t: i for i, t in enumerate(self.__tickers)}
+        self.__dates = closes.index[1:]
+
+    @classmethod
+    def from_securities(cls, securities, duration: Duration = Duration.YEAR_1, interval: Interval = Interval.DAY_1,
+                        fill_limit: int = 5):
+        """
+        Creates an engine from the histories of security objects (Stock,
+        ETF, Currency, ...), see ``history.aligned_closes``.
+        """
+        return cls(aligned_closes(securities, duration, interval, fill_limit))
+
+    @property
+    def tickers(self):
+        """
+        Returns
+        -------
+        list[str]
+            the ticker symbols, in matrix order.
+        """
+        return list(self.__tickers)
+
+    @property
+    def dates(self):
+        """
+        Returns
+        -------
+        pandas.Index
+            the dates of the returns.
+        """
+        return self.__dates
+
+    def __column(self, ticker_symbol):
+        column = self.__columns.get(ticker_symbol)
+        if column is None:
+            raise InputError("Ticker Symbol not in CorrelationEngine", "Input Ticker " + str(ticker_symbol))
+        return column
+
+    def __full_moments(self):
+        moments = _PairwiseMoments(len(self.__tickers), self.__dense)
+        moments.update(self.__returns)
+        return moments
+
+    def __frame(self, matrix):
+        return pd.DataFrame(matrix, index=self.__tickers, columns=self.__tickers)
+
+    def covariance(self, min_periods: int = 2) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the covariance matrix of the log returns over the whole history
+            (NaN for pairs with less than min_periods common returns).
+        """
+        return self.__frame(self.__full_moments().covariance(min_periods))
+
+    def correlation(self, min_periods: int = 2) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the correlation matrix of the log returns over the whole history
+            (NaN for pairs with less than min_periods common returns).
+        """
+        return self.__frame(self.__full_moments().correlation(min_periods))
+
+    def __rolling_pair_sums(self, benchmark, window):
+        """
+        Window sums of the returns of every ticker and of the benchmark,
+        over the dates where both are present, for all dates at once.
+        """
+        x = self.__returns
+        m = x[:, self.__column(benchmark)][:, None]
+        both = np.isfinite(x) & np.isfinite(m)
+        x = np.where(both, x, 0.0)
+        m = np.where(both, m, 0.0)
+
+        def window_sum(values):
+            total = np.cumsum(values, axis=0)
+            total[window:] = total[window:] - total[:-window]
+            return total
+
+        return (window_sum(both.astype(np.float64)), window_sum(x), window_sum(m), window_sum(x * m),
+                window_sum(m * m), window_sum(x * x))
+
+    def __rolling_frame(self, values, count, window, min_periods):
+        min_periods = window if min_periods is None else min_periods
+        values = np.where(count >= max(min_periods, 2), values, np.nan)
+        values[:window - 1] = np.nan
+        return pd.DataFrame(values, index=self.__dates, columns=self.__tickers)
+
+    def rolling_beta(self, benchmark: str, window: int = 60, min_periods: int = None) -> pd.DataFrame:
+        """
+        Returns the beta of every ticker to a benchmark over a rolling window.
+
+        Parameters
+        ----------
+        benchmark : str
+            Ticker symbol of the benchmark, e.g. "^GSPC"
+        window : int, optional
+            Number of returns in the window (default is 60)
+        min_periods : int, optional
+            Minimum number of common returns in a window (default is window)
+
+        Returns
+        -------
+        pandas.DataFrame
+            one column per ticker, indexed by the date ending each window;
+            NaN before the first full window.
+        """
+        if window < 2:
+            raise InputError("Invalid window", "Needs to be >= 2")
+        n, sx, sm, sxm, smm, _ = self.__rolling_pair_sums(benchmark, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = (sxm - sx * sm / n) / (smm - sm * sm / n)
+        return self.__rolling_frame(beta, n, window, min_periods)
+
+    def rolling_correlation_to(self, benchmark: str, window: int = 60, min_periods: int = None) -> pd.DataFrame:
+        """
+        Returns the correlation of every ticker to a benchmark over a
+        rolling window; parameters are those of ``rolling_beta``.
+        """
+        if window < 2:
+            raise InputError("Invalid window", "Needs to be >= 2")
+        n, sx, sm, sxm, smm, sxx = self.__rolling_pair_sums(benchmark, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (sxm - sx * sm / n) / np.sqrt((sxx - sx * sx / n) * (smm - sm * sm / n))
+        return self.__rolling_frame(np.clip(corr, -1.0, 1.0), n, window, min_periods)
+
+    def beta(self, benchmark: str) -> pd.Series:
+        """
+        Returns
+        -------
+        pandas.Series
+            the beta of every ticker to the benchmark over the whole history.
+        """
+        window = len(self.__returns)
+        return self.rolling_beta(benchmark, window, min_periods=2).iloc[-1].rename("Beta")
+
+    def iter_rolling(self, window: int = 60, step: int = 1, kind: str = "correlation", min_periods: int = None):
+        """
+        Yields the correlation (or covariance) matrix of every rolling window.
+
+        The sums of the window are updated as it moves: the returns entering
+        are added and the returns leaving removed. They are summed again
+        from the window's returns every few windows, so rounding errors
+        don't accumulate.
+
+        Parameters
+        ----------
+        window : int, optional
+            Number of returns in the window (default is 60)
+        step : int, optional
+            Yield every step-th window (default is 1)
+        kind : str, optional
+            "correlation" or "covariance" (default is "correlation")
+        min_periods : int, optional
+            Minimum number of common returns in a window (default is window)
+
+        Yields
+        ------
+        (pandas.Timestamp, numpy.ndarray)
+            the date ending the window and the matrix, in ``tickers`` order.
+        """
+        if kind not in ("correlation", "covariance"):
+            raise InputError("Invalid kind", "Needs to be 'correlation' or 'covariance'")
+        if window < 2 or step < 1:
+            raise InputError("Invalid window or step", "Needs window >= 2 and step >= 1")
+        min_periods = window if min_periods is None else min_periods
+        returns = self.__returns
+        if len(returns) < window:
+            return
+        moments = _PairwiseMoments(len(self.__tickers), self.__dense)
+        moments.update(returns[:window])
+        moved = 0
+        resync = max(_RESYNC_ROWS, 4 * window)
+        end = window
+        while True:
+            matrix = moments.correlation(min_periods) if kind == "correlation" else moments.covariance(min_periods)
+            yield self.__dates[end - 1], matrix
+            if end + step > len(returns):
+                break
+            moved += step
+            if step >= window or moved >= resync:
+                moments = _PairwiseMoments(len(self.__tickers), self.__dense)
+                moments.update(returns[end + step - window:end + step])
+                moved = 0
+            else:
+                moments.update(returns[end:end + step], returns[end - window:end + step - window])
+            end += step
+
+    def export_rolling(self, path: str, window: int = 60, step: int = 1, kind: str = "correlation",
+                       min_periods: int = None):
+        """
+        Saves the rolling matrices to a compressed numpy file, keeping only
+        the upper triangle of each in single precision.
+
+        Parameters
+        ----------
+        path : str
+            The file to write
+        window, step, kind, min_periods
+            See ``iter_rolling``
+        """
+        upper = np.triu_indices(len(self.__tickers), k=1 if kind == "correlation" else 0)
+        count = len(self.__returns)
+        windows = (count - window) // step + 1 if step >= 1 and count >= window else 0
+        # filled window by window, so the triangles are held only once
+        dates = np.zeros(windows, dtype=np.int64)
+        values = np.empty((windows, len(upper[0])), dtype=np.float32)
+        for i, (date, matrix) in enumerate(self.iter_rolling(window, step, kind, min_periods)):
+            dates[i] = date.value
+            values[i] = matrix[upper]
+        with open(path, "wb") as fh:
+            np.savez_compressed(fh, version=np.array(_FILE_VERSION), kind=np.array(kind),
+                                tickers=np.array(self.__tickers, dtype=str), dates=dates, values=values)
+
+
+def load_rolling(path: str):
+    """
+    Loads rolling matrices saved with ``CorrelationEngine.export_rolling``.
+
+    Parameters
+    ----------
+    path : str
+        The file to read
+
+    Returns
+    -------
+    (pandas.DatetimeIndex, list[str], numpy.ndarray)
+        the dates ending the windows, the ticker symbols, and the matrices,
+        of shape (dates, tickers, tickers).
+
+    Raises
+    ------
+    InputError
+        If the file cannot be read.
+    ParsingError
+        If the file is not a saved export.
+    """
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            columns = {k: data[k] for k in data.files}
+    except (OSError, ValueError) as e:
+        raise InputError(path, "Failed to read rolling matrices file. " + str(e))
+    if "version" not in columns or int(columns["version"]) != _FILE_VERSION:
+        raise ParsingError(path, "Not a rolling matrices file of version " + str(_FILE_VERSION))
+
+    tickers = columns["tickers"].tolist()
+    n = len(tickers)
+    correlation = str(columns["kind"]) == "correlation"
+    upper = np.triu_indices(n, k=1 if correlation else 0)
+    values = columns["values"]
+    matrices = np.zeros((len(values), n, n), dtype=np.float32)
+    matrices[:, upper[0], upper[1]] = values
+    matrices[:, upper[1], upper[0]] = values
+    if correlation:
+        matrices[:, np.arange(n), np.arange(n)] = 1.0
+    return pd.DatetimeIndex(columns["dates"].astype("datetime64[ns]")), tickers, matrices
@@ -62,4 +62,21 @@ class Multiplier(Enum):
     THRICE = 3
     QUADRICE = 4
     HALF = 0.5
-    QUARTER = 0.25
\ No newline at end of file
+    QUARTER = 0.25
+
+class LotMatching(Enum):
+    FIFO = "FIFO"
+    LIFO = "LIFO"
+
+class Statement(Enum):
+    FINANCIALS = "financials"
+    BALANCE_SHEET = "balance_sheet"
+    CASHFLOW = "cashflow"
+    EARNINGS = "earnings"
+    MAJOR_HOLDERS = "major_holders"
+    INSTITUTIONAL_HOLDERS = "institutional_holders"
+    MUTUALFUND_HOLDERS = "mutualfund_holders"
+
+class PathModel(Enum):
+    GBM = "gbm"
+    BOOTSTRAP = "bootstrap"
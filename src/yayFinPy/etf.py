@@ -20,10 +20,10 @@
 # - Shubham Gupta
 # - Vasudev Luthra
 
-from .base import _BaseSecurity
+from .base import _BaseSecurity, _ReadOnlySeries
+from .options import OptionChain
 from .exceptions import *
 from .enumerations import *
-import copy
 from decimal import *
 from datetime import date
    
@@ -49,6 +49,9 @@ class ETF(_BaseSecurity):
     returns_percentage(self,period,interval,start_date,end_date)
         returns stock returns in percentage for specific period and interval
 
+    option_chain(self, rate, dividend_yield)
+        returns the option chains of the ETF with implied volatilities and Greeks.
+
     
     A typical application of this class first initialize an object with a valid ticker symbol, then use the
 	class properties to extract information.
@@ -99,12 +102,13 @@ class ETF(_BaseSecurity):
             s = self.__security.info
             self.__business_summary = s["longBusinessSummary"]
             self.__name = s["shortName"]
-            self.__dividends = self.__security.dividends
+            self.__dividends = _ReadOnlySeries(lambda: self.__security.dividends)
             self.__ask = Decimal(s["ask"])
             self.__ask_size = Decimal(s["askSize"])
             self.__bid = Decimal(s["bid"])
             self.__bid_size = Decimal(s["bidSize"])
             self.__assets = Decimal(s["totalAssets"])
+            self.__option_chains = dict()
         except:
             raise InputError(ticker_symbol,"API data retrieval error")
 
@@ -143,9 +147,9 @@ class ETF(_BaseSecurity):
         Returns
         -------
         Pandas.DataFrame
-            dataframe of ETF security dividends
+            dataframe of ETF security dividends, fetched on first use; the data is read-only
         """        
-        return copy.deepcopy(self.__dividends)
+        return self.__dividends.get()
 
 
     @property
@@ -269,4 +273,27 @@ class ETF(_BaseSecurity):
         Decimal
             percentage return of an ETF.
         """       
-        return Decimal(self.__calculate_returns(period,interval,True,start,end))
\ No newline at end of file
+        return Decimal(self.__calculate_returns(period,interval,True,start,end))
+
+    def option_chain(self, rate: float = 0.0, dividend_yield: float = 0.0) -> OptionChain:
+        """Returns the option chains of the ETF for all expirations, with
+        implied volatilities and Greeks, see ``options.OptionChain``.
+        The chain is created once per ETF and its quotes cached.
+
+        Parameters
+        ----------
+        rate : float, optional
+            continuously compounded risk free rate, by default 0
+        dividend_yield : float, optional
+            continuous dividend yield, by default 0
+
+        Returns
+        -------
+        OptionChain
+            the option chains, priced at the current price of the ETF.
+        """
+        key = (float(rate), float(dividend_yield))
+        if key not in self.__option_chains:
+            self.__option_chains[key] = OptionChain(self.ticker_symbol, float(self.price), rate=rate,
+                                                    dividend_yield=dividend_yield)
+        return self.__option_chains[key]
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from .ratelimit import RateLimiter
+from .enumerations import *
+from .exceptions import *
+
+
+PANEL_COLUMNS = ["Ticker Symbol", "Statement", "Line Item", "Period", "Value"]
+
+# financial statements: one row per line item, one column per period
+_WIDE_STATEMENTS = (Statement.FINANCIALS, Statement.BALANCE_SHEET, Statement.CASHFLOW)
+# holders: one row per holder, the number of shares held as value
+_HOLDER_STATEMENTS = (Statement.INSTITUTIONAL_HOLDERS, Statement.MUTUALFUND_HOLDERS)
+
+
+def _numbers(values) -> np.ndarray:
+    # numbers which Yahoo may format as text ("0.07%", "5,470")
+    if pd.api.types.is_numeric_dtype(values):
+        return np.asarray(values, dtype=np.float64)
+    text = pd.Series(values).astype(str).str.replace(",", "", regex=False).str.strip()
+    percent = text.str.endswith("%")
+    numbers = pd.to_numeric(text.str.rstrip("%"), errors="coerce").to_numpy(dtype=np.float64)
+    numbers[percent.to_numpy()] /= 100
+    return numbers
+
+
+def _periods(values) -> np.ndarray:
+    values = pd.Index(values)
+    if pd.api.types.is_integer_dtype(values):
+        # earnings are reported per year
+        return pd.to_datetime(values.astype(str), format="%Y").to_numpy()
+    return pd.to_datetime(values, errors="coerce").to_numpy()
+
+
+def to_long(ticker_symbol: str, statement: Statement, frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turns a statement as returned by Stock into the long panel format.
+
+    Parameters
+    ----------
+    ticker_symbol : str
+        The ticker symbol of the statement
+    statement : Statement
+        The kind of statement
+    frame : pandas.DataFrame
+        The statement
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per value, with columns Ticker Symbol, Statement, Line Item,
+        Period and Value.
+    """
+    if frame is None or frame.empty:
+        return pd.DataFrame({c: [] for c in PANEL_COLUMNS})
+    if statement in _WIDE_STATEMENTS:
+        values = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+        items = np.repeat(np.asarray(frame.index, dtype=object), frame.shape[1])
+        periods = np.tile(_periods(frame.columns), frame.shape[0])
+        values = values.ravel()
+    elif statement == Statement.EARNINGS:
+        values = frame.to_numpy(dtype=np.float64, na_value=np.nan).ravel()
+        items = np.tile(np.asarray(frame.columns, dtype=object), frame.shape[0])
+        periods = np.repeat(_periods(frame.index), frame.shape[1])
+    elif statement == Statement.MAJOR_HOLDERS:
+        if "Value" in frame:
+            # one Value column, indexed by the breakdown
+            values = _numbers(frame["Value"])
+            items = np.asarray(frame.index, dtype=object)
+        else:
+            # older yfinance: two columns, the value and its description
+            values = _numbers(frame.iloc[:, 0])
+            items = np.asarray(frame.iloc[:, 1], dtype=object)
+        periods = np.full(len(frame), np.datetime64("NaT"), dtype="datetime64[ns]")
+    else:
+        values = _numbers(frame["Shares"])
+        items = np.asarray(frame["Holder"], dtype=object)
+        periods = _periods(frame["Date Reported"]) if "Date Reported" in frame else \
+            np.full(len(frame), np.datetime64("NaT"), dtype="datetime64[ns]")
+    keep = ~np.isnan(values)
+    return pd.DataFrame({"Ticker Symbol": ticker_symbol, "Statement": statement.value,
+                         "Line Item": items[keep], "Period": periods[keep], "Value": values[keep]},
+                        columns=PANEL_COLUMNS)
+
+
+def _yahoo_statement(ticker_symbol, statement):
+    return getattr(yf.Ticker(ticker_symbol), statement.value)
+
+
+class FundamentalsLoader():
+    """
+    Fetches fundamentals statements of many tickers concurrently and
+    assembles them into one long-format panel.
+
+    The panel has one row per (ticker symbol, statement, line item, period)
+    with its value as a float. Its text columns are categorical, so
+    cross-company queries (one line item for every ticker) are fast and
+    the panel stays compact for hundreds of tickers.
+
+    Tickers which fail to load are skipped; their errors are kept in
+    ``failed``.
+
+    Methods
+    -------
+    load(self, tickers, statements)
+        Returns the panel of the statements of the tickers.
+
+    failed(self)
+        Returns the errors of the tickers which failed in the last load.
+
+    cross_section(panel, line_item, statement, period)
+        Returns the value of a line item for every ticker of a panel.
+
+    Example usage:
+
+        loader = FundamentalsLoader(max_workers=16)
+        panel = loader.load(sp500, [Statement.FINANCIALS, Statement.BALANCE_SHEET])
+        revenue = FundamentalsLoader.cross_section(panel, "Total Revenue")
+    """
+
+    def __init__(self, max_workers: int = 8, limiter: RateLimiter = None, fetcher=None):
+        """
+        Parameters
+        ----------
+        max_workers : int, optional
+            Number of tickers fetched at once (default is 8)
+        limiter : RateLimiter, optional
+            Request budget, one request per statement (default is 2 requests per second)
+        fetcher : callable, optional
+            Function taking (ticker_symbol, statement) and returning the
+            statement as a pandas DataFrame (default fetches from Yahoo Finance)
+        """
+        if max_workers < 1:
+            raise InputError("Invalid max_workers", "Needs to be >= 1")
+        self.__max_workers = max_workers
+        self.__limiter = RateLimiter(rate=2, capacity=4) if limiter is None else limiter
+        self.__fetcher = _yahoo_statement if fetcher is None else fetcher
+        self.__failed = dict()
+
+    @property
+    def failed(self):
+        """
+        Returns
+        -------
+        dict
+            key: ticker symbol, value: error, for the tickers which failed
+            to load in the last ``load``.
+        """
+        return dict(self.__failed)
+
+    def __fetch(self, ticker, statements):
+        frames = []
+        for statement in statements:
+            if isinstance(ticker, str):
+                self.__limiter.acquire()
+                frame = self.__fetcher(ticker, statement)
+                symbol = ticker
+            else:
+                # a Stock object: use its memoized fundamentals
+                frame = ticker.fundamentals(statement)
+                symbol = ticker.ticker_symbol
+            frames.append(to_long(symbol, statement, frame))
+        return frames
+
+    def load(self, tickers, statements=(Statement.FINANCIALS, Statement.BALANCE_SHEET,
+                                        Statement.CASHFLOW)) -> pd.DataFrame:
+        """
+        Fetches statements of many tickers and assembles them into a panel.
+
+        Parameters
+        ----------
+        tickers : iterable of str or Stock
+            The ticker symbols, or Stock objects whose memoized fundamentals are used
+        statements : iterable of Statement, optional
+            The statements to load (default is financials, balance sheet and cashflow)
+
+        Returns
+        -------
+        pandas.DataFrame
+            the panel, with columns Ticker Symbol, Statement, Line Item,
+            Period and Value.
+        """
+        statements = list(statements)
+        for statement in statements:
+            if not isinstance(statement, Statement):
+                raise ParsingError("Invalid statement type", "expected type 'Statement'")
+        tickers = list(tickers)
+        self.__failed = dict()
+
+        frames = []
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            futures = [executor.submit(self.__fetch, t, statements) for t in tickers]
+            for t, future in zip(tickers, futures):
+                try:
+                    frames.extend(future.result())
+                except Exception as e:
+                    self.__failed[t if isinstance(t, str) else t.ticker_symbol] = e
+
+        frames = [f for f in frames if len(f)]
+        if not frames:
+            panel = pd.DataFrame({c: [] for c in PANEL_COLUMNS})
+            panel["Period"] = pd.to_datetime(panel["Period"])
+            panel["Value"] = panel["Value"].astype(np.float64)
+        else:
+            panel = pd.concat(frames, ignore_index=True)
+        for column in ("Ticker Symbol", "Statement", "Line Item"):
+            panel[column] = panel[column].astype("category")
+        return panel
+
+    @staticmethod
+    def cross_section(panel: pd.DataFrame, line_item: str, statement: Statement = None,
+                      period=None) -> pd.Series:
+        """
+        Returns the value of a line item for every ticker of a panel.
+
+        Parameters
+        ----------
+        panel : pandas.DataFrame
+            A panel returned by ``load``
+        line_item : str
+            The line item, e.g. "Total Revenue"
+        statement : Statement, optional
+            The statement of the line item (default is any)
+        period : date or str, optional
+            The period (default is the latest period of each ticker)
+
+        Returns
+        -------
+        pandas.Series
+            the values indexed by ticker symbol.
+        """
+        mask = (panel["Line Item"] == line_item).to_numpy()
+        if statement is not None:
+            mask &= (panel["Statement"] == statement.value).to_numpy()
+        rows = panel[mask]
+        if period is not None:
+            rows = rows[rows["Period"] == pd.Timestamp(period)]
+        else:
+            rows = rows.sort_values("Period", kind="stable")
+        values = rows.groupby("Ticker Symbol", observed=True, sort=True)["Value"].last()
+        values.name = line_item
+        return values
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import time
+import yfinance as yf
+import pandas as pd
+from .exceptions import *
+
+
+# Yahoo quotes some exchanges in minor currency units (e.g. pence on the LSE).
+_MINOR_UNITS = {
+    "GBp": ("GBP", 100.0),
+    "GBX": ("GBP", 100.0),
+    "ZAc": ("ZAR", 100.0),
+    "ILA": ("ILS", 100.0),
+}
+
+
+class FxRateCache():
+    """
+    A cache of foreign exchange rates used to convert security prices into a
+    single reporting currency.
+
+    Rates are looked up as Yahoo Finance currency pairs (e.g. "EURUSD=X") and
+    every pair missing from the cache is fetched in one batched download.
+    Cached rates are reused until they are older than ``ttl`` seconds.
+
+    Methods
+    -------
+    rates(self, currencies, reporting_currency)
+        Returns the conversion rate of each currency into the reporting currency.
+
+    clear(self)
+        Drops all the cached rates.
+
+    Example usage:
+
+        cache = FxRateCache(ttl=600)
+        rates = cache.rates({"EUR", "JPY"}, "USD")
+        usd_value = eur_value * rates["EUR"]
+    """
+
+    def __init__(self, ttl: int = 300):
+        """
+        Parameters
+        ----------
+        ttl : int, optional
+            Number of seconds a fetched rate stays valid (default is 300)
+        """
+        self.__ttl = ttl
+        self.__rates = dict()
+
+    @staticmethod
+    def pair_ticker(base_currency: str, quote_currency: str) -> str:
+        """
+        Returns
+        -------
+        str
+            the Yahoo Finance ticker symbol of the currency pair.
+        """
+        return base_currency + quote_currency + "=X"
+
+    def rates(self, currencies, reporting_currency: str) -> dict:
+        """
+        Get the rates converting each currency into the reporting currency.
+
+        Parameters
+        ----------
+        currencies : iterable of str
+            Currency codes as reported by Yahoo Finance (e.g. "EUR", "GBp")
+        reporting_currency : str
+            The currency code to convert into
+
+        Returns
+        -------
+        dict
+            key: currency code, value: float rate such that
+            amount * rate is the amount in the reporting currency
+
+        Raises
+        ------
+        YfinanceError
+            If a rate could not be retrieved for one of the currency pairs.
+        """
+        if not isinstance(reporting_currency, str):
+            raise ParsingError("Invalid reporting currency type", "expected type 'str'")
+
+        now = time.time()
+        currencies = set(currencies)
+        majors = {c: _MINOR_UNITS.get(c, (c, 1.0)) for c in currencies}
+
+        missing = set()
+        for major, _ in majors.values():
+            if major == reporting_currency:
+                continue
+            cached = self.__rates.get((major, reporting_currency))
+            if cached is None or now - cached[1] > self.__ttl:
+                missing.add(major)
+
+        if missing:
+            self.__fetch(sorted(missing), reporting_currency, now)
+
+        ret = dict()
+        for c, (major, divisor) in majors.items():
+            rate = 1.0 if major == reporting_currency else self.__rates[(major, reporting_currency)][0]
+            ret[c] = rate / divisor
+        return ret
+
+    def clear(self):
+        """
+        Drops all the cached rates.
+        """
+        self.__rates.clear()
+
+    def __fetch(self, currencies, reporting_currency, now):
+        pairs = [self.pair_ticker(c, reporting_currency) for c in currencies]
+        try:
+            data = yf.download(pairs, period="5d", interval="1d", progress=False, threads=True)
+            closes = data["Close"]
+        except Exception as e:
+            raise YfinanceError(" ".join(pairs), "Failed to download FX rates. " + str(e))
+
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(pairs[0])
+        last = closes.ffill().iloc[-1] if len(closes) else pd.Series(dtype=float)
+
+        for c, pair in zip(currencies, pairs):
+            rate = last.get(pair)
+            if rate is None or pd.isna(rate):
+                raise YfinanceError(pair, "Missing underlying Yfinance FX rate.")
+            self.__rates[(c, reporting_currency)] = (float(rate), now)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from .ratelimit import RateLimiter
+from .enumerations import *
+from .exceptions import *
+
+
+# Longest date range Yahoo Finance returns in one request, per intraday interval.
+MAX_WINDOW = {
+    Interval.MINUTE_1: timedelta(days=7),
+    Interval.MINUTE_5: timedelta(days=60),
+    Interval.MINUTE_15: timedelta(days=60),
+    Interval.MINUTE_30: timedelta(days=60),
+    Interval.HOUR_1: timedelta(days=730),
+}
+
+# Shared by all the downloads of the process, so parallel downloads do not
+# add up to more requests than Yahoo tolerates.
+_DEFAULT_LIMITER = RateLimiter(rate=2, capacity=4)
+
+
+def _to_timestamp(value, name):
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        raise ParsingError("Invalid " + name + " type", "expected a date, datetime or str")
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts
+
+
+def date_windows(start, end, interval: Interval = Interval.MINUTE_1) -> list:
+    """
+    Splits a date range into the windows Yahoo Finance accepts in one request.
+
+    Parameters
+    ----------
+    start, end : date, datetime or str
+        The date range, end excluded
+    interval : Interval, optional
+        The interval of the bars (default is 1 minute)
+
+    Returns
+    -------
+    list[(pandas.Timestamp, pandas.Timestamp)]
+        consecutive (start, end) windows covering the range, in order.
+    """
+    start = _to_timestamp(start, "start")
+    end = _to_timestamp(end, "end")
+    if end <= start:
+        raise InputError("Invalid date range", "end needs to be after start")
+    step = MAX_WINDOW.get(interval)
+    if step is None:
+        return [(start, end)]
+    windows = []
+    while start < end:
+        windows.append((start, min(start + step, end)))
+        start += step
+    return windows
+
+
+def _yahoo_history(ticker_symbol, start, end, interval):
+    return yf.Ticker(ticker_symbol).history(start=start, end=end, interval=interval.value)
+
+
+def iter_history(ticker_symbol: str, start, end=None, interval: Interval = Interval.MINUTE_1,
+                 max_workers: int = 4, limiter: RateLimiter = None, fetcher=None):
+    """
+    Downloads the price, volume data of a security over a long date range,
+    one window at a time.
+
+    The range is split into the windows Yahoo Finance accepts for the
+    interval, which are fetched concurrently (at most ``max_workers`` at a
+    time, within the request budget of ``limiter``) and yielded in
+    chronological order as they complete. Bars repeated across windows are
+    dropped, so the concatenation of the chunks has a unique, sorted index.
+    At most ``max_workers`` chunks are held in memory at once.
+
+    Parameters
+    ----------
+    ticker_symbol : str
+        The ticker symbol of the security
+    start : date, datetime or str
+        The date from which the data is required
+    end : date, datetime or str, optional
+        The date up to which the data is required (default is now)
+    interval : Interval, optional
+        In what intervals should the data be reported (default is 1 minute)
+    max_workers : int, optional
+        Number of windows downloaded at once (default is 4)
+    limiter : RateLimiter, optional
+        Request budget (default is one shared by all downloads)
+    fetcher : callable, optional
+        Function taking (ticker_symbol, start, end, interval) and returning a
+        pandas DataFrame indexed by time (default downloads from Yahoo Finance)
+
+    Returns
+    -------
+    generator of pandas.DataFrame
+        the data of each window, in order; empty windows are skipped.
+
+    Raises
+    ------
+    InputError
+        If the date range or max_workers is invalid.
+    """
+    if max_workers < 1:
+        raise InputError("Invalid max_workers", "Needs to be >= 1")
+    if end is None:
+        end = pd.Timestamp.now(tz="UTC")
+    windows = date_windows(start, end, interval)
+    limiter = _DEFAULT_LIMITER if limiter is None else limiter
+    fetcher = _yahoo_history if fetcher is None else fetcher
+
+    def fetch(window):
+        limiter.acquire()
+        return fetcher(ticker_symbol, window[0], window[1], interval)
+
+    return _ordered_chunks(windows, fetch, max_workers)
+
+
+def _ordered_chunks(windows, fetch, max_workers):
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    remaining = iter(windows)
+    last = None
+    try:
+        for window in islice(remaining, max_workers):
+            pending.append(executor.submit(fetch, window))
+        while pending:
+            chunk = pending.popleft().result()
+            for window in islice(remaining, 1):
+                pending.append(executor.submit(fetch, window))
+            if chunk is None or chunk.empty:
+                continue
+            chunk = chunk[~chunk.index.duplicated(keep="last")].sort_index()
+            if last is not None:
+                chunk = chunk[chunk.index > last]
+                if chunk.empty:
+                    continue
+            last = chunk.index[-1]
+            yield chunk
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def download_history(ticker_symbol: str, start, end=None, interval: Interval = Interval.MINUTE_1,
+                     max_workers: int = 4, limiter: RateLimiter = None, fetcher=None) -> pd.DataFrame:
+    """
+    Downloads the price, volume data of a security over a long date range
+    and returns it as one DataFrame. Takes the same parameters as
+    ``iter_history``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        the data of the whole range, with a unique, sorted index.
+    """
+    chunks = list(iter_history(ticker_symbol, start, end, interval, max_workers, limiter, fetcher))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks)
+
+
+_INTRADAY = (Interval.MINUTE_1, Interval.MINUTE_5, Interval.MINUTE_15, Interval.MINUTE_30, Interval.HOUR_1)
+
+
+def aligned_history(securities, duration: Duration = Duration.YEAR_1, interval: Interval = Interval.DAY_1,
+                    fill_limit: int = 5, fields=("Open", "High", "Low", "Close", "Volume")) -> dict:
+    """
+    Aligns the price and volume histories of many securities on one index.
+
+    Histories come from ``historical_data`` of each security, so they are
+    the cached ones. Daily (and longer) bars are aligned on their date in
+    the exchange's time zone, intraday bars on their UTC time. A security
+    with no bar at a time of the index (e.g. an exchange holiday) gets a
+    flat bar at its last close: Open, High, Low and Close are the last
+    Close, other fields carry their last value forward and Volume is 0.
+    Only gaps of at most ``fill_limit`` bars inside a history are filled;
+    longer gaps are left missing entirely.
+
+    Parameters
+    ----------
+    securities : iterable
+        Security objects (Stock, ETF, Currency, ...)
+    duration : Duration, optional
+        The duration of the histories (default is 1 year)
+    interval : Interval, optional
+        The interval of the bars (default is 1 day)
+    fill_limit : int, optional
+        Longest gap, in consecutive missing bars, which is filled (default is 5)
+    fields : iterable of str, optional
+        The columns of the histories to align (default is Open, High, Low,
+        Close and Volume)
+
+    Returns
+    -------
+    dict
+        key: field, value: pandas.DataFrame with one column per ticker
+        symbol, indexed by the union of the bar times, NaN where there is
+        no value (or the history has no such field).
+    """
+    fields = list(fields)
+    columns = {field: dict() for field in fields}
+    for security in securities:
+        history = security.historical_data(duration, interval)
+        index = history.index
+        if index.tz is not None:
+            index = index.tz_convert("UTC") if interval in _INTRADAY else index.tz_localize(None)
+        if interval not in _INTRADAY:
+            index = index.normalize()
+        unique = ~index.duplicated(keep="last")
+        for field in fields:
+            values = history[field].to_numpy(dtype="float64") if field in history else float("nan")
+            columns[field][security.ticker_symbol] = pd.Series(values, index=index)[unique]
+    frames = {field: pd.DataFrame(columns[field]).sort_index() for field in fields}
+    if not fields or frames[fields[0]].empty:
+        return frames
+    # the bars of a security are the times it has a close (or first field)
+    bars = frames["Close" if "Close" in frames else fields[0]]
+    # fill whole gaps inside each history, never before its first or after its last bar
+    missing = bars.isna().to_numpy()
+    rows = np.arange(len(bars))[:, None]
+    previous = np.maximum.accumulate(np.where(missing, -1, rows), axis=0)
+    following = np.minimum.accumulate(np.where(missing, len(bars), rows)[::-1], axis=0)[::-1]
+    filled = missing & (previous >= 0) & (following < len(bars)) & (following - previous - 1 <= fill_limit)
+    filled = pd.DataFrame(filled, index=bars.index, columns=bars.columns)
+    last_close = frames["Close"].ffill() if "Close" in frames else None
+    for field in fields:
+        if field == "Volume":
+            frames[field] = frames[field].mask(filled, 0.0)
+        elif field in ("Open", "High", "Low") and last_close is not None:
+            frames[field] = frames[field].mask(filled, last_close)
+        else:
+            frames[field] = frames[field].mask(filled, frames[field].ffill())
+    return frames
+
+
+def aligned_closes(securities, duration: Duration = Duration.YEAR_1, interval: Interval = Interval.DAY_1,
+                   fill_limit: int = 5) -> pd.DataFrame:
+    """
+    Aligns the closing prices of many securities on one index, see
+    ``aligned_history``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        one column of closing prices per ticker symbol, indexed by the
+        union of the bar times, NaN where there is no price.
+    """
+    return aligned_history(securities, duration, interval, fill_limit, fields=("Close",))["Close"]
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+import pandas as pd
+from .enumerations import *
+from .exceptions import *
+
+
+_FILE_VERSION = 1
+_KINDS = (Statement.INSTITUTIONAL_HOLDERS, Statement.MUTUALFUND_HOLDERS)
+
+
+class HoldingsIndex():
+    """
+    An inverted index of the institutional and mutual fund holders of many
+    stocks, answering both "who holds this stock" and "what does this
+    holder hold" across the universe ingested.
+
+    Positions are stored once as coordinate arrays (holder, stock, shares,
+    value). Holders added are buffered per stock and merged into the arrays
+    in one pass when the index is next read, so ingesting many stocks costs
+    time linear in the positions. Two compressed sparse row layouts are
+    derived from the arrays on demand, one grouped by holder and one
+    grouped by stock, so both lookups are a slice of sorted arrays.
+    Overlaps between holders intersect their sorted stock ids, and
+    concentration is computed for all holders at once with grouped
+    reductions.
+
+    The index can be saved to and loaded from a compressed numpy file so it
+    is not rebuilt on each run.
+
+    Methods
+    -------
+    add(self, ticker_symbol, frame, statement)
+        Adds the holders of a stock, replacing the previous ones.
+
+    ingest(self, stocks, statements)
+        Adds the holders of many Stock objects.
+
+    holders(self, ticker_symbol)
+        Returns the holders of a stock.
+
+    holdings(self, holder)
+        Returns the positions of a holder.
+
+    overlap(self, holder, other)
+        Returns the stocks held by both holders.
+
+    overlap_matrix(self, holders)
+        Returns the number of stocks held in common by each pair of holders.
+
+    concentration(self)
+        Returns the Herfindahl index of the positions of each holder.
+
+    save(self, path)
+        Saves the index.
+
+    load(path)
+        Loads a saved index.
+
+    Example usage:
+
+        index = HoldingsIndex()
+        index.ingest(Stock(t) for t in universe)
+        index.save("holders.npz")
+        print(index.holdings("Vanguard Group, Inc. (The)"))
+        print(index.overlap("Vanguard Group, Inc. (The)", "Blackrock Inc."))
+    """
+
+    def __init__(self):
+        self.__holders = []
+        self.__holder_ids = dict()
+        self.__tickers = []
+        self.__ticker_ids = dict()
+        self.__holder = np.zeros(0, dtype=np.int32)
+        self.__stock = np.zeros(0, dtype=np.int32)
+        self.__kind = np.zeros(0, dtype=np.int8)
+        self.__shares = np.zeros(0, dtype=np.float64)
+        self.__value = np.zeros(0, dtype=np.float64)
+        # key: (stock, kind), value: the arrays replacing its positions, None to drop them
+        self.__pending = dict()
+        self.__by_holder = None
+        self.__by_stock = None
+
+    def __len__(self):
+        self.__merge()
+        return len(self.__holder)
+
+    def __merge(self):
+        if not self.__pending:
+            return
+        columns = (self.__holder, self.__stock, self.__kind, self.__shares, self.__value)
+        replaced = np.array([2 * stock + kind for stock, kind in self.__pending], dtype=np.int64)
+        keep = ~np.isin(2 * self.__stock.astype(np.int64) + self.__kind, replaced)
+        chunks = [[c[keep]] for c in columns]
+        for added in self.__pending.values():
+            if added is not None:
+                for chunk, c in zip(chunks, added):
+                    chunk.append(c)
+        self.__holder, self.__stock, self.__kind, self.__shares, self.__value = \
+            [np.concatenate(chunk).astype(c.dtype, copy=False) for chunk, c in zip(chunks, columns)]
+        self.__pending = dict()
+        self.__by_holder = None
+        self.__by_stock = None
+
+    @staticmethod
+    def __intern(names, ids, values):
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, v in enumerate(values):
+            code = ids.get(v)
+            if code is None:
+                code = ids[v] = len(names)
+                names.append(v)
+            codes[i] = code
+        return codes
+
+    def add(self, ticker_symbol: str, frame: pd.DataFrame,
+            statement: Statement = Statement.INSTITUTIONAL_HOLDERS):
+        """
+        Adds the holders of a stock, replacing those previously added for
+        the same stock and statement.
+
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol of the stock
+        frame : pandas.DataFrame
+            The holders, as returned by Stock.institutional_holders or
+            Stock.mutualfund_holders (columns Holder, Shares and optionally Value)
+        statement : Statement, optional
+            Statement.INSTITUTIONAL_HOLDERS or Statement.MUTUALFUND_HOLDERS
+            (default is institutional holders)
+
+        Raises
+        ------
+        ParsingError
+            If the frame has no Holder and Shares columns.
+        """
+        if statement not in _KINDS:
+            raise InputError("Invalid statement", "Needs to be INSTITUTIONAL_HOLDERS or MUTUALFUND_HOLDERS")
+        kind = _KINDS.index(statement)
+        if frame is not None and len(frame) and ("Holder" not in frame or "Shares" not in frame):
+            raise ParsingError(ticker_symbol, "Holders need Holder and Shares columns")
+        stock = self.__intern(self.__tickers, self.__ticker_ids, [ticker_symbol])[0]
+
+        added = None
+        if frame is not None and len(frame):
+            holders = self.__intern(self.__holders, self.__holder_ids, list(frame["Holder"]))
+            shares = pd.to_numeric(frame["Shares"], errors="coerce").to_numpy(dtype=np.float64)
+            value = pd.to_numeric(frame["Value"], errors="coerce").to_numpy(dtype=np.float64) \
+                if "Value" in frame else np.full(len(frame), np.nan)
+            added = (holders, np.full(len(frame), stock, dtype=np.int32), np.full(len(frame), kind, dtype=np.int8),
+                     shares, value)
+        # the previous holders of the stock are dropped when merging
+        self.__pending[(int(stock), kind)] = added
+
+    def ingest(self, stocks, statements=_KINDS):
+        """
+        Adds the holders of many Stock objects.
+
+        Parameters
+        ----------
+        stocks : iterable of Stock
+            The stocks; their memoized holders statements are used
+        statements : iterable of Statement, optional
+            The holders statements to ingest (default is both)
+        """
+        for stock in stocks:
+            for statement in statements:
+                self.add(stock.ticker_symbol, stock.fundamentals(statement), statement)
+
+    @staticmethod
+    def __csr(keys, size, secondary):
+        # rows grouped by key (sorted by secondary within a key) and the offsets of each key
+        order = np.lexsort((secondary, keys))
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=size), out=indptr[1:])
+        return order, indptr
+
+    def __holder_layout(self):
+        self.__merge()
+        if self.__by_holder is None:
+            self.__by_holder = self.__csr(self.__holder, len(self.__holders), self.__stock)
+        return self.__by_holder
+
+    def __stock_layout(self):
+        self.__merge()
+        if self.__by_stock is None:
+            self.__by_stock = self.__csr(self.__stock, len(self.__tickers), -self.__shares)
+        return self.__by_stock
+
+    def __positions(self, rows, name_column, names, ids):
+        return pd.DataFrame({name_column: [names[i] for i in ids[rows]],
+                             "Statement": [_KINDS[k].value for k in self.__kind[rows]],
+                             "Shares": self.__shares[rows], "Value": self.__value[rows]})
+
+    def __holder_rows(self, holder):
+        h = self.__holder_ids.get(holder)
+        if h is None:
+            raise InputError("Holder not in index", "Input Holder " + str(holder))
+        order, indptr = self.__holder_layout()
+        return order[indptr[h]:indptr[h + 1]]
+
+    def holders(self, ticker_symbol: str) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the holders of the stock, with columns Holder, Statement, Shares
+            and Value, largest position first.
+
+        Raises
+        ------
+        InputError
+            If the stock is not in the index.
+        """
+        s = self.__ticker_ids.get(ticker_symbol)
+        if s is None:
+            raise InputError("Ticker Symbol not in index", "Input Ticker " + str(ticker_symbol))
+        order, indptr = self.__stock_layout()
+        rows = order[indptr[s]:indptr[s + 1]]
+        return self.__positions(rows, "Holder", self.__holders, self.__holder)
+
+    def holdings(self, holder: str) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the positions of the holder across the stocks of the index, with
+            columns Ticker Symbol, Statement, Shares and Value, largest value
+            first.
+
+        Raises
+        ------
+        InputError
+            If the holder is not in the index.
+        """
+        rows = self.__holder_rows(holder)
+        rows = rows[np.argsort(-np.nan_to_num(self.__value[rows], nan=-np.inf), kind="stable")]
+        return self.__positions(rows, "Ticker Symbol", self.__tickers, self.__stock)
+
+    def overlap(self, holder: str, other: str) -> list:
+        """
+        Returns
+        -------
+        list[str]
+            the ticker symbols of the stocks held by both holders.
+        """
+        rows, other_rows = self.__holder_rows(holder), self.__holder_rows(other)
+        a = np.unique(self.__stock[rows])
+        b = np.unique(self.__stock[other_rows])
+        return [self.__tickers[s] for s in np.intersect1d(a, b, assume_unique=True)]
+
+    def overlap_matrix(self, holders=None) -> pd.DataFrame:
+        """
+        Returns the number of stocks held in common by each pair of holders.
+
+        Parameters
+        ----------
+        holders : list[str], optional
+            The holders to compare (default is all)
+
+        Returns
+        -------
+        pandas.DataFrame
+            a holders x holders matrix; the diagonal is the number of stocks
+            each holder holds.
+        """
+        holders = list(self.__holders) if holders is None else list(holders)
+        ids = []
+        for h in holders:
+            if h not in self.__holder_ids:
+                raise InputError("Holder not in index", "Input Holder " + str(h))
+            ids.append(self.__holder_ids[h])
+        order, indptr = self.__stock_layout()
+        lookup = np.full(len(self.__holders), -1, dtype=np.int64)
+        lookup[ids] = np.arange(len(ids))
+        common = np.zeros((len(ids), len(ids)), dtype=np.int64)
+        # every stock adds one to each pair of the holders it has, so only
+        # the positions are visited, never a holders x stocks matrix
+        for s in range(len(self.__tickers)):
+            held = np.unique(lookup[self.__holder[order[indptr[s]:indptr[s + 1]]]])
+            held = held[held >= 0]
+            if len(held):
+                common[np.ix_(held, held)] += 1
+        return pd.DataFrame(common, index=holders, columns=holders)
+
+    def concentration(self) -> pd.Series:
+        """
+        Returns the Herfindahl index of the positions of every holder: the
+        sum of the squared weights of its positions, by value (by shares
+        when values are not known). 1 is a single position.
+
+        Returns
+        -------
+        pandas.Series
+            the index of each holder.
+        """
+        order, indptr = self.__holder_layout()
+        size = np.where(np.isnan(self.__value), self.__shares, self.__value)[order]
+        size = np.nan_to_num(size)
+        holder = self.__holder[order]
+        total = np.bincount(holder, weights=size, minlength=len(self.__holders))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weights = size / total[holder]
+        hhi = np.bincount(holder, weights=weights * weights, minlength=len(self.__holders))
+        hhi[total == 0] = np.nan
+        return pd.Series(hhi, index=pd.Index(self.__holders, name="Holder"), name="Concentration")
+
+    def save(self, path: str):
+        """
+        Saves the index to a compressed numpy file.
+
+        Parameters
+        ----------
+        path : str
+            The file to write
+        """
+        self.__merge()
+        with open(path, "wb") as fh:
+            np.savez_compressed(fh, version=np.array(_FILE_VERSION),
+                                holders=np.array(self.__holders, dtype=str),
+                                tickers=np.array(self.__tickers, dtype=str),
+                                holder=self.__holder, stock=self.__stock, kind=self.__kind,
+                                shares=self.__shares, value=self.__value)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Loads an index saved with ``save``.
+
+        Parameters
+        ----------
+        path : str
+            The file to read
+
+        Returns
+        -------
+        HoldingsIndex
+            the index.
+
+        Raises
+        ------
+        InputError
+            If the file cannot be read.
+        ParsingError
+            If the file is not a saved HoldingsIndex.
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {k: data[k] for k in data.files}
+        except (OSError, ValueError) as e:
+            raise InputError(path, "Failed to read HoldingsIndex file. " + str(e))
+
+        if "version" not in columns or int(columns["version"]) != _FILE_VERSION:
+            raise ParsingError(path, "Not a HoldingsIndex file of version " + str(_FILE_VERSION))
+
+        index = cls()
+        index.__holders = columns["holders"].tolist()
+        index.__holder_ids = {h: i for i, h in enumerate(index.__holders)}
+        index.__tickers = columns["tickers"].tolist()
+        index.__ticker_ids = {t: i for i, t in enumerate(index.__tickers)}
+        index.__holder = columns["holder"].astype(np.int32)
+        index.__stock = columns["stock"].astype(np.int32)
+        index.__kind = columns["kind"].astype(np.int8)
+        index.__shares = columns["shares"].astype(np.float64)
+        index.__value = columns["value"].astype(np.float64)
+        return index
@@ -0,0 +1,449 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import time
+from array import array
+from collections import deque, namedtuple
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from .enumerations import *
+from .exceptions import *
+
+
+Lot = namedtuple('Lot', ['lot_id', 'ticker', 'qty', 'price', 'timestamp'])
+Lot.__doc__ = """
+Named Tuple Lot
+lot_id -> identifier of the lot, as returned by TransactionLedger.buy
+ticker -> ticker symbol of the security bought
+qty -> quantity of the lot which is still open
+price -> buying price per unit of the lot
+timestamp -> time of the purchase as a datetime
+"""
+
+_BUY = 0
+_SELL = 1
+
+
+class TransactionLedger():
+    """
+    An append-only ledger of buy and sell transactions with tax-lot matching.
+
+    Every buy opens a new lot. Every sell closes quantity from the open lots
+    of the same ticker, either FIFO, LIFO or from one specific lot, and
+    accumulates the realized profit/loss.
+
+    Open lots are kept in a double ended queue per ticker and a lot id index,
+    so matching a trade against the oldest, newest or a specific lot takes
+    amortized constant time no matter how long the history is. Every lot
+    keeps its remaining total cost, so closing a lot removes exactly what it
+    added to the cost basis. Fully closed lots are dropped from memory.
+
+    The transaction log is stored in compact typed arrays (about 40 bytes
+    per transaction) and keeps every transaction by default; with
+    ``max_transactions`` only the latest transactions are kept.
+
+    Methods
+    -------
+    buy(self, ticker, qty, price, timestamp, cost)
+        Records a purchase and opens a new lot.
+
+    sell(self, ticker, qty, price, timestamp, matching, lot_id)
+        Records a sale and closes quantity from the open lots.
+
+    position(self, ticker)
+        Returns the quantity currently held.
+
+    cost_basis(self, ticker)
+        Returns the total cost of the quantity currently held.
+
+    open_lots(self, ticker)
+        Returns the open lots of a ticker.
+
+    realized_pnl(self, ticker)
+        Returns the realized profit/loss.
+
+    unrealized_pnl(self, prices)
+        Returns the unrealized profit/loss at given prices.
+
+    drop(self, ticker)
+        Discards the open lots of a ticker without recording a sale.
+
+    transactions(self)
+        Returns the transaction log as pandas DataFrame.
+
+    Example usage:
+
+        ledger = TransactionLedger(LotMatching.FIFO)
+        lot = ledger.buy("AAPL", Decimal(10), Decimal(120))
+        ledger.buy("AAPL", Decimal(10), Decimal(140))
+        realized = ledger.sell("AAPL", Decimal(5), Decimal(150))
+        unrealized = ledger.unrealized_pnl({"AAPL": Decimal(150)})
+    """
+
+    def __init__(self, matching: LotMatching = LotMatching.FIFO, max_transactions: int = None):
+        """
+        Parameters
+        ----------
+        matching : LotMatching, optional
+            Default lot matching method for sales (default is FIFO)
+        max_transactions : int, optional
+            Number of latest transactions kept in the log; lots, positions
+            and profit/loss are not affected (default keeps all of them)
+        """
+        if not isinstance(matching, LotMatching):
+            raise ParsingError("Invalid matching type", "expected type 'LotMatching'")
+        if max_transactions is not None and max_transactions < 1:
+            raise InputError("Invalid max_transactions", "Needs to be >= 1")
+
+        self.__matching = matching
+        self.__max_transactions = max_transactions
+        self.__symbol_ids = dict()
+        self.__symbols = []
+
+        # append-only transaction log
+        self.__tx_symbol = array('i')
+        self.__tx_side = array('b')
+        self.__tx_qty = array('d')
+        self.__tx_price = array('d')
+        self.__tx_time = array('d')
+        self.__tx_lot = array('q')
+
+        # open lots: lot id -> [remaining qty, price, timestamp, ticker, remaining cost]
+        self.__lots = dict()
+        self.__open = dict()
+        self.__stale = dict()
+        self.__next_lot = 0
+
+        self.__position = dict()
+        self.__cost = dict()
+        self.__realized = dict()
+
+    def __len__(self):
+        return len(self.__tx_side) - self.__trimmed()
+
+    def buy(self, ticker: str, qty: Decimal, price: Decimal, timestamp: datetime = None,
+            cost: Decimal = None) -> int:
+        """
+        Records a purchase of a security, opening a new lot.
+
+        Parameters
+        ----------
+        ticker: str
+            The security as ticker symbol
+        qty: Decimal
+            Quantity bought, must be > 0
+        price: Decimal
+            Buying price per unit, must be >= 0
+        timestamp: datetime, optional
+            Time of the purchase (default is now)
+        cost: Decimal, optional
+            Total cost of the lot, when price is only the rounded cost per
+            unit (default is qty * price)
+
+        Returns
+        -------
+        int
+            the lot id of the new lot, usable for specific lot matching
+        """
+        self.__validate(ticker, qty, price)
+        if cost is None:
+            cost = qty * price
+        elif not isinstance(cost, Decimal):
+            raise ParsingError("Invalid cost type", "expected type 'Decimal'")
+        elif cost < Decimal(0):
+            raise InputError("Invalid cost", "Needs to be >= 0")
+        ts = self.__timestamp(timestamp)
+
+        lot_id = self.__next_lot
+        self.__next_lot += 1
+
+        self.__lots[lot_id] = [qty, price, ts, ticker, cost]
+        self.__open.setdefault(ticker, deque()).append(lot_id)
+        self.__stale.setdefault(ticker, 0)
+        self.__position[ticker] = self.__position.get(ticker, Decimal(0)) + qty
+        self.__cost[ticker] = self.__cost.get(ticker, Decimal(0)) + cost
+
+        self.__log(ticker, _BUY, qty, price, ts, lot_id)
+        return lot_id
+
+    def sell(self, ticker: str, qty: Decimal, price: Decimal, timestamp: datetime = None,
+             matching: LotMatching = None, lot_id: int = None) -> Decimal:
+        """
+        Records a sale of a security, closing quantity from its open lots.
+
+        Parameters
+        ----------
+        ticker: str
+            The security as ticker symbol
+        qty: Decimal
+            Quantity sold, must be > 0 and not more than the position
+        price: Decimal
+            Selling price per unit, must be >= 0
+        timestamp: datetime, optional
+            Time of the sale (default is now)
+        matching: LotMatching, optional
+            Lot matching method (default is the ledger's matching method)
+        lot_id: int, optional
+            Sell from this specific lot only, ignoring ``matching``
+
+        Returns
+        -------
+        Decimal
+            the realized profit/loss of this sale
+
+        Raises
+        ------
+        InputError
+            If the quantity exceeds the open position or the specific lot.
+        """
+        self.__validate(ticker, qty, price)
+        ts = self.__timestamp(timestamp)
+
+        if qty > self.__position.get(ticker, Decimal(0)):
+            raise InputError("Invalid qty", "Sell qty exceeds position of " + ticker)
+
+        if matching is None:
+            matching = self.__matching
+        elif not isinstance(matching, LotMatching):
+            raise ParsingError("Invalid matching type", "expected type 'LotMatching'")
+
+        cost = Decimal(0)
+
+        if lot_id is not None:
+            lot = self.__lots.get(lot_id)
+            if lot is None or lot[3] != ticker:
+                raise InputError("Lot not open", "Input lot " + str(lot_id))
+            if qty > lot[0]:
+                raise InputError("Invalid qty", "Sell qty exceeds lot " + str(lot_id))
+            cost = self.__close(lot, qty)
+            if lot[0] == 0:
+                # lazily removed from the queue when it reaches either end
+                del self.__lots[lot_id]
+                self.__stale[ticker] += 1
+                if self.__stale[ticker] * 2 > len(self.__open[ticker]):
+                    self.__compact(ticker)
+        else:
+            lots = self.__open[ticker]
+            remaining = qty
+            while remaining > 0:
+                open_id = lots[0] if matching == LotMatching.FIFO else lots[-1]
+                lot = self.__lots.get(open_id)
+                if lot is None:
+                    self.__pop(lots, matching)
+                    self.__stale[ticker] -= 1
+                    continue
+                closed = min(remaining, lot[0])
+                cost += self.__close(lot, closed)
+                remaining -= closed
+                if lot[0] == 0:
+                    del self.__lots[open_id]
+                    self.__pop(lots, matching)
+
+        realized = qty * price - cost
+        self.__position[ticker] -= qty
+        self.__cost[ticker] -= cost
+        self.__realized[ticker] = self.__realized.get(ticker, Decimal(0)) + realized
+
+        self.__log(ticker, _SELL, qty, price, ts, -1 if lot_id is None else lot_id)
+        return realized
+
+    def drop(self, ticker: str):
+        """
+        Discards the open lots of a security without recording a sale, e.g.
+        when the holding is removed by hand. Its realized profit/loss and
+        transactions are kept.
+
+        Parameters
+        ----------
+        ticker: str
+            The security as ticker symbol
+        """
+        for lot_id in self.__open.pop(ticker, ()):
+            self.__lots.pop(lot_id, None)
+        self.__stale.pop(ticker, None)
+        self.__position.pop(ticker, None)
+        self.__cost.pop(ticker, None)
+
+    def position(self, ticker: str) -> Decimal:
+        """
+        Returns
+        -------
+        Decimal
+            the quantity of the security currently held.
+        """
+        return self.__position.get(ticker, Decimal(0))
+
+    def cost_basis(self, ticker: str) -> Decimal:
+        """
+        Returns
+        -------
+        Decimal
+            the total buying cost of the quantity currently held.
+        """
+        return self.__cost.get(ticker, Decimal(0))
+
+    def tickers(self) -> list:
+        """
+        Returns
+        -------
+        list[str]
+            ticker symbols which have ever been traded in this ledger.
+        """
+        return list(self.__symbols)
+
+    def open_lots(self, ticker: str) -> list:
+        """
+        Returns
+        -------
+        list[Lot]
+            the open lots of the security in order of purchase.
+        """
+        ret = []
+        for lot_id in self.__open.get(ticker, ()):
+            lot = self.__lots.get(lot_id)
+            if lot is not None:
+                ret.append(Lot(lot_id=lot_id, ticker=ticker, qty=lot[0], price=lot[1],
+                               timestamp=datetime.fromtimestamp(lot[2])))
+        return ret
+
+    def realized_pnl(self, ticker: str = None) -> Decimal:
+        """
+        Parameters
+        ----------
+        ticker: str, optional
+            Restrict to one security (default is all securities)
+
+        Returns
+        -------
+        Decimal
+            the realized profit/loss of all the sales.
+        """
+        if ticker is not None:
+            return self.__realized.get(ticker, Decimal(0))
+        return sum(self.__realized.values(), Decimal(0))
+
+    def unrealized_pnl(self, prices: dict) -> Decimal:
+        """
+        Parameters
+        ----------
+        prices: dict
+            key: ticker, value: current price (Decimal) of the security
+
+        Returns
+        -------
+        Decimal
+            the unrealized profit/loss of the open lots valued at prices.
+
+        Raises
+        ------
+        InputError
+            If a price is missing for a security with an open position.
+        """
+        ret = Decimal(0)
+        for t, qty in self.__position.items():
+            if qty == 0:
+                continue
+            if t not in prices:
+                raise InputError("Missing price", "Input Ticker " + t)
+            ret += qty * prices[t] - self.__cost[t]
+        return ret
+
+    def transactions(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the transaction log with one row per buy or sell, only the
+            latest ``max_transactions`` if set.
+        """
+        start = self.__trimmed()
+        return pd.DataFrame({
+            "Ticker Symbol": pd.Categorical.from_codes(np.frombuffer(self.__tx_symbol, dtype=np.int32)[start:],
+                                                       categories=pd.Index(self.__symbols, dtype=object)),
+            "Side": pd.Categorical.from_codes(np.frombuffer(self.__tx_side, dtype=np.int8)[start:],
+                                              categories=["BUY", "SELL"]),
+            "Quantity": np.frombuffer(self.__tx_qty, dtype=np.float64)[start:],
+            "Price": np.frombuffer(self.__tx_price, dtype=np.float64)[start:],
+            "Timestamp": pd.to_datetime(np.frombuffer(self.__tx_time, dtype=np.float64)[start:], unit='s'),
+            "Lot": np.frombuffer(self.__tx_lot, dtype=np.int64)[start:],
+        })
+
+    def __validate(self, ticker, qty, price):
+        if not isinstance(ticker, str):
+            raise ParsingError("Invalid Ticker type", "expected type 'str'")
+        if not isinstance(qty, Decimal):
+            raise ParsingError("Invalid qty type", "expected type 'Decimal'")
+        if not isinstance(price, Decimal):
+            raise ParsingError("Invalid price type", "expected type 'Decimal'")
+        if qty <= Decimal(0):
+            raise InputError("Invalid qty", "Needs to be > 0")
+        if price < Decimal(0):
+            raise InputError("Invalid price", "Needs to be >= 0")
+
+    def __timestamp(self, timestamp):
+        if timestamp is None:
+            return time.time()
+        if not isinstance(timestamp, datetime):
+            raise ParsingError("Invalid timestamp type", "expected type 'datetime'")
+        return timestamp.timestamp()
+
+    def __trimmed(self):
+        # number of logged transactions older than the latest max_transactions
+        if self.__max_transactions is None:
+            return 0
+        return max(0, len(self.__tx_side) - self.__max_transactions)
+
+    def __close(self, lot, qty):
+        # closing the whole lot takes its exact remaining cost
+        cost = lot[4] if qty == lot[0] else qty * lot[1]
+        lot[0] -= qty
+        lot[4] -= cost
+        return cost
+
+    def __pop(self, lots, matching):
+        if matching == LotMatching.FIFO:
+            lots.popleft()
+        else:
+            lots.pop()
+
+    def __compact(self, ticker):
+        self.__open[ticker] = deque(i for i in self.__open[ticker] if i in self.__lots)
+        self.__stale[ticker] = 0
+
+    def __log(self, ticker, side, qty, price, ts, lot_id):
+        symbol_id = self.__symbol_ids.get(ticker)
+        if symbol_id is None:
+            symbol_id = self.__symbol_ids[ticker] = len(self.__symbols)
+            self.__symbols.append(ticker)
+
+        self.__tx_symbol.append(symbol_id)
+        self.__tx_side.append(side)
+        self.__tx_qty.append(float(qty))
+        self.__tx_price.append(float(price))
+        self.__tx_time.append(ts)
+        self.__tx_lot.append(lot_id)
+
+        # the arrays are trimmed only at twice the size, so trimming costs
+        # amortized O(1) per transaction
+        if self.__max_transactions is not None and len(self.__tx_side) >= 2 * self.__max_transactions:
+            excess = self.__trimmed()
+            for log in (self.__tx_symbol, self.__tx_side, self.__tx_qty, self.__tx_price,
+                        self.__tx_time, self.__tx_lot):
+                del log[:excess]
@@ -22,6 +22,7 @@
 
 import yfinance as yf
 import talib
+from .base import _ReadOnlySeries
 from .enumerations import *
 from .exceptions import *
 from datetime import date
@@ -99,6 +100,8 @@ class MutualFund():
             self.__quote_type = QuoteType(self.__security.info['quoteType'])
         else:
             raise SecurityTypeError(self.__ticker_symbol, "Ticker Symbol does not match Mutual Fund type")
+
+        self.__dividends = _ReadOnlySeries(lambda: self.__security.dividends)
             
         try:
             self.__ticker_symbol = self.__security.info['symbol']
@@ -352,6 +355,6 @@ class MutualFund():
       Returns
       -------
       Pandas.DataFrame
-          dataframe of mutual fund security dividends
+          dataframe of mutual fund security dividends, fetched on first use; the data is read-only
       """       
-      return self.__security.dividends
\ No newline at end of file
+      return self.__dividends.get()
\ No newline at end of file
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from googlesearch import search
+from .ratelimit import RateLimiter
+from .exceptions import *
+
+
+class NewsBackend(ABC):
+    """
+    A search engine returning links to news about a query. Subclasses
+    implement ``search``.
+    """
+
+    # host the backend sends its requests to, rate limited per host
+    host = None
+
+    @abstractmethod
+    def search(self, query: str, limit: int) -> list:
+        """
+        Returns
+        -------
+        list[str]
+            up to limit links related to the query.
+        """
+
+
+class GoogleNewsBackend(NewsBackend):
+    """
+    Searches Google, as ``Stock.related_news`` always did.
+    """
+
+    def __init__(self, tld: str = "com", pause: float = 2):
+        """
+        Parameters
+        ----------
+        tld : str, optional
+            Top level domain of the Google site (default is "com")
+        pause : float, optional
+            Seconds between the result pages of one search (default is 2)
+        """
+        self.__tld = tld
+        self.__pause = pause
+        self.host = "www.google." + tld
+
+    def search(self, query: str, limit: int) -> list:
+        return list(search(query, tld=self.__tld, num=limit, stop=limit, pause=self.__pause))
+
+
+class StaticNewsBackend(NewsBackend):
+    """
+    A local stand-in backend returning fixed links, e.g. for tests.
+    """
+
+    def __init__(self, results: dict, delay: float = 0, host: str = "localhost"):
+        """
+        Parameters
+        ----------
+        results : dict
+            key: query, value: list of links
+        delay : float, optional
+            Seconds each search takes (default is 0)
+        host : str, optional
+            The host reported for rate limiting (default is "localhost")
+        """
+        self.__results = results
+        self.__delay = delay
+        self.host = host
+        self.searches = 0
+
+    def search(self, query: str, limit: int) -> list:
+        self.searches += 1
+        if self.__delay:
+            time.sleep(self.__delay)
+        return list(self.__results.get(query, []))[:limit]
+
+
+class NewsFetcher():
+    """
+    Fetches links to news about many tickers concurrently.
+
+    Searches run on a bounded thread pool, each within the request budget
+    of the backend's host (one RateLimiter per host). Results are cached per
+    ticker for ``ttl`` seconds, so repeated sweeps over the same tickers
+    don't search again; failed and empty searches are not cached, so they
+    are retried on the next call. Links found for several tickers are only reported
+    once, for the first of them.
+
+    Methods
+    -------
+    related(self, ticker_symbol, limit)
+        Returns the links related to a ticker.
+
+    fetch(self, ticker_symbols, limit, deduplicate)
+        Returns the links related to many tickers.
+
+    failed(self)
+        Returns the errors of the tickers which failed in the last fetch.
+
+    clear(self)
+        Drops all the cached results.
+
+    Example usage:
+
+        fetcher = NewsFetcher(max_workers=8, ttl=3600)
+        news = fetcher.fetch(["AAPL", "MSFT", "GOOG"])
+        print(news["AAPL"])
+    """
+
+    def __init__(self, backend: NewsBackend = None, max_workers: int = 8, ttl: float = 3600,
+                 requests_per_second: float = 0.5):
+        """
+        Parameters
+        ----------
+        backend : NewsBackend, optional
+            The search engine (default is Google)
+        max_workers : int, optional
+            Number of searches run at once (default is 8)
+        ttl : float, optional
+            Seconds results of a ticker are reused (default is 3600)
+        requests_per_second : float, optional
+            Request budget per host (default is 0.5)
+        """
+        if max_workers < 1:
+            raise InputError("Invalid max_workers", "Needs to be >= 1")
+        self.__backend = GoogleNewsBackend() if backend is None else backend
+        self.__max_workers = max_workers
+        self.__ttl = ttl
+        self.__rate = requests_per_second
+        self.__limiters = dict()
+        self.__cache = dict()
+        self.__failed = dict()
+        self.__lock = threading.Lock()
+
+    @property
+    def failed(self):
+        """
+        Returns
+        -------
+        dict
+            key: ticker symbol, value: error, for the tickers whose search
+            failed in the last ``fetch``.
+        """
+        return dict(self.__failed)
+
+    def clear(self):
+        """
+        Drops all the cached results.
+        """
+        with self.__lock:
+            self.__cache.clear()
+
+    def __limiter(self, host):
+        with self.__lock:
+            limiter = self.__limiters.get(host)
+            if limiter is None:
+                limiter = self.__limiters[host] = RateLimiter(self.__rate, capacity=max(1.0, self.__rate))
+            return limiter
+
+    def __cached(self, ticker_symbol, limit):
+        with self.__lock:
+            cached = self.__cache.get(ticker_symbol)
+        if cached is not None and time.monotonic() - cached[0] <= self.__ttl and cached[1] >= limit:
+            return cached[2][:limit]
+        return None
+
+    def __search(self, ticker_symbol, limit):
+        links = self.__cached(ticker_symbol, limit)
+        if links is not None:
+            return links
+        self.__limiter(self.__backend.host).acquire()
+        links = self.__backend.search(ticker_symbol, limit)
+        if links:
+            # an empty result is often transient, search again next time
+            with self.__lock:
+                self.__cache[ticker_symbol] = (time.monotonic(), limit, links)
+        return links
+
+    def related(self, ticker_symbol: str, limit: int = 20) -> list:
+        """
+        Returns links to news related to a ticker.
+
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol
+        limit : int, optional
+            Maximum number of links (default is 20)
+
+        Returns
+        -------
+        list[str]
+            the links.
+        """
+        return list(self.__search(ticker_symbol, limit))
+
+    def fetch(self, ticker_symbols, limit: int = 20, deduplicate: bool = True) -> dict:
+        """
+        Returns links to news related to many tickers.
+
+        Parameters
+        ----------
+        ticker_symbols : iterable of str
+            The ticker symbols
+        limit : int, optional
+            Maximum number of links per ticker (default is 20)
+        deduplicate : bool, optional
+            Report a link found for several tickers only for the first of
+            them, in the order given (default is True)
+
+        Returns
+        -------
+        dict
+            key: ticker symbol, value: list of links; tickers whose search
+            failed have no links and are listed in ``failed``.
+        """
+        tickers = list(dict.fromkeys(ticker_symbols))
+        self.__failed = dict()
+        results = dict()
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            futures = [executor.submit(self.__search, t, limit) for t in tickers]
+            for t, future in zip(tickers, futures):
+                try:
+                    results[t] = list(future.result())
+                except Exception as e:
+                    self.__failed[t] = e
+                    results[t] = []
+        if deduplicate:
+            seen = set()
+            for t in tickers:
+                links = []
+                for link in results[t]:
+                    if link not in seen:
+                        seen.add(link)
+                        links.append(link)
+                results[t] = links
+        return results
@@ -0,0 +1,573 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from .exceptions import *
+
+
+_NEW_YORK = ZoneInfo("America/New_York")
+_YEAR_SECONDS = 365.0 * 24 * 60 * 60
+_SQRT_2PI = np.sqrt(2 * np.pi)
+_MIN_VOL, _MAX_VOL = 1e-4, 5.0
+
+CHAIN_COLUMNS = ("Contract", "Expiration", "Type", "Strike", "Bid", "Ask", "Last", "Volume", "Open Interest")
+GREEKS = ("delta", "gamma", "vega", "theta", "rho")
+
+
+def _erf(x):
+    # Abramowitz and Stegun 7.1.26, absolute error below 1.5e-7
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    y = 1.0 - ((((1.061405429 * t - 1.453152027) * t + 1.421413741) * t - 0.284496736) * t
+               + 0.254829592) * t * np.exp(-x * x)
+    return sign * y
+
+
+def _norm_cdf(x):
+    return 0.5 * (1.0 + _erf(x / np.sqrt(2.0)))
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def _d1_d2(spot, strike, years, rate, sigma, dividend_yield):
+    vol_time = sigma * np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * sigma * sigma) * years) / vol_time
+    return d1, d1 - vol_time
+
+
+def black_scholes(is_call, spot, strike, years, rate, sigma, dividend_yield=0.0) -> np.ndarray:
+    """
+    Prices European options with the Black-Scholes formula, element-wise
+    over arrays (or scalars) of contracts.
+
+    Parameters
+    ----------
+    is_call : array of bool
+        True for calls, False for puts
+    spot, strike : array of float
+        Price of the underlying and strike
+    years : array of float
+        Time to expiration in years
+    rate : array of float
+        Continuously compounded risk free rate
+    sigma : array of float
+        Volatility
+    dividend_yield : array of float, optional
+        Continuous dividend yield (default is 0)
+
+    Returns
+    -------
+    numpy.ndarray
+        the option prices.
+    """
+    is_call, spot, strike, years, rate, sigma, dividend_yield = np.broadcast_arrays(
+        is_call, *(np.asarray(a, dtype=np.float64) for a in (spot, strike, years, rate, sigma, dividend_yield)))
+    d1, d2 = _d1_d2(spot, strike, years, rate, sigma, dividend_yield)
+    forward = spot * np.exp(-dividend_yield * years)
+    discounted = strike * np.exp(-rate * years)
+    call = forward * _norm_cdf(d1) - discounted * _norm_cdf(d2)
+    put = discounted * _norm_cdf(-d2) - forward * _norm_cdf(-d1)
+    return np.where(is_call.astype(bool), call, put)
+
+
+def greeks(is_call, spot, strike, years, rate, sigma, dividend_yield=0.0) -> dict:
+    """
+    Computes the Black-Scholes Greeks element-wise over arrays of contracts.
+
+    Parameters are those of ``black_scholes``.
+
+    Returns
+    -------
+    dict
+        key: "delta", "gamma", "vega", "theta", "rho", value: numpy array.
+        Vega and rho are per unit of volatility and rate (divide by 100
+        for one point), theta is per year (divide by 365 for one day).
+    """
+    is_call, spot, strike, years, rate, sigma, dividend_yield = np.broadcast_arrays(
+        is_call, *(np.asarray(a, dtype=np.float64) for a in (spot, strike, years, rate, sigma, dividend_yield)))
+    is_call = is_call.astype(bool)
+    sqrt_years = np.sqrt(years)
+    d1, d2 = _d1_d2(spot, strike, years, rate, sigma, dividend_yield)
+    carry = np.exp(-dividend_yield * years)
+    discount = np.exp(-rate * years)
+    pdf_d1 = _norm_pdf(d1)
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_d1 = _norm_cdf(sign * d1)
+    cdf_d2 = _norm_cdf(sign * d2)
+
+    return {"delta": sign * carry * cdf_d1,
+            "gamma": carry * pdf_d1 / (spot * sigma * sqrt_years),
+            "vega": spot * carry * pdf_d1 * sqrt_years,
+            "theta": (-spot * carry * pdf_d1 * sigma / (2 * sqrt_years)
+                      - sign * rate * strike * discount * cdf_d2
+                      + sign * dividend_yield * spot * carry * cdf_d1),
+            "rho": sign * strike * years * discount * cdf_d2}
+
+
+def implied_volatility(price, is_call, spot, strike, years, rate, dividend_yield=0.0,
+                       tol: float = 1e-8, max_iter: int = 100) -> np.ndarray:
+    """
+    Solves the Black-Scholes implied volatility of many contracts at once.
+
+    Every contract keeps a bracket of volatilities known to contain the
+    solution. Newton steps are taken for all contracts together; a contract
+    whose step leaves its bracket (or whose vega vanishes) bisects instead,
+    so the iteration converges like Newton near the solution and never
+    diverges far out of the money.
+
+    Parameters
+    ----------
+    price : array of float
+        The option prices
+    is_call, spot, strike, years, rate, dividend_yield
+        See ``black_scholes``
+    tol : float, optional
+        Price tolerance (default is 1e-8)
+    max_iter : int, optional
+        Maximum number of iterations (default is 100)
+
+    Returns
+    -------
+    numpy.ndarray
+        the implied volatilities, NaN where the price is outside the
+        no-arbitrage bounds or missing.
+    """
+    price, is_call, spot, strike, years, rate, dividend_yield = np.broadcast_arrays(
+        np.asarray(price, dtype=np.float64), is_call,
+        *(np.asarray(a, dtype=np.float64) for a in (spot, strike, years, rate, dividend_yield)))
+    shape = price.shape
+    price, spot, strike, years, rate, dividend_yield = (np.ravel(a) for a in (price, spot, strike, years, rate,
+                                                                              dividend_yield))
+    is_call = np.ravel(is_call).astype(bool)
+    forward = spot * np.exp(-dividend_yield * years)
+    discounted = strike * np.exp(-rate * years)
+    lower = np.where(is_call, np.maximum(forward - discounted, 0), np.maximum(discounted - forward, 0))
+    upper = np.where(is_call, forward, discounted)
+    valid = np.isfinite(price) & (price > lower) & (price < upper) & (years > 0) & (strike > 0) & (spot > 0)
+
+    # Brenner-Subrahmanyam guess, kept within the search range
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt(2 * np.pi / years) * price / spot
+    sigma = np.clip(np.nan_to_num(sigma, nan=0.2), 0.01, 2.0)
+    lo = np.full(sigma.shape, _MIN_VOL)
+    hi = np.full(sigma.shape, _MAX_VOL)
+
+    active = np.flatnonzero(valid)
+    for _ in range(max_iter):
+        if len(active) == 0:
+            break
+        args = (is_call[active], spot[active], strike[active], years[active], rate[active])
+        s = sigma[active]
+        diff = black_scholes(*args, s, dividend_yield[active]) - price[active]
+        done = np.abs(diff) < tol
+        # price increases with volatility: tighten the bracket
+        lo[active] = np.where(diff < 0, s, lo[active])
+        hi[active] = np.where(diff > 0, s, hi[active])
+        d1, _ = _d1_d2(spot[active], strike[active], years[active], rate[active], s, dividend_yield[active])
+        vega = forward[active] * _norm_pdf(d1) * np.sqrt(years[active])
+        with np.errstate(all="ignore"):
+            step = s - diff / vega
+        inside = np.isfinite(step) & (step > lo[active]) & (step < hi[active])
+        sigma[active] = np.where(done, s, np.where(inside, step, 0.5 * (lo[active] + hi[active])))
+        active = active[~done & (hi[active] - lo[active] > 1e-12)]
+
+    return np.where(valid, sigma, np.nan).reshape(shape)
+
+
+def _expiration_years(expirations, now):
+    """
+    Years from now to 16:00 New York time on each expiration date.
+    """
+    closes = np.array([datetime.combine(pd.Timestamp(str(e)).date(), dtime(16, 0), _NEW_YORK).timestamp()
+                       for e in expirations], dtype=np.float64)
+    return np.maximum(closes - now, 60.0) / _YEAR_SECONDS
+
+
+def _yahoo_expirations(ticker):
+    return list(ticker.options)
+
+
+def _yahoo_chain(ticker, expiration):
+    chain = ticker.option_chain(expiration)
+    return chain.calls, chain.puts
+
+
+class OptionChain():
+    """
+    The option chains of an underlying for all its expirations, with
+    implied volatilities and Greeks.
+
+    Chains of all expirations are fetched concurrently on a bounded thread
+    pool and cached per expiration for ``ttl`` seconds; expirations whose
+    cache expired are fetched again when the chain is next read. Contracts
+    are held column-wise in numpy arrays, so implied volatilities (a
+    vectorized Newton solver safeguarded by bisection) and delta, gamma,
+    vega, theta and rho are computed for many contracts at once. They are
+    cached per expiration, and only the expirations fetched again are
+    solved again.
+
+    Methods
+    -------
+    load(self, expirations)
+        Fetches the chains not cached and returns the expirations fetched.
+
+    to_dataframe(self)
+        Returns all contracts with implied volatility and Greeks.
+
+    chain(self, expiration)
+        Returns the contracts of one expiration.
+
+    implied_volatility(self)
+        Returns the implied volatility of all contracts.
+
+    greeks(self)
+        Returns the Greeks of all contracts.
+
+    Example usage:
+
+        chain = Stock("AAPL").option_chain(rate=0.05)
+        frame = chain.to_dataframe()
+        calls = frame[frame["Type"] == "call"]
+        print(calls[["Expiration", "Strike", "Implied Volatility", "Delta"]])
+    """
+
+    def __init__(self, ticker_symbol: str, spot: float, rate: float = 0.0, dividend_yield: float = 0.0,
+                 max_workers: int = 8, ttl: float = 15 * 60, expirations_fetcher=None, chain_fetcher=None,
+                 clock=time.time):
+        """
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol of the underlying
+        spot : float
+            The price of the underlying
+        rate : float, optional
+            Continuously compounded risk free rate (default is 0)
+        dividend_yield : float, optional
+            Continuous dividend yield of the underlying (default is 0)
+        max_workers : int, optional
+            Number of chains fetched at once (default is 8)
+        ttl : float, optional
+            Seconds a fetched chain is reused (default is 15 minutes)
+        expirations_fetcher : callable, optional
+            Function taking a ticker symbol and returning its expiration
+            dates ("YYYY-MM-DD"); by default from Yahoo Finance
+        chain_fetcher : callable, optional
+            Function taking (ticker symbol, expiration) and returning the
+            calls and puts DataFrames (with strike, bid, ask, lastPrice,
+            volume, openInterest and contractSymbol columns, as
+            yfinance); by default from Yahoo Finance
+        clock : callable, optional
+            Function returning the current time in epoch seconds
+        """
+        if max_workers < 1:
+            raise InputError("Invalid max_workers", "Needs to be >= 1")
+        if spot is None or not float(spot) > 0:
+            raise InputError("Invalid spot", "Needs to be > 0")
+        self.__ticker_symbol = ticker_symbol
+        self.__spot = float(spot)
+        self.__rate = float(rate)
+        self.__dividend_yield = float(dividend_yield)
+        self.__max_workers = max_workers
+        self.__ttl = ttl
+        if expirations_fetcher is None or chain_fetcher is None:
+            # one Ticker for all chains, so yfinance lists the expirations once
+            ticker = yf.Ticker(ticker_symbol)
+            if expirations_fetcher is None:
+                expirations_fetcher = lambda symbol: _yahoo_expirations(ticker)
+            if chain_fetcher is None:
+                chain_fetcher = lambda symbol, expiration: _yahoo_chain(ticker, expiration)
+        self.__expirations_fetcher = expirations_fetcher
+        self.__chain_fetcher = chain_fetcher
+        self.__clock = clock
+        self.__expirations = None
+        self.__chains = dict()
+        self.__failed = dict()
+        self.__columns = None
+        self.__bounds = []
+        self.__solved = dict()
+        self.__computed = None
+        self.__lock = threading.Lock()
+
+    @property
+    def ticker_symbol(self):
+        """
+        Returns
+        -------
+        str
+            the ticker symbol of the underlying.
+        """
+        return self.__ticker_symbol
+
+    @property
+    def spot(self):
+        """
+        Returns
+        -------
+        float
+            the price of the underlying used for pricing.
+        """
+        return self.__spot
+
+    @property
+    def rate(self):
+        """
+        Returns
+        -------
+        float
+            the risk free rate used for pricing.
+        """
+        return self.__rate
+
+    @property
+    def dividend_yield(self):
+        """
+        Returns
+        -------
+        float
+            the dividend yield used for pricing.
+        """
+        return self.__dividend_yield
+
+    @property
+    def expirations(self):
+        """
+        Returns
+        -------
+        list[str]
+            the expiration dates of the underlying.
+        """
+        if self.__expirations is None:
+            try:
+                self.__expirations = list(self.__expirations_fetcher(self.__ticker_symbol))
+            except Exception:
+                raise InputError(self.__ticker_symbol, "Failed to retrieve option expirations")
+        return list(self.__expirations)
+
+    @property
+    def failed(self):
+        """
+        Returns
+        -------
+        dict
+            key: expiration, value: error, for the chains which failed to
+            be fetched in the last ``load``.
+        """
+        return dict(self.__failed)
+
+    def set_spot(self, spot: float):
+        """
+        Updates the price of the underlying; implied volatilities and
+        Greeks are computed again when next read.
+        """
+        if spot is None or not float(spot) > 0:
+            raise InputError("Invalid spot", "Needs to be > 0")
+        self.__spot = float(spot)
+        self.__solved.clear()
+        self.__computed = None
+
+    def __fetch(self, expiration):
+        calls, puts = self.__chain_fetcher(self.__ticker_symbol, expiration)
+        frames = []
+        for kind, frame in (("call", calls), ("put", puts)):
+            if frame is None or len(frame) == 0:
+                continue
+            frames.append(pd.DataFrame({
+                "Contract": frame["contractSymbol"].astype(str).to_numpy() if "contractSymbol" in frame else "",
+                "Expiration": expiration, "Type": kind,
+                "Strike": frame["strike"].to_numpy(dtype=np.float64),
+                "Bid": frame["bid"].to_numpy(dtype=np.float64),
+                "Ask": frame["ask"].to_numpy(dtype=np.float64),
+                "Last": frame["lastPrice"].to_numpy(dtype=np.float64),
+                "Volume": pd.to_numeric(frame["volume"], errors="coerce").to_numpy(dtype=np.float64),
+                "Open Interest": pd.to_numeric(frame["openInterest"], errors="coerce").to_numpy(dtype=np.float64)}))
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def load(self, expirations=None, force: bool = False) -> list:
+        """
+        Fetches the chains of expirations which are not cached (or whose
+        cache expired), concurrently.
+
+        Parameters
+        ----------
+        expirations : iterable of str, optional
+            The expirations to load (default is all)
+        force : bool, optional
+            Fetch the expirations even if cached (default is False)
+
+        Returns
+        -------
+        list[str]
+            the expirations which were fetched; those which failed are
+            listed in ``failed``.
+        """
+        wanted = self.expirations if expirations is None else list(expirations)
+        now = self.__clock()
+        with self.__lock:
+            stale = [e for e in wanted if force or e not in self.__chains or now - self.__chains[e][0] > self.__ttl]
+        self.__failed = dict()
+        fetched = []
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(self.__max_workers, len(stale))) as executor:
+                futures = [executor.submit(self.__fetch, e) for e in stale]
+                for e, future in zip(stale, futures):
+                    try:
+                        frame = future.result()
+                    except Exception as ex:
+                        self.__failed[e] = ex
+                        continue
+                    with self.__lock:
+                        self.__chains[e] = (now, frame)
+                    fetched.append(e)
+        if fetched:
+            for e in fetched:
+                self.__solved.pop(e, None)
+            self.__columns = None
+            self.__computed = None
+        return fetched
+
+    def fetched_at(self, expiration: str) -> float:
+        """
+        Returns
+        -------
+        float
+            the epoch time the chain of an expiration was fetched, None if
+            it was not.
+        """
+        cached = self.__chains.get(expiration)
+        return None if cached is None else cached[0]
+
+    def __table(self):
+        if not self.__chains:
+            self.load()
+        else:
+            now = self.__clock()
+            with self.__lock:
+                stale = [e for e, (at, _) in self.__chains.items() if now - at > self.__ttl]
+            if stale:
+                self.load(stale)
+        if self.__columns is None:
+            loaded = [e for e in sorted(self.__chains) if self.__chains[e][1] is not None]
+            frames = [self.__chains[e][1] for e in loaded]
+            if frames:
+                table = pd.concat(frames, ignore_index=True)
+            else:
+                table = pd.DataFrame({c: [] for c in CHAIN_COLUMNS})
+            # the rows of each expiration, which are contiguous
+            stops = np.cumsum([len(f) for f in frames], dtype=np.int64)
+            self.__bounds = [(e, stop - len(f), stop) for e, f, stop in zip(loaded, frames, stops)]
+            bid, ask, last = (table[c].to_numpy(dtype=np.float64) for c in ("Bid", "Ask", "Last"))
+            quoted = (bid > 0) & (ask >= bid)
+            table["Mid"] = np.where(quoted, 0.5 * (bid + ask), np.where(last > 0, last, np.nan))
+            self.__columns = table
+        return self.__columns
+
+    def __solve(self, table, rows):
+        unique, inverse = np.unique(table["Expiration"].to_numpy(dtype=str)[rows], return_inverse=True)
+        years = _expiration_years(unique, self.__clock())[inverse]
+        is_call = table["Type"].to_numpy()[rows] == "call"
+        strike = table["Strike"].to_numpy(dtype=np.float64)[rows]
+        sigma = implied_volatility(table["Mid"].to_numpy(dtype=np.float64)[rows], is_call, self.__spot, strike,
+                                   years, self.__rate, self.__dividend_yield)
+        computed = {"Years": years, "Implied Volatility": sigma}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for name, values in greeks(is_call, self.__spot, strike, years, self.__rate, sigma,
+                                       self.__dividend_yield).items():
+                computed[name.capitalize()] = values
+        return computed
+
+    def __compute(self):
+        table = self.__table()
+        if self.__computed is None:
+            # solve the expirations not solved yet together, then split them up
+            missing = [(e, lo, hi) for e, lo, hi in self.__bounds if e not in self.__solved]
+            if missing:
+                rows = np.concatenate([np.arange(lo, hi) for _, lo, hi in missing])
+                solved = self.__solve(table, rows)
+                start = 0
+                for e, lo, hi in missing:
+                    self.__solved[e] = {name: values[start:start + hi - lo] for name, values in solved.items()}
+                    start += hi - lo
+            names = ("Years", "Implied Volatility") + tuple(g.capitalize() for g in GREEKS)
+            self.__computed = {name: np.concatenate([self.__solved[e][name] for e, _, _ in self.__bounds])
+                               if self.__bounds else np.zeros(0) for name in names}
+        return self.__computed
+
+    def implied_volatility(self) -> np.ndarray:
+        """
+        Returns
+        -------
+        numpy.ndarray
+            the implied volatility of every contract from its mid price (or
+            last price when not quoted), in ``to_dataframe`` order; NaN when
+            the price is outside the no-arbitrage bounds.
+        """
+        return self.__compute()["Implied Volatility"].copy()
+
+    def greeks(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            key: "delta", "gamma", "vega", "theta", "rho", value: numpy
+            array over all contracts in ``to_dataframe`` order, at their
+            implied volatility (see ``greeks``).
+        """
+        computed = self.__compute()
+        return {g: computed[g.capitalize()].copy() for g in GREEKS}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            one row per contract, ordered by expiration then calls and
+            puts, with the quote columns, Years (to expiration), Implied
+            Volatility, Delta, Gamma, Vega, Theta and Rho.
+        """
+        computed = self.__compute()
+        frame = self.__columns.copy()
+        for name, values in computed.items():
+            frame[name] = values
+        return frame
+
+    def chain(self, expiration: str) -> pd.DataFrame:
+        """
+        Returns the contracts of one expiration, as in ``to_dataframe``.
+
+        Raises
+        ------
+        InputError
+            If the expiration is not an expiration of the underlying.
+        """
+        if expiration not in self.expirations:
+            raise InputError("Invalid expiration", "Input Expiration " + str(expiration))
+        if expiration not in self.__chains:
+            self.load([expiration])
+        frame = self.to_dataframe()
+        return frame[frame["Expiration"] == expiration].reset_index(drop=True)
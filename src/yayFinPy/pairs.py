@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import numpy as np
+import pandas as pd
+from .history import aligned_closes
+from .enumerations import *
+from .exceptions import *
+
+
+# MacKinnon (2010) response surfaces of the critical values of the
+# Engle-Granger test for 2 variables with a constant:
+# significance -> (tau_inf, tau_1, tau_2), critical value = tau_inf + tau_1 / n + tau_2 / n^2
+_CRITICAL_VALUES = ((0.01, (-3.89644, -10.9519, -22.527)),
+                    (0.05, (-3.33613, -6.1101, -6.823)),
+                    (0.10, (-3.04445, -4.2412, -2.720)))
+
+RESULT_COLUMNS = ["Y", "X", "Hedge Ratio", "Intercept", "ADF Statistic", "Significance", "Half Life", "Z-Score"]
+
+# log prices shared with the worker processes, set by _attach
+_SHARED = None
+
+
+def critical_value(significance: float, observations: int) -> float:
+    """
+    Returns the critical value of the Engle-Granger ADF statistic of a
+    pair at a significance of 0.01, 0.05 or 0.10 for a number of
+    observations of the test regression.
+    """
+    for level, (tau_inf, tau_1, tau_2) in _CRITICAL_VALUES:
+        if np.isclose(level, significance):
+            return tau_inf + tau_1 / observations + tau_2 / observations ** 2
+    raise InputError("Invalid significance", "Needs to be 0.01, 0.05 or 0.10")
+
+
+def _engle_granger(y, x, lags):
+    """
+    Engle-Granger test of a batch of pairs: (pairs, dates) arrays of log
+    prices. Returns the hedge ratios, intercepts, ADF statistics of the
+    spreads, coefficients of the lagged spread, last spreads and spread
+    standard deviations, one per pair, and the number of observations of
+    the ADF regression.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # OLS of y on x, per pair
+        x_mean = x.mean(axis=1, keepdims=True)
+        y_mean = y.mean(axis=1, keepdims=True)
+        xc = x - x_mean
+        hedge = (xc * (y - y_mean)).sum(axis=1) / (xc * xc).sum(axis=1)
+        intercept = y_mean[:, 0] - hedge * x_mean[:, 0]
+        spread = y - intercept[:, None] - hedge[:, None] * x
+
+        # ADF regression without constant: d(e_t) on e_(t-1) and `lags` lagged d(e)
+        diff = np.diff(spread, axis=1)
+        n = diff.shape[1] - lags
+        regressors = np.empty((len(y), n, lags + 1))
+        regressors[:, :, 0] = spread[:, lags:-1]
+        for lag in range(1, lags + 1):
+            regressors[:, :, lag] = diff[:, lags - lag:diff.shape[1] - lag]
+        target = diff[:, lags:]
+        xtx = np.einsum('pti,ptj->pij', regressors, regressors)
+        xty = np.einsum('pti,pt->pi', regressors, target)
+        singular = np.linalg.cond(xtx) > 1e12
+        xtx[singular] = np.eye(lags + 1)
+        inverse = np.linalg.inv(xtx)
+        coef = np.einsum('pij,pj->pi', inverse, xty)
+        residual = target - np.einsum('pti,pi->pt', regressors, coef)
+        variance = (residual * residual).sum(axis=1) / (n - lags - 1)
+        statistic = coef[:, 0] / np.sqrt(variance * inverse[:, 0, 0])
+        statistic[singular] = np.nan
+        gamma = np.where(singular, np.nan, coef[:, 0])
+        return hedge, intercept, statistic, gamma, spread[:, -1], spread.std(axis=1, ddof=1), n
+
+
+def _scan_batch(prices, left, right, tickers, lags, max_significance):
+    """
+    Scans the pairs (left[k], right[k]) of rows of the log price matrix
+    and returns their results as a DataFrame.
+    """
+    hedge, intercept, statistic, gamma, last, std, n = _engle_granger(prices[left], prices[right], lags)
+    significance = np.full(len(left), np.nan)
+    for level, _ in reversed(_CRITICAL_VALUES):
+        significance[statistic < critical_value(level, n)] = level
+    with np.errstate(divide="ignore", invalid="ignore"):
+        half_life = np.where(gamma < 0, -np.log(2) / np.log1p(np.maximum(gamma, -1 + 1e-12)), np.inf)
+        half_life[np.isnan(gamma)] = np.nan
+        zscore = last / std
+    frame = pd.DataFrame({"Y": np.asarray(tickers, dtype=object)[left],
+                          "X": np.asarray(tickers, dtype=object)[right],
+                          "Hedge Ratio": hedge, "Intercept": intercept, "ADF Statistic": statistic,
+                          "Significance": significance, "Half Life": half_life, "Z-Score": zscore},
+                         columns=RESULT_COLUMNS)
+    if max_significance is not None:
+        frame = frame[frame["Significance"] <= max_significance]
+    return frame.reset_index(drop=True)
+
+
+def _attach(name, shape, tickers):
+    """
+    Initializer of the worker processes: maps the shared log prices.
+    """
+    global _SHARED
+    memory = shared_memory.SharedMemory(name=name)
+    _SHARED = (memory, np.ndarray(shape, dtype=np.float64, buffer=memory.buf), tickers)
+
+
+def _scan_shared_batch(left, right, lags, max_significance):
+    _, prices, tickers = _SHARED
+    return _scan_batch(prices, left, right, tickers, lags, max_significance)
+
+
+class PairScanner():
+    """
+    Scans all the pairs of a universe of securities for cointegration,
+    with the Engle-Granger two step test, and measures how far the spread
+    of each pair is from its mean.
+
+    For a pair (Y, X) the log price of Y is regressed on the log price of X
+    (the slope is the hedge ratio), and an augmented Dickey-Fuller test is
+    run on the residual spread; the ADF statistic is compared with the
+    MacKinnon critical values. The half life of mean reversion comes from
+    the same regression, and the z-score is the last spread in standard
+    deviations.
+
+    Batches are scanned in this process unless a process pool is asked for
+    with ``processes``. The aligned log prices are then placed once in
+    shared memory; worker processes map them and receive only batches of
+    pair indexes, so nothing per pair is pickled. Every batch is tested at
+    once with numpy, and results are streamed batch by batch as DataFrames.
+
+    Only the dates where every scanned security has a price are used, so
+    all pairs are tested on the same dates. Securities with a price on
+    less than ``min_coverage`` of the dates are left out and listed in
+    ``failed``.
+
+    Methods
+    -------
+    from_securities(securities, duration, interval, fill_limit, **kwargs)
+        Creates a scanner from the cached histories of securities.
+
+    scan(self, batch_size, lags, max_significance)
+        Yields the results of all pairs, one DataFrame per batch.
+
+    results(self, batch_size, lags, max_significance)
+        Returns the results of all pairs in one DataFrame.
+
+    Example usage:
+
+        scanner = PairScanner.from_securities(stocks, duration=Duration.YEAR_2)
+        for batch in scanner.scan(max_significance=0.05):
+            print(batch.sort_values("ADF Statistic").head())
+    """
+
+    def __init__(self, closes: pd.DataFrame, min_coverage: float = 0.9, processes: int = 0):
+        """
+        Parameters
+        ----------
+        closes : pandas.DataFrame
+            Aligned closing prices, one column per ticker symbol (see
+            ``history.aligned_closes``)
+        min_coverage : float, optional
+            Least fraction of the dates a security needs a price on to be
+            scanned (default is 0.9)
+        processes : int, optional
+            Number of processes scanning batches, None for the number of
+            CPUs (default is 0, scanning in this process)
+
+        Raises
+        ------
+        InputError
+            If less than 2 securities or 20 dates are left to scan.
+        """
+        if not 0 < min_coverage <= 1:
+            raise InputError("Invalid min_coverage", "Needs to be between 0 and 1")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prices = np.log(closes.to_numpy(dtype=np.float64))
+        present = np.isfinite(prices)
+        coverage = present.mean(axis=0) if len(prices) else np.zeros(prices.shape[1])
+        keep = coverage >= min_coverage
+        self.__failed = {str(t): "Price on %.0f%% of the dates" % (100 * c)
+                         for t, c, k in zip(closes.columns, coverage, keep) if not k}
+        rows = present[:, keep].all(axis=1)
+        self.__tickers = [str(t) for t, k in zip(closes.columns, keep) if k]
+        self.__dates = closes.index[rows]
+        # one contiguous row of log prices per security
+        self.__prices = np.ascontiguousarray(prices[rows][:, keep].T)
+        if len(self.__tickers) < 2 or len(self.__dates) < 20:
+            raise InputError("Invalid closes", "Needs at least 2 securities with prices on 20 common dates")
+        self.__processes = processes
+
+    @classmethod
+    def from_securities(cls, securities, duration: Duration = Duration.YEAR_1, interval: Interval = Interval.DAY_1,
+                        fill_limit: int = 5, **kwargs):
+        """
+        Creates a scanner from the histories of security objects (Stock,
+        ETF, Currency, ...), see ``history.aligned_closes``.
+        """
+        return cls(aligned_closes(securities, duration, interval, fill_limit), **kwargs)
+
+    @property
+    def tickers(self):
+        """
+        Returns
+        -------
+        list[str]
+            the ticker symbols scanned.
+        """
+        return list(self.__tickers)
+
+    @property
+    def dates(self):
+        """
+        Returns
+        -------
+        pandas.Index
+            the dates the pairs are tested on.
+        """
+        return self.__dates
+
+    @property
+    def failed(self):
+        """
+        Returns
+        -------
+        dict
+            key: ticker symbol, value: reason, for the securities left out
+            of the scan.
+        """
+        return dict(self.__failed)
+
+    @property
+    def pairs(self):
+        """
+        Returns
+        -------
+        int
+            the number of pairs scanned.
+        """
+        n = len(self.__tickers)
+        return n * (n - 1) // 2
+
+    def __batches(self, batch_size):
+        left, right = np.triu_indices(len(self.__tickers), 1)
+        for start in range(0, len(left), batch_size):
+            yield left[start:start + batch_size], right[start:start + batch_size]
+
+    def scan(self, batch_size: int = 2000, lags: int = 1, max_significance: float = None):
+        """
+        Tests every pair (Y, X) of securities, Y before X in ``tickers``.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            Number of pairs tested at once (default is 2000)
+        lags : int, optional
+            Number of lagged differences in the ADF regression (default is 1)
+        max_significance : float, optional
+            Yield only the pairs cointegrated at this significance, 0.01,
+            0.05 or 0.10 (default is all pairs)
+
+        Yields
+        ------
+        pandas.DataFrame
+            the results of a batch of pairs, with columns Y, X, Hedge Ratio,
+            Intercept, ADF Statistic, Significance (the smallest of 0.01,
+            0.05 and 0.10 at which the pair is cointegrated, NaN if none),
+            Half Life (in dates) and Z-Score (of the last spread).
+        """
+        if batch_size < 1 or lags < 0:
+            raise InputError("Invalid batch_size or lags", "Needs batch_size >= 1 and lags >= 0")
+        if len(self.__dates) - lags - 1 <= lags + 1:
+            raise InputError("Invalid lags", "Needs more dates than lags")
+        if max_significance is not None:
+            critical_value(max_significance, len(self.__dates))
+        return self.__scan(batch_size, lags, max_significance)
+
+    def __scan(self, batch_size, lags, max_significance):
+        processes = os.cpu_count() if self.__processes is None else self.__processes
+        if processes == 0 or self.pairs <= batch_size:
+            for left, right in self.__batches(batch_size):
+                yield _scan_batch(self.__prices, left, right, self.__tickers, lags, max_significance)
+            return
+
+        memory = shared_memory.SharedMemory(create=True, size=self.__prices.nbytes)
+        try:
+            np.ndarray(self.__prices.shape, dtype=np.float64, buffer=memory.buf)[:] = self.__prices
+            with ProcessPoolExecutor(max_workers=processes, initializer=_attach,
+                                     initargs=(memory.name, self.__prices.shape, self.__tickers)) as executor:
+                # a few batches in flight per process, results in order
+                pending = deque()
+                for left, right in self.__batches(batch_size):
+                    pending.append(executor.submit(_scan_shared_batch, left, right, lags, max_significance))
+                    if len(pending) >= 2 * processes:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def results(self, batch_size: int = 2000, lags: int = 1, max_significance: float = None) -> pd.DataFrame:
+        """
+        Returns the results of ``scan`` in one DataFrame, most cointegrated
+        pairs (lowest ADF statistic) first.
+        """
+        frames = list(self.scan(batch_size, lags, max_significance))
+        frame = pd.concat(frames, ignore_index=True)
+        return frame.sort_values("ADF Statistic", kind="stable").reset_index(drop=True)
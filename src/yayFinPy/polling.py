@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import heapq
+import math
+import time
+from collections import deque
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+import pandas as pd
+import yfinance as yf
+from .ratelimit import RateLimiter
+from .exceptions import *
+
+
+_NEW_YORK = ZoneInfo("America/New_York")
+
+# number of listener errors a PollingScheduler keeps
+_MAX_ERRORS = 1000
+
+# quote currencies of the Yahoo Finance cryptocurrency symbols ("BTC-USD");
+# other hyphenated symbols are share classes ("BRK-B")
+_CRYPTO_QUOTES = {"USD", "USDT", "USDC", "EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "INR", "KRW", "BTC", "ETH"}
+
+
+def _default_market_open(ticker: str, now: float) -> bool:
+    """
+    Rough trading hours by ticker symbol: cryptocurrencies ("BTC-USD") trade
+    all the time, currencies ("JPY=X") on weekdays, and everything else
+    on weekdays from 9:30 to 16:00 New York time.
+    """
+    base, _, quote = ticker.rpartition("-")
+    if base and quote in _CRYPTO_QUOTES:
+        return True
+    local = datetime.fromtimestamp(now, _NEW_YORK)
+    if local.weekday() >= 5:
+        return False
+    if ticker.endswith("=X"):
+        return True
+    return dtime(9, 30) <= local.time() < dtime(16, 0)
+
+
+def _yahoo_quotes(symbols: list) -> dict:
+    """
+    Fetches the intraday quote of many symbols in one batched request.
+    """
+    data = yf.download(symbols, period="1d", interval="1m", progress=False, threads=False,
+                       group_by="column")
+    quotes = dict()
+    if data is None or data.empty:
+        return quotes
+    for t in symbols:
+        try:
+            frame = pd.DataFrame({f: data[f][t] if isinstance(data.columns, pd.MultiIndex) else data[f]
+                                  for f in ("Open", "High", "Low", "Close", "Volume")}).dropna(subset=["Close"])
+        except KeyError:
+            continue
+        if frame.empty:
+            continue
+        quotes[t] = {"price": float(frame["Close"].iloc[-1]),
+                     "opening_price": float(frame["Open"].iloc[0]),
+                     "day_high": float(frame["High"].max()),
+                     "day_low": float(frame["Low"].min()),
+                     "volume": float(frame["Volume"].sum())}
+    return quotes
+
+
+class PollingScheduler():
+    """
+    Polls quotes for a watchlist of symbols in batched requests, adapting
+    how often each symbol is polled.
+
+    Symbols are kept in a priority queue ordered by their next due time. Due
+    symbols are grouped into batches, each batch costing one request of a
+    global request budget (a token bucket). After every poll the interval
+    of a symbol is adapted to its recent volatility: it is chosen so that
+    the expected price move between two polls is about ``target_move``,
+    within ``min_interval`` and ``max_interval``. Symbols whose market is
+    closed are polled every ``max_interval``.
+
+    Listeners are called with only the fields which changed since the
+    previous poll of a symbol. A listener which raises does not stop the
+    others nor the polling; its error is kept in ``errors``.
+
+    Methods
+    -------
+    add(self, symbols)
+        Adds symbols to the watchlist.
+
+    remove(self, symbols)
+        Removes symbols from the watchlist.
+
+    add_listener(self, listener)
+        Registers a function called with (ticker, changed fields).
+
+    interval(self, ticker)
+        Returns the current polling interval of a symbol.
+
+    failed(self)
+        Returns the symbols whose last poll failed, with the error.
+
+    errors(self)
+        Returns the latest errors raised by listeners.
+
+    run_once(self)
+        Polls one batch of due symbols if the budget allows it.
+
+    run(self, duration)
+        Polls until stopped or for a duration.
+
+    stop(self)
+        Stops run.
+
+    Example usage:
+
+        scheduler = PollingScheduler(watchlist, requests_per_minute=30)
+        scheduler.add_listener(lambda t, changed: print(t, changed))
+        scheduler.run(duration=3600)
+    """
+
+    def __init__(self, symbols=(), fetcher=None, batch_size: int = 100,
+                 min_interval: float = 5, max_interval: float = 300,
+                 requests_per_minute: float = 60, target_move: float = 0.001,
+                 market_open=None, clock=time.time, sleep=time.sleep):
+        """
+        Parameters
+        ----------
+        symbols : iterable of str, optional
+            The initial watchlist
+        fetcher : callable, optional
+            Function taking a list of symbols and returning a dict
+            key: ticker, value: dict of quote fields. By default the quotes
+            are downloaded from Yahoo Finance in one request per batch.
+        batch_size : int, optional
+            Maximum number of symbols per request (default is 100)
+        min_interval, max_interval : float, optional
+            Bounds of the polling interval of a symbol in seconds
+        requests_per_minute : float, optional
+            Global request budget (default is 60)
+        target_move : float, optional
+            Relative price move wanted between two polls (default is 0.1%)
+        market_open : callable, optional
+            Function taking (ticker, epoch seconds) and returning whether
+            the market of the symbol is open
+        clock : callable, optional
+            Function returning the current time in epoch seconds
+        sleep : callable, optional
+            Function sleeping for a number of seconds
+        """
+        if batch_size < 1:
+            raise InputError("Invalid batch_size", "Needs to be >= 1")
+        if not 0 < min_interval <= max_interval:
+            raise InputError("Invalid intervals", "Needs 0 < min_interval <= max_interval")
+
+        self.__fetcher = _yahoo_quotes if fetcher is None else fetcher
+        self.__batch_size = batch_size
+        self.__min_interval = float(min_interval)
+        self.__max_interval = float(max_interval)
+        self.__target_move = float(target_move)
+        self.__market_open = _default_market_open if market_open is None else market_open
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__limiter = RateLimiter(requests_per_minute / 60.0, capacity=max(1.0, requests_per_minute / 60.0),
+                                     clock=clock, sleep=sleep)
+
+        self.__queue = []
+        self.__seq = 0
+        self.__due = dict()
+        self.__interval = dict()
+        self.__variance = dict()
+        self.__last_poll = dict()
+        self.__last = dict()
+        self.__listeners = []
+        self.__failed = dict()
+        self.__errors = deque(maxlen=_MAX_ERRORS)
+        self.__running = False
+
+        self.add(symbols)
+
+    def add(self, symbols):
+        """
+        Adds symbols to the watchlist; they are due immediately.
+        """
+        now = self.__clock()
+        for t in symbols:
+            if t not in self.__due:
+                self.__interval[t] = self.__min_interval
+                self.__schedule(t, now)
+
+    def remove(self, symbols):
+        """
+        Removes symbols from the watchlist.
+        """
+        for t in symbols:
+            # queue entries of removed symbols are skipped lazily
+            self.__due.pop(t, None)
+            self.__interval.pop(t, None)
+            self.__variance.pop(t, None)
+            self.__last_poll.pop(t, None)
+            self.__last.pop(t, None)
+            self.__failed.pop(t, None)
+
+    def add_listener(self, listener):
+        """
+        Registers a function called as listener(ticker, changed) after each
+        poll, where changed is a dict of the quote fields whose value changed.
+        """
+        self.__listeners.append(listener)
+
+    def interval(self, ticker: str) -> float:
+        """
+        Returns
+        -------
+        float
+            the current polling interval of the symbol in seconds.
+        """
+        if ticker not in self.__interval:
+            raise InputError("Ticker Symbol not in watchlist", "Input Ticker " + str(ticker))
+        return self.__interval[ticker]
+
+    @property
+    def failed(self):
+        """
+        Returns
+        -------
+        dict
+            key: ticker, value: error, for the symbols whose last poll
+            failed (the request raised or returned no quote for them).
+        """
+        return dict(self.__failed)
+
+    @property
+    def errors(self):
+        """
+        Returns
+        -------
+        list
+            (ticker, changed, exception) of the last 1000 listener calls
+            which raised, oldest first.
+        """
+        return list(self.__errors)
+
+    def next_due(self) -> float:
+        """
+        Returns
+        -------
+        float
+            the epoch time at which the next symbol is due, None if the
+            watchlist is empty.
+        """
+        self.__drop_stale()
+        return self.__queue[0][0] if self.__queue else None
+
+    def run_once(self) -> int:
+        """
+        Polls one batch of due symbols, if the request budget allows it.
+
+        Returns
+        -------
+        int
+            the number of symbols polled.
+        """
+        now = self.__clock()
+        self.__drop_stale()
+        if not self.__queue or self.__queue[0][0] > now:
+            return 0
+        if not self.__limiter.try_acquire():
+            return 0
+
+        batch = []
+        while self.__queue and self.__queue[0][0] <= now and len(batch) < self.__batch_size:
+            due, _, t = heapq.heappop(self.__queue)
+            if self.__due.get(t) == due:
+                del self.__due[t]
+                batch.append(t)
+            self.__drop_stale()
+
+        try:
+            quotes = self.__fetcher(batch)
+            error = None
+        except Exception as e:
+            quotes = dict()
+            error = e
+
+        now = self.__clock()
+        notify = []
+        for t in batch:
+            quote = quotes.get(t)
+            if quote is not None:
+                self.__failed.pop(t, None)
+                changed = self.__update(t, quote, now)
+                if changed:
+                    notify.append((t, changed))
+            else:
+                self.__failed[t] = error if error is not None else YfinanceError(t, "No quote returned")
+            self.__schedule(t, now + self.__interval[t])
+        # every symbol is rescheduled before any listener runs
+        for t, changed in notify:
+            for listener in self.__listeners:
+                try:
+                    listener(t, changed)
+                except Exception as e:
+                    self.__errors.append((t, changed, e))
+        return len(batch)
+
+    def run(self, duration: float = None):
+        """
+        Polls due symbols until ``stop`` is called or for a duration.
+
+        Parameters
+        ----------
+        duration : float, optional
+            Number of seconds to run for (default is until stopped)
+        """
+        end = None if duration is None else self.__clock() + duration
+        self.__running = True
+        while self.__running and (end is None or self.__clock() < end):
+            if self.run_once():
+                continue
+            due = self.next_due()
+            now = self.__clock()
+            wait = self.__max_interval if due is None else max(due - now, self.__limiter.wait_time())
+            if end is not None:
+                wait = min(wait, end - now)
+            self.__sleep(max(wait, 0.001))
+        self.__running = False
+
+    def stop(self):
+        """
+        Stops ``run`` after the current batch.
+        """
+        self.__running = False
+
+    def __schedule(self, ticker, due):
+        self.__due[ticker] = due
+        self.__seq += 1
+        heapq.heappush(self.__queue, (due, self.__seq, ticker))
+
+    def __drop_stale(self):
+        while self.__queue and self.__due.get(self.__queue[0][2]) != self.__queue[0][0]:
+            heapq.heappop(self.__queue)
+
+    def __update(self, ticker, quote, now):
+        last = self.__last.get(ticker, {})
+        changed = {k: v for k, v in quote.items() if last.get(k) != v}
+        self.__last[ticker] = dict(quote)
+
+        old_price = last.get("price")
+        new_price = quote.get("price")
+        if old_price and new_price and ticker in self.__last_poll:
+            elapsed = max(now - self.__last_poll[ticker], 1e-6)
+            r = math.log(new_price / old_price)
+            # exponentially weighted variance of the return per second
+            sample = r * r / elapsed
+            previous = self.__variance.get(ticker)
+            self.__variance[ticker] = sample if previous is None else 0.8 * previous + 0.2 * sample
+        self.__last_poll[ticker] = now
+
+        if not self.__market_open(ticker, now):
+            self.__interval[ticker] = self.__max_interval
+        elif ticker in self.__variance:
+            variance = self.__variance[ticker]
+            wanted = self.__max_interval if variance <= 0 else self.__target_move ** 2 / variance
+            self.__interval[ticker] = min(self.__max_interval, max(self.__min_interval, wanted))
+        else:
+            self.__interval[ticker] = self.__min_interval
+        return changed
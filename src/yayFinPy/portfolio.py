@@ -26,13 +26,19 @@ from .stock import Stock
 from .mutual_fund import MutualFund
 from .treasury_bonds import TreasuryBond
 from .currency import Currency
+from .fx import FxRateCache
+from .ledger import TransactionLedger
+from .snapshot import SecuritySnapshot
 from .exceptions import *
 from .enumerations import *
 from decimal import *
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
+import math
+import time
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from numpy import NaN as nan
 from collections import namedtuple, OrderedDict
 
@@ -44,6 +50,33 @@ qty -> Quantity of the Security in portfolio
 buying_price -> buying price of the security in portfolio
 """
 
+_DEFAULT_FX_CACHE = FxRateCache()
+
+_FILE_VERSION = 1
+_SNAPSHOT_FIELDS = ('price', 'volume', 'opening_price', 'closing_price', 'day_high', 'day_low')
+
+
+def _create_security(ticker: str, quote_type: QuoteType):
+    if quote_type == QuoteType.EQUITY:
+        return Stock(ticker)
+    elif quote_type == QuoteType.ETF:
+        return ETF(ticker)
+    elif (quote_type == QuoteType.CRYPTOCURRENCY or quote_type == QuoteType.CURRENCY):
+        return Currency(ticker)
+    elif quote_type == QuoteType.INDEX:
+        return TreasuryBond(ticker)
+    elif quote_type == QuoteType.MUTUALFUND:
+        return MutualFund(ticker)
+    else:
+        return Misc(ticker)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
 
 class Portfolio():
     """
@@ -85,8 +118,22 @@ class Portfolio():
         Returns the current gain/loss (if negative) based on buying price
         and the current value of the Portfolio
 
-    value(self)
-        Returns the total value of the Portfolio
+    buy(self, ticker: str, qty: Decimal, price: Decimal, timestamp: datetime = None)
+        Records a purchase in the transaction ledger and adds to the holding
+
+    sell(self, ticker: str, qty: Decimal, price: Decimal, timestamp: datetime = None,
+         matching: LotMatching = None, lot_id: int = None)
+        Records a sale in the transaction ledger, matching it against tax lots
+
+    realized_returns(self)
+        Returns the realized gain/loss of the sales in the ledger
+
+    unrealized_returns(self)
+        Returns the unrealized gain/loss of the open lots in the ledger
+
+    value(self, reporting_currency: str = None)
+        Returns the total value of the Portfolio, optionally converted into
+        a single reporting currency
 
     get_portfolio_objects(self)
         Returns individual objects of the security on which more analysis can
@@ -96,12 +143,22 @@ class Portfolio():
         Returns Portfolio information as a dictionary in a specific format as
         was taken in input
 
+    save(self, path: str)
+        Saves the holdings and the last quotes of the Portfolio to a file
+
+    load(path: str)
+        Loads a Portfolio saved to a file without any network access
+
+    refresh(self, ticker: str = None)
+        Replaces the security objects by freshly fetched ones
+
 	Example usage:
 		
         portfolio = Portfolio({"BTC-USD": PortfolioInfo(qty=Decimal(1), buying_price=Decimal(50000)), "JPY=X": PortfolioInfo(qty=Decimal(1), buying_price=Decimal(10))})
 
         returns = portfolio.returns()
 		value = portfolio.value()
+		usd_value = portfolio.value(reporting_currency="USD")
 
         assets = portfolio.get_portfolio_objects()
 
@@ -109,11 +166,20 @@ class Portfolio():
 		portfolio.update_buying_price("BTC-USD", Decimal(47000))
 		p_info = portfolio.get_portfolio_info()
 
+		portfolio.buy("AAPL", Decimal(10), Decimal(120))
+		portfolio.sell("AAPL", Decimal(4), Decimal(150), matching=LotMatching.LIFO)
+		realized = portfolio.realized_returns()
+
         portfolio.remove_from_portfolio("JPY=X")
 
+		portfolio.save("book.npz")
+		portfolio = Portfolio.load("book.npz")
+		portfolio.refresh("BTC-USD")
+
     """
 
-    def __init__(self, tkr_qty_bp: dict = None):
+    def __init__(self, tkr_qty_bp: dict = None, fx_cache: FxRateCache = None,
+                 matching: LotMatching = LotMatching.FIFO):
         """
         The constructor of the Portfolio class for initializing a Portfolio object.
 
@@ -125,6 +191,12 @@ class Portfolio():
                 key: str -> ticker
                 value: (quantity: Decimal, buying price: Decimal) PortfolioInfo
                 named tuple
+		fx_cache :FxRateCache, optional
+			Cache of FX rates used for reporting currency conversion,
+			by default a cache shared by all portfolios
+		matching :LotMatching, optional
+			Default tax lot matching method of the transaction ledger,
+			by default FIFO
 		
 		Raises
 		------
@@ -136,6 +208,9 @@ class Portfolio():
         self.__portfolio = dict()
         self.__portfolio_objs = dict()
         self.__portfolio_bp = dict()
+        self.__portfolio_ccy = dict()
+        self.__fx_cache = _DEFAULT_FX_CACHE if fx_cache is None else fx_cache
+        self.__ledger = TransactionLedger(matching)
         
         if tkr_qty_bp:
             for t, ps in tkr_qty_bp.items():
@@ -265,22 +340,9 @@ class Portfolio():
         
         self.__portfolio_bp[ticker] = buying_price 
         self.__portfolio[ticker] = qty
+        self.__portfolio_ccy[ticker] = security.info.get('currency')
 
-        if quote_type == QuoteType.EQUITY:
-            security = Stock(ticker)
-        elif quote_type == QuoteType.ETF:
-            security = ETF(ticker)
-        elif (quote_type == QuoteType.CRYPTOCURRENCY or quote_type == QuoteType.CURRENCY):
-            security = Currency(ticker)
-        elif quote_type == QuoteType.INDEX:
-            security = TreasuryBond(ticker)
-        elif quote_type == QuoteType.MUTUALFUND:
-            security = MutualFund(ticker)
-        else:
-            security = Misc(ticker)
-        
-       
-        self.__portfolio_objs[ticker] = security
+        self.__portfolio_objs[ticker] = _create_security(ticker, quote_type)
         
 
     
@@ -305,6 +367,8 @@ class Portfolio():
             del self.__portfolio[ticker]
             del self.__portfolio_objs[ticker]
             del self.__portfolio_bp[ticker]
+            del self.__portfolio_ccy[ticker]
+            self.__ledger.drop(ticker)
 
 
     def update_qty(self, ticker: str, new_qty: Decimal):
@@ -380,25 +444,197 @@ class Portfolio():
 
         return rets
 
-    def value(self) -> Decimal:
+    @property
+    def ledger(self) -> TransactionLedger:
+        """
+        Returns
+        -------
+        TransactionLedger
+            the transaction ledger recording the buys and sells of the Portfolio.
+        """
+        return self.__ledger
+
+    def buy(self, ticker: str, qty: Decimal, price: Decimal, timestamp: datetime = None) -> int:
+        """
+        Records a purchase in the transaction ledger and adds the qty to the
+        holding, adding the security to the Portfolio if needed. The
+        buying price of the holding becomes the total cost of its open lots.
+
+        A holding added without buy (constructor or add_to_portfolio) first
+        gets an opening lot of its qty at its buying price.
+
+        Parameters
+        ----------
+        ticker: str
+            The security as ticker symbol
+        qty: Decimal
+            Quantity bought
+        price: Decimal
+            Buying price per unit
+        timestamp: datetime, optional
+            Time of the purchase (default is now)
+
+        Returns
+        -------
+        int
+            the lot id of the new tax lot
+
+        Raises
+        ------
+        InputError
+            If the holding has no buying price to open its lot with, or its
+            qty was updated without buy/sell since it was traded.
+        """
+        added = ticker not in self.__portfolio
+        if added:
+            self.add_to_portfolio(ticker, Decimal(0))
+
+        try:
+            self.__sync_ledger(ticker)
+            lot_id = self.__ledger.buy(ticker, qty, price, timestamp)
+        except Error:
+            if added:
+                self.remove_from_portfolio(ticker)
+            raise
+
+        self.update_qty(ticker, self.__portfolio[ticker] + qty)
+        self.__update_cost(ticker)
+        return lot_id
+
+    def sell(self, ticker: str, qty: Decimal, price: Decimal, timestamp: datetime = None,
+             matching: LotMatching = None, lot_id: int = None) -> Decimal:
+        """
+        Records a sale in the transaction ledger, matching it against the tax
+        lots of the security, and reduces the holding by qty. A holding
+        added without buy first gets an opening lot, as in ``buy``.
+
+        Parameters
+        ----------
+        ticker: str
+            The security as ticker symbol
+        qty: Decimal
+            Quantity sold
+        price: Decimal
+            Selling price per unit
+        timestamp: datetime, optional
+            Time of the sale (default is now)
+        matching: LotMatching, optional
+            Lot matching method (default is the Portfolio's matching method)
+        lot_id: int, optional
+            Sell from this specific lot only
+
+        Returns
+        -------
+        Decimal
+            the realized gain/loss of this sale
+
+        Raises
+        ------
+        InputError
+            If the qty exceeds the holding, or its opening lot cannot be
+            made (see ``buy``).
+        """
+        if ticker not in self.__portfolio:
+            raise InputError("Ticker Symbol not in Portfolio", "Input Ticker " + str(ticker))
+
+        self.__sync_ledger(ticker)
+        realized = self.__ledger.sell(ticker, qty, price, timestamp, matching, lot_id)
+        self.update_qty(ticker, self.__portfolio[ticker] - qty)
+        self.__update_cost(ticker)
+        return realized
+
+    def realized_returns(self) -> Decimal:
+        """
+        Get the realized returns of the sales recorded in the ledger.
+
+        Returns
+        -------
+        Decimal
+            the sum over all sales of: qty sold * (selling price - matched lot buying price)
+        """
+        return self.__ledger.realized_pnl()
+
+    def unrealized_returns(self) -> Decimal:
+        """
+        Get the unrealized returns of the open lots recorded in the ledger.
+
+        Returns
+        -------
+        Decimal
+            the sum over all open lots of: qty * (today's price - lot buying price)
+        """
+        prices = {t: self.__portfolio_objs[t].price for t in self.__ledger.tickers()
+                  if t in self.__portfolio_objs}
+        return self.__ledger.unrealized_pnl(prices)
+
+    def __sync_ledger(self, ticker):
+        """
+        Opens a lot in the ledger for a holding added without buy (through
+        the constructor or add_to_portfolio), at its buying price.
+        """
+        qty = self.__portfolio[ticker]
+        position = self.__ledger.position(ticker)
+        if qty == position:
+            return
+        if position != 0:
+            raise InputError("Holding not in ledger", "Quantity of " + ticker + " was updated without buy/sell")
+        buying_price = self.__portfolio_bp[ticker]
+        if buying_price is None:
+            raise InputError("Missing buying price", "Update the buying price of " + ticker + " before buy/sell")
+        # the total cost is kept exactly, the price per unit is rounded
+        self.__ledger.buy(ticker, qty, buying_price / qty, cost=buying_price)
+
+    def __update_cost(self, ticker):
+        # the buying price of a holding is its total cost, as in returns()
+        self.__portfolio_bp[ticker] = self.__ledger.cost_basis(ticker)
+
+    def value(self, reporting_currency: str = None) -> Decimal:
         """
         Get the value of the Portfolio.
+
+        Parameters
+        ----------
+        reporting_currency: str, optional
+            Currency code (e.g. "USD") to convert every holding into before
+            adding them up. By default prices are added as quoted. The
+            conversion is done in floating point, so the converted value
+            has about 15 significant digits.
         
         Returns
         -------
         Decimal
             the value of the Portfolio calculated as:
-            Today's price of the security * qty owned in Portfolio
+            Today's price of the security * qty owned in Portfolio * FX rate
+
+        Raises
+        ------
+        YfinanceError
+            If the currency of a holding or a needed FX rate is not available.
         """
         if not self.__portfolio:
             return Decimal(0)
 
-        val = Decimal(0)
+        if reporting_currency is None:
+            val = Decimal(0)
 
-        for t, o in self.__portfolio_objs.items():
-            val += (o.price * self.__portfolio[t])
-        
-        return val
+            for t, o in self.__portfolio_objs.items():
+                val += (o.price * self.__portfolio[t])
+            
+            return val
+
+        tickers = list(self.__portfolio_objs.keys())
+        for t in tickers:
+            if not self.__portfolio_ccy[t]:
+                raise YfinanceError(t, "Missing underlying Yfinance currency.")
+
+        rates = self.__fx_cache.rates(self.__portfolio_ccy.values(), reporting_currency)
+
+        prices = np.array([float(self.__portfolio_objs[t].price) for t in tickers])
+        qtys = np.array([float(self.__portfolio[t]) for t in tickers])
+        fx = np.array([rates[self.__portfolio_ccy[t]] for t in tickers])
+
+        # fsum rounds the sum once, so only the products carry float rounding
+        return Decimal(repr(math.fsum(prices * qtys * fx)))
                 
 
     def get_portfolio_objects(self) -> dict:
@@ -433,4 +669,116 @@ class Portfolio():
             for t, o in self.__portfolio.items():
                 ret_dict[t] = PortfolioInfo(qty=o, buying_price=self.__portfolio_bp[t])
             
-            return ret_dict
\ No newline at end of file
+            return ret_dict
+
+    def save(self, path: str):
+        """
+        Saves the holdings of the Portfolio and the last quote of each
+        security to a compressed columnar file (numpy ``.npz`` format).
+
+        The transaction ledger is not saved.
+
+        Parameters
+        ----------
+        path: str
+            The file path to write to
+        """
+        now = time.time()
+        tickers = list(self.__portfolio.keys())
+        objs = [self.__portfolio_objs[t] for t in tickers]
+
+        columns = dict()
+        columns["version"] = np.array(_FILE_VERSION)
+        columns["ticker"] = np.array(tickers, dtype=str)
+        columns["quote_type"] = np.array([o.quote_type.value for o in objs], dtype=str)
+        columns["qty"] = np.array([str(self.__portfolio[t]) for t in tickers], dtype=str)
+        columns["buying_price"] = np.array(["" if self.__portfolio_bp[t] is None else str(self.__portfolio_bp[t])
+                                            for t in tickers], dtype=str)
+        columns["currency"] = np.array([self.__portfolio_ccy[t] or "" for t in tickers], dtype=str)
+        columns["exchange"] = np.array([getattr(o, "exchange", None) or "" for o in objs], dtype=str)
+        columns["timestamp"] = np.array([o.timestamp.timestamp() if isinstance(o, SecuritySnapshot) else now
+                                         for o in objs], dtype=np.float64)
+        for f in _SNAPSHOT_FIELDS:
+            columns[f] = np.array([_to_float(getattr(o, f, None)) for o in objs], dtype=np.float64)
+
+        with open(path, "wb") as fh:
+            np.savez_compressed(fh, **columns)
+
+    @classmethod
+    def load(cls, path: str, fx_cache: FxRateCache = None,
+             matching: LotMatching = LotMatching.FIFO):
+        """
+        Loads a Portfolio saved with ``save``. No data is fetched: every
+        security is rehydrated as a SecuritySnapshot of its saved quote,
+        use ``refresh`` to fetch live security objects on demand.
+
+        Parameters
+        ----------
+        path: str
+            The file path to read from
+        fx_cache: FxRateCache, optional
+            As in the Portfolio constructor
+        matching: LotMatching, optional
+            As in the Portfolio constructor
+
+        Returns
+        -------
+        Portfolio
+            the loaded Portfolio
+
+        Raises
+        ------
+        InputError
+            If the file cannot be read.
+        ParsingError
+            If the file is not a saved Portfolio.
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {k: data[k] for k in data.files}
+        except (OSError, ValueError) as e:
+            raise InputError(path, "Failed to read Portfolio file. " + str(e))
+
+        if "version" not in columns or int(columns["version"]) != _FILE_VERSION:
+            raise ParsingError(path, "Not a Portfolio file of version " + str(_FILE_VERSION))
+
+        portfolio = cls(fx_cache=fx_cache, matching=matching)
+
+        quote_types = {v: QuoteType(v) for v in set(columns["quote_type"].tolist())}
+        timestamps = {v: datetime.fromtimestamp(v) for v in set(columns["timestamp"].tolist())}
+        fields = [columns[f].tolist() for f in _SNAPSHOT_FIELDS]
+
+        for i, (t, qt, qty, bp, ccy, exchange, ts) in enumerate(zip(
+                columns["ticker"].tolist(), columns["quote_type"].tolist(), columns["qty"].tolist(),
+                columns["buying_price"].tolist(), columns["currency"].tolist(),
+                columns["exchange"].tolist(), columns["timestamp"].tolist())):
+            portfolio.__portfolio[t] = Decimal(qty)
+            portfolio.__portfolio_bp[t] = Decimal(bp) if bp else None
+            portfolio.__portfolio_ccy[t] = ccy or None
+            portfolio.__portfolio_objs[t] = SecuritySnapshot(
+                t, quote_types[qt], fields[0][i], fields[1][i], fields[2][i], fields[3][i],
+                fields[4][i], fields[5][i], exchange, timestamps[ts])
+
+        return portfolio
+
+    def refresh(self, ticker: str = None):
+        """
+        Replaces security objects (e.g. snapshots of a loaded Portfolio) by
+        freshly fetched ones.
+
+        Parameters
+        ----------
+        ticker: str, optional
+            The security to refresh (default is every security)
+        """
+        if ticker is None:
+            tickers = list(self.__portfolio_objs.keys())
+        else:
+            if not isinstance(ticker, str):
+                raise ParsingError("Invalid Ticker type","expected type 'str'")
+            if ticker not in self.__portfolio:
+                raise InputError("Ticker Symbol not in Portfolio", "Input Ticker " + ticker)
+            tickers = [ticker]
+
+        for t in tickers:
+            self.__portfolio_objs[t] = _create_security(t, self.__portfolio_objs[t].quote_type)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import threading
+import time
+from .exceptions import *
+
+
+class RateLimiter():
+    """
+    A thread-safe token bucket limiting how many requests are made per unit
+    of time.
+
+    The bucket holds up to ``capacity`` tokens and is refilled at ``rate``
+    tokens per second; every request takes one token (or more).
+
+    Methods
+    -------
+    try_acquire(self, tokens)
+        Takes tokens if available, without waiting.
+
+    acquire(self, tokens)
+        Takes tokens, waiting until they are available.
+
+    wait_time(self, tokens)
+        Returns the number of seconds until tokens are available.
+
+    Example usage:
+
+        limiter = RateLimiter(rate=2000 / 3600, capacity=100)
+        limiter.acquire()
+        data = yf.download(...)
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Parameters
+        ----------
+        rate : float
+            Tokens added per second, must be > 0
+        capacity : float, optional
+            Maximum number of tokens, i.e. the largest burst (default is
+            one second worth of tokens, at least 1)
+        clock : callable, optional
+            Function returning the current time in seconds
+        sleep : callable, optional
+            Function sleeping for a number of seconds
+        """
+        if rate <= 0:
+            raise InputError("Invalid rate", "Needs to be > 0")
+        self.__rate = float(rate)
+        self.__capacity = float(capacity) if capacity is not None else max(1.0, self.__rate)
+        if self.__capacity <= 0:
+            raise InputError("Invalid capacity", "Needs to be > 0")
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__tokens = self.__capacity
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self):
+        """
+        Returns
+        -------
+        float
+            the number of tokens added per second.
+        """
+        return self.__rate
+
+    @property
+    def capacity(self):
+        """
+        Returns
+        -------
+        float
+            the maximum number of tokens.
+        """
+        return self.__capacity
+
+    def __refill(self):
+        now = self.__clock()
+        self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__rate)
+        self.__updated = now
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """
+        Returns
+        -------
+        float
+            the number of seconds until the tokens are available.
+        """
+        with self.__lock:
+            self.__refill()
+            return max(0.0, (tokens - self.__tokens) / self.__rate)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Takes tokens if they are available.
+
+        Returns
+        -------
+        bool
+            True if the tokens were taken, False otherwise.
+        """
+        with self.__lock:
+            self.__refill()
+            if self.__tokens >= tokens:
+                self.__tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1):
+        """
+        Takes tokens, sleeping until they are available.
+        """
+        if tokens > self.__capacity:
+            raise InputError("Invalid tokens", "Needs to be <= capacity")
+        while not self.try_acquire(tokens):
+            self.__sleep(self.wait_time(tokens))
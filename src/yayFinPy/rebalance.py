@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+from collections import namedtuple, OrderedDict
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from .exceptions import *
+
+
+RebalanceResult = namedtuple('RebalanceResult', ['trades', 'cash', 'tracking_error'])
+RebalanceResult.__doc__ = """
+Named Tuple RebalanceResult
+trades -> pandas DataFrame of the trades, one row per security traded
+cash -> cash left after the trades
+tracking_error -> root sum of squared differences between the weights after
+                  the trades and the target weights
+"""
+
+
+class Rebalancer():
+    """
+    Generates the trades moving a Portfolio from its current quantities to
+    target weights.
+
+    Target quantities are computed for all positions at once as arrays and
+    rounded to whole lots. Trades smaller than a minimum value are skipped,
+    and if the buys cost more than the available cash plus the sale
+    proceeds, every buy is scaled down to whole lots and the cash freed by
+    rounding is handed back to the buys which were cut the most.
+
+    Methods
+    -------
+    rebalance(self, target_weights, cash, lot_sizes, min_trade_value)
+        Returns the trades, remaining cash and tracking error to target.
+
+    apply(self, result)
+        Updates the Portfolio quantities with the trades of a result.
+
+    Example usage:
+
+        rebalancer = Rebalancer(portfolio)
+        result = rebalancer.rebalance({"AAPL": 0.6, "GOOG": 0.4}, cash=Decimal(1000),
+                                      min_trade_value=Decimal(100))
+        print(result.trades, result.tracking_error)
+        rebalancer.apply(result)
+    """
+
+    def __init__(self, portfolio):
+        """
+        Parameters
+        ----------
+        portfolio : Portfolio
+            The Portfolio to rebalance
+        """
+        self.__portfolio = portfolio
+
+    def rebalance(self, target_weights: dict, cash: Decimal = Decimal(0), lot_sizes=Decimal(1),
+                  min_trade_value: Decimal = Decimal(0)) -> RebalanceResult:
+        """
+        Computes the trades reaching the target weights.
+
+        Parameters
+        ----------
+        target_weights : dict
+            key: ticker, value: target fraction of the total value (holdings
+            plus cash). Holdings not listed are sold; weights may add up to
+            less than 1, the rest stays in cash.
+        cash : Decimal, optional
+            Cash available for buying (default is 0)
+        lot_sizes : Decimal or dict, optional
+            Trading lot size, for all securities or per ticker (default is 1,
+            whole shares)
+        min_trade_value : Decimal, optional
+            Trades worth less than this are skipped (default is 0)
+
+        Returns
+        -------
+        RebalanceResult
+            the trades, the remaining cash and the tracking error to target
+
+        Raises
+        ------
+        InputError
+            If a target is not in the Portfolio or the weights are invalid.
+        """
+        objs = self.__portfolio.get_portfolio_objects()
+        info = self.__portfolio.get_portfolio_info()
+
+        for t, w in target_weights.items():
+            if t not in info:
+                raise InputError("Ticker Symbol not in Portfolio", "Input Ticker " + str(t))
+            if float(w) < 0:
+                raise InputError("Invalid weight", "Needs to be >= 0")
+        if sum(float(w) for w in target_weights.values()) > 1 + 1e-9:
+            raise InputError("Invalid weights", "Needs to add up to <= 1")
+        if Decimal(cash) < 0:
+            raise InputError("Invalid cash", "Needs to be >= 0")
+
+        tickers = list(info.keys())
+        price = np.array([float(objs[t].price) for t in tickers], dtype=np.float64)
+        qty = np.array([float(info[t].qty) for t in tickers], dtype=np.float64)
+        target = np.array([float(target_weights.get(t, 0)) for t in tickers], dtype=np.float64)
+        if isinstance(lot_sizes, dict):
+            lot_decimals = [Decimal(lot_sizes.get(t, 1)) for t in tickers]
+        else:
+            lot_decimals = [Decimal(lot_sizes)] * len(tickers)
+        lot = np.array([float(l) for l in lot_decimals], dtype=np.float64)
+        if np.any(lot <= 0) or np.any(price <= 0):
+            raise InputError("Invalid lot size or price", "Needs to be > 0")
+
+        cash_before = Decimal(cash)
+        cash = float(cash)
+        total = float(np.dot(qty, price)) + cash
+
+        # whole lots, current and target
+        held_lots = np.floor(qty / lot + 1e-9)
+        target_lots = np.round(target * total / (price * lot))
+        delta = target_lots - held_lots
+        # never sell lots which are not held
+        delta = np.maximum(delta, -held_lots)
+        delta[np.abs(delta) * lot * price < float(min_trade_value)] = 0
+
+        buys = delta > 0
+        budget = cash - float(np.dot(np.minimum(delta, 0) * lot, price))
+        cost = float(np.dot(np.where(buys, delta, 0) * lot, price))
+        if cost > budget:
+            scale = max(budget, 0) / cost
+            wanted = delta * scale
+            delta[buys] = np.floor(wanted[buys])
+            # hand the budget left by rounding down back, one lot at a time,
+            # to the buys which were cut the most
+            left = budget - float(np.dot(np.where(buys, delta, 0) * lot, price))
+            order = np.argsort(-(wanted - delta) * buys, kind="stable")
+            order = order[buys[order]]
+            fits = np.cumsum(lot[order] * price[order]) <= left
+            delta[order[fits]] += 1
+            delta[buys & (delta * lot * price < float(min_trade_value))] = 0
+
+        trade_qty = delta * lot
+        weights_after = (qty + trade_qty) * price / total if total > 0 else np.zeros(len(tickers))
+        tracking_error = float(np.sqrt(np.sum((weights_after - target) ** 2)))
+
+        traded = np.nonzero(delta)[0]
+        trades = OrderedDict()
+        trades["Ticker Symbol"] = [tickers[i] for i in traded]
+        trades["Quantity"] = [Decimal(int(delta[i])) * lot_decimals[i] for i in traded]
+        trades["Price"] = [objs[tickers[i]].price for i in traded]
+        trades["Value"] = [q * p for q, p in zip(trades["Quantity"], trades["Price"])]
+
+        return RebalanceResult(trades=pd.DataFrame(trades), cash=cash_before - sum(trades["Value"], Decimal(0)),
+                               tracking_error=tracking_error)
+
+    def apply(self, result: RebalanceResult):
+        """
+        Updates the quantities of the Portfolio with the trades of a result.
+
+        Parameters
+        ----------
+        result : RebalanceResult
+            A result returned by ``rebalance`` for this Portfolio
+        """
+        info = self.__portfolio.get_portfolio_info()
+        for t, q in zip(result.trades["Ticker Symbol"], result.trades["Quantity"]):
+            self.__portfolio.update_qty(t, info[t].qty + q)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+import pandas as pd
+from .enumerations import *
+from .exceptions import *
+
+
+class Scenario():
+    """
+    A named stress scenario made of price shocks.
+
+    Relative shocks are fractions of the current price (-0.2 is a 20% drop)
+    and can be given per QuoteType, per industry sector and per ticker
+    symbol; the most specific one applies (symbol, then sector, then quote
+    type). Yield indices (QuoteType.INDEX holdings such as "^TNX", quoted in
+    percent) can in addition be shifted by a number of basis points.
+
+    Example usage:
+
+        crash = Scenario("crash",
+                         quote_type_shocks={QuoteType.EQUITY: -0.2, QuoteType.CRYPTOCURRENCY: -0.5},
+                         sector_shocks={"Technology": -0.3},
+                         yield_shift_bp=100)
+    """
+
+    def __init__(self, name: str, quote_type_shocks: dict = None, sector_shocks: dict = None,
+                 symbol_shocks: dict = None, yield_shift_bp: float = 0):
+        """
+        Parameters
+        ----------
+        name : str
+            The name of the scenario
+        quote_type_shocks : dict, optional
+            key: QuoteType, value: relative price shock
+        sector_shocks : dict, optional
+            key: industry sector (as in CompanyData.industry_sector), value: relative price shock
+        symbol_shocks : dict, optional
+            key: ticker symbol, value: relative price shock
+        yield_shift_bp : float, optional
+            Shift of the yield indices in basis points (default is 0)
+
+        Raises
+        ------
+        ParsingError
+            If a shock key or value has an invalid type.
+        """
+        if not isinstance(name, str):
+            raise ParsingError("Invalid name type", "expected type 'str'")
+
+        self.__name = name
+        self.__quote_type_shocks = self.__parse(quote_type_shocks, QuoteType)
+        self.__sector_shocks = self.__parse(sector_shocks, str)
+        self.__symbol_shocks = self.__parse(symbol_shocks, str)
+        try:
+            self.__yield_shift_bp = float(yield_shift_bp)
+        except (TypeError, ValueError):
+            raise ParsingError("Invalid yield_shift_bp type", "expected a number")
+
+    @staticmethod
+    def __parse(shocks, key_type):
+        ret = dict()
+        for k, v in (shocks or {}).items():
+            if not isinstance(k, key_type):
+                raise ParsingError("Invalid shock key type", "expected type '" + key_type.__name__ + "'")
+            try:
+                ret[k] = float(v)
+            except (TypeError, ValueError):
+                raise ParsingError("Invalid shock type", "expected a number for " + str(k))
+        return ret
+
+    @property
+    def name(self):
+        """
+        Returns
+        -------
+        str
+            the name of the scenario.
+        """
+        return self.__name
+
+    @property
+    def quote_type_shocks(self):
+        """
+        Returns
+        -------
+        dict
+            key: QuoteType, value: relative price shock.
+        """
+        return dict(self.__quote_type_shocks)
+
+    @property
+    def sector_shocks(self):
+        """
+        Returns
+        -------
+        dict
+            key: industry sector, value: relative price shock.
+        """
+        return dict(self.__sector_shocks)
+
+    @property
+    def symbol_shocks(self):
+        """
+        Returns
+        -------
+        dict
+            key: ticker symbol, value: relative price shock.
+        """
+        return dict(self.__symbol_shocks)
+
+    @property
+    def yield_shift_bp(self):
+        """
+        Returns
+        -------
+        float
+            the shift of the yield indices in basis points.
+        """
+        return self.__yield_shift_bp
+
+
+class ScenarioEngine():
+    """
+    Evaluates batches of stress scenarios against a Portfolio.
+
+    The positions of the Portfolio (price, qty, quote type, sector) are
+    captured once as arrays. A batch of scenarios is turned into a
+    scenario x position matrix of relative shocks and one of absolute price
+    shifts, and the P&L of every scenario is the matrix product:
+
+        P&L = relative_shocks @ (price * qty) + absolute_shifts @ qty
+
+    Scenarios are processed in chunks so memory stays bounded for large
+    batches against large books. P&L is expressed in the quote currency of
+    each holding, as in Portfolio.value().
+
+    Methods
+    -------
+    run(self, scenarios)
+        Returns the P&L of each scenario.
+
+    shock_matrices(self, scenarios)
+        Returns the relative shock and absolute shift matrices of scenarios.
+
+    Example usage:
+
+        engine = ScenarioEngine(portfolio)
+        pnl = engine.run([Scenario("equities -20%", quote_type_shocks={QuoteType.EQUITY: -0.2}),
+                          Scenario("rates +100bp", yield_shift_bp=100)])
+    """
+
+    def __init__(self, portfolio, chunk_size: int = 2000000):
+        """
+        Parameters
+        ----------
+        portfolio : Portfolio
+            The Portfolio to stress; its current prices and quantities are captured
+        chunk_size : int, optional
+            Maximum number of scenario x position cells computed at once
+        """
+        objs = portfolio.get_portfolio_objects()
+        info = portfolio.get_portfolio_info()
+
+        self.__chunk_size = max(1, int(chunk_size))
+        self.__tickers = list(info.keys())
+        self.__price = np.array([float(objs[t].price) for t in self.__tickers], dtype=np.float64)
+        self.__qty = np.array([float(info[t].qty) for t in self.__tickers], dtype=np.float64)
+        self.__position = {t: i for i, t in enumerate(self.__tickers)}
+
+        self.__by_quote_type = dict()
+        self.__by_sector = dict()
+        for i, t in enumerate(self.__tickers):
+            self.__by_quote_type.setdefault(objs[t].quote_type, []).append(i)
+            company_data = getattr(objs[t], "company_data", None)
+            if company_data is not None and company_data.industry_sector:
+                self.__by_sector.setdefault(company_data.industry_sector, []).append(i)
+
+        self.__by_quote_type = {k: np.array(v) for k, v in self.__by_quote_type.items()}
+        self.__by_sector = {k: np.array(v) for k, v in self.__by_sector.items()}
+        self.__yield_mask = np.zeros(len(self.__tickers), dtype=np.float64)
+        if QuoteType.INDEX in self.__by_quote_type:
+            self.__yield_mask[self.__by_quote_type[QuoteType.INDEX]] = 1.0
+
+    @property
+    def tickers(self):
+        """
+        Returns
+        -------
+        list[str]
+            the ticker symbols of the positions, in matrix column order.
+        """
+        return list(self.__tickers)
+
+    def shock_matrices(self, scenarios: list):
+        """
+        Builds the shock matrices of a batch of scenarios.
+
+        Parameters
+        ----------
+        scenarios : list[Scenario]
+            The scenarios to evaluate
+
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray)
+            the relative shocks and the absolute price shifts, both of shape
+            (number of scenarios, number of positions)
+        """
+        for s in scenarios:
+            if not isinstance(s, Scenario):
+                raise ParsingError("Invalid scenario type", "expected type 'Scenario'")
+
+        n = len(self.__tickers)
+        relative = np.zeros((len(scenarios), n), dtype=np.float64)
+        for row, s in enumerate(scenarios):
+            for quote_type, shock in s.quote_type_shocks.items():
+                idx = self.__by_quote_type.get(quote_type)
+                if idx is not None:
+                    relative[row, idx] = shock
+            for sector, shock in s.sector_shocks.items():
+                idx = self.__by_sector.get(sector)
+                if idx is not None:
+                    relative[row, idx] = shock
+            for symbol, shock in s.symbol_shocks.items():
+                i = self.__position.get(symbol)
+                if i is not None:
+                    relative[row, i] = shock
+
+        # yields are quoted in percent: 100bp moves the quote by 1.0
+        shifts = np.array([s.yield_shift_bp / 100.0 for s in scenarios], dtype=np.float64)
+        absolute = np.outer(shifts, self.__yield_mask)
+        return relative, absolute
+
+    def run(self, scenarios: list) -> pd.Series:
+        """
+        Evaluates the P&L of every scenario.
+
+        Parameters
+        ----------
+        scenarios : list[Scenario]
+            The scenarios to evaluate
+
+        Returns
+        -------
+        pandas.Series
+            the P&L of each scenario, indexed by scenario name
+        """
+        scenarios = list(scenarios)
+        exposure = self.__price * self.__qty
+        pnl = np.empty(len(scenarios), dtype=np.float64)
+
+        step = max(1, self.__chunk_size // max(1, len(self.__tickers)))
+        for start in range(0, len(scenarios), step):
+            relative, absolute = self.shock_matrices(scenarios[start:start + step])
+            pnl[start:start + step] = relative @ exposure + absolute @ self.__qty
+
+        return pd.Series(pnl, index=[s.name for s in scenarios], name="P&L")
@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+import pandas as pd
+from .columns import _ColumnStore
+from .exceptions import *
+
+
+NUMERIC_FIELDS = ("price", "volume", "market_cap", "pe_ratio", "peg_ratio")
+CATEGORICAL_FIELDS = ("industry_sector", "country")
+
+
+class Filter():
+    """
+    A condition on the fields of the screened securities. Filters are built
+    from ``Field`` comparisons and combined with ``&``, ``|`` and ``~``.
+    """
+
+    def __init__(self, evaluate):
+        self.__evaluate = evaluate
+
+    def mask(self, screener) -> np.ndarray:
+        """
+        Returns
+        -------
+        numpy.ndarray
+            the boolean mask of the rows of the screener matching the filter.
+        """
+        return self.__evaluate(screener)
+
+    def __and__(self, other):
+        return Filter(lambda s: self.mask(s) & other.mask(s))
+
+    def __or__(self, other):
+        return Filter(lambda s: self.mask(s) | other.mask(s))
+
+    def __invert__(self):
+        return Filter(lambda s: ~self.mask(s) & s._alive_mask())
+
+
+class Field():
+    """
+    A field of the screened securities, compared to build a Filter.
+
+    Numeric fields (price, volume, market_cap, pe_ratio, peg_ratio) support
+    ``<``, ``<=``, ``>``, ``>=``, ``==`` and ``between``; categorical fields
+    (industry_sector, country) support ``==``, ``!=`` and ``isin``. Missing
+    values never match.
+
+    Example usage:
+
+        cheap_tech = (Field("pe_ratio") < 15) & (Field("industry_sector") == "Technology")
+    """
+
+    def __init__(self, name: str):
+        """
+        Parameters
+        ----------
+        name : str
+            The name of the field
+
+        Raises
+        ------
+        InputError
+            If the field is not screened.
+        """
+        if name not in NUMERIC_FIELDS and name not in CATEGORICAL_FIELDS:
+            raise InputError("Invalid field", "Needs to be one of " + ", ".join(NUMERIC_FIELDS + CATEGORICAL_FIELDS))
+        self.__name = name
+
+    @property
+    def name(self):
+        """
+        Returns
+        -------
+        str
+            the name of the field.
+        """
+        return self.__name
+
+    def __range(self, low, high, low_inclusive=True, high_inclusive=True):
+        if self.__name not in NUMERIC_FIELDS:
+            raise InputError("Invalid comparison", self.__name + " is a categorical field")
+        return Filter(lambda s: s._range(self.__name, low, high, low_inclusive, high_inclusive))
+
+    def __lt__(self, value):
+        return self.__range(-np.inf, float(value), high_inclusive=False)
+
+    def __le__(self, value):
+        return self.__range(-np.inf, float(value))
+
+    def __gt__(self, value):
+        return self.__range(float(value), np.inf, low_inclusive=False)
+
+    def __ge__(self, value):
+        return self.__range(float(value), np.inf)
+
+    def between(self, low, high) -> Filter:
+        """
+        Returns
+        -------
+        Filter
+            the filter low <= field <= high.
+        """
+        return self.__range(float(low), float(high))
+
+    def isin(self, values) -> Filter:
+        """
+        Returns
+        -------
+        Filter
+            the filter matching any of the values.
+        """
+        values = list(values)
+        if self.__name in NUMERIC_FIELDS:
+            filters = [self == v for v in values]
+            return Filter(lambda s: np.logical_or.reduce([f.mask(s) for f in filters])
+                          if filters else np.zeros(s._size(), dtype=bool))
+        return Filter(lambda s: s._lookup(self.__name, values))
+
+    def __eq__(self, value):
+        if self.__name in NUMERIC_FIELDS:
+            return self.__range(float(value), float(value))
+        return Filter(lambda s: s._lookup(self.__name, [value]))
+
+    def __ne__(self, value):
+        if self.__name in NUMERIC_FIELDS:
+            return (self < value) | (self > value)
+        return Filter(lambda s: s._lookup(self.__name, [value], negate=True))
+
+    __hash__ = None
+
+
+class Screener():
+    """
+    Screens a universe of securities on their quote, valuation and company
+    fields.
+
+    Fields are kept column-wise in numpy arrays, one row per ticker. Numeric
+    fields have a sorted index (an argsort of the column) answering range
+    conditions with two binary searches. The index of a column is built on
+    the first query using it; rows updated after that are patched into it
+    at the next query with binary searches, unless so many changed that a
+    full argsort is cheaper. Categorical fields have a hash index from
+    value to rows, maintained as rows are updated. Updates only touch the
+    rows of the tickers updated.
+
+    Methods
+    -------
+    update(self, ticker_symbol, **fields)
+        Adds or updates the fields of a ticker.
+
+    update_securities(self, securities)
+        Adds or updates tickers from security objects or snapshots.
+
+    remove(self, ticker_symbol)
+        Removes a ticker.
+
+    screen(self, condition, sort_by, ascending, limit)
+        Returns the tickers matching a Filter.
+
+    to_dataframe(self)
+        Returns the screened fields as a DataFrame.
+
+    Example usage:
+
+        screener = Screener()
+        screener.update_securities(portfolio.get_portfolio_objects().values())
+        picks = screener.screen((Field("pe_ratio") < 15) & (Field("country") == "United States")
+                                & (Field("market_cap") > 1e10), sort_by="market_cap", ascending=False)
+    """
+
+    def __init__(self):
+        columns = {f: (np.float64, np.nan) for f in NUMERIC_FIELDS}
+        columns.update({f: (object, None) for f in CATEGORICAL_FIELDS})
+        # new rows are missing everywhere, so they never invalidate a sorted index
+        self.__store = _ColumnStore(columns)
+        self.__hash_index = {f: dict() for f in CATEGORICAL_FIELDS}
+        self.__sorted = dict()
+        self.__changed = {f: set() for f in NUMERIC_FIELDS}
+
+    def __len__(self):
+        return len(self.__store)
+
+    def __contains__(self, ticker_symbol):
+        return ticker_symbol in self.__store
+
+    def _size(self):
+        return self.__store.size
+
+    def _alive_mask(self):
+        return self.__store.alive.copy()
+
+    def update(self, ticker_symbol: str, **fields):
+        """
+        Adds a ticker or updates some of its fields.
+
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol
+        **fields
+            The new values of fields, e.g. pe_ratio=12.5, country="Canada";
+            None marks a value as missing
+
+        Raises
+        ------
+        InputError
+            If a field is not screened.
+        """
+        for name in fields:
+            if name not in NUMERIC_FIELDS and name not in CATEGORICAL_FIELDS:
+                raise InputError("Invalid field", "Needs to be one of " + ", ".join(NUMERIC_FIELDS + CATEGORICAL_FIELDS))
+        row = self.__store.row(ticker_symbol)
+        for name, value in fields.items():
+            if name in NUMERIC_FIELDS:
+                self.__set_number(name, row, np.nan if value is None else float(value))
+            else:
+                self.__set_category(name, row, value)
+
+    def __set_number(self, name, row, value):
+        column = self.__store.column(name)
+        if not (column[row] == value or (np.isnan(column[row]) and np.isnan(value))):
+            column[row] = value
+            if name in self.__sorted:
+                self.__changed[name].add(row)
+
+    def __set_category(self, name, row, value):
+        column = self.__store.column(name)
+        old = column[row]
+        if old == value:
+            return
+        index = self.__hash_index[name]
+        if old is not None:
+            rows = index[old]
+            rows.discard(row)
+            if not rows:
+                del index[old]
+        if value is not None:
+            index.setdefault(value, set()).add(row)
+        column[row] = value
+
+    def update_securities(self, securities):
+        """
+        Adds or updates tickers from security objects (Stock, ETF, ...) or
+        snapshots, reading the screened fields they have.
+
+        Parameters
+        ----------
+        securities : iterable
+            The security objects
+        """
+        for security in securities:
+            fields = dict()
+            for name in NUMERIC_FIELDS:
+                value = getattr(security, name, None)
+                fields[name] = None if value is None else float(value)
+            company_data = getattr(security, "company_data", None)
+            for name in CATEGORICAL_FIELDS:
+                fields[name] = getattr(company_data, name, None) if company_data is not None else None
+            self.update(security.ticker_symbol, **fields)
+
+    def remove(self, ticker_symbol: str):
+        """
+        Removes a ticker.
+
+        Raises
+        ------
+        InputError
+            If the ticker is not screened.
+        """
+        row = self.__store.get(ticker_symbol)
+        if row is None:
+            raise InputError("Ticker Symbol not in Screener", "Input Ticker " + str(ticker_symbol))
+        for name in CATEGORICAL_FIELDS:
+            self.__set_category(name, row, None)
+        for name in NUMERIC_FIELDS:
+            self.__set_number(name, row, np.nan)
+        self.__store.remove(ticker_symbol)
+
+    def __sorted_index(self, name):
+        index = self.__sorted.get(name)
+        changed = self.__changed[name]
+        column = self.__store.column(name)
+        if index is not None and changed:
+            # a patch costs one pass over the index and binary searches per
+            # changed row; past a few changed rows a new argsort is cheaper
+            if len(changed) <= max(64, len(index[0]) // 64):
+                index = self.__sorted[name] = self.__patch(index, column, changed)
+            else:
+                index = None
+            changed.clear()
+        if index is None:
+            # NaN (missing values and free rows) sorts last and is cut off
+            order = np.argsort(column, kind="stable")
+            count = int(np.count_nonzero(~np.isnan(column)))
+            order = order[:count]
+            index = self.__sorted[name] = (order, column[order])
+        return index
+
+    @staticmethod
+    def __patch(index, column, changed):
+        """
+        Moves the changed rows of a sorted index to the positions of their
+        new values, keeping ties in row order like the stable argsort.
+        """
+        order, values = index
+        rows = np.fromiter(changed, dtype=np.int64, count=len(changed))
+        keep = ~np.isin(order, rows)
+        order, values = order[keep], values[keep]
+        rows = rows[~np.isnan(column[rows])]
+        rows = rows[np.lexsort((rows, column[rows]))]
+        positions = np.empty(len(rows), dtype=np.int64)
+        for i, row in enumerate(rows):
+            value = column[row]
+            lo = np.searchsorted(values, value, side="left")
+            hi = np.searchsorted(values, value, side="right")
+            positions[i] = lo + np.searchsorted(order[lo:hi], row)
+        return np.insert(order, positions, rows), np.insert(values, positions, column[rows])
+
+    def _range(self, name, low, high, low_inclusive, high_inclusive):
+        order, values = self.__sorted_index(name)
+        lo = np.searchsorted(values, low, side="left" if low_inclusive else "right")
+        hi = np.searchsorted(values, high, side="right" if high_inclusive else "left")
+        mask = np.zeros(self.__store.size, dtype=bool)
+        mask[order[lo:hi]] = True
+        return mask
+
+    def _lookup(self, name, values, negate=False):
+        mask = np.zeros(self.__store.size, dtype=bool)
+        index = self.__hash_index[name]
+        for value in values:
+            rows = index.get(value)
+            if rows:
+                mask[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+        if negate:
+            known = np.zeros(self.__store.size, dtype=bool)
+            for rows in index.values():
+                known[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+            mask = known & ~mask
+        return mask
+
+    def screen(self, condition: Filter = None, sort_by: str = None, ascending: bool = True,
+               limit: int = None) -> list:
+        """
+        Returns the tickers matching a condition.
+
+        Parameters
+        ----------
+        condition : Filter, optional
+            The condition (default matches all tickers)
+        sort_by : str, optional
+            A numeric field to sort the tickers by; missing values come last
+            (default is no particular order)
+        ascending : bool, optional
+            Sort in ascending order (default is True)
+        limit : int, optional
+            Maximum number of tickers returned (default is all)
+
+        Returns
+        -------
+        list[str]
+            the ticker symbols matching.
+        """
+        if condition is not None and not isinstance(condition, Filter):
+            raise ParsingError("Invalid condition type", "expected type 'Filter'")
+        alive = self.__store.alive
+        mask = alive.copy() if condition is None else condition.mask(self) & alive
+        if sort_by is None:
+            rows = np.flatnonzero(mask)
+        else:
+            if sort_by not in NUMERIC_FIELDS:
+                raise InputError("Invalid sort_by", "Needs to be one of " + ", ".join(NUMERIC_FIELDS))
+            order, _ = self.__sorted_index(sort_by)
+            if not ascending:
+                order = order[::-1]
+            rows = order[mask[order]]
+            missing = mask.copy()
+            missing[order] = False
+            rows = np.concatenate([rows, np.flatnonzero(missing)])
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.__store.key(r) for r in rows]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the screened fields, one row per ticker symbol.
+        """
+        rows = np.flatnonzero(self.__store.alive)
+        columns = {f: self.__store.column(f)[rows] for f in NUMERIC_FIELDS}
+        columns.update({f: pd.Categorical(self.__store.column(f)[rows]) for f in CATEGORICAL_FIELDS})
+        return pd.DataFrame(columns, index=pd.Index([self.__store.key(r) for r in rows], name="Ticker Symbol"))
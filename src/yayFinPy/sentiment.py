@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .exceptions import *
+
+
+def sentifish_score(text: str) -> float:
+    """
+    Scores a text with sentifish, from 0 (most negative) to 1 (most positive).
+    """
+    from sentifish import Sentiment
+    return float(Sentiment(text).analyze())
+
+
+def _score_batch(scorer, texts):
+    return [float(scorer(t)) for t in texts]
+
+
+def _text_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class SentimentPipeline():
+    """
+    Scores the sentiment of texts in batches, remembering the scores.
+
+    Scores are memoized by a hash of the text in a bounded least recently
+    used cache, so a text seen before (e.g. a tweet about several tickers)
+    is not scored again, and texts repeated within a call are scored once.
+    The texts left to score are split into batches; large corpora can be
+    scored on a process pool (``processes``). The scorer can be any
+    picklable function taking a text and returning a number (by default
+    sentifish).
+
+    Methods
+    -------
+    score(self, texts)
+        Returns the score of every text.
+
+    mean(self, texts)
+        Returns the average score of texts.
+
+    cache_info(self)
+        Returns the hits, misses and size of the cache.
+
+    clear(self)
+        Drops all the cached scores.
+
+    Example usage:
+
+        pipeline = SentimentPipeline(cache_size=500000, processes=4)
+        scores = pipeline.score(tweets)
+        print(pipeline.mean(tweets), pipeline.cache_info())
+    """
+
+    def __init__(self, scorer=None, cache_size: int = 100000, batch_size: int = 1000,
+                 processes: int = 0, process_threshold: int = 20000):
+        """
+        Parameters
+        ----------
+        scorer : callable, optional
+            Function taking a text and returning its score; needs to be
+            picklable to be run on processes (default is sentifish)
+        cache_size : int, optional
+            Maximum number of scores remembered (default is 100000)
+        batch_size : int, optional
+            Number of texts scored per task (default is 1000)
+        processes : int, optional
+            Number of processes for large corpora, None for the number of
+            CPUs (default is 0, always score in this process)
+        process_threshold : int, optional
+            Number of texts left to score from which processes are used
+            (default is 20000)
+        """
+        if batch_size < 1:
+            raise InputError("Invalid batch_size", "Needs to be >= 1")
+        self.__scorer = sentifish_score if scorer is None else scorer
+        self.__cache_size = cache_size
+        self.__batch_size = batch_size
+        self.__processes = processes
+        self.__process_threshold = process_threshold
+        self.__cache = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def cache_info(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            the number of cache hits and misses so far, and the number of
+            scores cached.
+        """
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses, "size": len(self.__cache)}
+
+    def clear(self):
+        """
+        Drops all the cached scores.
+        """
+        with self.__lock:
+            self.__cache.clear()
+
+    def __score_missing(self, texts):
+        batches = [texts[i:i + self.__batch_size] for i in range(0, len(texts), self.__batch_size)]
+        if self.__processes != 0 and len(texts) >= self.__process_threshold and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=self.__processes) as executor:
+                results = list(executor.map(_score_batch, [self.__scorer] * len(batches), batches))
+        else:
+            results = [_score_batch(self.__scorer, b) for b in batches]
+        return [s for batch in results for s in batch]
+
+    def score(self, texts) -> np.ndarray:
+        """
+        Scores texts.
+
+        Parameters
+        ----------
+        texts : iterable of str
+            The texts
+
+        Returns
+        -------
+        numpy.ndarray
+            the score of every text, in order.
+        """
+        texts = list(texts)
+        keys = [_text_key(t) for t in texts]
+        scores = np.empty(len(texts), dtype=np.float64)
+
+        missing = dict()
+        with self.__lock:
+            for i, k in enumerate(keys):
+                score = self.__cache.get(k)
+                if score is None:
+                    missing.setdefault(k, []).append(i)
+                else:
+                    self.__cache.move_to_end(k)
+                    scores[i] = score
+            self.__hits += len(texts) - sum(len(v) for v in missing.values())
+            self.__misses += len(missing)
+
+        if missing:
+            todo = [texts[rows[0]] for rows in missing.values()]
+            computed = self.__score_missing(todo)
+            with self.__lock:
+                for (k, rows), score in zip(missing.items(), computed):
+                    scores[rows] = score
+                    self.__cache[k] = score
+                    self.__cache.move_to_end(k)
+                while len(self.__cache) > self.__cache_size:
+                    self.__cache.popitem(last=False)
+        return scores
+
+    def mean(self, texts) -> float:
+        """
+        Returns
+        -------
+        float
+            the average score of the texts.
+
+        Raises
+        ------
+        InputError
+            If there are no texts.
+        """
+        scores = self.score(texts)
+        if len(scores) == 0:
+            raise InputError("Invalid texts", "Needs at least one text")
+        return float(scores.mean())
@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import ast
+import numpy as np
+import pandas as pd
+from .history import aligned_history
+from .enumerations import *
+from .exceptions import *
+
+
+# names of the fields in rules -> columns of the histories
+FIELDS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+def _sma(values, window):
+    """
+    Simple moving average of every column, NaN until a window of values.
+    """
+    present = np.isfinite(values)
+    total = np.cumsum(np.where(present, values, 0.0), axis=0)
+    count = np.cumsum(present, axis=0)
+    total[window:] -= total[:-window].copy()
+    count[window:] -= count[:-window].copy()
+    with np.errstate(invalid="ignore"):
+        return np.where(count == window, total / window, np.nan)
+
+
+def _smooth(values, window, alpha):
+    """
+    Exponential smoothing of every column, seeded (like talib) with the
+    mean of the first window values of the column. Dates go one after the
+    other, all columns at once; a missing value holds the state.
+    """
+    out = np.full(values.shape, np.nan)
+    state = np.zeros(values.shape[1])
+    seen = np.zeros(values.shape[1], dtype=np.int64)
+    for t, row in enumerate(values):
+        present = np.isfinite(row)
+        seeding = present & (seen < window)
+        state[seeding] += row[seeding] / window
+        smoothing = present & (seen >= window)
+        state[smoothing] += alpha * (row[smoothing] - state[smoothing])
+        seen += present
+        out[t] = np.where(present & (seen >= window), state, np.nan)
+    return out
+
+
+def _ema(values, window):
+    return _smooth(values, window, 2.0 / (window + 1))
+
+
+def _rsi(values, window):
+    """
+    Relative strength index of every column, with Wilder's smoothing of the
+    gains and losses (as talib).
+    """
+    change = np.diff(values, axis=0)
+    gain = _smooth(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), window, 1.0 / window)
+    loss = _smooth(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), window, 1.0 / window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(gain + loss > 0, 100 * gain / (gain + loss), np.where(np.isnan(gain), np.nan, 0.0))
+    return np.vstack([np.full((1, values.shape[1]), np.nan), rsi])
+
+
+# name in rules -> (function of (values, window), field used when a rule gives only the window)
+INDICATORS = {
+    "SMA": (_sma, "close"),
+    "EMA": (_ema, "close"),
+    "RSI": (_rsi, "close"),
+}
+
+# name in rules -> indicator and the field it is computed on
+ALIASES = {
+    "avg_volume": ("SMA", "volume"),
+}
+
+_ARITHMETIC = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+_COMPARISONS = {ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=", ast.Eq: "==", ast.NotEq: "!="}
+_OPERATIONS = {
+    "+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide,
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal, "==": np.equal, "!=": np.not_equal,
+}
+
+
+class Rule():
+    """
+    A signal rule: a condition on fields (open, high, low, close, volume),
+    numbers and indicators, written as a Python expression, e.g.
+
+        close > SMA(200) and RSI(14) < 30 and volume > 2 * avg_volume(20)
+
+    Indicators are SMA, EMA and RSI of a window, computed on the close or
+    on the expression given first (``SMA(high - low, 10)``), and
+    avg_volume, the SMA of the volume. Arithmetic (+ - * /), comparisons
+    (possibly chained), and, or, not and parentheses are supported.
+
+    The rule is parsed once into a tree of nodes; identical subexpressions
+    (``avg_volume(20)`` and ``SMA(volume, 20)`` too) are the same node, so
+    a SignalScanner computes each once for all the rules it evaluates.
+
+    Example usage:
+
+        rule = Rule("close > SMA(200) and RSI(14) < 30")
+        print(rule.expression)
+    """
+
+    def __init__(self, expression: str):
+        """
+        Parameters
+        ----------
+        expression : str
+            The rule
+
+        Raises
+        ------
+        ParsingError
+            If the rule is not valid.
+        """
+        self.__expression = expression
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except (SyntaxError, AttributeError) as e:
+            raise ParsingError(expression, "Invalid rule: " + str(e))
+        self.__node, kind = self.__compile(tree.body)
+        if kind != "bool":
+            raise ParsingError(expression, "A rule needs to be a condition")
+
+    @property
+    def expression(self):
+        """
+        Returns
+        -------
+        str
+            the text of the rule.
+        """
+        return self.__expression
+
+    @property
+    def node(self):
+        """
+        Returns
+        -------
+        tuple
+            the parsed rule, nested tuples of (operation, operands...).
+        """
+        return self.__node
+
+    def __repr__(self):
+        return "Rule(%r)" % self.__expression
+
+    def __error(self, node, message):
+        return ParsingError(self.__expression, "%s at column %d" % (message, getattr(node, "col_offset", 0) + 1))
+
+    def __expect(self, node, expected):
+        compiled, kind = self.__compile(node)
+        if kind != expected:
+            raise self.__error(node, "Expected a %s" % ("condition" if expected == "bool" else "number"))
+        return compiled
+
+    def __compile(self, node):
+        """
+        Returns the tuple of a node of the syntax tree and its kind, "num"
+        or "bool".
+        """
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return ("num", float(node.value)), "num"
+        if isinstance(node, ast.Name):
+            if node.id not in FIELDS:
+                raise self.__error(node, "Unknown field '%s'" % node.id)
+            return ("field", FIELDS[node.id]), "num"
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            return (_ARITHMETIC[type(node.op)], self.__expect(node.left, "num"),
+                    self.__expect(node.right, "num")), "num"
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return ("-", ("num", 0.0), self.__expect(node.operand, "num")), "num"
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ("not", self.__expect(node.operand, "bool")), "bool"
+        if isinstance(node, ast.BoolOp):
+            return (("and" if isinstance(node.op, ast.And) else "or",) +
+                    tuple(self.__expect(v, "bool") for v in node.values)), "bool"
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            operands = [self.__expect(v, "num") for v in [node.left] + node.comparators]
+            # a < b < c is (a < b) and (b < c)
+            tests = tuple((_COMPARISONS[type(op)], a, b) for op, a, b in zip(node.ops, operands, operands[1:]))
+            return (tests[0] if len(tests) == 1 else ("and",) + tests), "bool"
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self.__call(node), "num"
+        raise self.__error(node, "Unsupported expression")
+
+    def __call(self, node):
+        name = node.func.id
+        if name in ALIASES:
+            name, field = ALIASES[name]
+            args = [ast.Name(id=field)] + node.args
+        elif name in INDICATORS:
+            args = node.args if len(node.args) == 2 else [ast.Name(id=INDICATORS[name][1])] + node.args
+        else:
+            raise self.__error(node, "Unknown indicator '%s'" % name)
+        if len(args) != 2:
+            raise self.__error(node, "Wrong number of arguments of %s" % node.func.id)
+        window = args[1]
+        if not (isinstance(window, ast.Constant) and type(window.value) is int and window.value >= 1):
+            raise self.__error(node, "The window of %s needs to be an integer >= 1" % node.func.id)
+        return ("call", name, self.__expect(args[0], "num"), window.value)
+
+
+class SignalScanner():
+    """
+    Evaluates signal rules over a universe of securities, for all the
+    securities and dates at once.
+
+    The histories are aligned into one matrix per field (dates by
+    securities); every node of a rule is one numpy operation over whole
+    matrices, and indicators are computed for all the securities at once.
+    The matrix of every indicator and subexpression is cached by its node,
+    so what several rules (or parts of one rule) share is computed once.
+
+    Methods
+    -------
+    from_securities(securities, duration, interval, fill_limit)
+        Creates a scanner from the cached histories of securities.
+
+    evaluate(self, rule)
+        Returns where the rule holds, by date and security.
+
+    matches(self, rule, start)
+        Returns the securities and dates where the rule holds.
+
+    latest(self, rule)
+        Returns the securities where the rule holds on the last date.
+
+    cache_info(self), clear(self)
+        Statistics and clearing of the cached matrices.
+
+    Example usage:
+
+        scanner = SignalScanner.from_securities(stocks, duration=Duration.YEAR_2)
+        rule = "close > SMA(200) and RSI(14) < 30 and volume > 2*avg_volume(20)"
+        print(scanner.latest(rule))
+        print(scanner.matches(rule, start="2021-01-01"))
+    """
+
+    def __init__(self, history: dict):
+        """
+        Parameters
+        ----------
+        history : dict
+            key: field (Open, High, Low, Close, Volume), value: pandas
+            DataFrame of dates by ticker symbols, all with the same index
+            and columns (see ``history.aligned_history``)
+
+        Raises
+        ------
+        InputError
+            If there is no field or the fields are not aligned.
+        """
+        if not history:
+            raise InputError("Invalid history", "Needs at least one field")
+        first = next(iter(history.values()))
+        for frame in history.values():
+            if not (frame.index.equals(first.index) and frame.columns.equals(first.columns)):
+                raise InputError("Invalid history", "All fields need the same dates and ticker symbols")
+        self.__values = {field: frame.to_numpy(dtype=np.float64) for field, frame in history.items()}
+        self.__dates = first.index
+        self.__tickers = [str(t) for t in first.columns]
+        self.__cache = dict()
+        self.__hits = 0
+        self.__misses = 0
+
+    @classmethod
+    def from_securities(cls, securities, duration: Duration = Duration.YEAR_1, interval: Interval = Interval.DAY_1,
+                        fill_limit: int = 5):
+        """
+        Creates a scanner from the histories of security objects (Stock,
+        ETF, Currency, ...), see ``history.aligned_history``.
+        """
+        return cls(aligned_history(securities, duration, interval, fill_limit))
+
+    @property
+    def tickers(self):
+        """
+        Returns
+        -------
+        list[str]
+            the ticker symbols, in column order.
+        """
+        return list(self.__tickers)
+
+    @property
+    def dates(self):
+        """
+        Returns
+        -------
+        pandas.Index
+            the dates, in row order.
+        """
+        return self.__dates
+
+    def __evaluate(self, node):
+        op = node[0]
+        if op == "num":
+            return node[1]
+        if op == "field":
+            if node[1] not in self.__values:
+                raise InputError("Field not in SignalScanner", "Input Field " + node[1])
+            return self.__values[node[1]]
+        cached = self.__cache.get(node)
+        if cached is not None:
+            self.__hits += 1
+            return cached
+        self.__misses += 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if op == "call":
+                result = INDICATORS[node[1]][0](np.broadcast_to(self.__evaluate(node[2]), self.__shape()), node[3])
+            elif op == "and":
+                result = np.logical_and.reduce([self.__evaluate(n) for n in node[1:]])
+            elif op == "or":
+                result = np.logical_or.reduce([self.__evaluate(n) for n in node[1:]])
+            elif op == "not":
+                result = ~self.__evaluate(node[1])
+            else:
+                result = _OPERATIONS[op](self.__evaluate(node[1]), self.__evaluate(node[2]))
+        result = np.broadcast_to(result, self.__shape())
+        self.__cache[node] = result
+        return result
+
+    def __shape(self):
+        return (len(self.__dates), len(self.__tickers))
+
+    def evaluate(self, rule) -> pd.DataFrame:
+        """
+        Parameters
+        ----------
+        rule : Rule or str
+            The rule
+
+        Returns
+        -------
+        pandas.DataFrame
+            True where the rule holds, one row per date and one column per
+            ticker symbol (False where a value is missing).
+        """
+        rule = rule if isinstance(rule, Rule) else Rule(rule)
+        # a copy: the cached values may be read-only and are shared between rules
+        return pd.DataFrame(self.__evaluate(rule.node), index=self.__dates, columns=self.__tickers, copy=True)
+
+    def matches(self, rule, start=None) -> pd.DataFrame:
+        """
+        Parameters
+        ----------
+        rule : Rule or str
+            The rule
+        start : date or str, optional
+            First date to report (default is all dates)
+
+        Returns
+        -------
+        pandas.DataFrame
+            the dates and ticker symbols where the rule holds, one row per
+            match, in columns Date and Ticker, by date.
+        """
+        rule = rule if isinstance(rule, Rule) else Rule(rule)
+        held = self.__evaluate(rule.node)
+        if start is not None:
+            held = held & (self.__dates >= pd.Timestamp(start))[:, None]
+        rows, columns = np.nonzero(held)
+        return pd.DataFrame({"Date": self.__dates[rows], "Ticker": np.asarray(self.__tickers, dtype=object)[columns]})
+
+    def latest(self, rule) -> list:
+        """
+        Returns
+        -------
+        list[str]
+            the ticker symbols for which the rule holds on the last date.
+        """
+        rule = rule if isinstance(rule, Rule) else Rule(rule)
+        if not len(self.__dates):
+            return []
+        held = self.__evaluate(rule.node)[-1]
+        return [t for t, h in zip(self.__tickers, held) if h]
+
+    def cache_info(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            the number of cache hits and misses so far, and the number of
+            matrices cached.
+        """
+        return {"hits": self.__hits, "misses": self.__misses, "size": len(self.__cache)}
+
+    def clear(self):
+        """
+        Drops all the cached matrices.
+        """
+        self.__cache = dict()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .enumerations import *
+from .exceptions import *
+
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+SimulationSummary = namedtuple('SimulationSummary', ['paths', 'steps', 'initial_price', 'mean', 'std', 'quantiles',
+                                                     'value_at_risk', 'expected_shortfall', 'probability_of_loss',
+                                                     'mean_max_drawdown', 'mean_path'])
+SimulationSummary.__doc__ = """
+Named Tuple SimulationSummary
+paths -> number of paths simulated
+steps -> number of steps of every path
+initial_price -> price the paths start from
+mean -> mean final price
+std -> standard deviation of the final price
+quantiles -> dict key: probability, value: quantile of the final price
+value_at_risk -> loss not exceeded with the confidence given, as a fraction
+                 of the initial price
+expected_shortfall -> mean loss beyond the value at risk, as a fraction of
+                      the initial price
+probability_of_loss -> fraction of paths ending below the initial price
+mean_max_drawdown -> mean over paths of the largest fall from a running peak,
+                     as a fraction of the peak
+mean_path -> numpy array of the mean price at every step, initial price first
+"""
+
+
+def _log_returns(model, rng, n, steps, returns, drift, volatility, block_size):
+    if model == PathModel.GBM:
+        return rng.normal(drift, volatility, size=(n, steps))
+    # circular moving block bootstrap of the historical returns
+    blocks = -(-steps // block_size)
+    starts = rng.integers(0, len(returns), size=(n, blocks, 1))
+    index = (starts + np.arange(block_size)) % len(returns)
+    return returns[index].reshape(n, blocks * block_size)[:, :steps]
+
+
+def _simulate_chunk(model, n, steps, initial_price, returns, drift, volatility, block_size, seed):
+    """
+    Simulates n paths and returns their final prices and the sums needed
+    for the summary, never more than one (n, steps) array at a time.
+    """
+    rng = np.random.default_rng(seed)
+    paths = _log_returns(model, rng, n, steps, returns, drift, volatility, block_size)
+    np.cumsum(paths, axis=1, out=paths)
+    np.exp(paths, out=paths)
+    paths *= initial_price
+    peaks = np.maximum.accumulate(np.maximum(paths, initial_price), axis=1)
+    drawdown = (1 - paths / peaks).max(axis=1)
+    return paths[:, -1].copy(), paths.sum(axis=0), float(drawdown.sum())
+
+
+class PathSimulator():
+    """
+    Simulates future price paths of a security and summarizes them.
+
+    Two models are supported: geometric Brownian motion with the drift and
+    volatility of the historical log returns, and a circular block
+    bootstrap resampling blocks of the historical returns (keeping their
+    short term autocorrelation and fat tails).
+
+    Paths are generated in chunks of ``chunk_size`` paths, as one numpy
+    array per chunk, so memory stays bounded by the chunk whatever the
+    number of paths; only the final price of each path is kept. Every
+    chunk draws from its own stream spawned from one seed (numpy
+    SeedSequence), so results are reproducible and the same whether
+    chunks run in this process or on a process pool.
+
+    Methods
+    -------
+    from_security(security, duration, interval, **kwargs)
+        Creates a simulator from the price history of a security.
+
+    simulate(self, steps, paths, model, block_size, seed, confidence)
+        Simulates paths and returns their SimulationSummary.
+
+    Example usage:
+
+        simulator = PathSimulator.from_security(Stock("AAPL"), duration=Duration.YEAR_5)
+        summary = simulator.simulate(steps=252, paths=1000000, model=PathModel.BOOTSTRAP, seed=42)
+        print(summary.quantiles[0.05], summary.value_at_risk)
+    """
+
+    def __init__(self, returns, initial_price: float, chunk_size: int = 10000, processes: int = 0):
+        """
+        Parameters
+        ----------
+        returns : array of float
+            Historical log returns, one per step
+        initial_price : float
+            The price the paths start from
+        chunk_size : int, optional
+            Number of paths simulated at once (default is 10000)
+        processes : int, optional
+            Number of processes simulating chunks, None for the number of
+            CPUs (default is 0, simulating in this process)
+
+        Raises
+        ------
+        InputError
+            If there are less than 2 returns or the price is not positive.
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[np.isfinite(returns)]
+        if len(returns) < 2:
+            raise InputError("Invalid returns", "Needs at least 2 returns")
+        if not float(initial_price) > 0:
+            raise InputError("Invalid initial_price", "Needs to be > 0")
+        if chunk_size < 1:
+            raise InputError("Invalid chunk_size", "Needs to be >= 1")
+        self.__returns = returns
+        self.__initial_price = float(initial_price)
+        self.__chunk_size = chunk_size
+        self.__processes = processes
+
+    @classmethod
+    def from_security(cls, security, duration: Duration = Duration.YEAR_1, interval: Interval = Interval.DAY_1,
+                      **kwargs):
+        """
+        Creates a simulator from the closing prices of a security over a
+        duration, starting from its current price. A step is one interval.
+
+        Parameters
+        ----------
+        security : _BaseSecurity
+            The security (Stock, ETF, ...)
+        duration : Duration, optional
+            History the returns are taken from (default is 1 year)
+        interval : Interval, optional
+            Length of a step (default is 1 day)
+        **kwargs
+            Other parameters of PathSimulator
+
+        Returns
+        -------
+        PathSimulator
+            the simulator.
+        """
+        close = security.historical_data(duration, interval)["Close"].to_numpy(dtype=np.float64)
+        close = close[np.isfinite(close) & (close > 0)]
+        price = getattr(security, "price", None)
+        initial_price = float(price) if price is not None and float(price) > 0 else close[-1]
+        return cls(np.diff(np.log(close)), initial_price, **kwargs)
+
+    @property
+    def drift(self):
+        """
+        Returns
+        -------
+        float
+            the mean log return per step.
+        """
+        return float(self.__returns.mean())
+
+    @property
+    def volatility(self):
+        """
+        Returns
+        -------
+        float
+            the standard deviation of the log returns per step.
+        """
+        return float(self.__returns.std(ddof=1))
+
+    def simulate(self, steps: int, paths: int, model: PathModel = PathModel.GBM, block_size: int = 5,
+                 seed: int = None, confidence: float = 0.95) -> SimulationSummary:
+        """
+        Simulates price paths and summarizes them.
+
+        Parameters
+        ----------
+        steps : int
+            Number of steps of every path
+        paths : int
+            Number of paths
+        model : PathModel, optional
+            GBM or BOOTSTRAP (default is GBM)
+        block_size : int, optional
+            Number of consecutive returns per bootstrap block (default is 5)
+        seed : int, optional
+            Seed making the simulation reproducible (default is random)
+        confidence : float, optional
+            Confidence of the value at risk (default is 0.95)
+
+        Returns
+        -------
+        SimulationSummary
+            the summary statistics of the paths.
+        """
+        if not isinstance(model, PathModel):
+            raise ParsingError("Invalid model type", "expected type 'PathModel'")
+        if steps < 1 or paths < 1 or block_size < 1:
+            raise InputError("Invalid steps, paths or block_size", "Needs to be >= 1")
+        if not 0 < confidence < 1:
+            raise InputError("Invalid confidence", "Needs to be between 0 and 1")
+
+        sizes = [min(self.__chunk_size, paths - start) for start in range(0, paths, self.__chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        args = [(model, n, steps, self.__initial_price, self.__returns, self.drift, self.volatility,
+                 block_size, s) for n, s in zip(sizes, seeds)]
+        if self.__processes != 0 and len(args) > 1:
+            with ProcessPoolExecutor(max_workers=self.__processes) as executor:
+                results = list(executor.map(_simulate_chunk, *zip(*args)))
+        else:
+            results = [_simulate_chunk(*a) for a in args]
+
+        final = np.concatenate([r[0] for r in results])
+        path_sum = np.sum([r[1] for r in results], axis=0)
+        drawdown_sum = sum(r[2] for r in results)
+
+        s0 = self.__initial_price
+        loss = 1 - final / s0
+        value_at_risk = float(np.quantile(loss, confidence))
+        tail = loss[loss >= value_at_risk]
+        return SimulationSummary(paths=paths, steps=steps, initial_price=s0,
+                                 mean=float(final.mean()), std=float(final.std(ddof=1)) if paths > 1 else 0.0,
+                                 quantiles=dict(zip(QUANTILES, np.quantile(final, QUANTILES).tolist())),
+                                 value_at_risk=value_at_risk,
+                                 expected_shortfall=float(tail.mean()),
+                                 probability_of_loss=float((final < s0).mean()),
+                                 mean_max_drawdown=drawdown_sum / paths,
+                                 mean_path=np.concatenate([[s0], path_sum / paths]))
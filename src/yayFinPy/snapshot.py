@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+from datetime import datetime
+from decimal import Decimal
+from .enumerations import *
+
+
+class SecuritySnapshot():
+    """
+    An immutable, offline copy of the quote of a security taken at a point in
+    time. It exposes the attributes common to all Securities without any
+    network access, and is what a Portfolio loaded from disk holds until it
+    is refreshed.
+
+    Attributes common to all Securities:
+    price, opening price, closing price, volume, day high, day low, exchange, ticker symbol, quote type.
+
+    Methods
+    -------
+    to_dict(self)
+        returns the information about the security as key-value pairs.
+
+    Example usage:
+
+        portfolio = Portfolio.load("book.npz")
+        snapshot = portfolio.get_portfolio_objects()["AAPL"]
+        print(snapshot.price, snapshot.timestamp)
+    """
+
+    __slots__ = ('__ticker_symbol', '__quote_type', '__price', '__vol', '__open_price',
+                 '__close_price', '__day_high', '__day_low', '__exchange', '__timestamp')
+
+    def __init__(self, ticker_symbol: str, quote_type: QuoteType, price: float,
+                 volume: float, opening_price: float, closing_price: float,
+                 day_high: float, day_low: float, exchange: str, timestamp: datetime):
+        """
+        Parameters
+        ----------
+        ticker_symbol : str
+            The ticker symbol of the security
+        quote_type : QuoteType
+            The quote type of the security
+        price, volume, opening_price, closing_price, day_high, day_low : float
+            The quote of the security, NaN when not available. Values are
+            only converted to Decimal when read.
+        exchange : str
+            The exchange in which the security is traded
+        timestamp : datetime
+            The time at which the quote was taken
+        """
+        self.__ticker_symbol = ticker_symbol
+        self.__quote_type = quote_type
+        self.__price = price
+        self.__vol = volume
+        self.__open_price = opening_price
+        self.__close_price = closing_price
+        self.__day_high = day_high
+        self.__day_low = day_low
+        self.__exchange = exchange
+        self.__timestamp = timestamp
+
+    def __str__(self):
+        return "Ticker Symbol: %s, Type: %s, Price: %s (as of %s)\n" % (
+            self.__ticker_symbol, self.__quote_type.value, self.price, self.__timestamp)
+
+    @property
+    def quote_type(self):
+        """
+        Returns
+        -------
+        QuoteType
+            returns the quote type of the security. (Refer to QuoteType Enum).
+        """
+        return self.__quote_type
+
+    @property
+    def ticker_symbol(self):
+        """
+        Returns
+        -------
+        str
+            returns the ticker symbol associated with security.
+        """
+        return self.__ticker_symbol
+
+    @property
+    def price(self):
+        """
+        Returns
+        -------
+        Decimal
+            returns the regular market price of the security when the snapshot was taken.
+        """
+        return Decimal(self.__price)
+
+    @property
+    def volume(self):
+        """
+        Returns
+        -------
+        Decimal
+            returns the traded market volume of security when the snapshot was taken.
+        """
+        return Decimal(self.__vol)
+
+    @property
+    def opening_price(self):
+        """
+        Returns
+        -------
+        Decimal
+            returns the opening market price of security.
+        """
+        return Decimal(self.__open_price)
+
+    @property
+    def closing_price(self):
+        """
+        Returns
+        -------
+        Decimal
+            returns the closing market price of security.
+        """
+        return Decimal(self.__close_price)
+
+    @property
+    def day_high(self):
+        """
+        Returns
+        -------
+        Decimal
+            returns the day's highest market price of security.
+        """
+        return Decimal(self.__day_high)
+
+    @property
+    def day_low(self):
+        """
+        Returns
+        -------
+        Decimal
+            returns the day's lowest market price of security.
+        """
+        return Decimal(self.__day_low)
+
+    @property
+    def exchange(self):
+        """
+        Returns
+        -------
+        str
+            returns the exchange in which security is being traded.
+        """
+        return self.__exchange
+
+    @property
+    def timestamp(self):
+        """
+        Returns
+        -------
+        datetime
+            returns the time at which the snapshot was taken.
+        """
+        return self.__timestamp
+
+    def to_dict(self):
+        """
+        Returns
+        -------
+        dict
+            returns the information about the security as key-value pairs.
+        """
+        return {"ticker_symbol": self.ticker_symbol, "quote_type": self.quote_type.value,
+                "price": self.price, "opening_price": self.opening_price, "closing_price": self.closing_price,
+                "day_low": self.day_low, "day_high": self.day_high, "exchange": self.exchange, "volume": self.volume}
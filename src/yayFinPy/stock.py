@@ -20,35 +20,79 @@
 # - Shubham Gupta
 # - Vasudev Luthra
 
-from .base import _BaseSecurity
-import copy
+from .base import _BaseSecurity, _ReadOnlySeries
+import numpy as np
+import pandas as pd
 from .enumerations import *
 from .exceptions import *
 from decimal import *
-from googlesearch import search
+import time
+from .news import NewsFetcher
 from datetime import date
-from sentifish import Sentiment
-import tweepy
+from .sentiment import SentimentPipeline
+from .tweets import TweetCollector, TweepyAPI
+from .options import OptionChain
  
 
 
 class CompanyData:
     """
     Stores data about the Stock issuing company in a encapsulated class object.
+
+    CompanyData is an immutable value type: its fields can't be changed once
+    created, so it is shared rather than copied, and it can be compared and
+    used as a dictionary key.
     """
-    
+
+    __slots__ = ("__name", "__address", "__business_summary", "__logo_url", "__industry_sector",
+                 "__profits", "__country", "__website")
+
     def __init__(self,name,address,business_summary,logo_url,industry_sector,profits,country,website):
         """
         Constructor for CompanyData class storing company details in a unified object.
         """
-        self.__name  = name
-        self.__address = address
-        self.__business_summary = business_summary
-        self.__logo_url = logo_url
-        self.__industry_sector = industry_sector
-        self.__profits = profits
-        self.__country = country
-        self.__website = website
+        set_field = object.__setattr__
+        set_field(self, "_CompanyData__name", name)
+        set_field(self, "_CompanyData__address", address)
+        set_field(self, "_CompanyData__business_summary", business_summary)
+        set_field(self, "_CompanyData__logo_url", logo_url)
+        set_field(self, "_CompanyData__industry_sector", industry_sector)
+        set_field(self, "_CompanyData__profits", profits)
+        set_field(self, "_CompanyData__country", country)
+        set_field(self, "_CompanyData__website", website)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompanyData is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompanyData is immutable")
+
+    def __fields(self):
+        return (self.__name, self.__address, self.__business_summary, self.__logo_url, self.__industry_sector,
+                self.__profits, self.__country, self.__website)
+
+    def __key(self):
+        # a missing (NaN) profit margin equals itself, as None does
+        fields = self.__fields()
+        profits = fields[5]
+        return fields[:5] + (None if profits != profits else profits,) + fields[6:]
+
+    def __eq__(self, other):
+        if not isinstance(other, CompanyData):
+            return NotImplemented
+        return self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (CompanyData, self.__fields())
 
     @property
     def name(self):
@@ -101,9 +145,9 @@ class CompanyData:
         Returns
         -------
         Decimal
-            company anual profits
+            company anual profits, None if not known
         """  
-        return Decimal(self.__profits)
+        return None if self.__profits is None else Decimal(self.__profits)
 
     @property
     def country(self):
@@ -117,7 +161,7 @@ class CompanyData:
         return self.__country
     
     @property
-    def wesbite(self):
+    def website(self):
         """Returns company website url
 
         Returns
@@ -127,6 +171,17 @@ class CompanyData:
         """        
         return self.__website
 
+    @property
+    def wesbite(self):
+        """Returns company website url. Kept for compatibility, use ``website``.
+
+        Returns
+        -------
+        str
+            company website url
+        """        
+        return self.__website
+
     @property
     def logo_url(self):
         """Returns company logo url
@@ -146,17 +201,177 @@ class CompanyData:
         str
             string representation of CompanyData
         """
-        return "Company Name: "+self.__name \
-        +"\naddress: "+self.__address \
-        +"\nsummary: "+self.__business_summary \
-        +"\nLogo Url: "+self.__logo_url \
-        +"\nCountry: "+self.__country \
-        +"\nwesbite: "+self.__website \
-        +"\nIndustry Sector: "+self.__industry_sector \
-        +"\nProfits: "+str(self.__profits) + "\n"
+        return "".join(["Company Name: ", str(self.__name),
+                        "\naddress: ", str(self.__address),
+                        "\nsummary: ", str(self.__business_summary),
+                        "\nLogo Url: ", str(self.__logo_url),
+                        "\nCountry: ", str(self.__country),
+                        "\nwesbite: ", str(self.__website),
+                        "\nIndustry Sector: ", str(self.__industry_sector),
+                        "\nProfits: ", str(self.__profits), "\n"])
+
+    def __repr__(self):
+        return "CompanyData(name=%r, industry_sector=%r, country=%r)" % (self.__name, self.__industry_sector,
+                                                                        self.__country)
+
+
+# Shared by all Stocks so related_news results are cached across them.
+_DEFAULT_NEWS_FETCHER = NewsFetcher()
+
+# One authenticated client per set of API keys, shared by all Stocks.
+_TWEET_COLLECTORS = dict()
+
+
+def _tweet_collector(consumer_key, consumer_secret, access_token, access_token_secret):
+    keys = (consumer_key, consumer_secret, access_token, access_token_secret)
+    collector = _TWEET_COLLECTORS.get(keys)
+    if collector is None:
+        collector = _TWEET_COLLECTORS[keys] = TweetCollector(TweepyAPI(*keys), max_pages=1)
+    return collector
+
+# Shared by all Stocks so tweets seen before are not scored again.
+_DEFAULT_SENTIMENT = SentimentPipeline()
+
+# Seconds fetched fundamentals (financial statements, holders) are reused.
+_FUNDAMENTALS_TTL = 24 * 60 * 60
+
+_COMPANY_FIELDS = ("name", "address", "business_summary", "logo_url", "industry_sector", "profits", "country",
+                   "website")
+
+
+class CompanyDataTable:
+    """
+    Stores the CompanyData of many stocks in a compact, columnar form.
+
+    Every text field is stored as a column of integer codes into the
+    distinct values of the field, so values repeated across companies (the
+    sector, the country, ...) are stored once; profits are stored as floats.
+    CompanyData objects are only created when a ticker is looked up.
+
+    Methods
+    -------
+    from_stocks(stocks)
+        Builds a table from Stock objects.
+
+    tickers()
+        Returns the ticker symbols of the table.
+
+    column(field)
+        Returns the values of a field for all tickers.
+
+    to_dataframe()
+        Returns the table as a pandas DataFrame.
+
+    Example usage:
+
+        table = CompanyDataTable({"AAPL": Stock("AAPL").company_data, "MSFT": Stock("MSFT").company_data})
+        print(table["AAPL"].industry_sector)
+        tech = table.to_dataframe().query("industry_sector == 'Technology'")
+    """
+
+    __slots__ = ("__tickers", "__rows", "__codes", "__values", "__profits")
+
+    def __init__(self, company_data: dict):
+        """
+        Parameters
+        ----------
+        company_data : dict
+            key: ticker symbol, value: CompanyData
+        """
+        for t, c in company_data.items():
+            if not isinstance(c, CompanyData):
+                raise ParsingError("Invalid company_data type", "expected type 'CompanyData' for " + str(t))
+        self.__tickers = list(company_data.keys())
+        self.__rows = {t: i for i, t in enumerate(self.__tickers)}
+        self.__codes = dict()
+        self.__values = dict()
+        records = list(company_data.values())
+        for field in _COMPANY_FIELDS:
+            if field == "profits":
+                continue
+            codes, values = pd.factorize(pd.Series([getattr(c, field) for c in records], dtype=object),
+                                         use_na_sentinel=True)
+            self.__codes[field] = codes.astype(np.int32)
+            self.__values[field] = list(values)
+        self.__profits = np.array([np.nan if c.profits is None else float(c.profits) for c in records],
+                                  dtype=np.float64)
+
+    @classmethod
+    def from_stocks(cls, stocks):
+        """
+        Builds a table from Stock objects.
+
+        Parameters
+        ----------
+        stocks : iterable of Stock
+            The stocks
+
+        Returns
+        -------
+        CompanyDataTable
+            the table of the company data of the stocks.
+        """
+        return cls({s.ticker_symbol: s.company_data for s in stocks})
+
+    def __len__(self):
+        return len(self.__tickers)
+
+    def __contains__(self, ticker_symbol):
+        return ticker_symbol in self.__rows
+
+    def __value(self, field, row):
+        code = self.__codes[field][row]
+        return None if code < 0 else self.__values[field][code]
+
+    def __getitem__(self, ticker_symbol) -> CompanyData:
+        row = self.__rows.get(ticker_symbol)
+        if row is None:
+            raise InputError("Ticker Symbol not in table", "Input Ticker " + str(ticker_symbol))
+        profits = self.__profits[row]
+        return CompanyData(*[(None if np.isnan(profits) else float(profits)) if f == "profits"
+                             else self.__value(f, row) for f in _COMPANY_FIELDS])
+
+    def tickers(self) -> list:
+        """
+        Returns
+        -------
+        list[str]
+            the ticker symbols of the table, in row order.
+        """
+        return list(self.__tickers)
+
+    def column(self, field: str):
+        """
+        Returns the values of a field for all tickers, in row order.
+
+        Parameters
+        ----------
+        field : str
+            A CompanyData field, e.g. "industry_sector" or "profits"
+
+        Returns
+        -------
+        pandas.Categorical or numpy.ndarray
+            the values of a text field, or the profits as floats.
+        """
+        if field == "profits":
+            return self.__profits.copy()
+        if field not in self.__codes:
+            raise InputError("Invalid field", "Needs to be one of " + ", ".join(_COMPANY_FIELDS))
+        return pd.Categorical.from_codes(self.__codes[field], categories=pd.Index(self.__values[field],
+                                                                                  dtype=object))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            one row per ticker symbol, one (categorical) column per field.
+        """
+        return pd.DataFrame({f: self.column(f) for f in _COMPANY_FIELDS},
+                            index=pd.Index(self.__tickers, name="Ticker Symbol"))
 
 
-    
 class Stock(_BaseSecurity):
     """
     A Yahoo Finance parser API for Stocks and Equity.
@@ -177,6 +392,9 @@ class Stock(_BaseSecurity):
     tweets(self)
 		returns upto 20 top tweets related to a stock.
 
+    option_chain(self, rate, dividend_yield)
+		returns the option chains of the stock with implied volatilities and Greeks.
+
     sentiment(self)
 		returns average sentiment score based on tweet data.
 
@@ -192,6 +410,9 @@ class Stock(_BaseSecurity):
     returns_percentage(self,period,interval,start_date,end_date)
         returns stock returns in percentage for specific period and interval
 
+    fundamentals(self,statement)
+        returns a fundamentals statement (financials, balance sheet, holders...), reused for a day
+
 
     A typical application of this class first initialize an object with a valid ticker symbol, then use the
 	class properties to extract information.
@@ -249,9 +470,9 @@ class Stock(_BaseSecurity):
                                              s["sector"],s["profitMargins"],s["country"],
                                              s["website"])
             
-            self.__stock_splits = self.__security.splits
+            self.__stock_splits = _ReadOnlySeries(lambda: self.__security.splits)
             self.__peg_ratio = Decimal(s["pegRatio"])
-            self.__dividends = self.__security.dividends
+            self.__dividends = _ReadOnlySeries(lambda: self.__security.dividends)
             self.__market_cap = Decimal(s["marketCap"])
             self.__ask = Decimal(s["ask"])
             self.__ask_size = Decimal(s["askSize"])
@@ -261,6 +482,8 @@ class Stock(_BaseSecurity):
             self.__name = s["shortName"]
             self.__news = None
             self.__tweets = None
+            self.__fundamentals = dict()
+            self.__option_chains = dict()
         except:
             raise InputError(ticker_symbol,"API data retrieval error")
 
@@ -285,29 +508,29 @@ class Stock(_BaseSecurity):
         CompanyData
             Object providing company details
         """
-        return copy.deepcopy(self.__company_data)
+        return self.__company_data
 
     @property
     def splits(self):
-      """Returns dataframe of stock splits.
+      """Returns dataframe of stock splits. Fetched on first use; the data is read-only.
 
         Returns
         -------
         Pandas.DataFrame
             dataframe of stock splits
         """    
-      return copy.deepcopy(self.__stock_splits)
+      return self.__stock_splits.get()
 
     @property
     def dividends(self):
-        """Returns dataframe of security dividends.
+        """Returns dataframe of security dividends. Fetched on first use; the data is read-only.
 
         Returns
         -------
         Pandas.DataFrame
             dataframe of security dividends
         """    
-        return copy.deepcopy(self.__dividends)
+        return self.__dividends.get()
     
 
     @property
@@ -476,11 +699,7 @@ class Stock(_BaseSecurity):
 
         if len(self.__tweets) == 0:
             raise TwitterError(self.__ticker_symbol ," Error getting twitter data.")
-        sentiments = []
-        for t in self.__tweets:
-            obj = Sentiment(t)
-            sentiments.append(obj.analyze())
-        return Decimal(sum(sentiments)/len(sentiments))
+        return Decimal(_DEFAULT_SENTIMENT.mean(self.__tweets))
 
     
 
@@ -495,8 +714,10 @@ class Stock(_BaseSecurity):
         return self.__security.recommendations
     
 
-    def tweets(self,consumer_key, consumer_secret, access_token,access_token_secret):
-        """[summary]
+    def tweets(self, consumer_key: str = None, consumer_secret: str = None, access_token: str = None,
+               access_token_secret: str = None, collector: TweetCollector = None):
+        """Returns up to 20 recent tweets mentioning the Stock's cashtag.
+        Tweets are collected once per Stock, see ``tweets.TweetCollector``.
 
         Parameters
         ----------
@@ -508,6 +729,9 @@ class Stock(_BaseSecurity):
              twitter API access token
         access_token_secret : str
              twitter API access token secret
+        collector : TweetCollector, optional
+            collector to use instead of one authenticated with the keys;
+            a collector is shared by all Stocks using the same keys.
 
         Returns
         -------
@@ -520,23 +744,48 @@ class Stock(_BaseSecurity):
             Riased when error in calling or authenticating twitter API.
         """
         if self.__tweets is None:
-            self.__tweets = []
-            # Authenticate to Twitter
             try:
-                auth = tweepy.OAuthHandler(consumer_key, consumer_secret)
-                auth.set_access_token(access_token, access_token_secret)
-
-                # Create API object
-                api = tweepy.API(auth, wait_on_rate_limit=True,
-                    wait_on_rate_limit_notify=True)
-                for tweet in api.search(q="$TSLA", lang="en", rpp=20):
-                    self.__tweets.append(tweet.text)
-            except:
+                if collector is None:
+                    collector = _tweet_collector(consumer_key, consumer_secret, access_token, access_token_secret)
+                collector.collect([self.__ticker_symbol])
+            except Exception:
                 raise TwitterError(self.__ticker_symbol ," Error getting twitter data. Check API keys.")
+            if self.__ticker_symbol in collector.failed:
+                raise TwitterError(self.__ticker_symbol ," Error getting twitter data. Check API keys.")
+            self.__tweets = collector.tweets(self.__ticker_symbol, 20)
         return self.__tweets
     
-    def related_news(self):
+    def option_chain(self, rate: float = 0.0, dividend_yield: float = 0.0) -> OptionChain:
+        """Returns the option chains of the Stock for all expirations, with
+        implied volatilities and Greeks, see ``options.OptionChain``.
+        The chain is created once per Stock and its quotes cached.
+
+        Parameters
+        ----------
+        rate : float, optional
+            continuously compounded risk free rate, by default 0
+        dividend_yield : float, optional
+            continuous dividend yield, by default 0
+
+        Returns
+        -------
+        OptionChain
+            the option chains, priced at the current price of the Stock.
+        """
+        key = (float(rate), float(dividend_yield))
+        if key not in self.__option_chains:
+            self.__option_chains[key] = OptionChain(self.ticker_symbol, float(self.price), rate=rate,
+                                                    dividend_yield=dividend_yield)
+        return self.__option_chains[key]
+
+    def related_news(self, fetcher: NewsFetcher = None):
         """Returns a list of links to news items related to the Stock.
+        Results are cached, see ``news.NewsFetcher``.
+
+        Parameters
+        ----------
+        fetcher: NewsFetcher, optional
+            The fetcher to search with (default is one shared by all Stocks)
 
         Returns
         -------
@@ -548,15 +797,41 @@ class Stock(_BaseSecurity):
         NewsError
             Raised when error occurs in getting news links.
         """
-        news_list = []
-        for news_article in search(self.__ticker_symbol, tld="com", num=20, stop=20, pause=2):
-            news_list.append(news_article)
+        if fetcher is None:
+            fetcher = _DEFAULT_NEWS_FETCHER
+        try:
+            news_list = fetcher.related(self.__ticker_symbol, 20)
+        except Exception:
+            news_list = []
 
         if len(news_list) == 0:
                 raise NewsError(self.__ticker_symbol ," Error getting related news.")
 
         return news_list
 
+    def fundamentals(self, statement: Statement):
+        """Returns a fundamentals statement of the Stock. Statements are
+        fetched on first use and reused for a day.
+
+        Parameters
+        ----------
+        statement: Statement
+            The statement required, e.g. Statement.BALANCE_SHEET
+
+        Returns
+        -------
+        Pandas.DataFrame
+            dataframe of the statement
+        """
+        if not isinstance(statement, Statement):
+            raise ParsingError("Invalid statement type", "expected type 'Statement'")
+        cached = self.__fundamentals.get(statement)
+        now = time.monotonic()
+        if cached is None or now - cached[0] > _FUNDAMENTALS_TTL:
+            cached = (now, getattr(self.__security, statement.value))
+            self.__fundamentals[statement] = cached
+        return cached[1].copy() if cached[1] is not None else None
+
     @property
     def financials(self):
         """Returns dataframe of stock financials.
@@ -566,7 +841,7 @@ class Stock(_BaseSecurity):
         Pandas.DataFrame
             dataframe of stock financials
         """  
-        return self.__security.financials
+        return self.fundamentals(Statement.FINANCIALS)
 
     @property
     def calendar(self):
@@ -588,7 +863,7 @@ class Stock(_BaseSecurity):
         Pandas.DataFrame
             dataframe of cashflow
         """     
-        return self.__security.cashflow
+        return self.fundamentals(Statement.CASHFLOW)
 
     @property
     def earnings(self):
@@ -599,7 +874,7 @@ class Stock(_BaseSecurity):
         Pandas.DataFrame
             dataframe of earnings
         """      
-        return self.__security.earnings
+        return self.fundamentals(Statement.EARNINGS)
 
 
     @property
@@ -611,7 +886,7 @@ class Stock(_BaseSecurity):
         Pandas.DataFrame
             dataframe of major stock holders
         """    
-        return self.__security.major_holders
+        return self.fundamentals(Statement.MAJOR_HOLDERS)
 
     @property   
     def actions(self):
@@ -633,7 +908,7 @@ class Stock(_BaseSecurity):
         Pandas.DataFrame
             dataframe of containing balance sheet
         """    
-        return self.__security.balance_sheet
+        return self.fundamentals(Statement.BALANCE_SHEET)
 
     @property
     def institutional_holders(self):
@@ -644,7 +919,7 @@ class Stock(_BaseSecurity):
         Pandas.DataFrame
             dataframe of institutional stock holders
         """      
-        return self.__security.institutional_holders
+        return self.fundamentals(Statement.INSTITUTIONAL_HOLDERS)
 
     @property
     def mutualfund_holders(self):
@@ -655,4 +930,4 @@ class Stock(_BaseSecurity):
         Pandas.DataFrame
             dataframe of mutualfund stock holders
         """    
-        return self.__security.mutualfund_holders
\ No newline at end of file
+        return self.fundamentals(Statement.MUTUALFUND_HOLDERS)
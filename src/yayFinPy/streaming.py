@@ -0,0 +1,505 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+from abc import ABC, abstractmethod
+import asyncio
+import math
+import random
+import time
+from collections import deque, namedtuple, OrderedDict
+import yfinance as yf
+from .exceptions import *
+
+
+QuoteUpdate = namedtuple('QuoteUpdate', ['ticker_symbol', 'price', 'volume', 'timestamp'])
+QuoteUpdate.__doc__ = """
+Named Tuple QuoteUpdate
+ticker_symbol -> ticker symbol of the security
+price -> last traded price as float
+volume -> day volume as float, NaN when not known
+timestamp -> time of the quote in seconds since the epoch
+"""
+
+
+# number of callback errors a QuoteStream keeps
+_MAX_ERRORS = 1000
+
+
+class QuoteSource(ABC):
+    """
+    Base class of the sources of live quotes used by a QuoteStream.
+
+    A source is told which ticker symbols are wanted through ``subscribe`` and
+    ``unsubscribe``, and produces QuoteUpdate objects from the asynchronous
+    generator ``updates``. Sources should only produce updates for
+    subscribed symbols, and stop when ``close`` is called.
+    """
+
+    def __init__(self):
+        self._symbols = set()
+        self._closed = False
+
+    @property
+    def symbols(self):
+        """
+        Returns
+        -------
+        set
+            the ticker symbols currently subscribed.
+        """
+        return set(self._symbols)
+
+    def subscribe(self, symbols):
+        """
+        Adds ticker symbols to the subscription of the source.
+        """
+        self._symbols.update(symbols)
+
+    def unsubscribe(self, symbols):
+        """
+        Removes ticker symbols from the subscription of the source.
+        """
+        self._symbols.difference_update(symbols)
+
+    def close(self):
+        """
+        Stops producing updates.
+        """
+        self._closed = True
+
+    @abstractmethod
+    async def updates(self):
+        """
+        Asynchronous generator of QuoteUpdate objects.
+        """
+
+
+class ReplayQuoteSource(QuoteSource):
+    """
+    Replays recorded quote updates, e.g. for tests or backtests.
+
+    Example usage:
+
+        source = ReplayQuoteSource([QuoteUpdate("AAPL", 127.1, 1e6, 1620997200.0), ...])
+    """
+
+    def __init__(self, updates, speed: float = None):
+        """
+        Parameters
+        ----------
+        updates : iterable of QuoteUpdate
+            The updates to replay, in timestamp order
+        speed : float, optional
+            Replay in real time scaled by this factor (e.g. 10 is ten times
+            faster than recorded). By default updates are replayed as fast
+            as possible.
+        """
+        super().__init__()
+        self.__updates = updates
+        self.__speed = speed
+
+    async def updates(self):
+        first = None
+        start = time.monotonic()
+        for i, u in enumerate(self.__updates):
+            if self._closed:
+                return
+            if self.__speed:
+                if first is None:
+                    first = u.timestamp
+                delay = (u.timestamp - first) / self.__speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 256 == 255:
+                await asyncio.sleep(0)
+            if u.ticker_symbol in self._symbols:
+                yield u
+
+
+class SimulatedQuoteSource(QuoteSource):
+    """
+    Produces random walk quotes for the subscribed symbols, e.g. for tests or
+    load testing.
+
+    Example usage:
+
+        source = SimulatedQuoteSource({"AAPL": 127.0, "BTC-USD": 50000.0},
+                                      updates_per_second=10000, seed=7)
+    """
+
+    def __init__(self, prices: dict = None, volatility: float = 0.0005,
+                 updates_per_second: float = 1000, limit: int = None, seed: int = None):
+        """
+        Parameters
+        ----------
+        prices : dict, optional
+            key: ticker, value: starting price (default is 100 for all)
+        volatility : float, optional
+            Standard deviation of the log return of each update
+        updates_per_second : float, optional
+            Rate of updates produced across all symbols
+        limit : int, optional
+            Stop after this many updates (default is to run until closed)
+        seed : int, optional
+            Seed of the random number generator
+        """
+        super().__init__()
+        self.__prices = dict(prices or {})
+        self.__volatility = volatility
+        self.__rate = updates_per_second
+        self.__limit = limit
+        self.__random = random.Random(seed)
+
+    async def updates(self):
+        produced = 0
+        batch = max(1, int(self.__rate / 100))
+        while not self._closed and (self.__limit is None or produced < self.__limit):
+            symbols = sorted(self._symbols)
+            if not symbols:
+                await asyncio.sleep(0.01)
+                continue
+            now = time.time()
+            for _ in range(batch):
+                if self.__limit is not None and produced >= self.__limit:
+                    return
+                t = symbols[self.__random.randrange(len(symbols))]
+                price = self.__prices.get(t, 100.0) * math.exp(self.__random.gauss(0, self.__volatility))
+                self.__prices[t] = price
+                produced += 1
+                yield QuoteUpdate(t, price, float('nan'), now)
+            await asyncio.sleep(batch / self.__rate)
+
+
+class YahooQuoteSource(QuoteSource):
+    """
+    Live quotes from the Yahoo Finance streaming websocket (requires a
+    yfinance version providing ``yfinance.AsyncWebSocket``).
+    """
+
+    def __init__(self, max_queue: int = 100000):
+        """
+        Parameters
+        ----------
+        max_queue : int, optional
+            Maximum number of received messages waiting to be consumed;
+            older messages are dropped beyond it
+
+        Raises
+        ------
+        YfinanceError
+            If the installed yfinance does not support streaming.
+        """
+        super().__init__()
+        if not hasattr(yf, "AsyncWebSocket"):
+            raise YfinanceError("AsyncWebSocket", "Installed yfinance does not support streaming.")
+        self.__ws = None
+        self.__queue = None
+        self.__max_queue = max_queue
+
+    def subscribe(self, symbols):
+        new = set(symbols) - self._symbols
+        super().subscribe(symbols)
+        if self.__ws is not None and new:
+            asyncio.ensure_future(self.__ws.subscribe(sorted(new)))
+
+    def unsubscribe(self, symbols):
+        gone = set(symbols) & self._symbols
+        super().unsubscribe(symbols)
+        if self.__ws is not None and gone:
+            asyncio.ensure_future(self.__ws.unsubscribe(sorted(gone)))
+
+    def __on_message(self, message):
+        try:
+            update = QuoteUpdate(message["id"], float(message["price"]),
+                                 float(message.get("day_volume", "nan")),
+                                 int(message["time"]) / 1000.0)
+        except (KeyError, TypeError, ValueError):
+            return
+        if self.__queue.full():
+            self.__queue.get_nowait()
+        self.__queue.put_nowait(update)
+
+    async def updates(self):
+        self.__queue = asyncio.Queue(self.__max_queue)
+        self.__ws = yf.AsyncWebSocket(verbose=False)
+        if self._symbols:
+            await self.__ws.subscribe(sorted(self._symbols))
+        listener = asyncio.ensure_future(self.__ws.listen(self.__on_message))
+        try:
+            while not self._closed:
+                try:
+                    update = await asyncio.wait_for(self.__queue.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                if update.ticker_symbol in self._symbols:
+                    yield update
+        finally:
+            listener.cancel()
+            await self.__ws.close()
+            self.__ws = None
+
+
+class Subscription():
+    """
+    The updates of a set of symbols delivered to one subscriber of a
+    QuoteStream, consumed as an asynchronous iterator.
+
+    Updates are buffered per symbol: when the subscriber falls behind, a
+    burst of updates for a symbol is coalesced into its latest update, so
+    the buffer never holds more than one update per subscribed symbol.
+
+    Example usage:
+
+        async for update in stream.subscribe(["AAPL", "MSFT"]):
+            print(update.ticker_symbol, update.price)
+    """
+
+    def __init__(self, symbols):
+        self.__symbols = frozenset(symbols)
+        self.__pending = OrderedDict()
+        self.__event = asyncio.Event()
+        self.__closed = False
+        self.__coalesced = 0
+
+    @property
+    def symbols(self):
+        """
+        Returns
+        -------
+        frozenset
+            the ticker symbols of the subscription.
+        """
+        return self.__symbols
+
+    @property
+    def coalesced(self):
+        """
+        Returns
+        -------
+        int
+            the number of updates replaced by a later update of the same
+            symbol before they were consumed.
+        """
+        return self.__coalesced
+
+    @property
+    def pending(self):
+        """
+        Returns
+        -------
+        int
+            the number of updates waiting to be consumed.
+        """
+        return len(self.__pending)
+
+    def _push(self, update):
+        if update.ticker_symbol in self.__pending:
+            self.__coalesced += 1
+            del self.__pending[update.ticker_symbol]
+        self.__pending[update.ticker_symbol] = update
+        self.__event.set()
+
+    def _close(self):
+        self.__closed = True
+        self.__event.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.__pending:
+            if self.__closed:
+                raise StopAsyncIteration
+            self.__event.clear()
+            await self.__event.wait()
+        return self.__pending.popitem(last=False)[1]
+
+
+class QuoteStream():
+    """
+    Distributes live quote updates from a pluggable QuoteSource to
+    subscribers, through callbacks or asynchronous iterators.
+
+    Each subscriber gets its own Subscription buffer coalescing bursts per
+    symbol, so a slow subscriber only ever sees the latest quote of each
+    symbol and never slows down the source or the other subscribers.
+
+    Methods
+    -------
+    subscribe(self, symbols, callback)
+        Subscribes to updates of a set of symbols.
+
+    unsubscribe(self, subscription)
+        Ends a subscription.
+
+    latest(self, ticker)
+        Returns the latest update received for a symbol.
+
+    errors(self)
+        Returns the latest errors raised by callbacks.
+
+    run(self)
+        Pumps updates from the source until it ends or stop is called.
+
+    stop(self)
+        Stops the stream and ends every subscription.
+
+    Example usage:
+
+        async def main():
+            stream = QuoteStream(SimulatedQuoteSource({"AAPL": 127.0}, limit=1000))
+            stream.subscribe(["AAPL"], callback=lambda u: print(u.price))
+            await stream.run()
+
+        asyncio.run(main())
+    """
+
+    def __init__(self, source: QuoteSource):
+        """
+        Parameters
+        ----------
+        source : QuoteSource
+            The source of quote updates, e.g. YahooQuoteSource()
+        """
+        if not isinstance(source, QuoteSource):
+            raise ParsingError("Invalid source type", "expected type 'QuoteSource'")
+        self.__source = source
+        self.__by_symbol = dict()
+        self.__latest = dict()
+        self.__callbacks = dict()
+        self.__tasks = dict()
+        self.__errors = deque(maxlen=_MAX_ERRORS)
+        self.__running = False
+
+    def subscribe(self, symbols, callback=None) -> Subscription:
+        """
+        Subscribes to the updates of a set of symbols.
+
+        Parameters
+        ----------
+        symbols : iterable of str
+            The ticker symbols
+        callback : callable, optional
+            Function or coroutine function called with each QuoteUpdate while
+            the stream runs; if it raises, the error is kept in ``errors``
+            and the next updates are still dispatched. Without a callback,
+            iterate over the returned Subscription.
+
+        Returns
+        -------
+        Subscription
+            the subscription, usable as an asynchronous iterator
+        """
+        if isinstance(symbols, str):
+            raise ParsingError("Invalid symbols type", "expected an iterable of 'str'")
+        subscription = Subscription(symbols)
+
+        new = [t for t in subscription.symbols if t not in self.__by_symbol]
+        for t in subscription.symbols:
+            self.__by_symbol.setdefault(t, []).append(subscription)
+        if new:
+            self.__source.subscribe(new)
+
+        if callback is not None:
+            self.__callbacks[subscription] = callback
+            if self.__running:
+                self.__start_dispatch(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Ends a subscription; its iterator stops once its buffer is consumed.
+        """
+        gone = []
+        for t in subscription.symbols:
+            subscribers = self.__by_symbol.get(t, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self.__by_symbol.pop(t, None)
+                gone.append(t)
+        if gone:
+            self.__source.unsubscribe(gone)
+        subscription._close()
+        self.__callbacks.pop(subscription, None)
+
+    def latest(self, ticker: str) -> QuoteUpdate:
+        """
+        Returns
+        -------
+        QuoteUpdate
+            the latest update received for the symbol, None if there is none.
+        """
+        return self.__latest.get(ticker)
+
+    @property
+    def errors(self):
+        """
+        Returns
+        -------
+        list
+            (QuoteUpdate, exception) of the last 1000 updates whose callback
+            raised, oldest first.
+        """
+        return list(self.__errors)
+
+    async def run(self):
+        """
+        Pumps updates from the source to the subscribers until the source
+        ends or ``stop`` is called, then ends every subscription.
+        """
+        self.__running = True
+        for subscription in self.__callbacks:
+            if subscription not in self.__tasks:
+                self.__start_dispatch(subscription)
+        try:
+            async for update in self.__source.updates():
+                if not self.__running:
+                    break
+                self.__latest[update.ticker_symbol] = update
+                for subscription in self.__by_symbol.get(update.ticker_symbol, ()):
+                    subscription._push(update)
+        finally:
+            self.__running = False
+            for subscribers in list(self.__by_symbol.values()):
+                for subscription in subscribers:
+                    subscription._close()
+            tasks = list(self.__tasks.values())
+            self.__tasks.clear()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        """
+        Stops the stream: the source is closed and ``run`` returns.
+        """
+        self.__running = False
+        self.__source.close()
+
+    def __start_dispatch(self, subscription):
+        self.__tasks[subscription] = asyncio.ensure_future(
+            self.__dispatch(subscription, self.__callbacks[subscription]))
+
+    async def __dispatch(self, subscription, callback):
+        async for update in subscription:
+            try:
+                result = callback(update)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.__errors.append((update, e))
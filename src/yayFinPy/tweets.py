@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+import tweepy
+from .ratelimit import RateLimiter
+from .exceptions import *
+
+
+_FILE_VERSION = 1
+
+Tweet = namedtuple('Tweet', ['id', 'text'])
+Tweet.__doc__ = """
+Named Tuple Tweet
+id -> tweet id, increasing with time
+text -> text of the tweet
+"""
+
+
+def cashtag(ticker_symbol: str) -> str:
+    """
+    Returns the cashtag searched for a ticker symbol, e.g. "$TSLA".
+    """
+    return "$" + ticker_symbol.upper()
+
+
+class TweetAPI(ABC):
+    """
+    A tweet search API. Subclasses implement ``search`` and report their
+    request budget: ``searches_per_window`` searches every ``window``
+    seconds.
+    """
+
+    searches_per_window = 180
+    window = 15 * 60
+
+    @abstractmethod
+    def search(self, query: str, count: int, since_id: int = None, max_id: int = None) -> list:
+        """
+        Returns
+        -------
+        list[Tweet]
+            up to count tweets matching the query, newest first, with an id
+            greater than since_id and at most max_id.
+        """
+
+    def rate_limit(self):
+        """
+        Returns
+        -------
+        (int, float)
+            the number of searches left in the current window and the epoch
+            time the window resets, None if unknown.
+        """
+        return None
+
+
+class TweepyAPI(TweetAPI):
+    """
+    Searches Twitter through one authenticated tweepy client.
+    """
+
+    def __init__(self, consumer_key: str, consumer_secret: str, access_token: str, access_token_secret: str,
+                 lang: str = "en"):
+        """
+        Parameters
+        ----------
+        consumer_key : str
+            twitter API consumer key
+        consumer_secret : str
+            twitter API consumer Secret
+        access_token : str
+            twitter API access token
+        access_token_secret : str
+            twitter API access token secret
+        lang : str, optional
+            Language of the tweets (default is "en")
+        """
+        auth = tweepy.OAuthHandler(consumer_key, consumer_secret)
+        auth.set_access_token(access_token, access_token_secret)
+        # the collector schedules requests itself rather than blocking here
+        self.__api = tweepy.API(auth, wait_on_rate_limit=False)
+        self.__lang = lang
+
+    def search(self, query: str, count: int, since_id: int = None, max_id: int = None) -> list:
+        # renamed search_tweets in tweepy 4
+        search = getattr(self.__api, "search_tweets", None) or self.__api.search
+        kwargs = {"q": query, "lang": self.__lang, "count": count, "result_type": "recent"}
+        if since_id is not None:
+            kwargs["since_id"] = since_id
+        if max_id is not None:
+            kwargs["max_id"] = max_id
+        return [Tweet(s.id, s.text) for s in search(**kwargs)]
+
+    def rate_limit(self):
+        response = getattr(self.__api, "last_response", None)
+        headers = getattr(response, "headers", None)
+        if not headers or "x-rate-limit-remaining" not in headers:
+            return None
+        return int(headers["x-rate-limit-remaining"]), float(headers["x-rate-limit-reset"])
+
+
+class FakeTweetAPI(TweetAPI):
+    """
+    A local stand-in API for tests, enforcing its rate limit windows like
+    Twitter does (searching over the limit raises TwitterError).
+
+    Example usage:
+
+        api = FakeTweetAPI(searches_per_window=5, window=60)
+        api.post("$TSLA", "$TSLA to the moon")
+        collector = TweetCollector(api)
+    """
+
+    def __init__(self, searches_per_window: int = 180, window: float = 15 * 60, clock=time.time):
+        """
+        Parameters
+        ----------
+        searches_per_window : int, optional
+            Searches allowed per window (default is 180)
+        window : float, optional
+            Length of a window in seconds (default is 15 minutes)
+        clock : callable, optional
+            Function returning the current time in epoch seconds
+        """
+        self.searches_per_window = searches_per_window
+        self.window = window
+        self.__clock = clock
+        self.__tweets = []
+        self.__window_start = clock()
+        self.__used = 0
+        self.searches = 0
+
+    def post(self, query: str, text: str) -> Tweet:
+        """
+        Adds a tweet found by searching query.
+        """
+        tweet = Tweet(len(self.__tweets) + 1, text)
+        self.__tweets.append((query, tweet))
+        return tweet
+
+    def __roll_window(self):
+        now = self.__clock()
+        if now >= self.__window_start + self.window:
+            self.__window_start = now
+            self.__used = 0
+
+    def search(self, query: str, count: int, since_id: int = None, max_id: int = None) -> list:
+        self.__roll_window()
+        if self.__used >= self.searches_per_window:
+            raise TwitterError(query, " Rate limit exceeded.")
+        self.__used += 1
+        self.searches += 1
+        found = [t for q, t in reversed(self.__tweets) if q == query and
+                 (since_id is None or t.id > since_id) and (max_id is None or t.id <= max_id)]
+        return found[:count]
+
+    def rate_limit(self):
+        self.__roll_window()
+        return self.searches_per_window - self.__used, self.__window_start + self.window
+
+
+class TweetCollector():
+    """
+    Collects the tweets mentioning the cashtags of many stocks through one
+    API client.
+
+    Symbols are queued and searched in turn. Every request is scheduled
+    against the API's rate limit windows: a token bucket spreads the
+    searches allowed per window, and when the API reports no searches left
+    the collector waits for the window to reset instead of failing. Results
+    are paginated from the newest tweet back to the checkpoint (the id up to
+    which every tweet of the symbol was collected), so each collection only
+    fetches tweets which are new. When ``max_pages`` runs out before the
+    checkpoint is reached, the collector remembers where it stopped and the
+    next collections page on from there; the checkpoint only moves once
+    that backlog is drained, so no tweet in between is skipped. Checkpoints
+    and the most recent tweets of each symbol can be persisted to a JSON
+    file and are reloaded from it.
+
+    Methods
+    -------
+    add(self, symbols)
+        Queues symbols (or Stock objects) for the next collection.
+
+    collect(self, symbols)
+        Searches the queued symbols and returns their new tweets.
+
+    tweets(self, ticker_symbol, limit)
+        Returns the most recent tweets collected for a symbol.
+
+    since_id(self, ticker_symbol)
+        Returns the checkpoint of a symbol.
+
+    save(self, path)
+        Writes the checkpoints and tweets to a JSON file.
+
+    Example usage:
+
+        api = TweepyAPI(consumer_key, consumer_secret, access_token, access_token_secret)
+        collector = TweetCollector(api, checkpoint_path="tweets.json")
+        new = collector.collect(["AAPL", "MSFT", "TSLA"])
+        print(collector.tweets("TSLA", 20))
+    """
+
+    def __init__(self, api: TweetAPI, checkpoint_path: str = None, count: int = 100, max_pages: int = 5,
+                 keep: int = 200, clock=time.time, sleep=time.sleep):
+        """
+        Parameters
+        ----------
+        api : TweetAPI
+            The search API client, e.g. TweepyAPI or FakeTweetAPI
+        checkpoint_path : str, optional
+            JSON file the checkpoints and tweets are loaded from (if it
+            exists) and saved to after each collection
+        count : int, optional
+            Tweets per page (default is 100)
+        max_pages : int, optional
+            Maximum number of pages searched per symbol and collection
+            (default is 5)
+        keep : int, optional
+            Number of most recent tweets kept per symbol (default is 200)
+        clock : callable, optional
+            Function returning the current time in epoch seconds
+        sleep : callable, optional
+            Function sleeping for a number of seconds
+
+        Raises
+        ------
+        InputError
+            If the checkpoint file cannot be read.
+        ParsingError
+            If the checkpoint file is not a saved TweetCollector.
+        """
+        if count < 1 or max_pages < 1:
+            raise InputError("Invalid count or max_pages", "Needs to be >= 1")
+        self.__api = api
+        self.__path = checkpoint_path
+        self.__count = count
+        self.__max_pages = max_pages
+        self.__keep = keep
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__limiter = RateLimiter(api.searches_per_window / float(api.window),
+                                     capacity=api.searches_per_window, clock=clock, sleep=sleep)
+        self.__queue = deque()
+        self.__queued = set()
+        self.__since_id = dict()
+        # key: symbol, value: (max_id, newest id) of a backlog being paged
+        self.__backlog = dict()
+        self.__tweets = dict()
+        self.__failed = dict()
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            self.__load(checkpoint_path)
+
+    @property
+    def pending(self):
+        """
+        Returns
+        -------
+        list[str]
+            the symbols queued for the next collection.
+        """
+        return list(self.__queue)
+
+    @property
+    def failed(self):
+        """
+        Returns
+        -------
+        dict
+            key: ticker symbol, value: error, for the symbols whose search
+            failed in the last ``collect``; their checkpoint is unchanged.
+        """
+        return dict(self.__failed)
+
+    def add(self, symbols):
+        """
+        Queues symbols for the next collection.
+
+        Parameters
+        ----------
+        symbols : iterable of str or Stock
+            The ticker symbols, or objects with a ``ticker_symbol``
+        """
+        for s in symbols:
+            symbol = s if isinstance(s, str) else s.ticker_symbol
+            if symbol not in self.__queued:
+                self.__queued.add(symbol)
+                self.__queue.append(symbol)
+
+    def since_id(self, ticker_symbol: str) -> int:
+        """
+        Returns
+        -------
+        int
+            the checkpoint of the symbol: every tweet up to this id was
+            collected, None if none was.
+        """
+        return self.__since_id.get(ticker_symbol)
+
+    def tweets(self, ticker_symbol: str, limit: int = None) -> list:
+        """
+        Returns
+        -------
+        list[str]
+            the text of the most recent tweets collected for the symbol,
+            newest first.
+        """
+        return [t.text for t in self.__tweets.get(ticker_symbol, [])[:limit]]
+
+    def __schedule(self):
+        status = self.__api.rate_limit()
+        if status is not None:
+            remaining, reset = status
+            now = self.__clock()
+            if remaining <= 0 and reset > now:
+                self.__sleep(reset - now)
+        self.__limiter.acquire()
+
+    def __search(self, symbol):
+        since_id = self.__since_id.get(symbol)
+        max_id, newest = self.__backlog.get(symbol, (None, None))
+        found = []
+        for _ in range(self.__max_pages):
+            self.__schedule()
+            page = self.__api.search(cashtag(symbol), self.__count, since_id=since_id, max_id=max_id)
+            found.extend(page)
+            if len(page) < self.__count:
+                break
+            max_id = min(t.id for t in page) - 1
+        else:
+            if since_id is not None:
+                # stopped above the checkpoint, page on from here next time
+                self.__backlog[symbol] = (max_id, newest or max(t.id for t in found))
+                return found
+        self.__backlog.pop(symbol, None)
+        if found:
+            newest = max(newest or 0, max(t.id for t in found))
+        if newest is not None:
+            self.__since_id[symbol] = max(newest, since_id or 0)
+        return found
+
+    def collect(self, symbols=()) -> dict:
+        """
+        Searches all queued symbols for tweets newer than their checkpoint.
+
+        Parameters
+        ----------
+        symbols : iterable of str or Stock, optional
+            Symbols queued before collecting
+
+        Returns
+        -------
+        dict
+            key: ticker symbol, value: list of the text of the new tweets,
+            newest first; symbols whose search failed have none and are
+            listed in ``failed``.
+        """
+        self.add(symbols)
+        self.__failed = dict()
+        results = dict()
+        while self.__queue:
+            symbol = self.__queue.popleft()
+            self.__queued.discard(symbol)
+            try:
+                found = self.__search(symbol)
+            except Exception as e:
+                self.__failed[symbol] = e
+                results[symbol] = []
+                continue
+            found = sorted({t.id: t for t in found}.values(), key=lambda t: -t.id)
+            kept = {t.id: t for t in self.__tweets.get(symbol, []) + found}
+            self.__tweets[symbol] = sorted(kept.values(), key=lambda t: -t.id)[:self.__keep]
+            results[symbol] = [t.text for t in found]
+        if self.__path is not None:
+            self.save(self.__path)
+        return results
+
+    def save(self, path: str):
+        """
+        Writes the checkpoints and most recent tweets to a JSON file.
+
+        Parameters
+        ----------
+        path : str
+            The file to write
+        """
+        data = {"version": _FILE_VERSION, "since_id": self.__since_id,
+                "backlog": {s: list(b) for s, b in self.__backlog.items()},
+                "tweets": {s: [list(t) for t in tweets] for s, tweets in self.__tweets.items()}}
+        # written aside and renamed so an interrupted save keeps the old checkpoints
+        tmp = path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+
+    def __load(self, path):
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as e:
+            raise InputError(path, "Failed to read TweetCollector file. " + str(e))
+        if not isinstance(data, dict) or data.get("version") != _FILE_VERSION:
+            raise ParsingError(path, "Not a TweetCollector file of version " + str(_FILE_VERSION))
+        self.__since_id = {s: int(i) for s, i in data["since_id"].items()}
+        self.__backlog = {s: (int(m), int(n)) for s, (m, n) in data.get("backlog", {}).items()}
+        self.__tweets = {s: [Tweet(int(i), text) for i, text in tweets] for s, tweets in data["tweets"].items()}
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Part of academic course project at CMU in the course API Design and
+# Implementation - 17780 by Josh Bloch and Charlie Garrod.
+
+import numpy as np
+import pandas as pd
+from .options import OptionChain
+from .exceptions import *
+
+
+_DEFAULT_GRID = np.linspace(-0.5, 0.5, 41)
+
+
+class VolatilitySurface():
+    """
+    The implied volatility surface of an underlying, by log-moneyness
+    ln(strike / forward) and time to expiration, built from its OptionChain.
+
+    Every expiration is fitted on its own: the out of the money contracts
+    (puts below the forward, calls above) with a meaningful vega give
+    total variances (volatility squared times years) which are averaged
+    per strike, weighted by vega, and interpolated onto a fixed grid of
+    log-moneyness. The rows of the grid are cached per expiration, so when
+    the chain of one expiration is fetched again only that row is refitted.
+
+    Queries are answered for arrays of points at once: bilinear
+    interpolation of total variance, linear in log-moneyness on the grid
+    and linear in time between expirations (flat volatility outside the
+    range of expirations, flat total variance outside the grid).
+
+    Methods
+    -------
+    refresh(self, expirations, force)
+        Reloads the chain and refits the expirations which were fetched.
+
+    implied_volatility(self, strikes, years)
+        Returns the implied volatilities at strikes and times.
+
+    total_variance(self, log_moneyness, years)
+        Returns the total variances at log-moneyness and times.
+
+    grid(self)
+        Returns the grid of implied volatilities as a DataFrame.
+
+    Example usage:
+
+        surface = VolatilitySurface(Stock("AAPL").option_chain(rate=0.05))
+        vols = surface.implied_volatility(strikes=[150, 160, 170], years=[0.1, 0.25, 0.5])
+        surface.refresh()
+    """
+
+    def __init__(self, chain: OptionChain, log_moneyness=None, min_vega: float = 0.01):
+        """
+        Parameters
+        ----------
+        chain : OptionChain
+            The option chains of the underlying
+        log_moneyness : array of float, optional
+            Evenly spaced grid of log-moneyness (default is 41 points from
+            -0.5 to 0.5)
+        min_vega : float, optional
+            Contracts with a smaller vega (per unit of volatility) are left
+            out of the fit (default is 0.01)
+
+        Raises
+        ------
+        InputError
+            If the grid is not evenly spaced and increasing.
+        """
+        grid = _DEFAULT_GRID if log_moneyness is None else np.asarray(log_moneyness, dtype=np.float64)
+        steps = np.diff(grid)
+        if len(grid) < 2 or not np.all(steps > 0) or not np.allclose(steps, steps[0]):
+            raise InputError("Invalid log_moneyness", "Needs at least 2 evenly spaced increasing points")
+        self.__chain = chain
+        self.__grid = grid
+        self.__min_vega = min_vega
+        self.__rows = dict()
+        self.__fitted_at = dict()
+        self.__stacked = None
+        self.refresh()
+
+    @property
+    def log_moneyness(self):
+        """
+        Returns
+        -------
+        numpy.ndarray
+            the log-moneyness of the grid columns.
+        """
+        return self.__grid.copy()
+
+    @property
+    def expirations(self):
+        """
+        Returns
+        -------
+        list[str]
+            the expirations of the grid rows, nearest first.
+        """
+        return [e for e, _ in sorted(self.__rows.items(), key=lambda kv: kv[1][0])]
+
+    def __forward(self, years):
+        chain = self.__chain
+        return chain.spot * np.exp((chain.rate - chain.dividend_yield) * years)
+
+    def __fit(self, contracts):
+        """
+        Returns the years and grid row of total variance of one expiration,
+        None if it has no usable contract.
+        """
+        years = float(contracts["Years"].iloc[0])
+        strike = contracts["Strike"].to_numpy(dtype=np.float64)
+        x = np.log(strike / self.__forward(years))
+        otm = np.where(contracts["Type"].to_numpy() == "call", x >= 0, x < 0)
+        sigma = contracts["Implied Volatility"].to_numpy(dtype=np.float64)
+        vega = contracts["Vega"].to_numpy(dtype=np.float64)
+        use = otm & np.isfinite(sigma) & np.isfinite(vega) & (vega >= self.__min_vega)
+        if not use.any():
+            return None
+        strikes, inverse = np.unique(x[use], return_inverse=True)
+        weight = np.bincount(inverse, weights=vega[use])
+        variance = np.bincount(inverse, weights=vega[use] * sigma[use] ** 2 * years) / weight
+        return years, np.interp(self.__grid, strikes, variance)
+
+    def refresh(self, expirations=None, force: bool = False) -> list:
+        """
+        Loads the chain (fetching expirations whose cache expired) and
+        refits the expirations fetched since they were last fitted.
+
+        Parameters
+        ----------
+        expirations : iterable of str, optional
+            The expirations to load (default is all)
+        force : bool, optional
+            Fetch the expirations even if cached (default is False)
+
+        Returns
+        -------
+        list[str]
+            the expirations refitted.
+        """
+        fetched = set(self.__chain.load(expirations, force=force))
+        changed = [e for e in self.__chain.expirations if e in fetched or
+                   (self.__chain.fetched_at(e) is not None and self.__chain.fetched_at(e) != self.__fitted_at.get(e))]
+        if not changed:
+            return []
+        frame = self.__chain.to_dataframe()
+        for e in changed:
+            row = self.__fit(frame[frame["Expiration"] == e]) if (frame["Expiration"] == e).any() else None
+            if row is None:
+                self.__rows.pop(e, None)
+            else:
+                self.__rows[e] = row
+            self.__fitted_at[e] = self.__chain.fetched_at(e)
+        self.__stacked = None
+        return changed
+
+    def __surface(self):
+        if self.__stacked is None:
+            if not self.__rows:
+                raise InputError(self.__chain.ticker_symbol, "No option quotes to build a volatility surface")
+            rows = sorted(self.__rows.values(), key=lambda r: r[0])
+            self.__stacked = (np.array([r[0] for r in rows]), np.vstack([r[1] for r in rows]))
+        return self.__stacked
+
+    def total_variance(self, log_moneyness, years) -> np.ndarray:
+        """
+        Interpolates total variance (volatility squared times years).
+
+        Parameters
+        ----------
+        log_moneyness : array of float
+            ln(strike / forward) of the points
+        years : array of float
+            Time to expiration of the points, > 0
+
+        Returns
+        -------
+        numpy.ndarray
+            the total variances, broadcast to the shape of the inputs.
+        """
+        x, years = np.broadcast_arrays(np.asarray(log_moneyness, dtype=np.float64),
+                                       np.asarray(years, dtype=np.float64))
+        expiry_years, variance = self.__surface()
+        grid = self.__grid
+
+        # position in the grid of log-moneyness
+        pos = (np.clip(x, grid[0], grid[-1]) - grid[0]) / (grid[1] - grid[0])
+        i = np.clip(np.floor(pos).astype(np.int64), 0, len(grid) - 2)
+        fx = pos - i
+
+        def row_variance(j):
+            return variance[j, i] * (1 - fx) + variance[j, i + 1] * fx
+
+        if len(expiry_years) == 1:
+            return row_variance(np.zeros(x.shape, dtype=np.int64)) * years / expiry_years[0]
+
+        j = np.clip(np.searchsorted(expiry_years, years) - 1, 0, len(expiry_years) - 2)
+        t0, t1 = expiry_years[j], expiry_years[j + 1]
+        w0, w1 = row_variance(j), row_variance(j + 1)
+        ft = (years - t0) / (t1 - t0)
+        # flat volatility before the first and after the last expiration
+        return np.where(years < expiry_years[0], w0 * years / t0,
+                        np.where(years > expiry_years[-1], w1 * years / t1, w0 + (w1 - w0) * ft))
+
+    def implied_volatility(self, strikes, years) -> np.ndarray:
+        """
+        Interpolates implied volatility.
+
+        Parameters
+        ----------
+        strikes : array of float
+            Strikes of the points
+        years : array of float
+            Time to expiration of the points, > 0
+
+        Returns
+        -------
+        numpy.ndarray
+            the implied volatilities, broadcast to the shape of the inputs.
+        """
+        strikes, years = np.broadcast_arrays(np.asarray(strikes, dtype=np.float64),
+                                             np.asarray(years, dtype=np.float64))
+        if np.any(years <= 0) or np.any(strikes <= 0):
+            raise InputError("Invalid strikes or years", "Needs to be > 0")
+        variance = self.total_variance(np.log(strikes / self.__forward(years)), years)
+        return np.sqrt(np.maximum(variance, 0) / years)
+
+    def grid(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            the implied volatility of the grid, one row per expiration
+            (nearest first), one column per log-moneyness.
+        """
+        expiry_years, variance = self.__surface()
+        return pd.DataFrame(np.sqrt(np.maximum(variance, 0) / expiry_years[:, None]),
+                            index=pd.Index(self.expirations, name="Expiration"),
+                            columns=pd.Index(self.__grid, name="Log Moneyness"))
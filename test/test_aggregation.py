@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from yayFinPy.aggregation import *
+from yayFinPy.exceptions import *
+
+class FakeCompanyData:
+	def __init__(self, industry_sector, country):
+		self.industry_sector = industry_sector
+		self.country = country
+
+class FakeStock:
+	def __init__(self, ticker_symbol, price, closing_price, volume, market_cap, pe_ratio, sector, country):
+		self.ticker_symbol = ticker_symbol
+		self.price = price
+		self.closing_price = closing_price
+		self.volume = volume
+		self.market_cap = market_cap
+		self.pe_ratio = pe_ratio
+		self.company_data = FakeCompanyData(sector, country)
+
+SECTORS = ["Technology", "Energy", "Healthcare", None]
+COUNTRIES = ["United States", "Canada", "Japan"]
+
+def universe(n, rnd):
+	return [FakeStock("S%d" % i, rnd.uniform(10, 100), rnd.uniform(10, 100), rnd.uniform(1e5, 1e7),
+					  rnd.uniform(1e8, 1e11), None if i % 7 == 0 else rnd.uniform(5, 40),
+					  SECTORS[rnd.randint(0, 3)], COUNTRIES[rnd.randint(0, 2)]) for i in range(n)]
+
+def expected(stocks, by):
+	frame = pd.DataFrame({"group": [getattr(s.company_data, by) for s in stocks],
+						  "market_cap": [s.market_cap for s in stocks],
+						  "volume": [s.volume for s in stocks],
+						  "ret": [s.price / s.closing_price - 1 for s in stocks],
+						  "pe": [np.nan if s.pe_ratio is None else s.pe_ratio for s in stocks]}).dropna(subset=["group"])
+	frame["wr"] = frame["ret"] * frame["volume"]
+	grouped = frame.groupby("group")
+	return pd.DataFrame({"Count": grouped.size(), "Market Cap": grouped["market_cap"].sum(),
+						 "Volume Weighted Return": grouped["wr"].sum() / grouped["volume"].sum(),
+						 "Mean PE": grouped["pe"].mean()})
+
+def matches(aggregator, stocks):
+	for by in GROUPINGS:
+		got = aggregator.aggregate(by).sort_index()
+		want = expected(stocks, by).sort_index()
+		assert(list(got.index) == list(want.index))
+		assert((got["Count"].values == want["Count"].values).all())
+		for c in ("Market Cap", "Volume Weighted Return", "Mean PE"):
+			assert(np.allclose(got[c].values, want[c].values, rtol=1e-9))
+
+def test_aggregate():
+	try:
+		rnd = np.random.RandomState(0)
+		stocks = universe(1000, rnd)
+		matches(UniverseAggregator(stocks), stocks)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_aggregate: ", e)
+	return 0
+
+def test_incremental_updates():
+	try:
+		rnd = np.random.RandomState(1)
+		stocks = universe(500, rnd)
+		aggregator = UniverseAggregator(stocks)
+		for _ in range(20):
+			refreshed = universe(500, rnd)
+			picks = rnd.choice(500, 10, replace=False)
+			for i in picks:
+				stocks[i] = refreshed[i]
+			aggregator.update_securities([stocks[i] for i in picks])
+			matches(aggregator, stocks)
+		aggregator.update("S1", price=stocks[1].closing_price * 1.1)
+		stocks[1].price = stocks[1].closing_price * 1.1
+		aggregator.remove("S2")
+		matches(aggregator, stocks[:2] + stocks[3:])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_incremental_updates: ", e)
+	return 0
+
+def test_invalid_grouping():
+	try:
+		UniverseAggregator().aggregate("exchange")
+	except InputError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_invalid_grouping: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_aggregate())
+	success.append(test_incremental_updates())
+	success.append(test_invalid_grouping())
+	print("Aggregation Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import talib
+from yayFinPy.alerts import *
+
+DAY = 86400
+
+def closes(values):
+	return pd.Series(values, index=pd.to_datetime(np.arange(len(values)) * DAY, unit="s", utc=True))
+
+def test_price_alerts():
+	try:
+		engine = AlertEngine()
+		fired = []
+		below = engine.add_alert("AAPL", "< 150", callback=fired.append)
+		engine.add_alert("AAPL", "price <= 140")
+		above = engine.add_alert("BTC-USD", "> 70000")
+		assert(engine.update("AAPL", 155) == [])
+		events = engine.update("AAPL", 149.5)
+		assert([e.alert.alert_id for e in events] == [below])
+		assert(fired[0].value == 149.5)
+		assert(len(engine.update("AAPL", 140)) == 1)
+		assert(engine.update("AAPL", 100) == [])
+		assert(engine.update("BTC-USD", 70000) == [])
+		assert(engine.update("BTC-USD", 70000.01)[0].alert.alert_id == above)
+		assert(len(engine) == 0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_price_alerts: ", e)
+	return 0
+
+def test_many_thresholds():
+	try:
+		engine = AlertEngine()
+		rng = np.random.default_rng(7)
+		thresholds = rng.uniform(0, 1000, 20000)
+		for i, t in enumerate(thresholds):
+			engine.add_alert("X", ("< %r" if i % 2 else "> %r") % t)
+		removed = engine.add_alert("X", "> 1")
+		engine.remove_alert(removed)
+		triggered = len(engine.update("X", 500.0))
+		expected = np.sum((thresholds > 500)[1::2]) + np.sum((thresholds < 500)[0::2])
+		assert(triggered == expected)
+		assert(len(engine) == 20000 - expected)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_many_thresholds: ", e)
+	return 0
+
+def test_incremental_indicators():
+	try:
+		rng = np.random.default_rng(1)
+		values = 100 + rng.standard_normal(60).cumsum()
+		engine = AlertEngine(history_loader=lambda t: closes(values[:40]))
+		engine.add_alert("AAPL", "RSI(14) > 1000")
+		engine.add_alert("AAPL", "SMA(10) > 1000")
+		rsi, sma = [], []
+		engine.add_alert("AAPL", "RSI(14) < 1000", callback=lambda e: rsi.append(e.value))
+		engine.add_alert("AAPL", "SMA(10) < 1000", callback=lambda e: sma.append(e.value))
+		engine.update("AAPL", values[39], 39 * DAY + 100)
+		assert(abs(rsi[0] - talib.RSI(values[:40], timeperiod=14)[-1]) < 1e-9)
+		assert(abs(sma[0] - talib.SMA(values[:40], timeperiod=10)[-1]) < 1e-9)
+		for day in range(40, 60):
+			# the first update of the day is replaced by the later one
+			engine.update("AAPL", values[day] + 5, day * DAY + 100)
+			engine.add_alert("AAPL", "RSI(14) < 1000", callback=lambda e: rsi.append(e.value))
+			engine.add_alert("AAPL", "SMA(10) < 1000", callback=lambda e: sma.append(e.value))
+			engine.update("AAPL", values[day], day * DAY + 200)
+		assert(np.allclose(rsi[1:], talib.RSI(values, timeperiod=14)[40:]))
+		assert(np.allclose(sma[1:], talib.SMA(values, timeperiod=10)[40:]))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_incremental_indicators: ", e)
+	return 0
+
+def test_raising_callback():
+	try:
+		engine = AlertEngine()
+		fired = []
+		def broken(event):
+			raise ValueError("bad callback")
+		first = engine.add_alert("AAPL", "< 150", callback=broken)
+		engine.add_alert("AAPL", "< 160", callback=fired.append)
+		engine.add_alert("AAPL", "< 170", callback=fired.append)
+		assert(len(engine.update("AAPL", 140)) == 3)
+		assert(len(fired) == 2)
+		assert(len(engine.errors) == 1 and engine.errors[0][0].alert.alert_id == first)
+		assert(isinstance(engine.errors[0][1], ValueError))
+		assert(len(engine) == 0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_raising_callback: ", e)
+	return 0
+
+def test_invalid_condition():
+	try:
+		AlertEngine().add_alert("AAPL", "RSI(14) ~ 30")
+		print("Test Failed: test_invalid_condition")
+		return 0
+	except ParsingError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_price_alerts())
+	success.append(test_many_thresholds())
+	success.append(test_incremental_indicators())
+	success.append(test_raising_callback())
+	success.append(test_invalid_condition())
+	print("Alerts Test Done: (%d/%d) Successful"%(sum(success), len(success)))
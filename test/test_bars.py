@@ -0,0 +1,129 @@
+import time
+import numpy as np
+import pandas as pd
+from yayFinPy.bars import *
+
+def test_minute_bars():
+	try:
+		aggregator = BarAggregator(Interval.MINUTE_1)
+		closed = aggregator.add_ticks(["AAPL", "AAPL", "MSFT", "AAPL"], [10.0, 12.0, 50.0, 11.0],
+									  [100, 300, 10, 100], [0.0, 10.0, 20.0, 59.0])
+		assert(len(closed) == 0)
+		bar = aggregator.current_bar("AAPL")
+		assert((bar["Open"], bar["High"], bar["Low"], bar["Close"], bar["Volume"], bar["Trades"]) ==
+			   (10.0, 12.0, 10.0, 11.0, 500.0, 3))
+		assert(abs(bar["VWAP"] - 11.4) < 1e-9)
+		closed = aggregator.add_tick("AAPL", 13.0, 50, 61.0)
+		assert([bar["Ticker Symbol"] for bar in closed] == ["AAPL", "MSFT"])
+		assert([bar["Close"] for bar in closed] == [11.0, 50.0])
+		assert(closed[0]["Datetime"] == pd.Timestamp(0, unit="s", tz="UTC"))
+		assert(abs(closed[0]["VWAP"] - 11.4) < 1e-9 and closed[0]["Trades"] == 3)
+		assert(aggregator.add_tick("AAPL", 14.0, 10, 62.0) == [])
+		assert(aggregator.current_bar("MSFT") is None)
+		assert(aggregator.current_bar("AAPL")["Open"] == 13.0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_minute_bars: ", e)
+	return 0
+
+def test_batch_matches_single_ticks():
+	try:
+		rng = np.random.default_rng(3)
+		n = 5000
+		symbols = rng.choice(["A", "B", "C", "D"], n)
+		prices = 100 + rng.standard_normal(n).cumsum()
+		volumes = rng.integers(1, 100, n)
+		timestamps = np.sort(rng.uniform(0, 3600, n))
+		batch = BarAggregator(Interval.MINUTE_5)
+		frames = [batch.add_ticks(symbols[i:i + 700], prices[i:i + 700], volumes[i:i + 700], timestamps[i:i + 700])
+				  for i in range(0, n, 700)]
+		single = BarAggregator(Interval.MINUTE_5)
+		for i in range(n):
+			single.add_tick(symbols[i], prices[i], volumes[i], timestamps[i])
+		for s in ["A", "B", "C", "D"]:
+			assert(len(batch.bars(s)) == 11)
+			assert(np.allclose(batch.bars(s).values.astype(float), single.bars(s).values.astype(float)))
+		expected = pd.DataFrame({"Close": prices, "Volume": volumes, "Ticker Symbol": symbols},
+								index=pd.to_datetime(timestamps, unit="s", utc=True))
+		a = expected[expected["Ticker Symbol"] == "A"]
+		assert(np.allclose(batch.bars("A")["Close"], a["Close"].resample("5min").last().iloc[:11]))
+		assert(np.allclose(batch.bars("A")["Volume"], a["Volume"].resample("5min").sum().iloc[:11]))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_batch_matches_single_ticks: ", e)
+	return 0
+
+def test_late_ticks_dropped():
+	try:
+		aggregator = BarAggregator(Interval.MINUTE_1)
+		aggregator.add_ticks(["AAPL", "AAPL"], [1.0, 2.0], [1, 1], [0.0, 70.0])
+		aggregator.add_tick("AAPL", 5.0, 1, 30.0)
+		assert(aggregator.dropped == 1)
+		assert(list(aggregator.bars("AAPL")["Close"]) == [1.0])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_late_ticks_dropped: ", e)
+	return 0
+
+def test_throughput():
+	try:
+		rng = np.random.default_rng(0)
+		n = 1000000
+		universe = np.array(["S%d" % i for i in range(500)], dtype=object)
+		symbols = universe[rng.integers(0, 500, n)]
+		prices = rng.uniform(10, 20, n)
+		volumes = rng.integers(1, 1000, n)
+		timestamps = np.linspace(0, 3600, n)
+		aggregator = BarAggregator(Interval.MINUTE_1)
+		start = time.perf_counter()
+		for i in range(0, n, 10000):
+			aggregator.add_ticks(symbols[i:i + 10000], prices[i:i + 10000], volumes[i:i + 10000],
+								 timestamps[i:i + 10000])
+		rate = n / (time.perf_counter() - start)
+		assert(rate > 100000)
+		assert(len(aggregator.bars("S0")) == 60)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_throughput: ", e)
+	return 0
+
+def test_single_tick_throughput():
+	try:
+		rng = np.random.default_rng(1)
+		n = 200000
+		universe = ["S%d" % i for i in range(3000)]
+		symbols = [universe[i] for i in rng.integers(0, 3000, n)]
+		prices = rng.uniform(10, 20, n).tolist()
+		volumes = rng.integers(1, 1000, n).tolist()
+		timestamps = np.linspace(0, 600, n).tolist()
+		aggregator = BarAggregator(Interval.MINUTE_1)
+		closed = 0
+		start = time.perf_counter()
+		for i in range(n):
+			closed += len(aggregator.add_tick(symbols[i], prices[i], volumes[i], timestamps[i]))
+		rate = n / (time.perf_counter() - start)
+		assert(rate > 100000)
+		assert(closed == sum(len(aggregator.bars(s)) for s in universe))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_single_tick_throughput: ", e)
+	return 0
+
+def test_invalid_interval():
+	try:
+		BarAggregator(Interval.DAY_1)
+		print("Test Failed: test_invalid_interval")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_minute_bars())
+	success.append(test_batch_matches_single_ticks())
+	success.append(test_late_ticks_dropped())
+	success.append(test_throughput())
+	success.append(test_single_tick_throughput())
+	success.append(test_invalid_interval())
+	print("Bars Test Done: (%d/%d) Successful"%(sum(success), len(success)))
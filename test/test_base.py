@@ -1,7 +1,9 @@
+from datetime import date
+import pandas as pd
 from decimal import Decimal
 from yayFinPy.currency import Currency
 from yayFinPy.stock import Stock
-from yayFinPy.enumerations import QuoteType, Duration
+from yayFinPy.enumerations import QuoteType, Duration, Interval
 
 
 def test_base_methods1():
@@ -74,11 +76,24 @@ def test_base_indicators2():
         print("Test Failed: test_base_indicators2", e)
     return 0
 
+def test_download_data_empty_range():
+    try:
+        stock = Stock("AAPL")
+        # ranges too short to be split into request windows are passed on as before
+        assert (isinstance(stock.download_data(start=date.today(), interval=Interval.MINUTE_1), pd.DataFrame))
+        assert (isinstance(stock.download_data(start=date(2021, 5, 3), end=date(2021, 5, 3),
+                                               interval=Interval.MINUTE_5), pd.DataFrame))
+        return 1
+    except Exception as e:
+        print("Test Failed: test_download_data_empty_range", e)
+    return 0
+
 if __name__ == '__main__':
     success = []
     success.append(test_base_methods1())
     success.append(test_base_methods2())
     success.append(test_base_indicators1())
     success.append(test_base_indicators2())
+    success.append(test_download_data_empty_range())
     success.append(test_baseclass_failure())
     print("Base Test Done: (%d/%d) Successful"%(sum(success), len(success)))
\ No newline at end of file
@@ -0,0 +1,75 @@
+import copy
+import pickle
+from yayFinPy.stock import *
+
+def company(name="Apple Inc.", sector="Technology", country="United States", profits=0.25):
+	return CompanyData(name, "One Apple Park Way", "Designs phones.", "https://logo.clearbit.com/apple.com",
+					   sector, profits, country, "https://www.apple.com")
+
+def test_value_type():
+	try:
+		data = company()
+		assert(data == company())
+		assert(hash(data) == hash(company()))
+		assert(data != company(profits=0.3))
+		assert(len(set([data, company(), company(name="Microsoft")])) == 2)
+		assert(copy.deepcopy(data) is data)
+		assert(pickle.loads(pickle.dumps(data)) == data)
+		assert(data.website == data.wesbite)
+		assert(str(data).startswith("Company Name: Apple Inc.\naddress: One Apple Park Way"))
+		assert(not hasattr(data, "__dict__"))
+		missing = company(profits=float("nan"))
+		assert(missing == company(profits=float("nan")))
+		assert(hash(missing) == hash(company(profits=float("nan"))))
+		assert(len(set([missing, company(profits=float("nan"))])) == 1)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_value_type: ", e)
+	return 0
+
+def test_immutable():
+	try:
+		company().name = "Other"
+		print("Test Failed: test_immutable")
+		return 0
+	except AttributeError:
+		return 1
+	return 0
+
+def test_table():
+	try:
+		data = {"S%d" % i: company(name="Company %d" % i, sector=["Technology", "Energy"][i % 2], profits=i / 100)
+				for i in range(1000)}
+		table = CompanyDataTable(data)
+		assert(len(table) == 1000)
+		assert("S10" in table)
+		assert(table["S10"] == data["S10"])
+		sectors = table.column("industry_sector")
+		assert(len(sectors.categories) == 2)
+		assert(list(sectors[:3]) == ["Technology", "Energy", "Technology"])
+		assert(table.column("profits")[999] == 9.99)
+		assert(CompanyDataTable({"X": company(profits=None)})["X"].profits is None)
+		frame = table.to_dataframe()
+		assert(frame.loc["S3", "name"] == "Company 3")
+		assert((frame["industry_sector"] == "Energy").sum() == 500)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_table: ", e)
+	return 0
+
+def test_table_missing_ticker():
+	try:
+		CompanyDataTable({"AAPL": company()})["MSFT"]
+		print("Test Failed: test_table_missing_ticker")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_value_type())
+	success.append(test_immutable())
+	success.append(test_table())
+	success.append(test_table_missing_ticker())
+	print("CompanyData Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from yayFinPy.correlation import *
+from yayFinPy.history import aligned_closes
+from yayFinPy.exceptions import *
+
+class FakeSecurity:
+	def __init__(self, ticker_symbol, close):
+		self.ticker_symbol = ticker_symbol
+		self.close = close
+	def historical_data(self, duration, interval):
+		return pd.DataFrame({"Close": self.close})
+
+def universe(n=6, dates=200, missing=False):
+	rnd = np.random.RandomState(0)
+	index = pd.bdate_range("2023-01-02", periods=dates)
+	market = rnd.normal(0, 0.01, dates)
+	returns = market[:, None] * rnd.uniform(0.5, 1.5, n) + rnd.normal(0, 0.01, (dates, n))
+	closes = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index,
+						  columns=["S%d" % i for i in range(n)])
+	closes["^GSPC"] = 4000 * np.exp(np.cumsum(market))
+	if missing:
+		closes.iloc[:30, 0] = np.nan
+		closes.iloc[rnd.choice(dates, 20, replace=False), 2] = np.nan
+	return closes
+
+def test_full_matrices():
+	try:
+		for missing in (False, True):
+			closes = universe(missing=missing)
+			returns = np.log(closes).diff().iloc[1:]
+			engine = CorrelationEngine(closes)
+			assert(np.allclose(engine.correlation().values, returns.corr().values, atol=1e-10))
+			assert(np.allclose(engine.covariance().values, returns.cov().values, atol=1e-12))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_full_matrices: ", e)
+	return 0
+
+def test_rolling_matrices():
+	try:
+		for missing in (False, True):
+			closes = universe(missing=missing)
+			returns = np.log(closes).diff().iloc[1:]
+			engine = CorrelationEngine(closes)
+			expected = returns.rolling(60, min_periods=40).corr()
+			seen = 0
+			for date, matrix in engine.iter_rolling(60, step=7, min_periods=40):
+				assert(np.allclose(matrix, expected.loc[date].values, atol=1e-8, equal_nan=True))
+				seen += 1
+			assert(seen == len(range(59, len(returns), 7)))
+			cov = list(engine.iter_rolling(60, step=60, kind="covariance", min_periods=2))
+			assert(np.allclose(cov[1][1], returns.iloc[60:120].cov().values, atol=1e-12, equal_nan=True))
+		# long enough for the sums to be summed again from scratch
+		closes = universe(dates=700)
+		returns = np.log(closes).diff().iloc[1:]
+		expected = returns.rolling(20).corr()
+		for date, matrix in CorrelationEngine(closes).iter_rolling(20):
+			assert(np.allclose(matrix, expected.loc[date].values, atol=1e-8))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_rolling_matrices: ", e)
+	return 0
+
+def test_betas():
+	try:
+		closes = universe(missing=True)
+		returns = np.log(closes).diff().iloc[1:]
+		engine = CorrelationEngine(closes)
+		beta = engine.rolling_beta("^GSPC", 60)
+		market = returns["^GSPC"]
+		for t in ("S1", "S2"):
+			expected = returns[t].rolling(60).cov(market) / market.rolling(60).var()
+			assert(np.allclose(beta[t].values, expected.values, atol=1e-8, equal_nan=True))
+		corr = engine.rolling_correlation_to("^GSPC", 60)
+		assert(np.allclose(corr["S1"].values, returns["S1"].rolling(60).corr(market).values, atol=1e-8, equal_nan=True))
+		full = engine.beta("^GSPC")
+		assert(abs(full["S1"] - returns["S1"].cov(market) / market.var()) < 1e-10)
+		assert(abs(full["^GSPC"] - 1) < 1e-12)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_betas: ", e)
+	return 0
+
+def test_aligned_closes_and_export():
+	try:
+		closes = universe()
+		us = closes.index.tz_localize("America/New_York")
+		securities = [FakeSecurity(t, pd.Series(closes[t].values, index=us)) for t in closes.columns]
+		# a security without a bar on some dates
+		securities.append(FakeSecurity("FX", pd.Series(closes["S1"].values[::2], index=closes.index[::2])))
+		aligned = aligned_closes(securities)
+		assert(list(aligned.columns) == list(closes.columns) + ["FX"])
+		assert(aligned["FX"].iloc[:-1].notna().all() and aligned["FX"].iloc[1] == aligned["FX"].iloc[0])
+		engine = CorrelationEngine(aligned)
+		path = os.path.join(tempfile.mkdtemp(), "rolling.npz")
+		engine.export_rolling(path, window=60, step=10)
+		dates, tickers, matrices = load_rolling(path)
+		expected = list(engine.iter_rolling(60, step=10))
+		assert(tickers == engine.tickers and list(dates) == [d for d, _ in expected])
+		assert(np.allclose(matrices[-1], expected[-1][1], atol=1e-6))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_aligned_closes_and_export: ", e)
+	return 0
+
+def test_unknown_benchmark():
+	try:
+		CorrelationEngine(universe()).rolling_beta("^DJI")
+	except InputError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_unknown_benchmark: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_full_matrices())
+	success.append(test_rolling_matrices())
+	success.append(test_betas())
+	success.append(test_aligned_closes_and_export())
+	success.append(test_unknown_benchmark())
+	print("Correlation Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from yayFinPy.fundamentals import *
+from yayFinPy.ratelimit import RateLimiter
+
+PERIODS = pd.to_datetime(["2020-09-26", "2019-09-28"])
+
+def fake_statement(ticker_symbol, statement):
+	if ticker_symbol == "BAD":
+		raise KeyError("no data")
+	scale = float(len(ticker_symbol))
+	if statement == Statement.EARNINGS:
+		return pd.DataFrame({"Revenue": [1.0, 2.0], "Earnings": [0.5, np.nan]}, index=pd.Index([2019, 2020], name="Year"))
+	if statement == Statement.MAJOR_HOLDERS:
+		major = pd.DataFrame({"Value": [0.0007, 5470.0]}, index=["insidersPercentHeld", "institutionsCount"])
+		major.columns.name = "Breakdown"
+		return major
+	if statement == Statement.INSTITUTIONAL_HOLDERS:
+		return pd.DataFrame({"Holder": ["Vanguard", "Blackrock"], "Shares": [100, 50],
+							 "Date Reported": pd.to_datetime(["2021-03-31", "2021-03-31"])})
+	return pd.DataFrame([[scale * 10, scale * 9], [scale, np.nan]], index=["Total Revenue", "Net Income"],
+						columns=PERIODS)
+
+def test_panel():
+	try:
+		tickers = ["AAPL", "GOOG", "MSFT", "FB", "BAD"]
+		loader = FundamentalsLoader(max_workers=4, limiter=RateLimiter(1000, capacity=1000), fetcher=fake_statement)
+		panel = loader.load(tickers, [Statement.FINANCIALS, Statement.BALANCE_SHEET])
+		assert(list(panel.columns) == PANEL_COLUMNS)
+		assert(len(panel) == 4 * 2 * 3)
+		assert(list(loader.failed.keys()) == ["BAD"])
+		assert(panel["Line Item"].dtype.name == "category")
+		revenue = FundamentalsLoader.cross_section(panel, "Total Revenue", Statement.FINANCIALS)
+		assert(revenue["AAPL"] == 40.0 and revenue["FB"] == 20.0)
+		old = FundamentalsLoader.cross_section(panel, "Total Revenue", period="2019-09-28")
+		assert(old["GOOG"] == 36.0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_panel: ", e)
+	return 0
+
+def test_other_statements():
+	try:
+		earnings = to_long("AAPL", Statement.EARNINGS, fake_statement("AAPL", Statement.EARNINGS))
+		assert(len(earnings) == 3)
+		assert(earnings["Period"].iloc[0] == pd.Timestamp("2019-01-01"))
+		major = to_long("AAPL", Statement.MAJOR_HOLDERS, fake_statement("AAPL", Statement.MAJOR_HOLDERS))
+		assert(np.allclose(major["Value"], [0.0007, 5470]))
+		assert(list(major["Line Item"]) == ["insidersPercentHeld", "institutionsCount"])
+		old_layout = pd.DataFrame([["0.07%", "% of Shares Held by All Insider"], ["5,470", "Number of Institutions Holding Shares"]])
+		major = to_long("AAPL", Statement.MAJOR_HOLDERS, old_layout)
+		assert(np.allclose(major["Value"], [0.0007, 5470]))
+		holders = to_long("AAPL", Statement.INSTITUTIONAL_HOLDERS,
+						  fake_statement("AAPL", Statement.INSTITUTIONAL_HOLDERS))
+		assert(list(holders["Line Item"]) == ["Vanguard", "Blackrock"])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_other_statements: ", e)
+	return 0
+
+def test_invalid_statement():
+	try:
+		FundamentalsLoader(fetcher=fake_statement).load(["AAPL"], ["financials"])
+		print("Test Failed: test_invalid_statement")
+		return 0
+	except ParsingError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_panel())
+	success.append(test_other_statements())
+	success.append(test_invalid_statement())
+	print("Fundamentals Test Done: (%d/%d) Successful"%(sum(success), len(success)))
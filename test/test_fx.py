@@ -0,0 +1,54 @@
+from yayFinPy.fx import FxRateCache
+from yayFinPy.exceptions import *
+
+def test_same_currency():
+	try:
+		cache = FxRateCache()
+		rates = cache.rates({"USD"}, "USD")
+		assert(rates == {"USD": 1.0})
+		return 1
+	except Exception as e:
+		print("Test Failed: test_same_currency: ", e)
+	return 0
+
+def test_minor_units():
+	try:
+		cache = FxRateCache()
+		rates = cache.rates({"GBp", "GBP"}, "GBP")
+		assert(rates["GBP"] == 1.0)
+		assert(rates["GBp"] == 0.01)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_minor_units: ", e)
+	return 0
+
+def test_rates():
+	try:
+		cache = FxRateCache()
+		rates = cache.rates({"EUR", "JPY", "USD"}, "USD")
+		assert(len(rates) == 3)
+		assert(rates["USD"] == 1.0)
+		assert(rates["EUR"] > rates["JPY"] > 0)
+		assert(cache.rates({"EUR"}, "USD")["EUR"] == rates["EUR"])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_rates: ", e)
+	return 0
+
+def test_invalid_pair():
+	try:
+		cache = FxRateCache()
+		cache.rates({"XXXINVALID"}, "USD")
+		print("Test Failed: test_invalid_pair")
+		return 0
+	except YfinanceError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_same_currency())
+	success.append(test_minor_units())
+	success.append(test_rates())
+	success.append(test_invalid_pair())
+	print("FX Test Done: (%d/%d) Successful"%(sum(success), len(success)))
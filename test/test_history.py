@@ -0,0 +1,84 @@
+import threading
+import numpy as np
+import pandas as pd
+from yayFinPy.history import *
+from yayFinPy.ratelimit import RateLimiter
+
+def minute_bars(ticker_symbol, start, end, interval):
+	# overlapping by one bar on both sides, like Yahoo's inclusive windows
+	index = pd.date_range(start - pd.Timedelta(minutes=1), end, freq="1min")
+	close = (index.asi8 // 60000000000).astype(np.float64)
+	return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+						 "Volume": np.ones(len(index))}, index=index)
+
+def test_date_windows():
+	try:
+		windows = date_windows("2021-01-01", "2021-01-31", Interval.MINUTE_1)
+		assert(len(windows) == 5)
+		assert(windows[0][0] == pd.Timestamp("2021-01-01"))
+		assert(windows[-1][1] == pd.Timestamp("2021-01-31"))
+		assert(all(a[1] == b[0] for a, b in zip(windows, windows[1:])))
+		assert(len(date_windows("2021-01-01", "2021-06-01", Interval.MINUTE_5)) == 3)
+		assert(len(date_windows("2000-01-01", "2021-01-01", Interval.DAY_1)) == 1)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_date_windows: ", e)
+	return 0
+
+def test_chunks_ordered_and_deduplicated():
+	try:
+		chunks = list(iter_history("AAPL", "2021-01-01", "2021-03-01", Interval.MINUTE_1, max_workers=4,
+								   limiter=RateLimiter(1000, capacity=1000), fetcher=minute_bars))
+		assert(len(chunks) == 9)
+		data = pd.concat(chunks)
+		assert(data.index.is_unique)
+		assert(data.index.is_monotonic_increasing)
+		assert(data.index[0] == pd.Timestamp("2020-12-31 23:59"))
+		assert(len(data) == 59 * 24 * 60 + 2)
+		assert(download_history("AAPL", "2021-01-01", "2021-03-01", fetcher=minute_bars,
+								limiter=RateLimiter(1000, capacity=1000)).equals(data))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_chunks_ordered_and_deduplicated: ", e)
+	return 0
+
+def test_bounded_concurrency():
+	try:
+		lock = threading.Lock()
+		active = [0, 0]
+		def fetcher(ticker_symbol, start, end, interval):
+			with lock:
+				active[0] += 1
+				active[1] = max(active[1], active[0])
+			try:
+				return minute_bars(ticker_symbol, start, start + pd.Timedelta(minutes=10), interval)
+			finally:
+				with lock:
+					active[0] -= 1
+		chunks = iter_history("AAPL", "2020-01-01", "2021-01-01", Interval.MINUTE_1, max_workers=3,
+							  limiter=RateLimiter(1000, capacity=1000), fetcher=fetcher)
+		first = next(chunks)
+		chunks.close()
+		assert(len(first) == 12)
+		assert(active[1] <= 3)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_bounded_concurrency: ", e)
+	return 0
+
+def test_invalid_range():
+	try:
+		iter_history("AAPL", "2021-02-01", "2021-01-01")
+		print("Test Failed: test_invalid_range")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_date_windows())
+	success.append(test_chunks_ordered_and_deduplicated())
+	success.append(test_bounded_concurrency())
+	success.append(test_invalid_range())
+	print("History Test Done: (%d/%d) Successful"%(sum(success), len(success)))
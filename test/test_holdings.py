@@ -0,0 +1,117 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from yayFinPy.holdings import *
+
+def holders_frame(names, shares, value=None):
+	frame = pd.DataFrame({"Holder": names, "Shares": shares, "Date Reported": pd.Timestamp("2021-03-31")})
+	if value is not None:
+		frame["Value"] = value
+	return frame
+
+def sample_index():
+	index = HoldingsIndex()
+	index.add("AAPL", holders_frame(["Vanguard", "Blackrock", "Berkshire"], [100, 80, 50], [1000, 800, 500]))
+	index.add("MSFT", holders_frame(["Vanguard", "Blackrock"], [60, 40], [600, 400]))
+	index.add("KO", holders_frame(["Berkshire", "Vanguard"], [400, 10], [4000, 100]))
+	index.add("AAPL", holders_frame(["Fidelity Contrafund"], [5], [50]), Statement.MUTUALFUND_HOLDERS)
+	return index
+
+def test_inverted_lookups():
+	try:
+		index = sample_index()
+		assert(list(index.holders("AAPL")["Holder"]) == ["Vanguard", "Blackrock", "Berkshire", "Fidelity Contrafund"])
+		holdings = index.holdings("Vanguard")
+		assert(list(holdings["Ticker Symbol"]) == ["AAPL", "MSFT", "KO"])
+		assert(holdings["Value"].sum() == 1700)
+		# re-adding the holders of a stock replaces them
+		index.add("KO", holders_frame(["Berkshire"], [400], [4000]))
+		assert(list(index.holdings("Vanguard")["Ticker Symbol"]) == ["AAPL", "MSFT"])
+		assert(len(index) == 7)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_inverted_lookups: ", e)
+	return 0
+
+def test_overlap_concentration():
+	try:
+		index = sample_index()
+		assert(index.overlap("Vanguard", "Berkshire") == ["AAPL", "KO"])
+		matrix = index.overlap_matrix(["Vanguard", "Blackrock", "Berkshire"])
+		assert(matrix.loc["Vanguard", "Vanguard"] == 3)
+		assert(matrix.loc["Blackrock", "Berkshire"] == 1)
+		hhi = index.concentration()
+		assert(hhi["Fidelity Contrafund"] == 1.0)
+		assert(abs(hhi["Berkshire"] - ((500 / 4500) ** 2 + (4000 / 4500) ** 2)) < 1e-12)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_overlap_concentration: ", e)
+	return 0
+
+def test_save_load():
+	try:
+		index = sample_index()
+		path = os.path.join(tempfile.mkdtemp(), "holders.npz")
+		index.save(path)
+		loaded = HoldingsIndex.load(path)
+		assert(loaded.holders("AAPL").equals(index.holders("AAPL")))
+		assert(loaded.overlap("Vanguard", "Blackrock") == ["AAPL", "MSFT"])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_save_load: ", e)
+	return 0
+
+def test_bad_frame_keeps_holders():
+	try:
+		index = sample_index()
+		try:
+			index.add("AAPL", pd.DataFrame({"Name": ["Vanguard"], "Size": [1]}))
+			return 0
+		except ParsingError:
+			pass
+		assert(list(index.holders("AAPL")["Holder"]) == ["Vanguard", "Blackrock", "Berkshire", "Fidelity Contrafund"])
+		assert(len(index) == 8)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_bad_frame_keeps_holders: ", e)
+	return 0
+
+def test_large_universe():
+	try:
+		rng = np.random.default_rng(4)
+		names = ["H%d" % i for i in range(300)]
+		index = HoldingsIndex()
+		held = np.zeros((300, 2000), dtype=np.int64)
+		for s in range(2000):
+			chosen = rng.choice(300, 20, replace=False)
+			held[chosen, s] = 1
+			index.add("S%d" % s, holders_frame([names[h] for h in chosen], rng.integers(1, 1000, 20)))
+		assert(len(index) == 40000)
+		matrix = index.overlap_matrix()
+		expected = held @ held.T
+		order = [int(h[1:]) for h in matrix.index]
+		assert((matrix.values == expected[np.ix_(order, order)]).all())
+		return 1
+	except Exception as e:
+		print("Test Failed: test_large_universe: ", e)
+	return 0
+
+def test_unknown_holder():
+	try:
+		sample_index().holdings("Nobody")
+		print("Test Failed: test_unknown_holder")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_inverted_lookups())
+	success.append(test_overlap_concentration())
+	success.append(test_save_load())
+	success.append(test_bad_frame_keeps_holders())
+	success.append(test_large_universe())
+	success.append(test_unknown_holder())
+	print("Holdings Test Done: (%d/%d) Successful"%(sum(success), len(success)))
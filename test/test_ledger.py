@@ -0,0 +1,137 @@
+from decimal import *
+from yayFinPy.ledger import TransactionLedger
+from yayFinPy.enumerations import *
+from yayFinPy.exceptions import *
+
+def test_fifo():
+	try:
+		ledger = TransactionLedger()
+		ledger.buy("AAPL", Decimal(10), Decimal(100))
+		ledger.buy("AAPL", Decimal(10), Decimal(140))
+		realized = ledger.sell("AAPL", Decimal(15), Decimal(150))
+		assert(realized == Decimal(10 * 50 + 5 * 10))
+		assert(ledger.position("AAPL") == Decimal(5))
+		assert(ledger.cost_basis("AAPL") == Decimal(5 * 140))
+		assert(ledger.unrealized_pnl({"AAPL": Decimal(150)}) == Decimal(50))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_fifo: ", e)
+	return 0
+
+def test_lifo():
+	try:
+		ledger = TransactionLedger(LotMatching.LIFO)
+		ledger.buy("AAPL", Decimal(10), Decimal(100))
+		ledger.buy("AAPL", Decimal(10), Decimal(140))
+		realized = ledger.sell("AAPL", Decimal(15), Decimal(150))
+		assert(realized == Decimal(10 * 10 + 5 * 50))
+		lots = ledger.open_lots("AAPL")
+		assert(len(lots) == 1)
+		assert(lots[0].price == Decimal(100))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_lifo: ", e)
+	return 0
+
+def test_specific_lot():
+	try:
+		ledger = TransactionLedger()
+		ledger.buy("AAPL", Decimal(10), Decimal(100))
+		lot_id = ledger.buy("AAPL", Decimal(10), Decimal(140))
+		ledger.buy("AAPL", Decimal(10), Decimal(120))
+		realized = ledger.sell("AAPL", Decimal(10), Decimal(150), lot_id=lot_id)
+		assert(realized == Decimal(100))
+		assert([l.price for l in ledger.open_lots("AAPL")] == [Decimal(100), Decimal(120)])
+		realized = ledger.sell("AAPL", Decimal(20), Decimal(150))
+		assert(realized == Decimal(500 + 300))
+		assert(ledger.realized_pnl() == Decimal(900))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_specific_lot: ", e)
+	return 0
+
+def test_oversell():
+	try:
+		ledger = TransactionLedger()
+		ledger.buy("AAPL", Decimal(10), Decimal(100))
+		ledger.sell("AAPL", Decimal(11), Decimal(150))
+		print("Test Failed: test_oversell")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+def test_transactions():
+	try:
+		ledger = TransactionLedger()
+		for i in range(1000):
+			ledger.buy("BTC-USD", Decimal(1), Decimal(i))
+		ledger.sell("BTC-USD", Decimal(500), Decimal(1000))
+		df = ledger.transactions()
+		assert(len(ledger) == 1001)
+		assert(df.shape[0] == 1001)
+		assert(list(df["Side"].value_counts().sort_index()) == [1000, 1])
+		assert(ledger.position("BTC-USD") == Decimal(500))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_transactions: ", e)
+	return 0
+
+def test_lot_cost():
+	try:
+		ledger = TransactionLedger()
+		ledger.buy("AAPL", Decimal(3), Decimal(100) / Decimal(3), cost=Decimal(100))
+		assert(ledger.cost_basis("AAPL") == Decimal(100))
+		ledger.sell("AAPL", Decimal(1), Decimal(50))
+		realized = ledger.sell("AAPL", Decimal(2), Decimal(50))
+		assert(ledger.cost_basis("AAPL") == Decimal(0))
+		assert(ledger.realized_pnl("AAPL") == Decimal(50))
+		assert(realized == Decimal(100) - (Decimal(100) - Decimal(100) / Decimal(3)))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_lot_cost: ", e)
+	return 0
+
+def test_max_transactions():
+	try:
+		ledger = TransactionLedger(max_transactions=100)
+		for i in range(1000):
+			ledger.buy("BTC-USD", Decimal(1), Decimal(i))
+		ledger.sell("BTC-USD", Decimal(999), Decimal(1000))
+		df = ledger.transactions()
+		assert(len(ledger) == 100 and df.shape[0] == 100)
+		assert(list(df["Price"][:2]) == [901.0, 902.0] and df["Side"].iloc[-1] == "SELL")
+		assert(ledger.position("BTC-USD") == Decimal(1))
+		assert(ledger.realized_pnl() == sum(Decimal(1000 - i) for i in range(999)))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_max_transactions: ", e)
+	return 0
+
+def test_drop():
+	try:
+		ledger = TransactionLedger()
+		ledger.buy("AAPL", Decimal(10), Decimal(100))
+		ledger.sell("AAPL", Decimal(4), Decimal(150))
+		ledger.drop("AAPL")
+		assert(ledger.position("AAPL") == Decimal(0) and ledger.open_lots("AAPL") == [])
+		assert(ledger.unrealized_pnl({}) == Decimal(0))
+		assert(ledger.realized_pnl("AAPL") == Decimal(200) and len(ledger) == 2)
+		ledger.buy("AAPL", Decimal(1), Decimal(90))
+		assert(ledger.cost_basis("AAPL") == Decimal(90))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_drop: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_fifo())
+	success.append(test_lifo())
+	success.append(test_specific_lot())
+	success.append(test_oversell())
+	success.append(test_transactions())
+	success.append(test_lot_cost())
+	success.append(test_max_transactions())
+	success.append(test_drop())
+	print("Ledger Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -0,0 +1,91 @@
+import time
+from yayFinPy.news import *
+
+def backend(delay=0):
+	results = {"S%d" % i: ["https://news.example.com/s%d/%d" % (i, j) for j in range(5)] +
+			   ["https://news.example.com/market-wrap"] for i in range(100)}
+	return StaticNewsBackend(results, delay=delay)
+
+def test_concurrent_cached_sweep():
+	try:
+		news = backend(delay=0.05)
+		fetcher = NewsFetcher(news, max_workers=20, requests_per_second=1000)
+		tickers = ["S%d" % i for i in range(100)]
+		start = time.perf_counter()
+		results = fetcher.fetch(tickers)
+		first = time.perf_counter() - start
+		assert(first < 2)
+		assert(news.searches == 100)
+		start = time.perf_counter()
+		again = fetcher.fetch(tickers)
+		assert(time.perf_counter() - start < 0.5)
+		assert(news.searches == 100)
+		assert(again == results)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_concurrent_cached_sweep: ", e)
+	return 0
+
+def test_deduplicate():
+	try:
+		fetcher = NewsFetcher(backend(), requests_per_second=1000)
+		results = fetcher.fetch(["S1", "S2"])
+		assert("https://news.example.com/market-wrap" in results["S1"])
+		assert("https://news.example.com/market-wrap" not in results["S2"])
+		assert(len(results["S2"]) == 5)
+		assert(len(fetcher.fetch(["S1", "S2"], deduplicate=False)["S2"]) == 6)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_deduplicate: ", e)
+	return 0
+
+def test_ttl_and_failures():
+	try:
+		class Failing(NewsBackend):
+			host = "localhost"
+			def search(self, query, limit):
+				raise ValueError("blocked")
+		fetcher = NewsFetcher(Failing(), requests_per_second=1000)
+		results = fetcher.fetch(["AAPL"])
+		assert(results["AAPL"] == [])
+		assert(isinstance(fetcher.failed["AAPL"], ValueError))
+		news = backend()
+		fetcher = NewsFetcher(news, ttl=0, requests_per_second=1000)
+		fetcher.related("S1")
+		time.sleep(0.01)
+		fetcher.related("S1")
+		assert(news.searches == 2)
+		fetcher = NewsFetcher(news, requests_per_second=1000)
+		assert(fetcher.related("UNKNOWN") == [])
+		fetcher.related("UNKNOWN")
+		assert(news.searches == 4)
+		try:
+			NewsBackend()
+			return 0
+		except TypeError:
+			pass
+		return 1
+	except Exception as e:
+		print("Test Failed: test_ttl_and_failures: ", e)
+	return 0
+
+def test_rate_limit_per_host():
+	try:
+		news = backend()
+		fetcher = NewsFetcher(news, max_workers=8, requests_per_second=20)
+		start = time.perf_counter()
+		# a burst of 20 searches, then 20 per second
+		fetcher.fetch(["S%d" % i for i in range(40)])
+		assert(time.perf_counter() - start >= 0.9)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_rate_limit_per_host: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_concurrent_cached_sweep())
+	success.append(test_deduplicate())
+	success.append(test_ttl_and_failures())
+	success.append(test_rate_limit_per_host())
+	print("News Test Done: (%d/%d) Successful"%(sum(success), len(success)))
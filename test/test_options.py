@@ -0,0 +1,172 @@
+import time
+import threading
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from yayFinPy.options import *
+from yayFinPy.exceptions import *
+
+NOW = datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc).timestamp()
+EXPIRATIONS = ["2024-01-19", "2024-02-16", "2024-03-15", "2024-06-21", "2024-12-20", "2025-06-20"]
+
+def synthetic_chain(strikes, spot=100.0, rate=0.03, delay=0, calls_made=None):
+	# contracts expire at 16:00 New York time
+	years = dict(zip(EXPIRATIONS, [(pd.Timestamp(e + " 16:00", tz="America/New_York").timestamp() - NOW)
+								   / (365 * 86400) for e in EXPIRATIONS]))
+	def fetch(ticker, expiration):
+		if calls_made is not None:
+			calls_made.append(expiration)
+		time.sleep(delay)
+		frames = []
+		for is_call in (True, False):
+			sigma = 0.2 + 0.1 * np.abs(np.log(strikes / spot))
+			price = black_scholes(is_call, spot, strikes, years[expiration], rate, sigma)
+			frames.append(pd.DataFrame({"contractSymbol": ["X%s%s%d" % (expiration, "CP"[is_call], k) for k in strikes],
+										"strike": strikes, "bid": price - 0.001, "ask": price + 0.001, "lastPrice": price,
+										"volume": 10, "openInterest": 100}))
+		return frames[0], frames[1]
+	return fetch
+
+def test_implied_volatility_round_trip():
+	try:
+		rnd = np.random.RandomState(0)
+		n = 20000
+		is_call = rnd.rand(n) < 0.5
+		strike = rnd.uniform(50, 150, n)
+		years = rnd.uniform(0.02, 2, n)
+		sigma = rnd.uniform(0.05, 1.5, n)
+		price = black_scholes(is_call, 100.0, strike, years, 0.03, sigma, 0.01)
+		solved = implied_volatility(price, is_call, 100.0, strike, years, 0.03, 0.01)
+		# contracts with no time value have no meaningful volatility
+		vega = greeks(is_call, 100.0, strike, years, 0.03, sigma, 0.01)["vega"]
+		meaningful = vega > 1e-3
+		assert(np.nanmax(np.abs(solved - sigma)[meaningful]) < 1e-5)
+		assert(np.isnan(implied_volatility(0.01, True, 100.0, 50.0, 1.0, 0.0)))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_implied_volatility_round_trip: ", e)
+	return 0
+
+def test_greeks():
+	try:
+		args = (np.array([True, False]), 100.0, np.array([95.0, 110.0]), 0.5, 0.03, 0.25, 0.01)
+		g = greeks(*args)
+		h = 1e-4
+		is_call, spot, strike, years, rate, sigma, q = args
+		bump = lambda **kw: black_scholes(**dict(dict(is_call=is_call, spot=spot, strike=strike, years=years,
+													  rate=rate, sigma=sigma, dividend_yield=q), **kw))
+		assert(np.allclose(g["delta"], (bump(spot=spot + h) - bump(spot=spot - h)) / (2 * h), atol=1e-4))
+		assert(np.allclose(g["vega"], (bump(sigma=sigma + h) - bump(sigma=sigma - h)) / (2 * h), atol=1e-3))
+		assert(np.allclose(g["rho"], (bump(rate=rate + h) - bump(rate=rate - h)) / (2 * h), atol=1e-3))
+		assert(np.allclose(g["theta"], -(bump(years=years + h) - bump(years=years - h)) / (2 * h), atol=1e-3))
+		assert(np.allclose(g["gamma"], (bump(spot=spot + 0.01) - 2 * bump() + bump(spot=spot - 0.01)) / 1e-4, atol=1e-3))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_greeks: ", e)
+	return 0
+
+def test_chain_concurrent_cached():
+	try:
+		calls_made = []
+		chain = OptionChain("XYZ", 100.0, rate=0.03, expirations_fetcher=lambda t: EXPIRATIONS,
+							chain_fetcher=synthetic_chain(np.arange(60.0, 141.0, 5.0), delay=0.1, calls_made=calls_made),
+							clock=lambda: NOW)
+		start = time.perf_counter()
+		assert(sorted(chain.load()) == sorted(EXPIRATIONS))
+		assert(time.perf_counter() - start < 0.4)
+		assert(chain.load() == [] and len(calls_made) == len(EXPIRATIONS))
+		frame = chain.to_dataframe()
+		assert(len(frame) == 2 * 17 * len(EXPIRATIONS))
+		expected = 0.2 + 0.1 * np.abs(np.log(frame["Strike"] / 100.0))
+		# deep in or out of the money prices carry no volatility information
+		meaningful = frame["Vega"] > 0.1
+		assert(np.nanmax(np.abs(frame["Implied Volatility"] - expected)[meaningful]) < 1e-4)
+		delta = frame["Delta"].dropna()
+		assert((delta[frame["Type"] == "call"] >= 0).all() and (delta[frame["Type"] == "put"] <= 0).all())
+		one = chain.chain("2024-03-15")
+		assert(len(one) == 34 and (one["Expiration"] == "2024-03-15").all())
+		return 1
+	except Exception as e:
+		print("Test Failed: test_chain_concurrent_cached: ", e)
+	return 0
+
+def test_large_chain_speed():
+	try:
+		chain = OptionChain("XYZ", 100.0, rate=0.03, expirations_fetcher=lambda t: EXPIRATIONS,
+							chain_fetcher=synthetic_chain(np.linspace(40.0, 200.0, 1000)), clock=lambda: NOW)
+		chain.load()
+		start = time.perf_counter()
+		iv = chain.implied_volatility()
+		g = chain.greeks()
+		elapsed = time.perf_counter() - start
+		assert(len(iv) == 12000 and len(g["gamma"]) == 12000)
+		assert(elapsed < 0.5)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_large_chain_speed: ", e)
+	return 0
+
+def test_ttl_on_read():
+	try:
+		calls_made = []
+		clock = [NOW]
+		chain = OptionChain("XYZ", 100.0, ttl=60, expirations_fetcher=lambda t: EXPIRATIONS,
+							chain_fetcher=synthetic_chain(np.arange(60.0, 141.0, 5.0), calls_made=calls_made),
+							clock=lambda: clock[0])
+		chain.to_dataframe()
+		assert(len(calls_made) == len(EXPIRATIONS))
+		chain.implied_volatility()
+		assert(len(calls_made) == len(EXPIRATIONS))
+		clock[0] += 61
+		chain.to_dataframe()
+		assert(len(calls_made) == 2 * len(EXPIRATIONS))
+		assert(chain.fetched_at("2024-01-19") == NOW + 61)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_ttl_on_read: ", e)
+	return 0
+
+def test_one_yahoo_ticker():
+	import yfinance as yf
+	class FakeTicker:
+		created = 0
+		def __init__(self, ticker_symbol):
+			FakeTicker.created += 1
+			self.options = tuple(EXPIRATIONS[:2])
+		def option_chain(self, expiration):
+			calls, puts = synthetic_chain(np.arange(90.0, 111.0, 5.0))(None, expiration)
+			return pd.Series({"calls": calls, "puts": puts})
+	ticker = yf.Ticker
+	yf.Ticker = FakeTicker
+	try:
+		chain = OptionChain("XYZ", 100.0, clock=lambda: NOW)
+		assert(len(chain.to_dataframe()) == 2 * 2 * 5)
+		assert(FakeTicker.created == 1)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_one_yahoo_ticker: ", e)
+	finally:
+		yf.Ticker = ticker
+	return 0
+
+def test_invalid_expiration():
+	try:
+		chain = OptionChain("XYZ", 100.0, expirations_fetcher=lambda t: EXPIRATIONS,
+							chain_fetcher=synthetic_chain(np.arange(60.0, 141.0, 5.0)))
+		chain.chain("2030-01-01")
+	except InputError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_invalid_expiration: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_implied_volatility_round_trip())
+	success.append(test_greeks())
+	success.append(test_chain_concurrent_cached())
+	success.append(test_large_chain_speed())
+	success.append(test_ttl_on_read())
+	success.append(test_one_yahoo_ticker())
+	success.append(test_invalid_expiration())
+	print("Options Test Done: (%d/%d) Successful"%(sum(success), len(success)))
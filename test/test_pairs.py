@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from yayFinPy.pairs import *
+from yayFinPy.exceptions import *
+
+def universe(n=8, dates=500):
+	rnd = np.random.RandomState(1)
+	index = pd.bdate_range("2022-01-03", periods=dates)
+	logs = np.cumsum(rnd.normal(0, 0.01, (dates, n)), axis=0) + 4
+	# S1 follows 1.5 * S0 with a mean reverting spread
+	spread = np.zeros(dates)
+	for t in range(1, dates):
+		spread[t] = 0.8 * spread[t - 1] + rnd.normal(0, 0.005)
+	logs[:, 1] = 1.5 * logs[:, 0] - 2 + spread
+	return pd.DataFrame(np.exp(logs), index=index, columns=["S%d" % i for i in range(n)])
+
+def adf_statistic(y, x, lags):
+	X = np.column_stack([np.ones_like(x), x])
+	beta = np.linalg.lstsq(X, y, rcond=None)[0]
+	e = y - X @ beta
+	d = np.diff(e)
+	target = d[lags:]
+	R = np.column_stack([e[lags:-1]] + [d[lags - l:len(d) - l] for l in range(1, lags + 1)])
+	coef, res = np.linalg.lstsq(R, target, rcond=None)[:2]
+	s2 = res[0] / (len(target) - R.shape[1])
+	return beta[1], coef[0] / np.sqrt(s2 * np.linalg.inv(R.T @ R)[0, 0])
+
+def test_cointegrated_pair():
+	try:
+		scanner = PairScanner(universe())
+		results = scanner.results()
+		assert(len(results) == scanner.pairs == 28)
+		best = results.iloc[0]
+		assert((best["Y"], best["X"]) == ("S0", "S1"))
+		assert(best["Significance"] == 0.01)
+		assert(abs(best["Hedge Ratio"] - 1 / 1.5) < 0.05)
+		assert(0 < best["Half Life"] < 20)
+		cointegrated = scanner.results(max_significance=0.05)
+		assert(("S0", "S1") in set(zip(cointegrated["Y"], cointegrated["X"])))
+		assert(len(cointegrated) < 5)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_cointegrated_pair: ", e)
+	return 0
+
+def test_statistic():
+	try:
+		closes = universe()
+		logs = np.log(closes.values)
+		results = PairScanner(closes, processes=0).results(lags=2).set_index(["Y", "X"])
+		for i, j in ((0, 1), (2, 5), (3, 7)):
+			hedge, statistic = adf_statistic(logs[:, i], logs[:, j], 2)
+			row = results.loc[("S%d" % i, "S%d" % j)]
+			assert(np.isclose(row["Hedge Ratio"], hedge))
+			assert(np.isclose(row["ADF Statistic"], statistic))
+		assert(critical_value(0.05, 10 ** 9) == -3.33613 + -6.1101e-9 + -6.823e-18)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_statistic: ", e)
+	return 0
+
+def test_process_pool():
+	try:
+		closes = universe(n=20)
+		local = PairScanner(closes, processes=0).results(batch_size=30)
+		batches = list(PairScanner(closes, processes=2).scan(batch_size=30))
+		assert(len(batches) == 7)
+		pooled = pd.concat(batches, ignore_index=True).sort_values("ADF Statistic", kind="stable")
+		assert(np.allclose(local["ADF Statistic"].values, pooled["ADF Statistic"].values))
+		assert(list(local["Y"]) == list(pooled["Y"]))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_process_pool: ", e)
+	return 0
+
+def test_missing_prices():
+	try:
+		closes = universe()
+		closes.iloc[:200, 3] = np.nan
+		closes.iloc[10, 4] = np.nan
+		scanner = PairScanner(closes, processes=0)
+		assert(list(scanner.failed) == ["S3"])
+		assert("S3" not in scanner.tickers and len(scanner.dates) == 499)
+		assert(scanner.pairs == 21)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_missing_prices: ", e)
+	return 0
+
+def test_invalid():
+	try:
+		PairScanner(universe(), processes=0).scan(max_significance=0.2)
+	except InputError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_invalid: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_cointegrated_pair())
+	success.append(test_statistic())
+	success.append(test_process_pool())
+	success.append(test_missing_prices())
+	success.append(test_invalid())
+	print("Pairs Test Done: (%d/%d) Successful" % (sum(success), len(success)))
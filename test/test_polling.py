@@ -0,0 +1,188 @@
+from yayFinPy.polling import *
+from yayFinPy.polling import _default_market_open
+from yayFinPy.ratelimit import RateLimiter
+
+class FakeClock():
+	def __init__(self, now=0.0):
+		self.now = now
+	def __call__(self):
+		return self.now
+	def sleep(self, seconds):
+		self.now += seconds
+
+def test_batching():
+	try:
+		clock = FakeClock()
+		calls = []
+		def fetcher(symbols):
+			calls.append(list(symbols))
+			return {t: {"price": 100.0, "volume": 1.0} for t in symbols}
+		symbols = ["S%d" % i for i in range(250)]
+		scheduler = PollingScheduler(symbols, fetcher=fetcher, batch_size=100, requests_per_minute=600,
+									 market_open=lambda t, now: True, clock=clock, sleep=clock.sleep)
+		assert(scheduler.run_once() == 100)
+		assert(scheduler.run_once() == 100)
+		assert(scheduler.run_once() == 50)
+		assert(scheduler.run_once() == 0)
+		assert(len(calls) == 3)
+		assert(sorted(sum(calls, [])) == sorted(symbols))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_batching: ", e)
+	return 0
+
+def test_adaptive_interval():
+	try:
+		clock = FakeClock()
+		prices = {"CALM": 100.0, "WILD": 100.0}
+		def fetcher(symbols):
+			prices["WILD"] *= 1.01 if clock.now % 2 else 0.99
+			return {t: {"price": prices[t]} for t in symbols}
+		scheduler = PollingScheduler(["CALM", "WILD"], fetcher=fetcher, min_interval=5, max_interval=300,
+									 requests_per_minute=6000, market_open=lambda t, now: True,
+									 clock=clock, sleep=clock.sleep)
+		scheduler.run(duration=1200)
+		assert(scheduler.interval("CALM") == 300)
+		assert(scheduler.interval("WILD") == 5)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_adaptive_interval: ", e)
+	return 0
+
+def test_market_closed():
+	try:
+		clock = FakeClock()
+		def fetcher(symbols):
+			return {t: {"price": 100.0 + clock.now} for t in symbols}
+		scheduler = PollingScheduler(["AAPL"], fetcher=fetcher, max_interval=600,
+									 market_open=lambda t, now: False, clock=clock, sleep=clock.sleep)
+		scheduler.run_once()
+		assert(scheduler.interval("AAPL") == 600)
+		assert(scheduler.next_due() == 600)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_market_closed: ", e)
+	return 0
+
+def test_changed_fields():
+	try:
+		clock = FakeClock()
+		quotes = [{"price": 1.0, "volume": 10.0}, {"price": 1.0, "volume": 20.0}, {"price": 1.0, "volume": 20.0}]
+		received = []
+		scheduler = PollingScheduler(["BTC-USD"], fetcher=lambda s: {"BTC-USD": quotes.pop(0)},
+									 min_interval=1, requests_per_minute=6000, clock=clock, sleep=clock.sleep)
+		scheduler.add_listener(lambda t, changed: received.append((t, changed)))
+		scheduler.run(duration=10)
+		assert(received == [("BTC-USD", {"price": 1.0, "volume": 10.0}), ("BTC-USD", {"volume": 20.0})])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_changed_fields: ", e)
+	return 0
+
+def test_request_budget():
+	try:
+		clock = FakeClock()
+		calls = []
+		def fetcher(symbols):
+			calls.append(clock.now)
+			return {}
+		symbols = ["S%d" % i for i in range(1000)]
+		scheduler = PollingScheduler(symbols, fetcher=fetcher, batch_size=10, min_interval=1,
+									 requests_per_minute=60, clock=clock, sleep=clock.sleep)
+		scheduler.run(duration=60)
+		assert(len(calls) <= 61)
+		limiter = RateLimiter(1, capacity=2, clock=clock, sleep=clock.sleep)
+		assert(limiter.try_acquire(2))
+		assert(not limiter.try_acquire())
+		limiter.acquire()
+		assert(clock.now >= 61)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_request_budget: ", e)
+	return 0
+
+def test_failed_polls():
+	try:
+		clock = FakeClock()
+		responses = [RuntimeError("outage"), {"AAPL": {"price": 1.0}}, {"AAPL": {"price": 1.0}, "MSFT": {"price": 2.0}}]
+		def fetcher(symbols):
+			response = responses.pop(0)
+			if isinstance(response, Exception):
+				raise response
+			return response
+		scheduler = PollingScheduler(["AAPL", "MSFT"], fetcher=fetcher, min_interval=1, requests_per_minute=6000,
+									 market_open=lambda t, now: True, clock=clock, sleep=clock.sleep)
+		scheduler.run_once()
+		assert(set(scheduler.failed) == {"AAPL", "MSFT"} and isinstance(scheduler.failed["AAPL"], RuntimeError))
+		clock.sleep(1)
+		scheduler.run_once()
+		assert(list(scheduler.failed) == ["MSFT"])
+		clock.sleep(1)
+		scheduler.run_once()
+		assert(scheduler.failed == {})
+		return 1
+	except Exception as e:
+		print("Test Failed: test_failed_polls: ", e)
+	return 0
+
+def test_raising_listener():
+	try:
+		clock = FakeClock()
+		received = []
+		def listener(t, changed):
+			if t == "AAPL":
+				raise ValueError("bad listener")
+			received.append(t)
+		scheduler = PollingScheduler(["AAPL", "MSFT"], fetcher=lambda s: {t: {"price": clock.now + 1} for t in s},
+									 min_interval=1, requests_per_minute=6000, market_open=lambda t, now: True,
+									 clock=clock, sleep=clock.sleep)
+		scheduler.add_listener(listener)
+		scheduler.add_listener(lambda t, changed: received.append(t))
+		assert(scheduler.run_once() == 2)
+		assert(sorted(received) == ["AAPL", "MSFT", "MSFT"])
+		assert(len(scheduler.errors) == 1 and scheduler.errors[0][0] == "AAPL")
+		assert(isinstance(scheduler.errors[0][2], ValueError))
+		assert(scheduler.next_due() is not None)
+		clock.sleep(1)
+		assert(scheduler.run_once() == 2)
+		assert(len(scheduler.errors) == 2)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_raising_listener: ", e)
+	return 0
+
+def test_default_market_hours():
+	try:
+		# Saturday 2024-01-06 03:00 New York
+		saturday_night = 1704528000
+		assert(_default_market_open("BTC-USD", saturday_night))
+		assert(_default_market_open("ETH-USDT", saturday_night))
+		assert(not _default_market_open("BRK-B", saturday_night))
+		assert(not _default_market_open("BF-B", saturday_night))
+		assert(not _default_market_open("JPY=X", saturday_night))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_default_market_hours: ", e)
+	return 0
+
+def test_invalid_interval():
+	try:
+		PollingScheduler(["AAPL"], min_interval=10, max_interval=5)
+		print("Test Failed: test_invalid_interval")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_batching())
+	success.append(test_adaptive_interval())
+	success.append(test_market_closed())
+	success.append(test_changed_fields())
+	success.append(test_request_budget())
+	success.append(test_failed_polls())
+	success.append(test_raising_listener())
+	success.append(test_default_market_hours())
+	success.append(test_invalid_interval())
+	print("Polling Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -1,6 +1,10 @@
+import os
+import tempfile
 from decimal import *
+import numpy as np
 from yayFinPy.portfolio import Portfolio, PortfolioInfo
 from yayFinPy.currency import Currency
+from yayFinPy.snapshot import SecuritySnapshot
 from yayFinPy.enumerations import *
 from yayFinPy.exceptions import *
 
@@ -118,6 +122,113 @@ def test_diversification():
 		print("Test Failed: test_diversification: ", e)
 	return 0
 
+def test_value_reporting_currency():
+	try:
+		portfolio = Portfolio({"BTC-USD": PortfolioInfo(qty=Decimal(1), buying_price=Decimal(50000)), "JPY=X": PortfolioInfo(qty=Decimal(1000), buying_price=Decimal(10))})
+		usd_value = portfolio.value(reporting_currency="USD")
+		assert(isinstance(usd_value, Decimal))
+		assets = portfolio.get_portfolio_objects()
+		assert(usd_value > assets["BTC-USD"].price)
+		assert(usd_value < portfolio.value())
+		return 1
+	except Exception as e:
+		print("Test Failed: test_value_reporting_currency: ", e)
+	return 0
+
+def offline_portfolio(tickers, qtys, prices, currencies, **kwargs):
+	path = os.path.join(tempfile.mkdtemp(), "offline.npz")
+	n = len(tickers)
+	columns = {"version": np.array(1), "ticker": np.array(tickers), "quote_type": np.array(["EQUITY"] * n),
+			   "qty": np.array(qtys), "buying_price": np.array([""] * n), "currency": np.array(currencies),
+			   "exchange": np.array([""] * n), "timestamp": np.zeros(n)}
+	for f in ("price", "volume", "opening_price", "closing_price", "day_high", "day_low"):
+		columns[f] = np.array(prices, dtype=np.float64)
+	np.savez_compressed(path, **columns)
+	return Portfolio.load(path, **kwargs)
+
+def test_value_rounding():
+	try:
+		usd_only = offline_portfolio(["AAA"], ["3"], [0.1], ["USD"])
+		assert(usd_only.value(reporting_currency="USD") == Decimal("0.30000000000000004"))
+		assert(abs(usd_only.value(reporting_currency="USD") - usd_only.value()) < Decimal("1e-15"))
+		gbp_only = offline_portfolio(["BBB"], ["7"], [1234.5], ["GBp"])
+		assert(gbp_only.value(reporting_currency="GBP") == Decimal("86.415"))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_value_rounding: ", e)
+	return 0
+
+def test_buy_sell():
+	try:
+		portfolio = Portfolio()
+		portfolio.buy("BTC-USD", Decimal(2), Decimal(40000))
+		portfolio.buy("BTC-USD", Decimal(2), Decimal(50000))
+		realized = portfolio.sell("BTC-USD", Decimal(1), Decimal(60000), matching=LotMatching.LIFO)
+		assert(realized == Decimal(10000))
+		p_info = portfolio.get_portfolio_info()
+		assert(p_info["BTC-USD"].qty == Decimal(3))
+		assert(portfolio.realized_returns() == Decimal(10000))
+		assert(isinstance(portfolio.unrealized_returns(), Decimal))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_buy_sell: ", e)
+	return 0
+
+def test_buy_sell_existing_holding():
+	try:
+		portfolio = Portfolio({"BTC-USD": PortfolioInfo(qty=Decimal(2), buying_price=Decimal(80000))})
+		realized = portfolio.sell("BTC-USD", Decimal(1), Decimal(50000))
+		assert(realized == Decimal(10000))
+		portfolio.buy("BTC-USD", Decimal(1), Decimal(30000))
+		p_info = portfolio.get_portfolio_info()
+		assert(p_info["BTC-USD"].qty == Decimal(2))
+		assert(p_info["BTC-USD"].buying_price == Decimal(70000))
+		assert(portfolio.returns() == portfolio.value() - Decimal(70000))
+		portfolio.buy("AAPL", Decimal(1), Decimal(100))
+		portfolio.remove_from_portfolio("AAPL")
+		assert(isinstance(portfolio.unrealized_returns(), Decimal))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_buy_sell_existing_holding: ", e)
+	return 0
+
+def test_invalid_sell_without_buying_price():
+	try:
+		portfolio = Portfolio({"BTC-USD": PortfolioInfo(qty=Decimal(2), buying_price=None)})
+		portfolio.sell("BTC-USD", Decimal(1), Decimal(50000))
+		print("Test Failed: test_invalid_sell_without_buying_price")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+def test_save_load():
+	try:
+		portfolio = Portfolio({"BTC-USD": PortfolioInfo(qty=Decimal(1), buying_price=Decimal(50000)), "JPY=X": PortfolioInfo(qty=Decimal(1), buying_price=None)})
+		path = os.path.join(tempfile.mkdtemp(), "book.npz")
+		portfolio.save(path)
+		loaded = Portfolio.load(path)
+		assert(loaded.get_portfolio_info() == portfolio.get_portfolio_info())
+		assert(loaded.value() == portfolio.value())
+		assets = loaded.get_portfolio_objects()
+		assert(isinstance(assets["BTC-USD"], SecuritySnapshot))
+		assert(assets["JPY=X"].quote_type == QuoteType.CURRENCY)
+		loaded.refresh("BTC-USD")
+		assert(isinstance(loaded.get_portfolio_objects()["BTC-USD"], Currency))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_save_load: ", e)
+	return 0
+
+def test_invalid_load():
+	try:
+		Portfolio.load(os.path.join(tempfile.mkdtemp(), "missing.npz"))
+		print("Test Failed: test_invalid_load")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
 if __name__ == '__main__':
 	success = []
 	success.append(test_constructor())
@@ -129,4 +240,11 @@ if __name__ == '__main__':
 	success.append(test_remove())
 	success.append(test_invalid_remove())
 	success.append(test_diversification())
+	success.append(test_value_reporting_currency())
+	success.append(test_value_rounding())
+	success.append(test_buy_sell())
+	success.append(test_buy_sell_existing_holding())
+	success.append(test_invalid_sell_without_buying_price())
+	success.append(test_save_load())
+	success.append(test_invalid_load())
 	print("Portfolio Test Done: (%d/%d) Successful"%(sum(success), len(success)))
\ No newline at end of file
@@ -0,0 +1,51 @@
+from decimal import *
+from yayFinPy.portfolio import Portfolio, PortfolioInfo
+from yayFinPy.rebalance import Rebalancer, RebalanceResult
+from yayFinPy.exceptions import *
+
+def test_rebalance():
+	try:
+		portfolio = Portfolio({"AAPL": PortfolioInfo(qty=Decimal(100), buying_price=None), "MSFT": PortfolioInfo(qty=Decimal(0), buying_price=None)})
+		rebalancer = Rebalancer(portfolio)
+		result = rebalancer.rebalance({"AAPL": 0.5, "MSFT": 0.5})
+		assert(isinstance(result, RebalanceResult))
+		assert(set(result.trades["Ticker Symbol"]) == set(["AAPL", "MSFT"]))
+		assert(result.cash >= 0)
+		assert(result.cash == -sum(result.trades["Value"]))
+		assert(result.tracking_error < 0.05)
+		for q in result.trades["Quantity"]:
+			assert(q == q.to_integral_value())
+		rebalancer.apply(result)
+		assert(portfolio.get_portfolio_info()["AAPL"].qty < Decimal(100))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_rebalance: ", e)
+	return 0
+
+def test_min_trade_value():
+	try:
+		portfolio = Portfolio({"AAPL": PortfolioInfo(qty=Decimal(100), buying_price=None)})
+		value = portfolio.value()
+		result = Rebalancer(portfolio).rebalance({"AAPL": 0.99}, min_trade_value=value)
+		assert(len(result.trades) == 0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_min_trade_value: ", e)
+	return 0
+
+def test_invalid_weights():
+	try:
+		portfolio = Portfolio({"AAPL": PortfolioInfo(qty=Decimal(100), buying_price=None)})
+		Rebalancer(portfolio).rebalance({"AAPL": 0.7, "MSFT": 0.7})
+		print("Test Failed: test_invalid_weights")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_rebalance())
+	success.append(test_min_trade_value())
+	success.append(test_invalid_weights())
+	print("Rebalance Test Done: (%d/%d) Successful"%(sum(success), len(success)))
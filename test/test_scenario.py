@@ -0,0 +1,64 @@
+import os
+import tempfile
+from decimal import *
+import numpy as np
+from yayFinPy.portfolio import Portfolio
+from yayFinPy.scenario import Scenario, ScenarioEngine
+from yayFinPy.enumerations import *
+from yayFinPy.exceptions import *
+
+def test_scenario_constructor():
+	try:
+		scenario = Scenario("crash", quote_type_shocks={QuoteType.EQUITY: -0.2}, sector_shocks={"Technology": Decimal("-0.3")}, yield_shift_bp=100)
+		assert(scenario.name == "crash")
+		assert(scenario.quote_type_shocks == {QuoteType.EQUITY: -0.2})
+		assert(scenario.sector_shocks == {"Technology": -0.3})
+		assert(scenario.yield_shift_bp == 100.0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_scenario_constructor: ", e)
+	return 0
+
+def test_invalid_scenario():
+	try:
+		Scenario("crash", quote_type_shocks={"EQUITY": -0.2})
+		print("Test Failed: test_invalid_scenario")
+		return 0
+	except ParsingError:
+		return 1
+	return 0
+
+def offline_portfolio(tickers, qtys, prices, quote_types):
+	path = os.path.join(tempfile.mkdtemp(), "offline.npz")
+	n = len(tickers)
+	columns = {"version": np.array(1), "ticker": np.array(tickers), "quote_type": np.array(quote_types),
+			   "qty": np.array(qtys), "buying_price": np.array([""] * n), "currency": np.array(["USD"] * n),
+			   "exchange": np.array([""] * n), "timestamp": np.zeros(n)}
+	for f in ("price", "volume", "opening_price", "closing_price", "day_high", "day_low"):
+		columns[f] = np.array(prices, dtype=np.float64)
+	np.savez_compressed(path, **columns)
+	return Portfolio.load(path)
+
+def test_run():
+	try:
+		portfolio = offline_portfolio(["BTC-USD", "^TNX"], ["2", "1000"], [60000.0, 4.2], ["CRYPTOCURRENCY", "INDEX"])
+		engine = ScenarioEngine(portfolio)
+		btc = 60000.0
+		pnl = engine.run([Scenario("crypto -50%", quote_type_shocks={QuoteType.CRYPTOCURRENCY: -0.5}),
+						  Scenario("rates +100bp", yield_shift_bp=100),
+						  Scenario("btc +10%", quote_type_shocks={QuoteType.CRYPTOCURRENCY: -0.5}, symbol_shocks={"BTC-USD": 0.1})])
+		assert(list(pnl.index) == ["crypto -50%", "rates +100bp", "btc +10%"])
+		assert(abs(pnl["crypto -50%"] + btc) < 1e-6 * btc)
+		assert(abs(pnl["rates +100bp"] - 1000) < 1e-6)
+		assert(abs(pnl["btc +10%"] - 0.2 * btc) < 1e-6 * btc)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_run: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_scenario_constructor())
+	success.append(test_invalid_scenario())
+	success.append(test_run())
+	print("Scenario Test Done: (%d/%d) Successful"%(sum(success), len(success)))
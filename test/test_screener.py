@@ -0,0 +1,113 @@
+import time
+import numpy as np
+from yayFinPy.screener import *
+
+SECTORS = ["Technology", "Energy", "Healthcare", "Utilities"]
+COUNTRIES = ["United States", "Canada", "Germany"]
+
+def universe(n=12000, seed=5):
+	rng = np.random.default_rng(seed)
+	screener = Screener()
+	data = {"pe_ratio": rng.uniform(1, 60, n), "market_cap": rng.lognormal(22, 2, n),
+			"volume": rng.integers(1000, 10000000, n).astype(float),
+			"industry_sector": rng.choice(SECTORS, n), "country": rng.choice(COUNTRIES, n)}
+	for i in range(n):
+		screener.update("S%d" % i, **{k: v[i] for k, v in data.items()})
+	return screener, data
+
+def test_compound_filter():
+	try:
+		screener, data = universe()
+		condition = ((Field("pe_ratio") < 15) & (Field("industry_sector") == "Technology")) | \
+					((Field("market_cap") >= 1e11) & ~(Field("country") == "Canada"))
+		start = time.perf_counter()
+		result = screener.screen(condition)
+		elapsed = time.perf_counter() - start
+		expected = ((data["pe_ratio"] < 15) & (data["industry_sector"] == "Technology")) | \
+				   ((data["market_cap"] >= 1e11) & (data["country"] != "Canada"))
+		assert(sorted(result) == sorted("S%d" % i for i in np.flatnonzero(expected)))
+		assert(elapsed < 0.05)
+		between = screener.screen(Field("volume").between(1e6, 2e6) & Field("country").isin(["Germany", "Canada"]))
+		expected = (data["volume"] >= 1e6) & (data["volume"] <= 2e6) & (data["country"] != "United States")
+		assert(len(between) == expected.sum())
+		return 1
+	except Exception as e:
+		print("Test Failed: test_compound_filter: ", e)
+	return 0
+
+def test_incremental_update():
+	try:
+		screener, data = universe(n=1000)
+		cheap = Field("pe_ratio") <= 2
+		before = set(screener.screen(cheap))
+		screener.update("S1", pe_ratio=1.5, industry_sector="Energy")
+		screener.update("NEW", pe_ratio=0.5, country="Canada")
+		screener.remove("S2")
+		after = set(screener.screen(cheap))
+		assert(after == (before | set(["S1", "NEW"])) - set(["S2"]))
+		assert("S1" in screener.screen(Field("industry_sector") == "Energy"))
+		assert("NEW" in screener.screen(Field("country") != "Germany"))
+		assert(len(screener) == 1000)
+		top = screener.screen(sort_by="pe_ratio", limit=2)
+		assert(top[0] == "NEW")
+		assert(screener.to_dataframe().loc["NEW", "country"] == "Canada")
+		return 1
+	except Exception as e:
+		print("Test Failed: test_incremental_update: ", e)
+	return 0
+
+def test_update_after_growth():
+	try:
+		screener, data = universe(n=64)
+		cheap = set(screener.screen(Field("pe_ratio") < 10))
+		large = set(screener.screen(Field("market_cap") > 1e10))
+		screener.update("GROW", pe_ratio=0.5)
+		assert(set(screener.screen(Field("pe_ratio") < 10)) == cheap | set(["GROW"]))
+		assert(set(screener.screen(Field("market_cap") > 1e10)) == large)
+		assert(screener.screen(sort_by="pe_ratio", ascending=False)[-1] == "GROW")
+		return 1
+	except Exception as e:
+		print("Test Failed: test_update_after_growth: ", e)
+	return 0
+
+def test_patched_index():
+	try:
+		screener, data = universe(n=5000)
+		rng = np.random.default_rng(11)
+		pe = data["pe_ratio"].copy()
+		for _ in range(3):
+			screener.screen(Field("pe_ratio") < 20)
+			for i in rng.choice(5000, 40, replace=False):
+				pe[i] = np.nan if i % 7 == 0 else round(rng.uniform(1, 60), 1)
+				screener.update("S%d" % i, pe_ratio=None if np.isnan(pe[i]) else pe[i])
+			start = time.perf_counter()
+			result = screener.screen(Field("pe_ratio") < 20)
+			elapsed = time.perf_counter() - start
+			assert(sorted(result) == sorted("S%d" % i for i in np.flatnonzero(pe < 20)))
+			assert(elapsed < 0.05)
+			fresh = Screener()
+			for i in range(5000):
+				fresh.update("S%d" % i, pe_ratio=None if np.isnan(pe[i]) else pe[i])
+			assert(screener.screen(sort_by="pe_ratio") == fresh.screen(sort_by="pe_ratio"))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_patched_index: ", e)
+	return 0
+
+def test_invalid_field():
+	try:
+		Field("dividend_yield") < 3
+		print("Test Failed: test_invalid_field")
+		return 0
+	except InputError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_compound_filter())
+	success.append(test_incremental_update())
+	success.append(test_update_after_growth())
+	success.append(test_patched_index())
+	success.append(test_invalid_field())
+	print("Screener Test Done: (%d/%d) Successful"%(sum(success), len(success)))
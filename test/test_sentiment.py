@@ -0,0 +1,74 @@
+from yayFinPy.sentiment import *
+from yayFinPy.exceptions import *
+
+calls = []
+
+def length_scorer(text):
+	calls.append(text)
+	return (len(text) % 10) / 10
+
+def pure_scorer(text):
+	return (len(text) % 10) / 10
+
+def test_score_and_cache():
+	try:
+		del calls[:]
+		pipeline = SentimentPipeline(scorer=length_scorer, batch_size=2)
+		texts = ["good", "bad", "good", "great stock", "bad"]
+		scores = pipeline.score(texts)
+		assert(list(scores) == [0.4, 0.3, 0.4, 0.1, 0.3])
+		assert(len(calls) == 3)
+		again = pipeline.score(["bad", "new one"])
+		assert(list(again) == [0.3, 0.7])
+		assert(len(calls) == 4)
+		info = pipeline.cache_info()
+		assert(info["misses"] == 4 and info["hits"] == 1 and info["size"] == 4)
+		assert(abs(pipeline.mean(["good", "bad"]) - 0.35) < 1e-12)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_score_and_cache: ", e)
+	return 0
+
+def test_bounded_cache():
+	try:
+		del calls[:]
+		pipeline = SentimentPipeline(scorer=length_scorer, cache_size=2)
+		pipeline.score(["a", "bb", "ccc"])
+		assert(pipeline.cache_info()["size"] == 2)
+		pipeline.score(["a"])
+		assert(len(calls) == 4)
+		pipeline.clear()
+		assert(pipeline.cache_info()["size"] == 0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_bounded_cache: ", e)
+	return 0
+
+def test_process_pool():
+	try:
+		texts = ["tweet number %d" % (i % 3000) for i in range(6000)]
+		pipeline = SentimentPipeline(scorer=pure_scorer, batch_size=500, processes=2, process_threshold=1000)
+		scores = pipeline.score(texts)
+		assert(list(scores) == [pure_scorer(t) for t in texts])
+		assert(pipeline.cache_info()["misses"] == 3000)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_process_pool: ", e)
+	return 0
+
+def test_empty_mean():
+	try:
+		SentimentPipeline(scorer=pure_scorer).mean([])
+	except InputError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_empty_mean: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_score_and_cache())
+	success.append(test_bounded_cache())
+	success.append(test_process_pool())
+	success.append(test_empty_mean())
+	print("Sentiment Test Done: (%d/%d) Successful"%(sum(success), len(success)))
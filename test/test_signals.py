@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import talib
+from yayFinPy.signals import *
+from yayFinPy.history import aligned_history
+from yayFinPy.exceptions import *
+
+class FakeSecurity:
+	def __init__(self, ticker_symbol, history):
+		self.ticker_symbol = ticker_symbol
+		self.history = history
+	def historical_data(self, duration, interval):
+		return self.history
+
+def universe(n=5, dates=300):
+	rnd = np.random.RandomState(2)
+	index = pd.bdate_range("2022-01-03", periods=dates)
+	close = 100 * np.exp(np.cumsum(rnd.normal(0, 0.02, (dates, n)), axis=0))
+	volume = rnd.lognormal(12, 0.5, (dates, n))
+	volume[-1, n - 2] *= 10
+	tickers = ["S%d" % i for i in range(n)]
+	return {"Close": pd.DataFrame(close, index=index, columns=tickers),
+			"Volume": pd.DataFrame(volume, index=index, columns=tickers)}
+
+def test_indicators():
+	try:
+		history = universe()
+		scanner = SignalScanner(history)
+		close = history["Close"]["S1"].to_numpy()
+		volume = history["Volume"]["S1"].to_numpy()
+		for rule, expected in (("close > SMA(50)", close > talib.SMA(close, 50)),
+							   ("close > EMA(20)", close > talib.EMA(close, 20)),
+							   ("RSI(14) < 40", talib.RSI(close, 14) < 40),
+							   ("volume > 1.5 * avg_volume(20)", volume > 1.5 * talib.SMA(volume, 20)),
+							   ("SMA(close - 1, 10) < close - 1 < 120", (talib.SMA(close - 1, 10) < close - 1) & (close - 1 < 120))):
+			with np.errstate(invalid="ignore"):
+				assert((scanner.evaluate(rule)["S1"].to_numpy() == expected).all())
+		return 1
+	except Exception as e:
+		print("Test Failed: test_indicators: ", e)
+	return 0
+
+def test_matches_and_shared_subexpressions():
+	try:
+		scanner = SignalScanner(universe())
+		rule = "volume > 2 * avg_volume(20) and not RSI(14) > 99"
+		matches = scanner.matches(rule)
+		held = scanner.evaluate(rule)
+		assert(len(matches) == held.values.sum())
+		traded = scanner.evaluate("volume > 0")
+		traded.iloc[0, 0] = False
+		assert(scanner.evaluate("volume > 0").values.all())
+		assert(all(held.loc[d, t] for d, t in zip(matches["Date"], matches["Ticker"])))
+		assert("S3" in scanner.latest(rule))
+		assert(list(scanner.matches(rule, start=scanner.dates[-1])["Ticker"]) == scanner.latest(rule))
+		before = scanner.cache_info()
+		scanner.evaluate("volume > 2 * SMA(volume, 20) or RSI(14) > 99")
+		after = scanner.cache_info()
+		# only the new or and not nodes are computed
+		assert(after["misses"] - before["misses"] == 1 and after["hits"] - before["hits"] == 2)
+		scanner.clear()
+		assert(scanner.cache_info()["size"] == 0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_matches_and_shared_subexpressions: ", e)
+	return 0
+
+def test_aligned_history():
+	try:
+		history = universe(n=2)
+		frames = [pd.DataFrame({"Open": history["Close"][t] * 0.99, "High": history["Close"][t] * 1.01,
+								"Low": history["Close"][t] * 0.98, "Close": history["Close"][t],
+								"Volume": history["Volume"][t]}) for t in ("S0", "S1")]
+		frames[1] = frames[1].drop(frames[1].index[[100, 150, 151, 152, 153, 154] + list(range(200, 210))])
+		securities = [FakeSecurity("S%d" % i, f) for i, f in enumerate(frames)]
+		aligned = aligned_history(securities)
+		close = aligned["Close"]["S1"]
+		# a gap is filled with flat bars at the last close
+		for field in ("Open", "High", "Low", "Close"):
+			assert(aligned[field]["S1"].iloc[100] == close.iloc[99])
+			assert(aligned[field]["S1"].iloc[150:155].eq(close.iloc[149]).all())
+		assert(aligned["Volume"]["S1"].iloc[100] == 0 and aligned["Volume"]["S1"].iloc[150:155].eq(0).all())
+		# a gap longer than fill_limit is not filled at all
+		for field in ("Open", "High", "Low", "Close", "Volume"):
+			assert(aligned[field]["S1"].iloc[200:210].isna().all())
+		assert(aligned["Close"]["S1"].iloc[[199, 210]].notna().all())
+		scanner = SignalScanner.from_securities(securities)
+		assert(scanner.tickers == ["S0", "S1"] and len(scanner.dates) == 300)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_aligned_history: ", e)
+	return 0
+
+def test_invalid_rules():
+	try:
+		for rule in ("close >", "close + 1", "SMA(close)", "SMA(2.5) > 1", "foo > 1", "__import__('os')", "close > 1 if 1 else 2"):
+			try:
+				Rule(rule)
+				return 0
+			except ParsingError:
+				pass
+		SignalScanner({"Close": universe()["Close"]}).evaluate("high > 1")
+	except InputError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_invalid_rules: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_indicators())
+	success.append(test_matches_and_shared_subexpressions())
+	success.append(test_aligned_history())
+	success.append(test_invalid_rules())
+	print("Signals Test Done: (%d/%d) Successful" % (sum(success), len(success)))
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from yayFinPy.simulation import *
+from yayFinPy.enumerations import *
+from yayFinPy.exceptions import *
+
+class FakeSecurity:
+	price = 100.0
+	def historical_data(self, duration, interval):
+		rnd = np.random.RandomState(0)
+		close = 90 * np.exp(np.cumsum(rnd.normal(0.0005, 0.01, 500)))
+		return pd.DataFrame({"Close": close})
+
+def test_gbm_moments():
+	try:
+		simulator = PathSimulator.from_security(FakeSecurity(), chunk_size=5000, processes=0)
+		mu, sigma = simulator.drift, simulator.volatility
+		summary = simulator.simulate(steps=20, paths=100000, seed=1)
+		expected = 100.0 * np.exp(20 * (mu + sigma ** 2 / 2))
+		assert(abs(summary.mean / expected - 1) < 0.002)
+		assert(abs(summary.std / (expected * np.sqrt(np.exp(20 * sigma ** 2) - 1)) - 1) < 0.02)
+		assert(len(summary.mean_path) == 21 and summary.mean_path[0] == 100.0)
+		assert(abs(summary.mean_path[-1] - summary.mean) < 1e-9)
+		assert(summary.quantiles[0.05] < summary.quantiles[0.5] < summary.quantiles[0.95])
+		assert(summary.expected_shortfall >= summary.value_at_risk)
+		assert(0 < summary.mean_max_drawdown < 1)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_gbm_moments: ", e)
+	return 0
+
+def test_reproducible_across_processes():
+	try:
+		returns = np.random.RandomState(3).normal(0, 0.02, 300)
+		local = PathSimulator(returns, 50.0, chunk_size=1000)
+		pooled = PathSimulator(returns, 50.0, chunk_size=1000, processes=2)
+		for model in (PathModel.GBM, PathModel.BOOTSTRAP):
+			a = local.simulate(steps=30, paths=5500, model=model, seed=7)
+			b = pooled.simulate(steps=30, paths=5500, model=model, seed=7)
+			assert(a.mean == b.mean and a.quantiles == b.quantiles)
+			assert(np.array_equal(a.mean_path, b.mean_path))
+		assert(local.simulate(steps=30, paths=5500, seed=8).mean != a.mean)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_reproducible_across_processes: ", e)
+	return 0
+
+def test_bootstrap_resamples_history():
+	try:
+		# every block of a constant history compounds to the same price
+		simulator = PathSimulator(np.full(10, 0.01), 10.0, processes=0)
+		summary = simulator.simulate(steps=7, paths=100, model=PathModel.BOOTSTRAP, block_size=3, seed=0)
+		assert(abs(summary.quantiles[0.01] - 10.0 * np.exp(0.07)) < 1e-9)
+		assert(summary.std < 1e-9 and summary.probability_of_loss == 0)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_bootstrap_resamples_history: ", e)
+	return 0
+
+def test_invalid_model():
+	try:
+		PathSimulator([0.01, 0.02, -0.01], 10.0).simulate(10, 10, model="gbm")
+	except ParsingError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_invalid_model: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_gbm_moments())
+	success.append(test_reproducible_across_processes())
+	success.append(test_bootstrap_resamples_history())
+	success.append(test_invalid_model())
+	print("Simulation Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -0,0 +1,37 @@
+from decimal import Decimal
+from datetime import datetime
+from yayFinPy.snapshot import SecuritySnapshot
+from yayFinPy.enumerations import QuoteType
+
+def test_snapshot_attributes():
+	try:
+		ts = datetime(2021, 5, 14, 16, 0)
+		snapshot = SecuritySnapshot("AAPL", QuoteType.EQUITY, 127.45, 81917951.0, 126.25,
+									124.97, 127.89, 125.85, "NMS", ts)
+		assert(snapshot.ticker_symbol == "AAPL")
+		assert(snapshot.quote_type == QuoteType.EQUITY)
+		assert(snapshot.price == Decimal(127.45))
+		assert(type(snapshot.volume) == Decimal)
+		assert(snapshot.timestamp == ts)
+		assert(snapshot.to_dict()["exchange"] == "NMS")
+		return 1
+	except Exception as e:
+		print("Test Failed: test_snapshot_attributes", e)
+	return 0
+
+def test_snapshot_missing_values():
+	try:
+		snapshot = SecuritySnapshot("VFIAX", QuoteType.MUTUALFUND, 380.5, float('nan'), float('nan'),
+									379.2, float('nan'), float('nan'), "NAS", datetime.now())
+		assert(snapshot.volume.is_nan())
+		assert(snapshot.price == Decimal(380.5))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_snapshot_missing_values", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_snapshot_attributes())
+	success.append(test_snapshot_missing_values())
+	print("Snapshot Test Done: (%d/%d) Successful"%(sum(success), len(success)))
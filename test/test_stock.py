@@ -2,6 +2,7 @@ from typing import List
 from decimal import Decimal
 from yayFinPy.stock import Stock
 import pandas as pd
+import numpy as np
 
 def test_constructor():
 	try:
@@ -45,6 +46,26 @@ def test_stock_splits():
 		print("Test Failed: test_stock_splits", e)
 	return 0  
 
+def test_stock_dividends_read_only():
+	try:
+		stock = Stock("AAPL")
+		dividends = stock.dividends
+		assert(not dividends.values.flags.writeable)
+		assert(np.shares_memory(dividends.values, stock.dividends.values))
+		try:
+			dividends.values.flags.writeable = True
+			return 0
+		except ValueError:
+			pass
+		try:
+			dividends.iloc[0] = 0
+			return 0
+		except ValueError:
+			return 1
+	except Exception as e:
+		print("Test Failed: test_stock_dividends_read_only", e)
+	return 0
+
 def test_stock_dividends():
 	try:
 		stock = Stock("AAPL")
@@ -116,6 +137,7 @@ if __name__ == '__main__':
 	success.append(test_stock_attributes())
 	success.append(test_stock_splits())
 	success.append(test_stock_dividends())
+	success.append(test_stock_dividends_read_only())
 	success.append(test_stock_returns())
 	success.append(test_stock_news())
 	success.append(test_stock_tweets())
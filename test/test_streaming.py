@@ -0,0 +1,109 @@
+import asyncio
+from yayFinPy.streaming import *
+
+def test_replay_callback():
+	try:
+		updates = [QuoteUpdate("AAPL", 127.0 + i, 1e6, 1620997200.0 + i) for i in range(10)]
+		updates.append(QuoteUpdate("MSFT", 250.0, 1e6, 1620997300.0))
+		received = []
+		async def main():
+			stream = QuoteStream(ReplayQuoteSource(updates))
+			stream.subscribe(["AAPL"], callback=received.append)
+			await stream.run()
+			return stream
+		stream = asyncio.run(main())
+		assert(len(received) >= 1)
+		assert(received[-1].price == 136.0)
+		assert(all(u.ticker_symbol == "AAPL" for u in received))
+		assert(stream.latest("AAPL").price == 136.0)
+		assert(stream.latest("MSFT") is None)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_replay_callback: ", e)
+	return 0
+
+def test_coalescing():
+	try:
+		updates = [QuoteUpdate("AAPL" if i % 2 else "MSFT", float(i), 1e6, float(i)) for i in range(10000)]
+		async def main():
+			stream = QuoteStream(ReplayQuoteSource(updates))
+			subscription = stream.subscribe(["AAPL", "MSFT"])
+			await stream.run()
+			return subscription, [u async for u in subscription]
+		subscription, received = asyncio.run(main())
+		assert(len(received) == 2)
+		assert(subscription.coalesced == 9998)
+		assert(set(u.price for u in received) == set([9998.0, 9999.0]))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_coalescing: ", e)
+	return 0
+
+def test_simulated_iterator():
+	try:
+		symbols = ["S%d" % i for i in range(2000)]
+		async def main():
+			stream = QuoteStream(SimulatedQuoteSource(updates_per_second=100000, limit=20000, seed=1))
+			subscription = stream.subscribe(symbols)
+			runner = asyncio.ensure_future(stream.run())
+			received = 0
+			async for update in subscription:
+				assert(update.ticker_symbol in subscription.symbols)
+				received += 1
+			await runner
+			return received + subscription.coalesced
+		assert(asyncio.run(main()) == 20000)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_simulated_iterator: ", e)
+	return 0
+
+def test_callback_errors():
+	try:
+		updates = [QuoteUpdate("AAPL", 127.0, 1e6, 1620997200.0), QuoteUpdate("MSFT", 250.0, 1e6, 1620997201.0)]
+		received = []
+		def callback(update):
+			if update.ticker_symbol == "AAPL":
+				raise ValueError("bad callback")
+			received.append(update)
+		async def main():
+			stream = QuoteStream(ReplayQuoteSource(updates))
+			stream.subscribe(["AAPL", "MSFT"], callback=callback)
+			await stream.run()
+			return stream
+		stream = asyncio.run(main())
+		assert([u.ticker_symbol for u in received] == ["MSFT"])
+		assert(len(stream.errors) == 1)
+		assert(stream.errors[0][0].ticker_symbol == "AAPL" and isinstance(stream.errors[0][1], ValueError))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_callback_errors: ", e)
+	return 0
+
+def test_abstract_source():
+	try:
+		QuoteSource()
+		print("Test Failed: test_abstract_source")
+		return 0
+	except TypeError:
+		return 1
+	return 0
+
+def test_invalid_subscribe():
+	try:
+		QuoteStream(SimulatedQuoteSource()).subscribe("AAPL")
+		print("Test Failed: test_invalid_subscribe")
+		return 0
+	except ParsingError:
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_replay_callback())
+	success.append(test_coalescing())
+	success.append(test_simulated_iterator())
+	success.append(test_callback_errors())
+	success.append(test_abstract_source())
+	success.append(test_invalid_subscribe())
+	print("Streaming Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -0,0 +1,114 @@
+import os
+import tempfile
+from yayFinPy.tweets import *
+from yayFinPy.exceptions import *
+
+class FakeClock:
+	def __init__(self):
+		self.now = 1000.0
+		self.slept = 0.0
+	def __call__(self):
+		return self.now
+	def sleep(self, seconds):
+		self.slept += seconds
+		self.now += seconds
+
+def test_pagination_and_since_id():
+	try:
+		api = FakeTweetAPI()
+		for i in range(25):
+			api.post("$TSLA", "tsla %d" % i)
+		api.post("$AAPL", "aapl 0")
+		collector = TweetCollector(api, count=10, max_pages=5)
+		new = collector.collect(["TSLA", "AAPL"])
+		assert(len(new["TSLA"]) == 25 and new["TSLA"][0] == "tsla 24")
+		assert(new["AAPL"] == ["aapl 0"])
+		assert(api.searches == 4)
+		api.post("$TSLA", "tsla 25")
+		new = collector.collect(["TSLA", "AAPL"])
+		assert(new == {"TSLA": ["tsla 25"], "AAPL": []})
+		assert(collector.tweets("TSLA", 3) == ["tsla 25", "tsla 24", "tsla 23"])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_pagination_and_since_id: ", e)
+	return 0
+
+def test_backlog_after_max_pages():
+	try:
+		api = FakeTweetAPI()
+		api.post("$TSLA", "tsla 0")
+		collector = TweetCollector(api, count=2, max_pages=1)
+		collector.collect(["TSLA"])
+		assert(collector.since_id("TSLA") == 1)
+		for i in range(1, 6):
+			api.post("$TSLA", "tsla %d" % i)
+		assert(collector.collect(["TSLA"]) == {"TSLA": ["tsla 5", "tsla 4"]})
+		assert(collector.since_id("TSLA") == 1)
+		api.post("$TSLA", "tsla 6")
+		assert(collector.collect(["TSLA"]) == {"TSLA": ["tsla 3", "tsla 2"]})
+		assert(collector.collect(["TSLA"]) == {"TSLA": ["tsla 1"]})
+		assert(collector.since_id("TSLA") == 6)
+		assert(collector.collect(["TSLA"]) == {"TSLA": ["tsla 6"]})
+		assert(collector.tweets("TSLA") == ["tsla %d" % i for i in range(6, -1, -1)])
+		collector.add(["TSLA", "AAPL", "TSLA"])
+		assert(collector.pending == ["TSLA", "AAPL"])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_backlog_after_max_pages: ", e)
+	return 0
+
+def test_rate_limit_windows():
+	try:
+		clock = FakeClock()
+		api = FakeTweetAPI(searches_per_window=5, window=60, clock=clock)
+		collector = TweetCollector(api, clock=clock, sleep=clock.sleep)
+		symbols = ["S%d" % i for i in range(12)]
+		for s in symbols:
+			api.post(cashtag(s), s)
+		new = collector.collect(symbols)
+		assert(collector.failed == {})
+		assert(all(new[s] == [s] for s in symbols))
+		# 12 searches at 5 per minute
+		assert(clock.slept >= 84)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_rate_limit_windows: ", e)
+	return 0
+
+def test_checkpoint_file():
+	try:
+		path = os.path.join(tempfile.mkdtemp(), "tweets.json")
+		api = FakeTweetAPI()
+		api.post("$MSFT", "msft 0")
+		collector = TweetCollector(api, checkpoint_path=path)
+		collector.collect(["MSFT"])
+		api.post("$MSFT", "msft 1")
+		reloaded = TweetCollector(api, checkpoint_path=path)
+		assert(reloaded.since_id("MSFT") == 1)
+		assert(reloaded.collect(["MSFT"]) == {"MSFT": ["msft 1"]})
+		assert(reloaded.tweets("MSFT") == ["msft 1", "msft 0"])
+		return 1
+	except Exception as e:
+		print("Test Failed: test_checkpoint_file: ", e)
+	return 0
+
+def test_bad_checkpoint_file():
+	try:
+		path = os.path.join(tempfile.mkdtemp(), "tweets.json")
+		with open(path, "w") as fh:
+			fh.write('{"version": 99}')
+		TweetCollector(FakeTweetAPI(), checkpoint_path=path)
+	except ParsingError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_bad_checkpoint_file: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_pagination_and_since_id())
+	success.append(test_backlog_after_max_pages())
+	success.append(test_rate_limit_windows())
+	success.append(test_checkpoint_file())
+	success.append(test_bad_checkpoint_file())
+	print("Tweets Test Done: (%d/%d) Successful"%(sum(success), len(success)))
@@ -0,0 +1,118 @@
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import yayFinPy.options
+from yayFinPy.options import *
+from yayFinPy.volatility_surface import *
+from yayFinPy.exceptions import *
+
+NOW = datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc).timestamp()
+EXPIRATIONS = ["2024-02-16", "2024-03-15", "2024-06-21", "2024-12-20"]
+SPOT, RATE = 100.0, 0.03
+
+def years_to(expiration):
+	return (pd.Timestamp(expiration + " 16:00", tz="America/New_York").timestamp() - NOW) / (365 * 86400)
+
+def smile(x, level):
+	return level + 0.2 * x * x
+
+def make_chain(levels, fetched):
+	strikes = np.arange(50.0, 201.0, 2.5)
+	def fetch(ticker, expiration):
+		fetched.append(expiration)
+		years = years_to(expiration)
+		x = np.log(strikes / (SPOT * np.exp(RATE * years)))
+		frames = []
+		for is_call in (True, False):
+			price = black_scholes(is_call, SPOT, strikes, years, RATE, smile(x, levels[expiration]))
+			frames.append(pd.DataFrame({"contractSymbol": "X", "strike": strikes, "bid": price, "ask": price,
+										"lastPrice": price, "volume": 1, "openInterest": 1}))
+		return frames[0], frames[1]
+	return OptionChain("XYZ", SPOT, rate=RATE, expirations_fetcher=lambda t: EXPIRATIONS, chain_fetcher=fetch,
+					   clock=lambda: NOW)
+
+def test_surface_matches_smile():
+	try:
+		levels = dict(zip(EXPIRATIONS, [0.3, 0.28, 0.25, 0.22]))
+		surface = VolatilitySurface(make_chain(levels, []))
+		assert(surface.expirations == EXPIRATIONS)
+		grid = surface.grid()
+		x = np.array(grid.columns)
+		for e in EXPIRATIONS:
+			inside = np.abs(x) <= 0.3
+			assert(np.allclose(grid.loc[e].values[inside], smile(x[inside], levels[e]), atol=2e-3))
+		# at an expiration, volatility is the smile of that expiration
+		years = years_to("2024-06-21")
+		strikes = SPOT * np.exp(RATE * years) * np.exp(np.array([-0.2, 0.0, 0.15]))
+		vols = surface.implied_volatility(strikes, years)
+		assert(np.allclose(vols, smile(np.array([-0.2, 0.0, 0.15]), 0.25), atol=2e-3))
+		# between expirations, total variance is interpolated linearly in time
+		t0, t1 = years_to("2024-03-15"), years_to("2024-06-21")
+		mid = 0.5 * (t0 + t1)
+		w = surface.total_variance(0.0, mid)
+		assert(abs(w - 0.5 * (0.28 ** 2 * t0 + 0.25 ** 2 * t1)) < 1e-3)
+		return 1
+	except Exception as e:
+		print("Test Failed: test_surface_matches_smile: ", e)
+	return 0
+
+def test_batch_queries():
+	try:
+		levels = dict(zip(EXPIRATIONS, [0.3, 0.28, 0.25, 0.22]))
+		surface = VolatilitySurface(make_chain(levels, []))
+		rnd = np.random.RandomState(0)
+		strikes = rnd.uniform(60, 160, 100000)
+		years = rnd.uniform(0.01, 2, 100000)
+		start = time.perf_counter()
+		vols = surface.implied_volatility(strikes, years)
+		assert(time.perf_counter() - start < 0.5)
+		assert(vols.shape == (100000,) and np.all(np.isfinite(vols)) and np.all(vols > 0))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_batch_queries: ", e)
+	return 0
+
+def test_incremental_refresh():
+	try:
+		levels = dict(zip(EXPIRATIONS, [0.3, 0.28, 0.25, 0.22]))
+		fetched = []
+		surface = VolatilitySurface(make_chain(levels, fetched))
+		before = surface.grid()
+		assert(surface.refresh() == [])
+		levels["2024-03-15"] = 0.4
+		solved = []
+		solver = yayFinPy.options.implied_volatility
+		yayFinPy.options.implied_volatility = lambda price, *args: solved.append(len(price)) or solver(price, *args)
+		try:
+			assert(surface.refresh(["2024-03-15"], force=True) == ["2024-03-15"])
+		finally:
+			yayFinPy.options.implied_volatility = solver
+		# only the contracts of the expiration fetched are solved again
+		assert(solved == [2 * 61])
+		assert(len(fetched) == len(EXPIRATIONS) + 1)
+		after = surface.grid()
+		assert(abs(after.loc["2024-03-15"].iloc[20] - 0.4) < 2e-3)
+		others = [e for e in EXPIRATIONS if e != "2024-03-15"]
+		assert(np.allclose(after.loc[others].values, before.loc[others].values))
+		return 1
+	except Exception as e:
+		print("Test Failed: test_incremental_refresh: ", e)
+	return 0
+
+def test_invalid_grid():
+	try:
+		VolatilitySurface(make_chain(dict.fromkeys(EXPIRATIONS, 0.2), []), log_moneyness=[0.0, 0.1, 0.3])
+	except InputError:
+		return 1
+	except Exception as e:
+		print("Test Failed: test_invalid_grid: ", e)
+	return 0
+
+if __name__ == '__main__':
+	success = []
+	success.append(test_surface_matches_smile())
+	success.append(test_batch_queries())
+	success.append(test_incremental_refresh())
+	success.append(test_invalid_grid())
+	print("Volatility Surface Test Done: (%d/%d) Successful"%(sum(success), len(success)))